@@ -0,0 +1,4 @@
+"""Бенчмарки производительности бота.
+
+Запускаются из корня проекта: python -m benchmarks.<имя_модуля>
+"""
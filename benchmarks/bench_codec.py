@@ -0,0 +1,90 @@
+"""Бенчмарк форматов записи игроков: JSON против бинарного кодека.
+
+Пример:
+    python -m benchmarks.bench_codec --sizes 1000 10000
+"""
+import argparse
+import json
+import random
+import time
+
+from models import BattleState, DailyQuest, Equipment, Player
+from models.story import StoryProgress
+from services.binary_codec import decode_record, encode_record
+
+
+def make_player(uid: int, rng: random.Random) -> Player:
+    """Игрок с типичным для середины игры набором данных."""
+    player = Player(
+        user_id=10 ** 9 + uid,
+        hp=rng.randint(1, 200),
+        max_hp=200,
+        level=rng.randint(1, 30),
+        exp=rng.randint(0, 5000),
+        gold=rng.randint(0, 10 ** 5),
+        inventory=["Деревянная палка", "Стальной меч", "Кожаная броня"][:rng.randint(1, 3)],
+        spells=["⚡ Огненный шар", "✨ Исцеление"][:rng.randint(0, 2)],
+        location=rng.choice(["village", "forest", "cave", "mountain"]),
+        equipment=Equipment(weapon="Стальной меч", armor=rng.choice([None, "Кожаная броня"])),
+        quests={"daily": DailyQuest(date="2026-10-18", kills=rng.randint(0, 5))},
+        achievements=["first_blood", "monster_hunter"][:rng.randint(0, 2)],
+        total_kills=rng.randint(0, 500),
+        story_progress=StoryProgress(current_chapter=2, completed_chapters=[1],
+                                     boss_defeated={"Вожак гоблинов": True}),
+        potions={"health": 0, "mana": 0, "power": 0, "health_potion": rng.randint(0, 5)},
+    )
+    if rng.random() < 0.3:
+        player.battle_state = BattleState(
+            monster_key="wolf", monster_name="Волк", monster_hp=20, monster_max_hp=35,
+            monster_power=12, monster_exp=20, monster_gold_min=5, monster_gold_max=12,
+        )
+    return player
+
+
+def timed(func, *args, repeat: int = 3) -> float:
+    """Лучшее время из нескольких запусков, мс."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes: list[int]) -> None:
+    """Запустить бенчмарк и напечатать таблицу."""
+    print(f"{'игроков':>8} {'формат':>12} {'байт':>11} {'запись, мс':>11} {'чтение, мс':>11}")
+    for size in sizes:
+        rng = random.Random(size)
+        records = [make_player(uid, rng).to_dict() for uid in range(size)]
+        data = {str(r['user_id']): r for r in records}
+
+        pretty = json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+        compact = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        encoded = [encode_record(r) for r in records]
+
+        rows = [
+            ('json indent', len(pretty),
+             timed(lambda: json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')),
+             timed(lambda: json.loads(pretty))),
+            ('json compact', len(compact),
+             timed(lambda: json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')),
+             timed(lambda: json.loads(compact))),
+            ('binary', sum(len(b) + 2 for b in encoded),
+             timed(lambda: [encode_record(r) for r in records]),
+             timed(lambda: [decode_record(b) for b in encoded])),
+        ]
+        for name, size_bytes, write_ms, read_ms in rows:
+            print(f"{size:>8} {name:>12} {size_bytes:>11} {write_ms:>11.2f} {read_ms:>11.2f}")
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == '__main__':
+    main()
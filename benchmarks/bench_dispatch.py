@@ -0,0 +1,130 @@
+"""Бенчмарк выбора обработчика нажатия кнопки: цепочка фильтров против словаря.
+
+Оба варианта прогоняют настоящий ``Dispatcher.feed_update`` с пустыми
+обработчиками, поэтому время включает весь путь aiogram, кроме сети.
+«Фильтры» — прежняя схема: обработчики с ``F.data == ...`` и
+``F.data.startswith(...)`` в нескольких роутерах. «Словарь» — один
+``CallbackDispatcher`` с компактными кодами.
+
+Пример:
+    python -m benchmarks.bench_dispatch --updates 20000
+"""
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Update, User
+
+from handlers.callback_dispatcher import CallbackDispatcher
+from keyboards.callback_data import CallbackCode, pack
+
+# (роутер, старые данные кнопки, код, аргумент) в порядке регистрации до перехода на коды
+ROUTES = [
+    ("battle", "battle_attack", CallbackCode.BATTLE_ATTACK, None),
+    ("battle", "battle_defend", CallbackCode.BATTLE_DEFEND, None),
+    ("battle", "battle_spells", CallbackCode.BATTLE_SPELLS, None),
+    ("battle", "cast_", CallbackCode.CAST_SPELL, "fireball"),
+    ("battle", "battle_potions", CallbackCode.BATTLE_POTIONS, None),
+    ("battle", "use_", CallbackCode.USE_POTION, "health_potion"),
+    ("battle", "battle_back", CallbackCode.BATTLE_BACK, None),
+    ("battle", "battle_flee", CallbackCode.BATTLE_FLEE, None),
+    ("shop", "shop_main", CallbackCode.SHOP_MAIN, None),
+    ("shop", "shop_equipment", CallbackCode.SHOP_EQUIPMENT, None),
+    ("shop", "shop_spells", CallbackCode.SHOP_SPELLS, None),
+    ("shop", "shop_potions", CallbackCode.SHOP_POTIONS, None),
+    ("shop", "buy_", CallbackCode.BUY_ITEM, "iron_sword"),
+    ("shop", "shop_close", CallbackCode.SHOP_CLOSE, None),
+]
+
+# Роутеры без обработчиков кнопок, через которые событие проходит в бою
+EMPTY_ROUTERS = ["commands", "profile"]
+
+
+async def noop(callback: CallbackQuery) -> None:
+    """Пустой обработчик."""
+
+
+def build_filter_dispatcher() -> Dispatcher:
+    """Прежняя схема: фильтры в роутерах, проверяемые по очереди."""
+    dp = Dispatcher()
+    for name in EMPTY_ROUTERS:
+        dp.include_router(Router(name=name))
+    routers: dict[str, Router] = {}
+    for router_name, data, _, payload in ROUTES:
+        router = routers.get(router_name)
+        if router is None:
+            router = routers[router_name] = Router(name=router_name)
+            dp.include_router(router)
+        flt = F.data.startswith(data) if payload is not None else F.data == data
+        router.callback_query.register(noop, flt)
+    return dp
+
+
+def build_table_dispatcher() -> Dispatcher:
+    """Новая схема: один роутер с поиском обработчика по коду."""
+    dp = Dispatcher()
+    callbacks = CallbackDispatcher()
+    for _, _, code, _ in ROUTES:
+        callbacks.register(code)(noop)
+    dp.include_router(callbacks.router)
+    for name in EMPTY_ROUTERS:
+        dp.include_router(Router(name=name))
+    return dp
+
+
+def make_update(update_id: int, data: str) -> Update:
+    """Обновление с нажатием кнопки."""
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=User(id=1, is_bot=False, first_name="bench"),
+            chat_instance="bench",
+            data=data,
+        ),
+    )
+
+
+async def measure(dp: Dispatcher, bot: Bot, updates: list[Update]) -> float:
+    """Среднее время обработки одного обновления, мкс."""
+    for update in updates[:100]:
+        await dp.feed_update(bot, update)
+    start = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - start) / len(updates) * 10 ** 6
+
+
+async def run(count: int) -> None:
+    """Запустить бенчмарк и напечатать таблицу."""
+    bot = Bot(token="42:BENCHMARK")
+    filter_dp = build_filter_dispatcher()
+    table_dp = build_table_dispatcher()
+
+    cases = {
+        "первая кнопка": [ROUTES[0]],
+        "последняя кнопка": [ROUTES[-1]],
+        "все кнопки": ROUTES,
+    }
+    print(f"{'нажатия':<18} {'фильтры, мкс':>13} {'словарь, мкс':>13} {'ускорение':>10}")
+    for name, routes in cases.items():
+        picked = [routes[i % len(routes)] for i in range(count)]
+        old = [make_update(i, data + (payload or "")) for i, (_, data, _, payload) in enumerate(picked)]
+        new = [make_update(i, pack(code, payload)) for i, (_, _, code, payload) in enumerate(picked)]
+        filter_us = await measure(filter_dp, bot, old)
+        table_us = await measure(table_dp, bot, new)
+        print(f"{name:<18} {filter_us:>13.1f} {table_us:>13.1f} {filter_us / table_us:>9.1f}x")
+    await bot.session.close()
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=20000, help="Нажатий на каждый сценарий")
+    args = parser.parse_args()
+    asyncio.run(run(args.updates))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Бенчмарк /top: полный перебор против индекса рейтинга.
+
+Пример:
+    python -m benchmarks.bench_leaderboard --sizes 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from models import Player
+from services import LeaderboardIndex
+
+
+def full_scan_top(all_data: dict[str, dict], limit: int) -> list[tuple[str, Player]]:
+    """Прежняя реализация get_top_players: from_dict для всех и сортировка."""
+    players = [(uid, Player.from_dict(data)) for uid, data in all_data.items()]
+    players.sort(key=lambda x: (x[1].level, x[1].gold), reverse=True)
+    return players[:limit]
+
+
+def indexed_top(index: LeaderboardIndex, all_data: dict[str, dict], limit: int) -> list[tuple[str, Player]]:
+    """Новая реализация: срез индекса и from_dict только для топа."""
+    return [(str(uid), Player.from_dict(all_data[str(uid)])) for uid in index.top(limit)]
+
+
+def timed(func, *args, repeat: int = 5) -> float:
+    """Лучшее время из нескольких запусков, мс."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes: list[int]) -> None:
+    """Запустить бенчмарк и напечатать таблицу."""
+    print(f"{'игроков':>8} {'перебор, мс':>12} {'индекс, мс':>11} {'update, мкс':>12} {'rank, мкс':>10}")
+    for size in sizes:
+        rng = random.Random(size)
+        all_data = {
+            str(uid): Player(user_id=uid, level=rng.randint(1, 50), gold=rng.randint(0, 10 ** 5)).to_dict()
+            for uid in range(size)
+        }
+        index = LeaderboardIndex()
+        index.rebuild((int(uid), d['level'], d['gold']) for uid, d in all_data.items())
+
+        scan_ms = timed(full_scan_top, all_data, 10, repeat=3)
+        index_ms = timed(indexed_top, index, all_data, 10)
+
+        updates = 1000
+        start = time.perf_counter()
+        for _ in range(updates):
+            index.update(rng.randrange(size), rng.randint(1, 50), rng.randint(0, 10 ** 5))
+        update_us = (time.perf_counter() - start) / updates * 10 ** 6
+
+        start = time.perf_counter()
+        for _ in range(updates):
+            index.rank(rng.randrange(size))
+        rank_us = (time.perf_counter() - start) / updates * 10 ** 6
+
+        print(f"{size:>8} {scan_ms:>12.2f} {index_ms:>11.3f} {update_us:>12.2f} {rank_us:>10.2f}")
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Бенчмарк задержки сохранения и холодного чтения игрока для разных хранилищ.
+
+Пример:
+    python -m benchmarks.bench_storage --sizes 1000 10000 100000 --saves 20
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from models import Player
+from services import (
+    BinaryDataRepository,
+    DataRepository,
+    IndexedDataRepository,
+    JournalDataRepository,
+    SqliteDataRepository,
+)
+
+
+def make_players(count: int) -> dict[str, dict]:
+    """Сгенерировать базу игроков."""
+    rng = random.Random(count)
+    players = {}
+    for uid in range(count):
+        player = Player(
+            user_id=uid,
+            level=rng.randint(1, 30),
+            gold=rng.randint(0, 5000),
+            total_kills=rng.randint(0, 500),
+            inventory=["Деревянная палка", "Стальной меч", "Кожаная броня"],
+            spells=["⚡ Огненный шар"],
+        )
+        players[str(uid)] = player.to_dict()
+    return players
+
+
+def measure_saves(repo: DataRepository, count: int, saves: int) -> list[float]:
+    """Замерить время save_player для случайных игроков, мс."""
+    rng = random.Random(0)
+    timings = []
+    for _ in range(saves):
+        player = Player.from_dict(repo.get_player_data(rng.randrange(count)))
+        player.gold += 1
+        start = time.perf_counter()
+        repo.save_player(player)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure_cold_read(repo: DataRepository, count: int) -> float:
+    """Время первого чтения игрока сразу после открытия хранилища, мс."""
+    start = time.perf_counter()
+    repo.get_player_data(count // 2)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(sizes: list[int], saves: int) -> None:
+    """Запустить бенчмарк и напечатать таблицу."""
+    backends = {
+        'json': lambda path: DataRepository(data_file=str(path / 'players.json')),
+        'journal': lambda path: JournalDataRepository(
+            data_file=str(path / 'players.json'), compact_threshold=10 ** 9
+        ),
+        'sqlite': lambda path: SqliteDataRepository(data_file=str(path / 'players.db')),
+        'binary': lambda path: BinaryDataRepository(data_file=str(path / 'players.bin')),
+        'indexed': lambda path: IndexedDataRepository(data_file=str(path / 'players.jsonl')),
+    }
+
+    print(f"{'игроков':>8} {'бэкенд':>8} {'среднее, мс':>12} {'p99, мс':>10} {'холодное чтение, мс':>20}")
+    for size in sizes:
+        data = make_players(size)
+        for name, factory in backends.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                repo = factory(Path(tmp))
+                repo.save_all(dict(data))
+                timings = measure_saves(repo, size, saves)
+                repo.close()
+                cold_repo = factory(Path(tmp))
+                cold_ms = measure_cold_read(cold_repo, size)
+                cold_repo.close()
+            p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+            print(f"{size:>8} {name:>8} {statistics.mean(timings):>12.3f} {p99:>10.3f} {cold_ms:>20.3f}")
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--saves', type=int, default=20, help="сохранений на каждый замер")
+    args = parser.parse_args()
+    run(args.sizes, args.saves)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Бенчмарк движка хода: resolve_turn по одному и пакетная симуляция.
+
+Пакетный режим — это векторная симуляция ``game_logic.balance``, а не
+пачки вызовов ``resolve_turn``: она повторяет правила боя массивами numpy,
+а совпадение с ``resolve_turn`` по доле побед и распределению числа ходов
+проверяет ``tests/test_balance.py``.
+
+Пример:
+    python -m benchmarks.bench_turns --turns 200000 --fights 20000
+"""
+import argparse
+import random
+import time
+
+from data import MONSTER_TEMPLATES
+from game_logic.battle import TurnAction, TurnStatus, create_battle_state, resolve_turn
+from models import Monster, Player
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy необязателен
+    np = None
+
+
+def scalar_turns(turns: int, seed: int) -> float:
+    """Ходы resolve_turn в секунду: атака/защита, бой заново после исхода."""
+    rng = random.Random(seed)
+    template = MONSTER_TEMPLATES["orc"]
+    actions = [TurnAction.ATTACK] * 3 + [TurnAction.DEFEND]
+    player = state = None
+
+    start = time.perf_counter()
+    for i in range(turns):
+        if state is None:
+            player = Player(user_id=1, hp=400, max_hp=400, power=40)
+            state = player.battle_state = create_battle_state(Monster.from_template(template))
+        outcome = resolve_turn(player, state, actions[i & 3], rng)
+        if outcome.status is not TurnStatus.ONGOING:
+            state = None
+    return turns / (time.perf_counter() - start)
+
+
+def batch_turns(fights: int, seed: int) -> float:
+    """Ходы в секунду векторной симуляции game_logic.balance (numpy), не resolve_turn."""
+    from game_logic.balance import make_build, simulate_fights
+
+    templates = [MONSTER_TEMPLATES[key] for key in ("goblin", "wolf", "orc")]
+    builds = [make_build(level) for level in (1, 5, 10)]
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    results = simulate_fights(templates, builds, fights, rng)
+    elapsed = time.perf_counter() - start
+    return sum(result.avg_turns * result.fights for result in results) / elapsed
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=200000)
+    parser.add_argument('--fights', type=int, default=20000, help="боёв на пару монстр × билд")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"resolve_turn:  {scalar_turns(args.turns, args.seed):>12,.0f} ходов/с")
+    if np is None:
+        print("balance (numpy): нужен numpy (pip install numpy)")
+    else:
+        print(f"balance (numpy): {batch_turns(args.fights, args.seed):>10,.0f} ходов/с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Локальная заглушка Telegram Bot API для нагрузочных тестов.
+
+Отвечает на методы, которые вызывает бот, хранит отправленные им
+сообщения (с клавиатурами — по ним виртуальные игроки выбирают
+следующее действие) и отдаёт через ``getUpdates`` обновления,
+поставленные в очередь ``push_update``.
+
+Бот подключается к заглушке через ``TELEGRAM_API_URL``.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiohttp import web
+
+BOT_USER = {'id': 42, 'is_bot': True, 'first_name': 'Termux RPG', 'username': 'termux_rpg_bot'}
+# Сколько последних сообщений бота помнить в каждом чате
+MESSAGES_PER_CHAT = 20
+# Предел загружаемого файла, как у sendPhoto в Telegram
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+
+class FakeBotAPI:
+    """Заглушка Bot API поверх aiohttp.
+
+    Запросы приходят на ``/bot<token>/<method>`` так же, как на
+    api.telegram.org. Ответы строятся из переданных параметров, поэтому
+    бот получает правдоподобные ``Message`` с ``message_id``, подписью,
+    фото и клавиатурой.
+    """
+
+    def __init__(self):
+        """Инициализировать пустую заглушку."""
+        self._updates: deque[dict] = deque()
+        self._arrived = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+        self._message_ids: Dict[int, itertools.count] = {}
+        self._messages: Dict[int, OrderedDict[int, dict]] = {}
+        self._methods: Dict[str, Callable[[dict], Awaitable[Any]]] = {
+            'getMe': self._get_me,
+            'getUpdates': self._get_updates,
+            'deleteWebhook': self._ok,
+            'sendMessage': self._send_message,
+            'sendPhoto': self._send_photo,
+            'editMessageText': self._edit_message_text,
+            'editMessageCaption': self._edit_message_caption,
+            'editMessageReplyMarkup': self._edit_message_reply_markup,
+            'deleteMessage': self._delete_message,
+            'answerCallbackQuery': self._ok,
+        }
+        self.calls: Counter[str] = Counter()
+        self.unknown: Counter[str] = Counter()
+
+    def make_app(self) -> web.Application:
+        """aiohttp-приложение заглушки."""
+        app = web.Application(client_max_size=MAX_UPLOAD_BYTES)
+        app.router.add_post('/bot{token}/{method}', self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Выполнить метод Bot API."""
+        method = request.match_info['method']
+        handler = self._methods.get(method)
+        if handler is None:
+            self.unknown[method] += 1
+            return web.json_response(
+                {'ok': False, 'error_code': 404, 'description': f"Not Found: method {method} not implemented"},
+                status=404,
+            )
+        self.calls[method] += 1
+        params = dict(await request.post())
+        return web.json_response({'ok': True, 'result': await handler(params)})
+
+    def push_update(self, update: dict) -> int:
+        """Поставить обновление в очередь getUpdates.
+
+        Returns:
+            Присвоенный ``update_id``
+        """
+        update_id = next(self._update_ids)
+        self._updates.append({'update_id': update_id, **update})
+        self._arrived.set()
+        return update_id
+
+    def next_message_id(self, chat_id: int) -> int:
+        """Очередной ``message_id`` в чате (общий для игрока и бота)."""
+        return next(self._message_ids.setdefault(chat_id, itertools.count(1)))
+
+    def get_message(self, chat_id: int, message_id: int) -> Optional[dict]:
+        """Сообщение бота в его текущем виде (с учётом правок)."""
+        return self._messages.get(chat_id, {}).get(message_id)
+
+    def last_message(self, chat_id: int) -> Optional[dict]:
+        """Последнее сообщение бота в чате."""
+        messages = self._messages.get(chat_id)
+        if not messages:
+            return None
+        return next(reversed(messages.values()))
+
+    @staticmethod
+    def as_telegram(message: dict) -> dict:
+        """Сообщение в том виде, в каком его видит бот.
+
+        Telegram возвращает в ``Message`` только инлайн-клавиатуру; обычная
+        клавиатура хранится у заглушки, чтобы игроки видели свои кнопки.
+        """
+        if 'inline_keyboard' in message.get('reply_markup', {}):
+            return message
+        return {key: value for key, value in message.items() if key != 'reply_markup'}
+
+    def stats(self) -> dict:
+        """Сколько раз вызывался каждый метод."""
+        return {
+            'calls': dict(self.calls),
+            'unknown': dict(self.unknown),
+            'pending_updates': len(self._updates),
+        }
+
+    # Методы Bot API
+
+    async def _ok(self, params: dict) -> bool:
+        """Метод без полезного результата."""
+        return True
+
+    async def _get_me(self, params: dict) -> dict:
+        """Профиль бота."""
+        return BOT_USER
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        """Отдать накопленные обновления, при пустой очереди — подождать."""
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 100))
+        timeout = float(params.get('timeout', 0))
+        # offset подтверждает всё, что было до него
+        while self._updates and self._updates[0]['update_id'] < offset:
+            self._updates.popleft()
+        if not self._updates and timeout > 0:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return list(itertools.islice(self._updates, limit))
+
+    def _store(self, chat_id: int, message: dict) -> dict:
+        """Запомнить сообщение бота, вытесняя самые старые."""
+        messages = self._messages.setdefault(chat_id, OrderedDict())
+        messages[message['message_id']] = message
+        if len(messages) > MESSAGES_PER_CHAT:
+            messages.popitem(last=False)
+        return message
+
+    def _new_message(self, params: dict, **fields: Any) -> dict:
+        """Сообщение бота в чате ``chat_id``."""
+        chat_id = int(params['chat_id'])
+        message = {
+            'message_id': self.next_message_id(chat_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+            'from': BOT_USER,
+            **fields,
+        }
+        if 'reply_markup' in params:
+            message['reply_markup'] = json.loads(params['reply_markup'])
+        return self.as_telegram(self._store(chat_id, message))
+
+    async def _send_message(self, params: dict) -> dict:
+        """sendMessage."""
+        return self._new_message(params, text=params.get('text', ''))
+
+    async def _send_photo(self, params: dict) -> dict:
+        """sendPhoto: загруженный файл получает новый file_id, переданный file_id возвращается как есть."""
+        photo = params.get('photo')
+        if isinstance(photo, str) and not photo.startswith('attach://'):
+            file_id = photo
+        else:
+            file_id = f"fake-photo-{next(self._file_ids)}"
+        sizes = [
+            {'file_id': f"{file_id}-s", 'file_unique_id': f"{file_id}-s", 'width': 90, 'height': 90},
+            {'file_id': file_id, 'file_unique_id': file_id, 'width': 800, 'height': 800},
+        ]
+        fields = {'photo': sizes}
+        if 'caption' in params:
+            fields['caption'] = params['caption']
+        return self._new_message(params, **fields)
+
+    def _edit(self, params: dict, **fields: Any) -> Any:
+        """Изменить сообщение; без ``reply_markup`` инлайн-клавиатура убирается, как в Telegram."""
+        if 'inline_message_id' in params:
+            return True
+        message = self.get_message(int(params['chat_id']), int(params['message_id']))
+        if message is None:
+            raise web.HTTPBadRequest(
+                text=json.dumps({'ok': False, 'error_code': 400, 'description': "Bad Request: message to edit not found"}),
+                content_type='application/json',
+            )
+        message.update(fields)
+        message['edit_date'] = int(time.time())
+        if 'reply_markup' in params:
+            message['reply_markup'] = json.loads(params['reply_markup'])
+        else:
+            message.pop('reply_markup', None)
+        return self.as_telegram(message)
+
+    async def _edit_message_text(self, params: dict) -> Any:
+        """editMessageText."""
+        return self._edit(params, text=params.get('text', ''))
+
+    async def _edit_message_caption(self, params: dict) -> Any:
+        """editMessageCaption."""
+        return self._edit(params, caption=params.get('caption', ''))
+
+    async def _edit_message_reply_markup(self, params: dict) -> Any:
+        """editMessageReplyMarkup."""
+        return self._edit(params)
+
+    async def _delete_message(self, params: dict) -> bool:
+        """deleteMessage."""
+        self._messages.get(int(params['chat_id']), {}).pop(int(params['message_id']), None)
+        return True
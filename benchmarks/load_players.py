@@ -0,0 +1,399 @@
+"""Нагрузочный тест бота целиком: виртуальные игроки против заглушки Bot API.
+
+Бот запускается в этом же процессе с настоящими роутерами и middleware,
+получает обновления polling-ом из ``FakeBotAPI`` и отвечает в неё же.
+Каждый виртуальный игрок ведёт себя как человек: ``/start``, поездки по
+карте, многоходовые бои (атаки, заклинания, зелья), покупки в магазине и
+награды за квесты. Следующее действие выбирается по кнопкам из ответа
+бота, а новое обновление игрок шлёт только после обработки предыдущего.
+
+Хранилище создаётся во временной директории, поэтому данные игроков и
+кэш картинок рабочего бота не затрагиваются.
+
+Пример:
+    python -m benchmarks.load_players --players 100 --duration 30
+    python -m benchmarks.load_players --players 500 --backend sqlite --scheduler --write-behind
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from aiohttp import web
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+import config
+from keyboards.callback_data import CallbackCode, unpack
+from services import PlayerService, create_repository, setup_logging
+from .fake_bot_api import FakeBotAPI
+
+FAKE_API_PORT = 8098
+TOKEN = "42:LOADTEST"
+BASE_USER_ID = 10 ** 6
+# Сколько ждать обработки одного обновления, с
+UPDATE_TIMEOUT = 30.0
+# Предел ходов одного боя (защита от зацикливания)
+MAX_BATTLE_TURNS = 60
+
+START = "/start"
+BATTLE = "⚔️ В бой!"
+PROFILE = "👤 Профиль"
+MAP = "🗺️ Карта"
+QUESTS = "📜 Квесты"
+CLAIM = "📦 Забрать награду"
+SHOP = "🛒 Магазин"
+REST = "☕ Отдых (15💰)"
+BACK = "⬅️ Назад"
+
+# Сценарии и их относительная частота
+SCENARIOS = (('battle', 5), ('travel', 2), ('shop', 2), ('quests', 1), ('profile', 1))
+
+
+class CountingRepository:
+    """Обёртка хранилища, считающая операции записи."""
+
+    def __init__(self, repository: Any):
+        """Обернуть репозиторий."""
+        self._repository = repository
+        self.writes = 0
+        self.players_written = 0
+
+    def __getattr__(self, name: str) -> Any:
+        """Остальные методы — без изменений."""
+        return getattr(self._repository, name)
+
+    def save_player(self, player, changed_fields=None, record=None) -> bool:
+        """Сохранить одного игрока."""
+        self.writes += 1
+        self.players_written += 1
+        return self._repository.save_player(player, changed_fields=changed_fields, record=record)
+
+    def save_players(self, players: Iterable) -> bool:
+        """Сохранить игроков одной операцией."""
+        players = list(players)
+        self.writes += 1
+        self.players_written += len(players)
+        return self._repository.save_players(players)
+
+    def save_records(self, records: dict) -> bool:
+        """Сохранить снимки игроков одной операцией."""
+        self.writes += 1
+        self.players_written += len(records)
+        return self._repository.save_records(records)
+
+
+class Traffic:
+    """Отправка обновлений в заглушку и ожидание их обработки."""
+
+    def __init__(self, api: FakeBotAPI):
+        """Инициализировать счётчики."""
+        self.api = api
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.handler_ms: list[float] = []
+        self.round_trip_ms: list[float] = []
+        self.errors = 0
+        self.timeouts = 0
+
+    async def send(self, update: dict) -> bool:
+        """Отправить обновление и дождаться конца его обработки."""
+        future = asyncio.get_running_loop().create_future()
+        update_id = self.api.push_update(update)
+        self._pending[update_id] = future
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, timeout=UPDATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return False
+        finally:
+            self._pending.pop(update_id, None)
+        self.round_trip_ms.append((time.perf_counter() - start) * 1000)
+        return True
+
+    def complete(self, update_id: int, elapsed_ms: float, failed: bool) -> None:
+        """Отметить обновление обработанным."""
+        self.handler_ms.append(elapsed_ms)
+        if failed:
+            self.errors += 1
+        future = self._pending.get(update_id)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+
+class LatencyProbe(BaseMiddleware):
+    """Замер времени обработки обновления ботом."""
+
+    def __init__(self, traffic: Traffic):
+        """Инициализировать замер."""
+        self.traffic = traffic
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Вызвать обработку и сообщить о её завершении."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await handler(event, data)
+            failed = False
+            return result
+        finally:
+            self.traffic.complete(event.update_id, (time.perf_counter() - start) * 1000, failed)
+
+
+def inline_buttons(message: Optional[dict]) -> Dict[CallbackCode, list[str]]:
+    """Callback-данные инлайн-кнопок сообщения по кодам действий."""
+    buttons: Dict[CallbackCode, list[str]] = {}
+    markup = (message or {}).get('reply_markup') or {}
+    for row in markup.get('inline_keyboard', []):
+        for button in row:
+            parsed = unpack(button.get('callback_data') or '')
+            if parsed is not None:
+                buttons.setdefault(parsed[0], []).append(button['callback_data'])
+    return buttons
+
+
+def reply_buttons(message: Optional[dict]) -> list[str]:
+    """Тексты кнопок обычной клавиатуры сообщения."""
+    markup = (message or {}).get('reply_markup') or {}
+    return [button['text'] for row in markup.get('keyboard', []) for button in row]
+
+
+def message_text(message: Optional[dict]) -> str:
+    """Текст или подпись сообщения."""
+    if message is None:
+        return ''
+    return message.get('text') or message.get('caption') or ''
+
+
+class VirtualPlayer:
+    """Игрок, который жмёт кнопки из ответов бота."""
+
+    def __init__(self, user_id: int, traffic: Traffic, rng: random.Random, think_ms: float = 0.0):
+        """Инициализировать игрока."""
+        self.user_id = user_id
+        self.traffic = traffic
+        self.rng = rng
+        self.think_ms = think_ms
+        self.user = {'id': user_id, 'is_bot': False, 'first_name': f"Load{user_id}"}
+        self._callbacks = 0
+
+    @property
+    def api(self) -> FakeBotAPI:
+        """Заглушка Bot API."""
+        return self.traffic.api
+
+    async def say(self, text: str) -> Optional[dict]:
+        """Написать боту и вернуть его последнее сообщение."""
+        await self.traffic.send({'message': {
+            'message_id': self.api.next_message_id(self.user_id),
+            'date': int(time.time()),
+            'chat': {'id': self.user_id, 'type': 'private'},
+            'from': self.user,
+            'text': text,
+        }})
+        return self.api.last_message(self.user_id)
+
+    async def press(self, message: dict, callback_data: str) -> Optional[dict]:
+        """Нажать инлайн-кнопку и вернуть сообщение после правки."""
+        self._callbacks += 1
+        await self.traffic.send({'callback_query': {
+            'id': f"{self.user_id}-{self._callbacks}",
+            'from': self.user,
+            'chat_instance': str(self.user_id),
+            'message': self.api.as_telegram(message),
+            'data': callback_data,
+        }})
+        return self.api.get_message(self.user_id, message['message_id'])
+
+    async def think(self) -> None:
+        """Пауза между действиями."""
+        if self.think_ms > 0:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think_ms) / 1000)
+
+    async def play(self, deadline: float) -> None:
+        """Играть до ``deadline`` (по ``time.perf_counter``)."""
+        names = [name for name, _ in SCENARIOS]
+        weights = [weight for _, weight in SCENARIOS]
+        await self.say(START)
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            await getattr(self, scenario)()
+            await self.think()
+
+    async def profile(self) -> None:
+        """Посмотреть профиль."""
+        await self.say(PROFILE)
+
+    async def travel(self) -> None:
+        """Открыть карту и отправиться в случайную локацию."""
+        reply = await self.say(MAP)
+        locations = reply_buttons(reply)
+        if locations:
+            await self.think()
+            await self.say(self.rng.choice(locations))
+
+    async def quests(self) -> None:
+        """Открыть квесты, забрать награду и вернуться."""
+        await self.say(QUESTS)
+        await self.say(CLAIM)
+        await self.say(BACK)
+
+    async def shop(self) -> None:
+        """Зайти в магазин, купить что-нибудь и закрыть его."""
+        message = await self.say(SHOP)
+        sections = [
+            data
+            for code in (CallbackCode.SHOP_EQUIPMENT, CallbackCode.SHOP_SPELLS, CallbackCode.SHOP_POTIONS)
+            for data in inline_buttons(message).get(code, [])
+        ]
+        if not sections:
+            return
+        message = await self.press(message, self.rng.choice(sections))
+        offers = inline_buttons(message).get(CallbackCode.BUY_ITEM)
+        if offers:
+            await self.think()
+            message = await self.press(message, self.rng.choice(offers))
+        # Закрыть магазин можно только из главного раздела
+        back = inline_buttons(message).get(CallbackCode.SHOP_MAIN)
+        if back:
+            message = await self.press(message, back[0])
+        close = inline_buttons(message).get(CallbackCode.SHOP_CLOSE)
+        if close:
+            await self.press(message, close[0])
+
+    async def battle(self) -> None:
+        """Начать бой и вести его до конца."""
+        message = await self.say(BATTLE)
+        buttons = inline_buttons(message)
+        if CallbackCode.BATTLE_ATTACK not in buttons:
+            # Бой не начался: мало здоровья или в локации нет врагов
+            if "слабы" in message_text(message):
+                await self.say(REST)
+            else:
+                await self.travel()
+            return
+
+        for _ in range(MAX_BATTLE_TURNS):
+            choice = self._battle_action(buttons)
+            if choice is None:
+                return
+            await self.think()
+            message = await self.press(message, choice)
+            buttons = inline_buttons(message)
+
+    def _battle_action(self, buttons: Dict[CallbackCode, list[str]]) -> Optional[str]:
+        """Выбрать кнопку боя; None — бой окончен."""
+        for code in (CallbackCode.CAST_SPELL, CallbackCode.USE_POTION):
+            if code in buttons:
+                return self.rng.choice(buttons[code])
+        if CallbackCode.BATTLE_BACK in buttons:
+            # Меню заклинаний или зелий без доступных вариантов
+            return buttons[CallbackCode.BATTLE_BACK][0]
+        if CallbackCode.BATTLE_ATTACK not in buttons:
+            return None
+        roll = self.rng.random()
+        if roll < 0.2 and CallbackCode.BATTLE_SPELLS in buttons:
+            return buttons[CallbackCode.BATTLE_SPELLS][0]
+        if roll < 0.3 and CallbackCode.BATTLE_POTIONS in buttons:
+            return buttons[CallbackCode.BATTLE_POTIONS][0]
+        return buttons[CallbackCode.BATTLE_ATTACK][0]
+
+
+def percentiles(values: list[float]) -> str:
+    """p50/p95/p99/max в миллисекундах."""
+    if len(values) < 2:
+        return "мало данных"
+    quantiles = statistics.quantiles(values, n=100)
+    return f"p50 {quantiles[49]:.2f}  p95 {quantiles[94]:.2f}  p99 {quantiles[98]:.2f}  max {max(values):.2f}"
+
+
+async def run(players: int, duration: float, backend: str, scheduler: bool, write_behind: bool,
+              flood_control: bool, think_ms: float, seed: int) -> None:
+    """Прогнать ``players`` виртуальных игроков ``duration`` секунд и напечатать итоги."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Настройки теста важнее .env: своё хранилище, заглушка вместо api.telegram.org
+        config.TELEGRAM_API_URL = f"http://127.0.0.1:{FAKE_API_PORT}"
+        config.MEDIA_CACHE_FILE = os.path.join(data_dir, 'media_cache.json')
+        config.FLOOD_CONTROL_ENABLED = flood_control
+        config.UPDATE_SCHEDULER_ENABLED = scheduler
+        config.WRITE_BEHIND_ENABLED = write_behind
+        repository = CountingRepository(create_repository(backend, data_file=os.path.join(data_dir, f"players.{backend}")))
+        PlayerService._instance = None
+        PlayerService(repository=repository)
+
+        # Обработчики берут сервисы при импорте — импортируем после настройки
+        from bot import create_bot, create_dispatcher
+
+        api = FakeBotAPI()
+        runner = web.AppRunner(api.make_app())
+        await runner.setup()
+        await web.TCPSite(runner, host='127.0.0.1', port=FAKE_API_PORT).start()
+
+        traffic = Traffic(api)
+        dp = create_dispatcher()
+        dp.update.outer_middleware(LatencyProbe(traffic))
+        bot = create_bot(TOKEN)
+        polling = asyncio.create_task(dp.start_polling(
+            bot, handle_signals=False, handle_as_tasks=not scheduler, polling_timeout=1,
+        ))
+
+        rng = random.Random(seed)
+        virtual_players = [
+            VirtualPlayer(BASE_USER_ID + i, traffic, random.Random(rng.random()), think_ms)
+            for i in range(players)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(player.play(started + duration) for player in virtual_players))
+        elapsed = time.perf_counter() - started
+        writes, players_written = repository.writes, repository.players_written
+
+        await dp.stop_polling()
+        await polling
+        await runner.cleanup()
+
+    updates = len(traffic.handler_ms)
+    print(f"игроков:          {players}, хранилище: {backend}, планировщик: {'да' if scheduler else 'нет'}, "
+          f"write-behind: {'да' if write_behind else 'нет'}")
+    print(f"обновлений:       {updates} за {elapsed:.1f} с, ошибок: {traffic.errors}, таймаутов: {traffic.timeouts}")
+    print(f"обновлений/с:     {updates / elapsed:.0f}")
+    print(f"обработчик, мс:   {percentiles(traffic.handler_ms)}")
+    print(f"ответ игроку, мс: {percentiles(traffic.round_trip_ms)}")
+    print(f"записи:           {writes / elapsed:.0f} операций/с, {players_written / elapsed:.0f} игроков/с "
+          f"(после остановки: {repository.writes - writes} операций)")
+    calls = ", ".join(f"{method} {count}" for method, count in api.calls.most_common())
+    print(f"Bot API:          {calls}")
+    if api.unknown:
+        print(f"⚠️ Не поддержаны заглушкой: {dict(api.unknown)}")
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=100, help="Виртуальных игроков")
+    parser.add_argument('--duration', type=float, default=30.0, help="Длительность, с")
+    parser.add_argument('--backend', default='json', help="Хранилище: json, journal, sqlite, binary, indexed")
+    parser.add_argument('--scheduler', action='store_true', help="Очереди обновлений по игрокам")
+    parser.add_argument('--write-behind', action='store_true', help="Отложенная запись игроков")
+    parser.add_argument('--flood-control', action='store_true', help="Лимиты исходящих сообщений Telegram")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Средняя пауза игрока между действиями, мс")
+    parser.add_argument('--seed', type=int, default=1, help="Зерно генератора действий")
+    args = parser.parse_args()
+    listener = setup_logging(level='WARNING', fmt='text')
+    try:
+        asyncio.run(run(args.players, args.duration, args.backend, args.scheduler, args.write_behind,
+                        args.flood_control, args.think_ms, args.seed))
+    finally:
+        listener.stop()
+
+
+if __name__ == '__main__':
+    main()
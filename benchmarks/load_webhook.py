@@ -0,0 +1,151 @@
+"""Нагрузочный тест вебхука: синтетические обновления POST-запросами.
+
+Без ``--url`` поднимает локальный сервер ``create_app`` с пустым
+обработчиком — так меряется сам путь приёма (HTTP, проверка секрета,
+ограничение параллельности, диспетчер). Печатаются две задержки:
+ответ на запрос (Telegram получает его до обработки) и полная обработка —
+от отправки запроса до конца фоновой обработки обновления. С пустым
+обработчиком обработка часто заканчивается раньше, чем клиент дочитает
+ответ, поэтому вторая задержка может быть меньше первой.
+
+С ``--url`` нагружает уже запущенного бота (``BOT_MODE=webhook``). Конец
+обработки снаружи не виден, поэтому печатается только задержка ответа
+на запрос.
+
+Пример:
+    python -m benchmarks.load_webhook --duration 10 --connections 32
+    python -m benchmarks.load_webhook --url http://127.0.0.1:8080/webhook --secret change_me
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from typing import Optional
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+from webhook import create_app
+
+LOCAL_PORT = 8099
+SECRET = "load-test"
+TEXTS = ["⚔️ В бой!", "👤 Профиль", "🗺️ Карта", "📜 Квесты", "🛒 Магазин"]
+
+
+def make_update(update_id: int, players: int) -> dict:
+    """Синтетическое обновление от одного из ``players`` игроков."""
+    user_id = 10 ** 6 + update_id % players
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'Load'},
+            'text': TEXTS[update_id % len(TEXTS)],
+        },
+    }
+
+
+async def start_local_server(max_concurrency: int, processed: dict[int, asyncio.Future]) -> web.AppRunner:
+    """Поднять локальный вебхук с пустым обработчиком.
+
+    Обработчик завершает future из ``processed`` по номеру сообщения.
+    """
+    dp = Dispatcher()
+
+    @dp.message()
+    async def noop(message: Message) -> None:
+        """Пустой обработчик: отметить конец обработки."""
+        done = processed.pop(message.message_id, None)
+        if done is not None and not done.done():
+            done.set_result(time.perf_counter())
+
+    app = create_app(dp, Bot(token="42:LOADTEST"), secret_token=SECRET, max_concurrency=max_concurrency)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host='127.0.0.1', port=LOCAL_PORT).start()
+    return runner
+
+
+async def run(url: Optional[str], secret: str, duration: float, connections: int, players: int,
+              max_concurrency: int) -> None:
+    """Слать обновления ``duration`` секунд и напечатать итоги."""
+    runner = None
+    processed: dict[int, asyncio.Future] = {}
+    if url is None:
+        runner = await start_local_server(max_concurrency, processed)
+        url = f"http://127.0.0.1:{LOCAL_PORT}/webhook"
+    track_processing = runner is not None
+
+    headers = {'X-Telegram-Bot-Api-Secret-Token': secret}
+    update_ids = itertools.count(1)
+    latencies: list[float] = []
+    processing: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async with ClientSession(connector=TCPConnector(limit=connections)) as session:
+        async def worker() -> None:
+            nonlocal errors
+            loop = asyncio.get_running_loop()
+            while time.perf_counter() < deadline:
+                update_id = next(update_ids)
+                payload = make_update(update_id, players)
+                if track_processing:
+                    done = processed[update_id] = loop.create_future()
+                start = time.perf_counter()
+                async with session.post(url, json=payload, headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                        processed.pop(update_id, None)
+                        continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                if track_processing:
+                    processing.append((await done - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(connections)))
+        elapsed = time.perf_counter() - started
+
+    if runner is not None:
+        await runner.cleanup()
+
+    if len(latencies) < 2:
+        print("Слишком мало успешных запросов для статистики")
+        return
+    print(f"адрес:            {url}")
+    print(f"соединений:       {connections}, игроков: {players}")
+    print(f"запросов:         {len(latencies)} за {elapsed:.1f} с, ошибок: {errors}")
+    print(f"обновлений/с:     {len(latencies) / elapsed:.0f}")
+    print(f"ответ, мс:        {format_quantiles(latencies)}")
+    if track_processing:
+        print(f"обработка, мс:    {format_quantiles(processing)}")
+    else:
+        print("обработка:        не видна снаружи, выше — только задержка ответа на запрос")
+
+
+def format_quantiles(values: list[float]) -> str:
+    """p50, p95, p99 и максимум задержек."""
+    quantiles = statistics.quantiles(values, n=100)
+    return f"p50 {quantiles[49]:.2f}  p95 {quantiles[94]:.2f}  p99 {quantiles[98]:.2f}  max {max(values):.2f}"
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="Адрес запущенного вебхука (по умолчанию — локальный сервер)")
+    parser.add_argument('--secret', default=SECRET, help="X-Telegram-Bot-Api-Secret-Token")
+    parser.add_argument('--duration', type=float, default=10.0, help="Длительность, с")
+    parser.add_argument('--connections', type=int, default=32, help="Одновременных соединений")
+    parser.add_argument('--players', type=int, default=1000, help="Сколько разных игроков шлют обновления")
+    parser.add_argument('--max-concurrency', type=int, default=64, help="Предел обработок локального сервера")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.secret, args.duration, args.connections, args.players, args.max_concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,8 +8,13 @@ import os
 from dotenv import load_dotenv
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 
 from handlers import (
+    admin_router,
+    callback_router,
+    text_command_router,
     commands_router,
     profile_router,
     battle_router,
@@ -19,47 +24,171 @@ from handlers import (
     rest_router,
     story_router
 )
+from middlewares import (
+    FloodControlMiddleware,
+    HandlerMetricsMiddleware,
+    PlayerSessionMiddleware,
+    UpdateLoggingMiddleware,
+    UpdateSchedulerMiddleware,
+    UserLockMiddleware,
+)
+from services import (
+    get_asset_compiler,
+    get_flood_control,
+    get_media_cache,
+    get_metrics,
+    get_player_service,
+    get_update_scheduler,
+    instrument_services,
+    parse_logger_levels,
+    setup_logging,
+    start_metrics_server,
+)
+from services.asset_compiler import format_report
+from webhook import run_webhook
+import config
 
 # Загрузка переменных окружения
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
-if not TELEGRAM_BOT_TOKEN:
-    raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
+logger = logging.getLogger(__name__)
+
+
+def create_bot(token: str) -> Bot:
+    """Создать бота.
+
+    ``TELEGRAM_API_URL`` направляет запросы на другой сервер Bot API —
+    локальный ``telegram-bot-api`` или тестовую заглушку.
+    """
+    session = None
+    if config.TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(config.TELEGRAM_API_URL))
+    bot = Bot(token=token, session=session)
+
+    # Исходящие сообщения выдерживают лимиты Telegram, устаревшие правки склеиваются
+    if config.FLOOD_CONTROL_ENABLED:
+        bot.session.middleware(FloodControlMiddleware(get_flood_control(), max_retries=config.FLOOD_MAX_RETRIES))
+    return bot
+
+
+def create_dispatcher() -> Dispatcher:
+    """Создать диспетчер с middleware, роутерами и хуками запуска."""
+    dp = Dispatcher()
+
+    # Обновления раскладываются по очередям игроков: по порядку для одного игрока,
+    # параллельно для разных (см. UPDATE_SCHEDULER_ENABLED)
+    if config.UPDATE_SCHEDULER_ENABLED:
+        dp.update.outer_middleware(UpdateSchedulerMiddleware(get_update_scheduler()))
+
+    # События одного игрока обрабатываются по очереди
+    user_lock_middleware = UserLockMiddleware(get_player_service().locks)
+    dp.message.middleware(user_lock_middleware)
+    dp.callback_query.middleware(user_lock_middleware)
+
+    # Время обработки событий (с загрузкой и сохранением игрока) пишется в журнал
+    update_logging_middleware = UpdateLoggingMiddleware(slow_ms=config.LOG_SLOW_UPDATE_MS)
+    dp.message.middleware(update_logging_middleware)
+    dp.callback_query.middleware(update_logging_middleware)
 
-# Инициализация бота и диспетчера
-bot: Bot = Bot(token=TELEGRAM_BOT_TOKEN)
-dp: Dispatcher = Dispatcher()
+    # Время обработчиков по роутерам для /metrics
+    if config.METRICS_ENABLED:
+        metrics_middleware = HandlerMetricsMiddleware(get_metrics())
+        dp.message.middleware(metrics_middleware)
+        dp.callback_query.middleware(metrics_middleware)
 
-# Регистрация роутеров
-dp.include_router(commands_router)
-dp.include_router(profile_router)
-dp.include_router(battle_router)
-dp.include_router(shop_router)
-dp.include_router(map_router)
-dp.include_router(quest_router)
-dp.include_router(rest_router)
-dp.include_router(story_router)
+    # Игрок загружается один раз на событие и сохраняется после обработчика
+    player_session_middleware = PlayerSessionMiddleware(get_player_service())
+    dp.message.middleware(player_session_middleware)
+    dp.callback_query.middleware(player_session_middleware)
+
+    # Регистрация роутеров. Нажатия инлайн-кнопок и тексты кнопок главной клавиатуры
+    # находятся поиском в словаре, остальное проходит по цепочке роутеров
+    dp.include_router(callback_router)
+    dp.include_router(text_command_router)
+    dp.include_router(admin_router)
+    dp.include_router(commands_router)
+    dp.include_router(profile_router)
+    dp.include_router(battle_router)
+    dp.include_router(shop_router)
+    dp.include_router(map_router)
+    dp.include_router(quest_router)
+    dp.include_router(rest_router)
+    dp.include_router(story_router)
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+async def on_startup(dispatcher: Dispatcher) -> None:
+    """Подготовить сервисы и запустить фоновые задачи."""
+    player_service = get_player_service()
+    if config.METRICS_ENABLED:
+        instrument_services(get_metrics(), player_service)
+        dispatcher['metrics_runner'] = await start_metrics_server(
+            get_metrics(), config.METRICS_HOST, config.METRICS_PORT,
+        )
+        logger.info("Метрики: http://%s:%d/metrics", config.METRICS_HOST, config.METRICS_PORT)
+    await player_service.arebuild_leaderboard()
+    if config.ASSET_COMPILE_ON_STARTUP:
+        try:
+            reports = await asyncio.get_running_loop().run_in_executor(None, get_asset_compiler().compile)
+            logger.info("Картинки собраны:\n%s", format_report(reports))
+        except RuntimeError as e:
+            logger.warning("Картинки не собраны: %s", e)
+    if config.UPDATE_SCHEDULER_ENABLED:
+        get_update_scheduler().start()
+    if config.WRITE_BEHIND_ENABLED:
+        player_service.start_write_behind(
+            interval_ms=config.WRITE_BEHIND_INTERVAL_MS,
+            max_dirty=config.WRITE_BEHIND_MAX_DIRTY,
+        )
+
+
+async def on_shutdown(dispatcher: Dispatcher) -> None:
+    """Доработать очереди обновлений, сбросить изменения и закрыть хранилище."""
+    if config.UPDATE_SCHEDULER_ENABLED:
+        await get_update_scheduler().stop(timeout=10)
+    await get_player_service().aclose()
+    await get_media_cache().aflush()
+    metrics_runner = dispatcher.workflow_data.pop('metrics_runner', None)
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
 
 
 async def main() -> None:
     """Главная функция запуска бота."""
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-    )
-    logging.getLogger("aiogram").setLevel(logging.DEBUG)
-    print("🤖 Termux RPG Bot запускается...")
-    print("📡 Начинаем polling...")
+    if not TELEGRAM_BOT_TOKEN:
+        raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
 
+    # Записи журнала уходят в очередь, пишет их отдельный поток
+    listener = setup_logging(
+        level=config.LOG_LEVEL,
+        logger_levels=parse_logger_levels(config.LOG_LEVELS),
+        fmt=config.LOG_FORMAT,
+        sample_burst=config.LOG_SAMPLE_BURST,
+        sample_interval=config.LOG_SAMPLE_INTERVAL,
+    )
     try:
-        await dp.start_polling(bot)
-    except Exception as e:
-        print(f"❌ Ошибка polling: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+        logger.info("Termux RPG Bot запускается")
+        bot = create_bot(TELEGRAM_BOT_TOKEN)
+        dp = create_dispatcher()
+
+        if config.BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+            return
+
+        logger.info("Начинаем polling")
+        try:
+            # С планировщиком polling ждёт постановки в очередь — так работает backpressure
+            await dp.start_polling(bot, handle_as_tasks=not config.UPDATE_SCHEDULER_ENABLED)
+        except Exception:
+            logger.exception("Ошибка polling")
+            raise
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -6,10 +6,94 @@ load_dotenv()
 
 # Telegram Bot Token
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# Свой сервер Bot API (локальный telegram-bot-api или заглушка нагрузочного теста)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+# Telegram id администраторов через запятую (служебные команды)
+ADMIN_IDS = frozenset(int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip())
+
+# Журнал: уровень, уровни отдельных логгеров ("aiogram=WARNING,services=DEBUG"), формат json | text
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "aiogram.event=WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Одинаковых записей не больше LOG_SAMPLE_BURST за LOG_SAMPLE_INTERVAL секунд (0 — все)
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "10"))
+LOG_SAMPLE_INTERVAL = float(os.getenv("LOG_SAMPLE_INTERVAL", "60"))
+# События дольше этого порога (мс) попадают в журнал предупреждением
+LOG_SLOW_UPDATE_MS = float(os.getenv("LOG_SLOW_UPDATE_MS", "1000"))
+
+# Метрики Prometheus на http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# Сэмплирующий профилировщик (/profile): период сэмплов, предел длительности, куда писать стеки
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "300"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Режим получения обновлений: polling | webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Вебхук: публичный адрес (регистрируется в Telegram при запуске), путь и секрет
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Сколько обновлений обрабатывается одновременно и сколько соединений открывает Telegram
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "64"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
 
 # Data file
-DATA_FILE = 'players_rpg.json'
+DATA_FILE = os.getenv("DATA_FILE", 'players_rpg.json')
+
+# Storage backend: json | journal | sqlite | binary | indexed
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+SQLITE_FILE = os.getenv("SQLITE_FILE", 'players_rpg.db')
+BINARY_FILE = os.getenv("BINARY_FILE", 'players_rpg.bin')
+INDEXED_FILE = os.getenv("INDEXED_FILE", 'players_rpg.jsonl')
+# Через сколько дописанных байт сохранять индекс (столько досканируется после сбоя)
+INDEXED_INDEX_EVERY_BYTES = int(os.getenv("INDEXED_INDEX_EVERY_BYTES", str(4 * 1024 * 1024)))
+# Сколько записей журнала накапливать до компакции в снимок
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv("JOURNAL_COMPACT_THRESHOLD", "1000"))
+
+# Сохранённые file_id картинок, уже загруженных в Telegram
+MEDIA_CACHE_FILE = os.getenv("MEDIA_CACHE_FILE", 'media_cache.json')
+
+# Уменьшенные копии картинок (python -m services.asset_compiler, нужен Pillow)
+ASSET_SOURCE_DIR = os.getenv("ASSET_SOURCE_DIR", 'assets/images')
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", 'assets/cache')
+ASSET_MAX_SIZE = int(os.getenv("ASSET_MAX_SIZE", "800"))
+ASSET_FORMAT = os.getenv("ASSET_FORMAT", "JPEG")
+ASSET_QUALITY = int(os.getenv("ASSET_QUALITY", "85"))
+ASSET_COMPILE_ON_STARTUP = os.getenv("ASSET_COMPILE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
 
 # Game constants
 HEAL_COST = 10
 MIN_HP_FOR_BATTLE = 15
+
+# Размер пула потоков для операций хранилища
+STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", "4"))
+
+# Лимиты кэша игроков в памяти (0 — без ограничения)
+PLAYER_CACHE_MAX_ENTRIES = int(os.getenv("PLAYER_CACHE_MAX_ENTRIES", "10000"))
+PLAYER_CACHE_MAX_BYTES = int(os.getenv("PLAYER_CACHE_MAX_BYTES", "0"))
+
+# Планировщик обновлений: очереди по игрокам вместо задачи на каждое обновление
+UPDATE_SCHEDULER_ENABLED = os.getenv("UPDATE_SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+# Число очередей = сколько игроков обрабатывается одновременно
+UPDATE_WORKERS = int(os.getenv("UPDATE_WORKERS", "16"))
+# Ёмкость одной очереди; при заполнении приём обновлений притормаживает
+UPDATE_QUEUE_SIZE = int(os.getenv("UPDATE_QUEUE_SIZE", "100"))
+
+# Лимиты исходящих сообщений: общий на бота и на групповой чат (сообщений в секунду)
+FLOOD_CONTROL_ENABLED = os.getenv("FLOOD_CONTROL_ENABLED", "true").lower() in ("1", "true", "yes")
+FLOOD_GLOBAL_RATE = float(os.getenv("FLOOD_GLOBAL_RATE", "30"))
+FLOOD_CHAT_RATE = float(os.getenv("FLOOD_CHAT_RATE", "1"))
+FLOOD_CHAT_BURST = float(os.getenv("FLOOD_CHAT_BURST", "3"))
+FLOOD_MAX_RETRIES = int(os.getenv("FLOOD_MAX_RETRIES", "2"))
+
+# Отложенная запись игроков (write-behind)
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv("WRITE_BEHIND_INTERVAL_MS", "500"))
+WRITE_BEHIND_MAX_DIRTY = int(os.getenv("WRITE_BEHIND_MAX_DIRTY", "100"))
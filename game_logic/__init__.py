@@ -1,8 +1,9 @@
 """Игровая логика."""
 from .battle import (
-    BattleResult, calculate_damage, select_monster_for_location,
+    BattleConstants, BattleResult, calculate_damage, select_monster_for_location,
     simulate_battle, apply_battle_result, create_boss_monster,
-    create_battle_state, player_attack, monster_attack, flee_battle
+    create_battle_state, player_attack, monster_attack, flee_battle,
+    TurnAction, TurnEventType, TurnStatus, TurnEvent, TurnOutcome, resolve_turn
 )
 from .experience import exp_for_level, check_level_up, add_experience
 from .achievements import Achievement, AchievementInfo, ACHIEVEMENTS, check_and_award, get_achievement_name, format_achievements
@@ -11,6 +12,7 @@ from .trading import get_item_type, can_purchase_item, purchase_item, equip_item
 from .magic import get_spell_by_key, get_spell_by_name, cast_spell, use_potion
 
 __all__ = [
+    'BattleConstants',
     'BattleResult',
     'calculate_damage',
     'select_monster_for_location',
@@ -21,6 +23,12 @@ __all__ = [
     'player_attack',
     'monster_attack',
     'flee_battle',
+    'TurnAction',
+    'TurnEventType',
+    'TurnStatus',
+    'TurnEvent',
+    'TurnOutcome',
+    'resolve_turn',
     'exp_for_level',
     'check_level_up',
     'add_experience',
@@ -0,0 +1,304 @@
+"""Симуляция баланса пошагового боя методом Монте-Карло.
+
+Бои разыгрываются не по одному, а массивами numpy: один шаг цикла —
+один ход во всех ещё не закончившихся боях сразу. Правила повторяют
+``player_attack``, ``monster_attack`` и ``cast_spell``; для каждого
+монстра, уровня игрока и набора купленной экипировки считаются доля
+побед, среднее число ходов и средняя потеря HP.
+
+Пример:
+    python -m game_logic.balance --fights 20000 --max-level 20 --csv balance.csv
+"""
+import argparse
+import csv
+import itertools
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+from data import MONSTER_TEMPLATES, SHOP_ITEMS
+from models import ItemType, MonsterTemplate
+from .battle import BattleConstants
+from .experience import ExperienceConstants
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для симуляции баланса, не для бота
+    np = None
+
+# Бой, не закончившийся за столько ходов, считается непобеждённым
+MAX_TURNS = 200
+# Сколько боёв разыгрывается одним набором массивов
+CHUNK_FIGHTS = 2_000_000
+
+_ONGOING, _VICTORY, _DEFEAT = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class PlayerBuild:
+    """Характеристики игрока для симуляции."""
+    level: int
+    equipment: tuple[str, ...]
+    max_hp: int
+    power: int
+    max_mana: int
+    spells: tuple[str, ...] = ()
+
+
+@dataclass
+class BalanceResult:
+    """Итог боёв одного монстра с одной сборкой игрока."""
+    monster: str
+    level: int
+    equipment: tuple[str, ...]
+    fights: int
+    win_rate: float
+    avg_turns: float
+    avg_hp_loss: float
+
+
+def equipment_items() -> list[str]:
+    """Оружие и броня из магазина (бонусы дают при покупке)."""
+    return [
+        key for key, shop_item in SHOP_ITEMS.items()
+        if shop_item.item.item_type in (ItemType.WEAPON, ItemType.ARMOR)
+    ]
+
+
+def equipment_combinations(items: Optional[Sequence[str]] = None) -> list[tuple[str, ...]]:
+    """Все наборы купленной экипировки, от пустого до полного."""
+    items = equipment_items() if items is None else list(items)
+    return [
+        combo
+        for size in range(len(items) + 1)
+        for combo in itertools.combinations(items, size)
+    ]
+
+
+def make_build(level: int, equipment: Iterable[str] = (), learn_spells: bool = True) -> PlayerBuild:
+    """Сборка игрока уровня ``level``, купившего ``equipment``.
+
+    Рост характеристик — как в ``check_level_up``, бонусы предметов — как
+    в ``purchase_item``. С ``learn_spells`` игрок знает все заклинания,
+    доступные на его уровне.
+    """
+    equipment = tuple(equipment)
+    items = [SHOP_ITEMS[key].item for key in equipment]
+    spells = tuple(
+        key for key, shop_item in SHOP_ITEMS.items()
+        if learn_spells and shop_item.item.is_spell and shop_item.item.required_level <= level
+    )
+    return PlayerBuild(
+        level=level,
+        equipment=equipment,
+        max_hp=100 + ExperienceConstants.HP_PER_LEVEL * (level - 1) + sum(item.max_hp_bonus for item in items),
+        power=10 + ExperienceConstants.POWER_PER_LEVEL * (level - 1) + sum(item.power_bonus for item in items),
+        max_mana=50 + ExperienceConstants.MANA_PER_LEVEL * (level - 1),
+        spells=spells,
+    )
+
+
+def _spell_table() -> tuple[list[str], "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Ключи, стоимость, урон и лечение всех заклинаний."""
+    keys = [key for key, shop_item in SHOP_ITEMS.items() if shop_item.item.is_spell]
+    spells = [SHOP_ITEMS[key].item for key in keys]
+    return (
+        keys,
+        np.array([spell.mana_cost for spell in spells], dtype=np.int64),
+        np.array([spell.spell_damage for spell in spells], dtype=np.int64),
+        np.array([spell.spell_heal for spell in spells], dtype=np.int64),
+    )
+
+
+def _best_affordable(known: "np.ndarray", mana: "np.ndarray", cost: "np.ndarray",
+                     value: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Самое сильное доступное по мане заклинание: (индекс, есть ли такое)."""
+    score = np.where(known & (mana[:, None] >= cost) & (value > 0), value, 0)
+    choice = score.argmax(axis=1)
+    return choice, score[np.arange(len(choice)), choice] > 0
+
+
+def simulate_fights(
+    monsters: Sequence[MonsterTemplate],
+    builds: Sequence[PlayerBuild],
+    fights: int,
+    rng: "np.random.Generator",
+    heal_below: float = 0.35,
+    defend_below: float = 0.0,
+) -> list[BalanceResult]:
+    """Разыграть ``fights`` боёв для каждой пары ``monsters[i]``, ``builds[i]``.
+
+    Тактика игрока: лечиться, когда HP не больше ``heal_below`` от
+    максимума; защищаться при HP не больше ``defend_below`` (по умолчанию
+    никогда — защита только оттягивает поражение); иначе бить самым
+    сильным заклинанием, на которое хватает маны, а без маны — атаковать.
+    Игрок начинает бой с полными HP и маной.
+    """
+    if np is None:
+        raise RuntimeError("Для симуляции баланса нужен numpy: pip install numpy")
+
+    spell_keys, spell_cost, spell_damage, spell_heal = _spell_table()
+    cells = len(monsters)
+    known_cells = np.array(
+        [[key in build.spells for key in spell_keys] for build in builds], dtype=bool,
+    ).reshape(cells, len(spell_keys))
+
+    def per_fight(values: Iterable[int]) -> "np.ndarray":
+        return np.repeat(np.fromiter(values, dtype=np.int64, count=cells), fights)
+
+    monster_hp = per_fight(monster.hp for monster in monsters)
+    monster_power = per_fight(monster.power for monster in monsters)
+    max_hp = per_fight(build.max_hp for build in builds)
+    power = per_fight(build.power for build in builds)
+    hp = max_hp.copy()
+    mana = per_fight(build.max_mana for build in builds)
+    known = np.repeat(known_cells, fights, axis=0)
+    turns = np.zeros(cells * fights, dtype=np.int64)
+    outcome = np.zeros(cells * fights, dtype=np.int8)
+
+    active = np.arange(cells * fights)
+    for _ in range(MAX_TURNS):
+        if not len(active):
+            break
+        n = len(active)
+        cur_hp, cur_mana, cur_max_hp = hp[active], mana[active], max_hp[active]
+
+        # Выбор действия: лечение > защита > заклинание > атака
+        heal_choice, can_heal = _best_affordable(known[active], cur_mana, spell_cost, spell_heal)
+        heal = can_heal & (cur_hp <= heal_below * cur_max_hp)
+        defend = ~heal & (cur_hp <= defend_below * cur_max_hp)
+        cast_choice, can_cast = _best_affordable(known[active], cur_mana, spell_cost, spell_damage)
+        cast = ~heal & ~defend & can_cast
+        attack = ~heal & ~defend & ~cast
+
+        # Ход игрока (player_attack / cast_spell)
+        cur_power = power[active]
+        damage = rng.integers(cur_power // 2, cur_power + 1)
+        crit = rng.random(n) < BattleConstants.CRIT_CHANCE
+        damage = np.where(crit, (damage * BattleConstants.CRIT_MULTIPLIER).astype(np.int64), damage)
+        cur_monster_hp = monster_hp[active] - np.where(attack, damage, 0) - np.where(cast, spell_damage[cast_choice], 0)
+        cur_mana = cur_mana - np.where(cast, spell_cost[cast_choice], 0) - np.where(heal, spell_cost[heal_choice], 0)
+        cur_hp = cur_hp + np.where(heal, np.minimum(spell_heal[heal_choice], cur_max_hp - cur_hp), 0)
+        won = cur_monster_hp <= 0
+
+        # Ход монстра (monster_attack), если он пережил удар
+        cur_monster_power = monster_power[active]
+        enemy_damage = rng.integers(cur_monster_power // 2, cur_monster_power + 1)
+        enemy_damage = np.where(defend, enemy_damage // BattleConstants.DEFEND_DIVISOR, enemy_damage)
+        hit = ~won & (rng.random(n) >= BattleConstants.DODGE_CHANCE)
+        cur_hp = cur_hp - np.where(hit, enemy_damage, 0)
+        lost = ~won & (cur_hp <= 0)
+
+        hp[active], mana[active], monster_hp[active] = cur_hp, cur_mana, cur_monster_hp
+        turns[active] += 1
+        outcome[active[won]] = _VICTORY
+        outcome[active[lost]] = _DEFEAT
+        active = active[~won & ~lost]
+
+    shape = (cells, fights)
+    wins = (outcome == _VICTORY).reshape(shape).mean(axis=1)
+    avg_turns = turns.reshape(shape).mean(axis=1)
+    hp_loss = (max_hp - np.maximum(hp, 0)).reshape(shape).mean(axis=1)
+    return [
+        BalanceResult(
+            monster=monster.key,
+            level=build.level,
+            equipment=build.equipment,
+            fights=fights,
+            win_rate=float(wins[i]),
+            avg_turns=float(avg_turns[i]),
+            avg_hp_loss=float(hp_loss[i]),
+        )
+        for i, (monster, build) in enumerate(zip(monsters, builds))
+    ]
+
+
+def simulate_balance(
+    monster_keys: Optional[Sequence[str]] = None,
+    levels: Iterable[int] = range(1, 21),
+    equipment: Optional[Sequence[tuple[str, ...]]] = None,
+    fights: int = 10000,
+    seed: Optional[int] = None,
+    learn_spells: bool = True,
+    heal_below: float = 0.35,
+) -> list[BalanceResult]:
+    """Таблица баланса: каждый монстр × уровень × набор экипировки."""
+    if np is None:
+        raise RuntimeError("Для симуляции баланса нужен numpy: pip install numpy")
+
+    monsters = [MONSTER_TEMPLATES[key] for key in (monster_keys or MONSTER_TEMPLATES)]
+    combos = equipment_combinations() if equipment is None else equipment
+    builds = [make_build(level, combo, learn_spells) for level in levels for combo in combos]
+    cells = [(monster, build) for monster in monsters for build in builds]
+
+    rng = np.random.default_rng(seed)
+    per_chunk = max(1, CHUNK_FIGHTS // fights)
+    results: list[BalanceResult] = []
+    for start in range(0, len(cells), per_chunk):
+        chunk = cells[start:start + per_chunk]
+        results.extend(simulate_fights(
+            [monster for monster, _ in chunk],
+            [build for _, build in chunk],
+            fights,
+            rng,
+            heal_below=heal_below,
+        ))
+    return results
+
+
+def write_csv(results: Iterable[BalanceResult], path: str) -> None:
+    """Записать таблицу баланса в CSV."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['monster', 'level', 'equipment', 'fights', 'win_rate', 'avg_turns', 'avg_hp_loss'])
+        for result in results:
+            writer.writerow([
+                result.monster, result.level, '+'.join(result.equipment), result.fights,
+                f"{result.win_rate:.4f}", f"{result.avg_turns:.2f}", f"{result.avg_hp_loss:.1f}",
+            ])
+
+
+def format_results(results: Iterable[BalanceResult]) -> str:
+    """Таблица баланса для терминала."""
+    lines = [f"{'монстр':<14} {'ур.':>3} {'побед':>6} {'ходов':>6} {'-HP':>6}  экипировка"]
+    for result in results:
+        lines.append(
+            f"{result.monster:<14} {result.level:>3} {result.win_rate:>6.1%} "
+            f"{result.avg_turns:>6.1f} {result.avg_hp_loss:>6.1f}  {'+'.join(result.equipment) or '—'}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Запуск из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fights', type=int, default=10000, help="боёв на каждую клетку таблицы")
+    parser.add_argument('--max-level', type=int, default=20)
+    parser.add_argument('--monster', action='append', choices=sorted(MONSTER_TEMPLATES), help="только эти монстры")
+    parser.add_argument('--no-equipment', action='store_true', help="только игрок без купленной экипировки")
+    parser.add_argument('--no-spells', action='store_true', help="игрок не знает заклинаний")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--csv', help="записать полную таблицу в CSV вместо вывода")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = simulate_balance(
+        monster_keys=args.monster,
+        levels=range(1, args.max_level + 1),
+        equipment=[()] if args.no_equipment else None,
+        fights=args.fights,
+        seed=args.seed,
+        learn_spells=not args.no_spells,
+    )
+    elapsed = time.perf_counter() - started
+
+    if args.csv:
+        write_csv(results, args.csv)
+    else:
+        print(format_results(results))
+    total = sum(result.fights for result in results)
+    print(f"\nБоёв: {total}, {elapsed:.1f} с ({total / elapsed:,.0f} боёв/с)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
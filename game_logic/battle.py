@@ -1,9 +1,35 @@
 """Логика боя."""
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
 from models import Player, Monster, BattleState
 from data import MONSTER_TEMPLATES, LOCATIONS
 from data.monsters import BOSS_NAME_TO_KEY
+from .magic import cast_spell, use_potion
+from .spawn_tables import SpawnTables
+
+
+class BattleConstants:
+    """Константы пошагового боя."""
+    CRIT_CHANCE = 0.15
+    CRIT_MULTIPLIER = 1.5
+    DODGE_CHANCE = 0.10
+    DEFEND_DIVISOR = 2  # защита делит урон монстра
+    FLEE_CHANCE = 0.60
+    ELITE_CHANCE = 0.05  # шанс встретить элитного монстра вместо обычного
+    ELITE_HP_MULTIPLIER = 1.5
+    ELITE_POWER_MULTIPLIER = 1.25
+
+
+# Таблицы появления монстров строятся один раз при импорте
+SPAWN_TABLES = SpawnTables(
+    LOCATIONS,
+    MONSTER_TEMPLATES,
+    elite_chance=BattleConstants.ELITE_CHANCE,
+    elite_hp_multiplier=BattleConstants.ELITE_HP_MULTIPLIER,
+    elite_power_multiplier=BattleConstants.ELITE_POWER_MULTIPLIER,
+)
 
 
 @dataclass
@@ -31,9 +57,9 @@ class BattleResult:
             return msg
 
 
-def calculate_damage(power: int) -> int:
+def calculate_damage(power: int, rng: random.Random = random) -> int:
     """Рассчитать урон."""
-    return random.randint(power // 2, power)
+    return rng.randint(power // 2, power)
 
 
 def select_monster_for_location(
@@ -41,30 +67,12 @@ def select_monster_for_location(
     player_level: int,
     allow_any_level: bool = False,
 ) -> Monster | None:
-    """Выбрать монстра для локации с учётом уровня игрока."""
-    location = LOCATIONS.get(location_key)
-    if not location or not location.has_enemies:
-        return None
-
-    # Фильтруем монстров по уровню
-    available_monsters = [
-        MONSTER_TEMPLATES[key]
-        for key in location.enemies
-        if key in MONSTER_TEMPLATES and MONSTER_TEMPLATES[key].is_available_for_level(player_level)
-    ]
-
-    if not available_monsters and allow_any_level:
-        available_monsters = [
-            MONSTER_TEMPLATES[key]
-            for key in location.enemies
-            if key in MONSTER_TEMPLATES
-        ]
-
-    if not available_monsters:
-        return None
+    """Выбрать монстра для локации с учётом уровня игрока.
 
-    template = random.choice(available_monsters)
-    return Monster.from_template(template)
+    Если по уровню никто не подходит, с ``allow_any_level`` выбирается
+    любой монстр локации. Иногда монстр оказывается элитным (``is_elite``).
+    """
+    return SPAWN_TABLES.spawn(location_key, player_level, allow_any_level)
 
 
 def simulate_battle(player: Player, monster: Monster) -> BattleResult:
@@ -147,30 +155,143 @@ def create_battle_state(monster: Monster, is_boss: bool = False, is_elite: bool
     )
 
 
-def player_attack(player: Player, state: BattleState) -> tuple[int, bool]:
+def player_attack(player: Player, state: BattleState, rng: random.Random = random) -> tuple[int, bool]:
     """Атака игрока. Возвращает (урон, крит?)."""
-    crit = random.random() < 0.15  # 15% шанс крита
-    damage = calculate_damage(player.power)
+    crit = rng.random() < BattleConstants.CRIT_CHANCE
+    damage = calculate_damage(player.power, rng)
     if crit:
-        damage = int(damage * 1.5)
+        damage = int(damage * BattleConstants.CRIT_MULTIPLIER)
     return damage, crit
 
 
-def monster_attack(player: Player, state: BattleState) -> tuple[int, bool]:
+def monster_attack(player: Player, state: BattleState, rng: random.Random = random) -> tuple[int, bool]:
     """Атака монстра. Возвращает (урон, промах игрока?)."""
-    dodge = random.random() < 0.10  # 10% шанс уклонения
+    dodge = rng.random() < BattleConstants.DODGE_CHANCE
     if dodge:
         return 0, True
 
-    damage = calculate_damage(state.monster_power)
+    damage = calculate_damage(state.monster_power, rng)
 
-    # Если игрок защищается - урон снижается на 50%
+    # Если игрок защищается - урон снижается вдвое
     if state.defending:
-        damage = damage // 2
+        damage = damage // BattleConstants.DEFEND_DIVISOR
 
     return damage, False
 
 
-def flee_battle(player: Player) -> bool:
+def flee_battle(player: Player, rng: random.Random = random) -> bool:
     """Попытка сбежать. Возвращает True если успешно."""
-    return random.random() < 0.60  # 60% шанс побега
+    return rng.random() < BattleConstants.FLEE_CHANCE
+
+
+# Движок хода: вся механика без Telegram, обработчики только рисуют события
+
+class TurnAction(Enum):
+    """Действие игрока в ходе боя."""
+    ATTACK = "attack"
+    DEFEND = "defend"
+    SPELL = "spell"
+    POTION = "potion"
+    FLEE = "flee"
+
+
+class TurnEventType(Enum):
+    """Тип события хода."""
+    PLAYER_ATTACK = "player_attack"  # amount, crit
+    DEFEND = "defend"
+    SPELL = "spell"  # amount, text
+    POTION = "potion"  # text
+    FLED = "fled"
+    FLEE_FAILED = "flee_failed"
+    MONSTER_ATTACK = "monster_attack"  # amount, defended
+    MONSTER_MISSED = "monster_missed"
+
+
+class TurnStatus(Enum):
+    """Итог хода."""
+    ONGOING = "ongoing"
+    VICTORY = "victory"
+    DEFEAT = "defeat"
+    FLED = "fled"
+    REJECTED = "rejected"  # действие невозможно, ход не потрачен
+
+
+@dataclass
+class TurnEvent:
+    """Событие хода."""
+    type: TurnEventType
+    amount: int = 0
+    crit: bool = False
+    defended: bool = False
+    text: str = ""
+
+
+@dataclass
+class TurnOutcome:
+    """Результат хода: события по порядку и итог."""
+    status: TurnStatus
+    events: list[TurnEvent] = field(default_factory=list)
+    message: str = ""  # причина отказа для REJECTED
+
+
+def resolve_turn(
+    player: Player,
+    state: BattleState,
+    action: TurnAction,
+    rng: random.Random = random,
+    key: Optional[str] = None,
+) -> TurnOutcome:
+    """Разыграть ход: действие игрока, ответ монстра, проверка исхода.
+
+    Меняет только ``player`` и ``state``. Награды и штрафы за исход боя
+    остаются вызывающему коду. ``key`` — заклинание или зелье. Вся
+    случайность хода, включая заклинания и зелья, берётся из ``rng``:
+    с тем же зерном бой повторяется ход в ход.
+    """
+    events = []
+
+    if action is TurnAction.ATTACK:
+        damage, crit = player_attack(player, state, rng)
+        state.monster_hp -= damage
+        events.append(TurnEvent(TurnEventType.PLAYER_ATTACK, amount=damage, crit=crit))
+    elif action is TurnAction.DEFEND:
+        state.defending = True
+        events.append(TurnEvent(TurnEventType.DEFEND))
+    elif action is TurnAction.SPELL:
+        success, message, damage = cast_spell(player, key, state, rng)
+        if not success:
+            return TurnOutcome(TurnStatus.REJECTED, message=message)
+        events.append(TurnEvent(TurnEventType.SPELL, amount=damage, text=message))
+    elif action is TurnAction.POTION:
+        success, message = use_potion(player, key, state, rng)
+        if not success:
+            return TurnOutcome(TurnStatus.REJECTED, message=message)
+        events.append(TurnEvent(TurnEventType.POTION, text=message))
+    elif action is TurnAction.FLEE:
+        if state.is_boss:
+            return TurnOutcome(TurnStatus.REJECTED, message="❌ Вы не можете сбежать от босса!")
+        if flee_battle(player, rng):
+            player.battle_state = None
+            events.append(TurnEvent(TurnEventType.FLED))
+            return TurnOutcome(TurnStatus.FLED, events)
+        events.append(TurnEvent(TurnEventType.FLEE_FAILED))
+    else:
+        raise ValueError(f"Неизвестное действие: {action!r}")
+
+    if state.monster_hp <= 0:
+        return TurnOutcome(TurnStatus.VICTORY, events)
+
+    # Ход монстра
+    damage, dodged = monster_attack(player, state, rng)
+    player.hp -= damage
+    if dodged:
+        events.append(TurnEvent(TurnEventType.MONSTER_MISSED))
+    else:
+        events.append(TurnEvent(TurnEventType.MONSTER_ATTACK, amount=damage, defended=state.defending))
+
+    state.defending = False
+    state.turn += 1
+
+    if player.hp <= 0:
+        return TurnOutcome(TurnStatus.DEFEAT, events)
+    return TurnOutcome(TurnStatus.ONGOING, events)
@@ -1,4 +1,5 @@
 """Логика магии и заклинаний."""
+import random
 from models import Player, BattleState
 from data import SHOP_ITEMS
 
@@ -19,9 +20,14 @@ def get_spell_by_name(spell_name: str):
     return None
 
 
-def cast_spell(player: Player, spell_key: str, state: BattleState) -> tuple[bool, str, int]:
+def cast_spell(
+    player: Player, spell_key: str, state: BattleState, rng: random.Random = random,
+) -> tuple[bool, str, int]:
     """Применить заклинание в бою.
 
+    ``rng`` — генератор хода: эффекты заклинаний сейчас без разброса, но
+    случайность, если появится, должна браться только из него.
+
     Returns:
         (success: bool, message: str, damage_to_monster: int)
     """
@@ -55,9 +61,13 @@ def cast_spell(player: Player, spell_key: str, state: BattleState) -> tuple[bool
     return False, "❌ Неизвестный эффект заклинания!", 0
 
 
-def use_potion(player: Player, potion_key: str, state: BattleState | None = None) -> tuple[bool, str]:
+def use_potion(
+    player: Player, potion_key: str, state: BattleState | None = None, rng: random.Random = random,
+) -> tuple[bool, str]:
     """Использовать зелье.
 
+    ``rng`` — генератор хода, как в ``cast_spell``.
+
     Returns:
         (success: bool, message: str)
     """
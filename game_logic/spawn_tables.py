@@ -0,0 +1,141 @@
+"""Таблицы появления монстров по локациям и уровням.
+
+Для каждой пары (локация, уровень игрока) заранее, при импорте, строится
+таблица псевдонимов (метод Уолкера/Воуза) по весам ``spawn_weight``
+подходящих монстров. Выбор монстра — одно случайное число и одно
+сравнение, без фильтрации шаблонов на каждое нажатие «⚔️ В бой!».
+"""
+import random
+from dataclasses import dataclass, replace
+from typing import Mapping, Optional, Sequence
+from models import Location, Monster, MonsterTemplate
+
+
+class AliasTable:
+    """Выбор индекса с заданными весами за O(1)."""
+
+    def __init__(self, weights: Sequence[float]):
+        """Построить таблицу по положительным весам."""
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Нужен хотя бы один положительный вес")
+
+        scaled = [weight * n / total for weight in weights]
+        # Столбцы, оставшиеся без пары (в том числе из-за округления), целиком свои
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def __len__(self) -> int:
+        """Количество вариантов."""
+        return len(self.prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        """Случайный индекс: столбец и порог из одного случайного числа."""
+        u = rng.random() * len(self.prob)
+        column = int(u)
+        return column if u - column < self.prob[column] else self.alias[column]
+
+
+@dataclass(frozen=True)
+class SpawnTable:
+    """Монстры одной локации для одного уровня игрока."""
+    templates: tuple[MonsterTemplate, ...]
+    sampler: AliasTable
+
+    @classmethod
+    def build(cls, templates: Sequence[MonsterTemplate]) -> Optional['SpawnTable']:
+        """Таблица по шаблонам с положительным весом (None, если таких нет)."""
+        templates = tuple(template for template in templates if template.spawn_weight > 0)
+        if not templates:
+            return None
+        return cls(templates, AliasTable([template.spawn_weight for template in templates]))
+
+    def draw(self, rng: random.Random = random) -> MonsterTemplate:
+        """Случайный шаблон монстра с учётом весов."""
+        return self.templates[self.sampler.sample(rng)]
+
+
+def make_elite(monster: Monster, hp_multiplier: float, power_multiplier: float) -> Monster:
+    """Элитная версия монстра: больше HP и силы."""
+    hp = int(monster.max_hp * hp_multiplier)
+    return replace(monster, hp=hp, max_hp=hp, power=int(monster.power * power_multiplier), is_elite=True)
+
+
+class SpawnTables:
+    """Скомпилированные таблицы появления всех локаций."""
+
+    def __init__(
+        self,
+        locations: Mapping[str, Location],
+        templates: Mapping[str, MonsterTemplate],
+        elite_chance: float = 0.0,
+        elite_hp_multiplier: float = 1.0,
+        elite_power_multiplier: float = 1.0,
+    ):
+        """Построить таблицы для всех уровней, на которых меняется состав монстров."""
+        self.elite_chance = elite_chance
+        self.elite_hp_multiplier = elite_hp_multiplier
+        self.elite_power_multiplier = elite_power_multiplier
+        self._tables: dict[tuple[str, int], Optional[SpawnTable]] = {}
+        self._any_level: dict[str, Optional[SpawnTable]] = {}
+
+        enemies = {
+            key: [templates[enemy] for enemy in location.enemies if enemy in templates]
+            for key, location in locations.items()
+        }
+        # Выше этого уровня состав монстров уже не меняется
+        self.max_level = max(
+            (template.max_level + 1 for location in enemies.values() for template in location),
+            default=1,
+        )
+        # Одинаковый состав монстров на разных уровнях — одна общая таблица
+        built: dict[tuple[str, ...], Optional[SpawnTable]] = {}
+
+        def build(location_templates: list[MonsterTemplate]) -> Optional[SpawnTable]:
+            key = tuple(template.key for template in location_templates)
+            if key not in built:
+                built[key] = SpawnTable.build(location_templates)
+            return built[key]
+
+        for key, location_templates in enemies.items():
+            self._any_level[key] = build(location_templates)
+            for level in range(1, self.max_level + 1):
+                self._tables[(key, level)] = build([
+                    template for template in location_templates if template.is_available_for_level(level)
+                ])
+
+    def table(self, location_key: str, player_level: int, allow_any_level: bool = False) -> Optional[SpawnTable]:
+        """Таблица для локации и уровня (с ``allow_any_level`` — любая, если по уровню нет)."""
+        level = min(max(player_level, 1), self.max_level)
+        table = self._tables.get((location_key, level))
+        if table is None and allow_any_level:
+            table = self._any_level.get(location_key)
+        return table
+
+    def spawn(
+        self,
+        location_key: str,
+        player_level: int,
+        allow_any_level: bool = False,
+        rng: random.Random = random,
+    ) -> Optional[Monster]:
+        """Создать случайного монстра локации; с ``elite_chance`` — элитного."""
+        table = self.table(location_key, player_level, allow_any_level)
+        if table is None:
+            return None
+        monster = Monster.from_template(table.draw(rng))
+        if self.elite_chance and rng.random() < self.elite_chance:
+            monster = make_elite(monster, self.elite_hp_multiplier, self.elite_power_multiplier)
+        return monster
@@ -1,4 +1,6 @@
 """Обработчики бота."""
+from .admin_handlers import router as admin_router
+from .callback_dispatcher import router as callback_router
 from .commands import router as commands_router
 from .profile import router as profile_router
 from .battle_handlers import router as battle_router
@@ -7,8 +9,12 @@ from .map_handlers import router as map_router
 from .quest_handlers import router as quest_router
 from .rest_handlers import router as rest_router
 from .story_handlers import router as story_router
+from .text_commands import router as text_command_router
 
 __all__ = [
+    'admin_router',
+    'callback_router',
+    'text_command_router',
     'commands_router',
     'profile_router',
     'battle_router',
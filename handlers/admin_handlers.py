@@ -0,0 +1,133 @@
+"""Служебные команды для администраторов бота."""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+from aiogram import Router, F, types
+from aiogram.filters import Command, CommandObject
+from aiogram.types import FSInputFile
+import config
+from services import ProfileReport, get_flood_control, get_profiler, get_update_scheduler
+from .text_commands import text_commands
+
+logger = logging.getLogger(__name__)
+
+router = Router(name="admin")
+router.message.filter(F.from_user.id.in_(config.ADMIN_IDS))
+
+
+def format_text_command_stats() -> str:
+    """Таблица текстовых команд и числа срабатываний."""
+    lines = ["📋 Текстовые команды:\n"]
+    for text, handler_name, hits in text_commands.stats():
+        lines.append(f"{hits:>6}  {text} → {handler_name}")
+    lines.append(f"\nПередано роутерам: {text_commands.misses}")
+    return "\n".join(lines)
+
+
+@router.message(Command("commands"))
+async def cmd_commands(message: types.Message) -> None:
+    """Команда /commands - зарегистрированные текстовые команды и их счётчики."""
+    await message.answer(format_text_command_stats())
+
+
+def format_scheduler_stats(stats: dict) -> str:
+    """Сводка очередей обновлений."""
+    return (
+        "📬 Очереди обновлений:\n\n"
+        f"Воркеров: {stats['workers']}\n"
+        f"В очередях: {stats['queued']} (самая длинная {stats['max_queue_depth']}, пик {stats['peak_queue_depth']})\n"
+        f"Принято: {stats['submitted']}, обработано: {stats['processed']}, ошибок: {stats['failed']}\n"
+        f"Ожидание в очереди: среднее {stats['avg_wait_ms']:.1f} мс, максимум {stats['max_wait_ms']:.1f} мс\n"
+        f"Приём притормаживал: {stats['blocked']} раз, {stats['blocked_ms']:.0f} мс"
+    )
+
+
+@router.message(Command("queues"))
+async def cmd_queues(message: types.Message) -> None:
+    """Команда /queues - глубина очередей обновлений и время ожидания."""
+    if not config.UPDATE_SCHEDULER_ENABLED:
+        await message.answer("📬 Планировщик обновлений выключен (UPDATE_SCHEDULER_ENABLED).")
+        return
+    await message.answer(format_scheduler_stats(get_update_scheduler().stats()))
+
+
+def format_flood_stats(stats: dict) -> str:
+    """Сводка ограничения исходящих сообщений."""
+    return (
+        "🚦 Исходящие сообщения:\n\n"
+        f"Отправлено: {stats['sent']}\n"
+        f"Придержано лимитом: {stats['throttled']} ({stats['throttled_ms']:.0f} мс ожидания)\n"
+        f"Склеено правок: {stats['coalesced']}\n"
+        f"Повторов после 429: {stats['retried']}\n"
+        f"Корзин чатов: {stats['chat_buckets']}"
+    )
+
+
+@router.message(Command("flood"))
+async def cmd_flood(message: types.Message) -> None:
+    """Команда /flood - сколько отправок придержано лимитами и склеено."""
+    await message.answer(format_flood_stats(get_flood_control().stats()))
+
+
+def parse_profile_seconds(args: Optional[str]) -> Optional[int]:
+    """Длительность профилирования из аргумента команды (None — неверный аргумент)."""
+    try:
+        seconds = int(args) if args else 30
+    except ValueError:
+        return None
+    if not 1 <= seconds <= config.PROFILE_MAX_SECONDS:
+        return None
+    return seconds
+
+
+def format_profile_report(report: ProfileReport, limit: int = 15) -> str:
+    """Сводка профиля: доля простоя и самые горячие функции."""
+    busy = report.busy_samples
+    if not busy:
+        return f"🔥 Профиль за {report.seconds:.0f} с: цикл событий простаивал ({report.samples} сэмплов)"
+    lines = [
+        f"🔥 Профиль за {report.seconds:.0f} с: {report.samples} сэмплов, "
+        f"цикл событий занят в {busy} ({busy / report.samples:.0%})\n",
+        "  своё  всего  функция",
+    ]
+    for hot in report.top(limit):
+        lines.append(f"{hot.self_samples / busy:>6.1%} {hot.total_samples / busy:>6.1%}  {hot.name}")
+    return "\n".join(lines)
+
+
+async def run_profile(message: types.Message, seconds: int) -> None:
+    """Снять профиль и отправить администратору сводку и файл стеков."""
+    try:
+        report = await get_profiler().profile_loop(seconds)
+        path = os.path.join(config.PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        await asyncio.get_running_loop().run_in_executor(None, report.write_folded, path)
+        await message.answer(format_profile_report(report))
+        if report.samples:
+            await message.answer_document(FSInputFile(path), caption="Стеки для flamegraph.pl / speedscope")
+    except Exception:
+        logger.exception("Ошибка профилирования")
+        await message.answer("❌ Профилирование не удалось, подробности в журнале.")
+
+
+# Задачи профилирования, чтобы их не собрал сборщик мусора до завершения
+_profile_tasks: set[asyncio.Task] = set()
+
+
+@router.message(Command("profile"))
+async def cmd_profile(message: types.Message, command: CommandObject) -> None:
+    """Команда /profile <секунды> - профиль цикла событий под текущей нагрузкой."""
+    seconds = parse_profile_seconds(command.args)
+    if seconds is None:
+        await message.answer(f"Использование: /profile <секунды от 1 до {config.PROFILE_MAX_SECONDS}>")
+        return
+    if get_profiler().running:
+        await message.answer("⏳ Профилирование уже идёт.")
+        return
+
+    await message.answer(f"🔥 Профилирую {seconds} с…")
+    # Команда не ждёт окончания замера, чтобы не держать очередь событий администратора
+    task = asyncio.create_task(run_profile(message, seconds))
+    _profile_tasks.add(task)
+    task.add_done_callback(_profile_tasks.discard)
@@ -1,29 +1,33 @@
 """Обработчики боев с пошаговой системой."""
 import random
 from pathlib import Path
-from aiogram import Router, F, types
-from aiogram.types import FSInputFile, CallbackQuery
-from services import get_player_service
+from aiogram import Router, types
+from aiogram.types import CallbackQuery
+from services import get_media_cache
 from game_logic import (
     select_monster_for_location,
     create_battle_state,
-    player_attack,
-    monster_attack,
-    flee_battle,
+    resolve_turn,
+    TurnAction,
+    TurnEventType,
+    TurnOutcome,
+    TurnStatus,
     add_experience,
     increment_kills,
     check_and_award,
-    cast_spell,
-    use_potion
 )
 from game_logic.battle import create_boss_monster
 from game_logic.story import get_story_progress, get_current_chapter, complete_chapter, check_chapter_requirements
 from data import LOCATIONS
 from keyboards.battle_keyboard import get_battle_keyboard, get_spells_battle_keyboard, get_potions_battle_keyboard
+from models import Player
+from keyboards.callback_data import CallbackCode
+from .callback_dispatcher import callbacks
+from .text_commands import text_commands
 
-router = Router()
+router = Router(name="battle")
 
-player_service = get_player_service()
+media_cache = get_media_cache()
 
 
 def format_battle_status(player, state) -> str:
@@ -58,13 +62,9 @@ async def update_battle_message(message: types.Message, text: str, reply_markup=
         await message.edit_text(text, reply_markup=reply_markup)
 
 
-@router.message(F.text == "⚔️ В бой!")
-async def start_battle(message: types.Message) -> None:
+@text_commands.register("⚔️ В бой!")
+async def start_battle(message: types.Message, player: Player) -> None:
     """Начать пошаговый бой."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
-
     # Проверка здоровья
     if player.hp <= 15:
         await message.answer("⚠️ Вы слишком слабы для боя! Отдохните.")
@@ -108,8 +108,7 @@ async def start_battle(message: types.Message) -> None:
             return
 
     # Создаём состояние боя
-    player.battle_state = create_battle_state(monster, is_boss=is_boss_fight)
-    player_service.save_player(player)
+    player.battle_state = create_battle_state(monster, is_boss=is_boss_fight, is_elite=monster.is_elite)
 
     # Проверяем наличие зелий
     has_potions = any(count > 0 for count in player.potions.values())
@@ -119,9 +118,9 @@ async def start_battle(message: types.Message) -> None:
 
     image_path = Path(monster.image_path) if monster.image_path else None
     if image_path and image_path.exists():
-        photo = FSInputFile(str(image_path))
-        await message.answer_photo(
-            photo,
+        await media_cache.answer_photo(
+            message,
+            str(image_path),
             caption=text,
             reply_markup=get_battle_keyboard(player, has_potions)
         )
@@ -132,56 +131,69 @@ async def start_battle(message: types.Message) -> None:
         )
 
 
-@router.callback_query(F.data == "battle_attack")
-async def callback_battle_attack(callback: CallbackQuery) -> None:
-    """Атака игрока."""
-    if not callback.from_user or not callback.message:
-        return
+def format_turn_log(outcome: TurnOutcome, monster_name: str) -> str:
+    """Текст хода по событиям движка."""
+    log = ""
+    previous = None
+    for event in outcome.events:
+        kind = event.type
+        if kind is TurnEventType.PLAYER_ATTACK:
+            if event.crit:
+                log += f"⚔️ Вы атакуете! 💥 КРИТИЧЕСКИЙ УДАР! {event.amount} урона!\n"
+            else:
+                log += f"⚔️ Вы атакуете! {event.amount} урона.\n"
+        elif kind is TurnEventType.DEFEND:
+            log += "🛡️ Вы приняли защитную стойку!\n"
+        elif kind is TurnEventType.SPELL or kind is TurnEventType.POTION:
+            log += event.text + "\n"
+        elif kind is TurnEventType.FLED:
+            log += f"🏃 Вам удалось сбежать от {monster_name}!"
+        elif kind is TurnEventType.FLEE_FAILED:
+            log += "🏃 Попытка побега провалилась!\n"
+        elif kind is TurnEventType.MONSTER_MISSED:
+            if previous is TurnEventType.FLEE_FAILED:
+                log += f"💨 Но вы уклонились от атаки {monster_name}!"
+            else:
+                log += f"💨 Вы уклонились от атаки {monster_name}!"
+        elif kind is TurnEventType.MONSTER_ATTACK:
+            if event.defended:
+                log += f"🗡️ {monster_name} атакует! Урон снижен до {event.amount}."
+            else:
+                log += f"🗡️ {monster_name} атакует! {event.amount} урона."
+        previous = kind
+    return log
+
 
-    player = player_service.get_or_create(callback.from_user.id)
+async def play_turn(callback: CallbackQuery, player: Player, action: TurnAction, key: str | None = None) -> None:
+    """Разыграть ход движком и показать результат."""
+    if not callback.message:
+        return
 
     if not player.battle_state:
         await callback.answer("❌ У вас нет активного боя!")
         return
 
     state = player.battle_state
+    outcome = resolve_turn(player, state, action, key=key)
 
-    # Атака игрока
-    damage, is_crit = player_attack(player, state)
-    state.monster_hp -= damage
+    if outcome.status is TurnStatus.REJECTED:
+        await callback.answer(outcome.message, show_alert=True)
+        return
 
-    log = f"⚔️ Вы атакуете! "
-    if is_crit:
-        log += f"💥 КРИТИЧЕСКИЙ УДАР! {damage} урона!\n"
-    else:
-        log += f"{damage} урона.\n"
+    log = format_turn_log(outcome, state.monster_name)
 
-    # Проверяем, жив ли монстр
-    if state.monster_hp <= 0:
+    if outcome.status is TurnStatus.VICTORY:
         await handle_victory(callback, player, state, log)
         return
 
-    # Ход монстра
-    enemy_damage, is_dodge = monster_attack(player, state)
-    player.hp -= enemy_damage
-
-    if is_dodge:
-        log += f"💨 Вы уклонились от атаки {state.monster_name}!"
-    elif state.defending:
-        log += f"🛡️ {state.monster_name} атакует! Благодаря защите урон снижен до {enemy_damage}."
-    else:
-        log += f"🗡️ {state.monster_name} атакует! {enemy_damage} урона."
-
-    # Сбрасываем защиту
-    state.defending = False
-    state.turn += 1
-
-    # Проверяем, жив ли игрок
-    if player.hp <= 0:
+    if outcome.status is TurnStatus.DEFEAT:
         await handle_defeat(callback, player, state, log)
         return
 
-    player_service.save_player(player)
+    if outcome.status is TurnStatus.FLED:
+        await update_battle_message(callback.message, log, None)
+        await callback.answer()
+        return
 
     # Обновляем статус боя
     text = log + "\n\n" + format_battle_status(player, state)
@@ -191,59 +203,24 @@ async def callback_battle_attack(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "battle_defend")
-async def callback_battle_defend(callback: CallbackQuery) -> None:
-    """Защита игрока."""
-    if not callback.from_user or not callback.message:
-        return
-
-    player = player_service.get_or_create(callback.from_user.id)
-
-    if not player.battle_state:
-        await callback.answer("❌ У вас нет активного боя!")
-        return
-
-    state = player.battle_state
-
-    # Игрок защищается
-    state.defending = True
-    log = "🛡️ Вы приняли защитную стойку!\n"
-
-    # Ход монстра
-    enemy_damage, is_dodge = monster_attack(player, state)
-    player.hp -= enemy_damage
-
-    if is_dodge:
-        log += f"💨 Вы уклонились от атаки {state.monster_name}!"
-    else:
-        log += f"🗡️ {state.monster_name} атакует! Урон снижен до {enemy_damage}."
-
-    state.defending = False
-    state.turn += 1
-
-    # Проверяем, жив ли игрок
-    if player.hp <= 0:
-        await handle_defeat(callback, player, state, log)
-        return
-
-    player_service.save_player(player)
+@callbacks.register(CallbackCode.BATTLE_ATTACK)
+async def callback_battle_attack(callback: CallbackQuery, player: Player) -> None:
+    """Атака игрока."""
+    await play_turn(callback, player, TurnAction.ATTACK)
 
-    # Обновляем статус боя
-    text = log + "\n\n" + format_battle_status(player, state)
-    has_potions = any(count > 0 for count in player.potions.values())
 
-    await update_battle_message(callback.message, text, get_battle_keyboard(player, has_potions))
-    await callback.answer()
+@callbacks.register(CallbackCode.BATTLE_DEFEND)
+async def callback_battle_defend(callback: CallbackQuery, player: Player) -> None:
+    """Защита игрока."""
+    await play_turn(callback, player, TurnAction.DEFEND)
 
 
-@router.callback_query(F.data == "battle_spells")
-async def callback_battle_spells(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.BATTLE_SPELLS)
+async def callback_battle_spells(callback: CallbackQuery, player: Player) -> None:
     """Показать список заклинаний."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     if not player.battle_state:
         await callback.answer("❌ У вас нет активного боя!")
         return
@@ -252,69 +229,18 @@ async def callback_battle_spells(callback: CallbackQuery) -> None:
     await callback.answer("Выберите заклинание:")
 
 
-@router.callback_query(F.data.startswith("cast_"))
-async def callback_cast_spell(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.CAST_SPELL)
+async def callback_cast_spell(callback: CallbackQuery, player: Player, payload: str) -> None:
     """Применить заклинание."""
-    if not callback.from_user or not callback.message or not callback.data:
-        return
-
-    player = player_service.get_or_create(callback.from_user.id)
-
-    if not player.battle_state:
-        await callback.answer("❌ У вас нет активного боя!")
-        return
-
-    state = player.battle_state
-    spell_key = callback.data.replace("cast_", "")
-
-    # Применяем заклинание
-    success, spell_msg, damage = cast_spell(player, spell_key, state)
-
-    if not success:
-        await callback.answer(spell_msg, show_alert=True)
-        return
-
-    log = spell_msg + "\n"
-
-    # Проверяем, жив ли монстр после заклинания
-    if state.monster_hp <= 0:
-        await handle_victory(callback, player, state, log)
-        return
-
-    # Ход монстра
-    enemy_damage, is_dodge = monster_attack(player, state)
-    player.hp -= enemy_damage
-
-    if is_dodge:
-        log += f"💨 Вы уклонились от атаки {state.monster_name}!"
-    else:
-        log += f"🗡️ {state.monster_name} атакует! {enemy_damage} урона."
-
-    state.turn += 1
+    await play_turn(callback, player, TurnAction.SPELL, payload)
 
-    # Проверяем, жив ли игрок
-    if player.hp <= 0:
-        await handle_defeat(callback, player, state, log)
-        return
 
-    player_service.save_player(player)
-
-    # Обновляем статус боя
-    text = log + "\n\n" + format_battle_status(player, state)
-    has_potions = any(count > 0 for count in player.potions.values())
-
-    await update_battle_message(callback.message, text, get_battle_keyboard(player, has_potions))
-    await callback.answer()
-
-
-@router.callback_query(F.data == "battle_potions")
-async def callback_battle_potions(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.BATTLE_POTIONS)
+async def callback_battle_potions(callback: CallbackQuery, player: Player) -> None:
     """Показать список зелий."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     if not player.battle_state:
         await callback.answer("❌ У вас нет активного боя!")
         return
@@ -323,64 +249,18 @@ async def callback_battle_potions(callback: CallbackQuery) -> None:
     await callback.answer("Выберите зелье:")
 
 
-@router.callback_query(F.data.startswith("use_"))
-async def callback_use_potion(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.USE_POTION)
+async def callback_use_potion(callback: CallbackQuery, player: Player, payload: str) -> None:
     """Использовать зелье."""
-    if not callback.from_user or not callback.message or not callback.data:
-        return
-
-    player = player_service.get_or_create(callback.from_user.id)
-
-    if not player.battle_state:
-        await callback.answer("❌ У вас нет активного боя!")
-        return
+    await play_turn(callback, player, TurnAction.POTION, payload)
 
-    state = player.battle_state
-    potion_key = callback.data.replace("use_", "")
-
-    # Используем зелье
-    success, potion_msg = use_potion(player, potion_key, state)
-
-    if not success:
-        await callback.answer(potion_msg, show_alert=True)
-        return
-
-    log = potion_msg + "\n"
-
-    # Ход монстра (использование зелья - это действие)
-    enemy_damage, is_dodge = monster_attack(player, state)
-    player.hp -= enemy_damage
-
-    if is_dodge:
-        log += f"💨 Вы уклонились от атаки {state.monster_name}!"
-    else:
-        log += f"🗡️ {state.monster_name} атакует! {enemy_damage} урона."
 
-    state.turn += 1
-
-    # Проверяем, жив ли игрок
-    if player.hp <= 0:
-        await handle_defeat(callback, player, state, log)
-        return
-
-    player_service.save_player(player)
-
-    # Обновляем статус боя
-    text = log + "\n\n" + format_battle_status(player, state)
-    has_potions = any(count > 0 for count in player.potions.values())
-
-    await update_battle_message(callback.message, text, get_battle_keyboard(player, has_potions))
-    await callback.answer()
-
-
-@router.callback_query(F.data == "battle_back")
-async def callback_battle_back(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.BATTLE_BACK)
+async def callback_battle_back(callback: CallbackQuery, player: Player) -> None:
     """Вернуться к действиям боя."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     if not player.battle_state:
         await callback.answer("❌ У вас нет активного боя!")
         return
@@ -390,61 +270,10 @@ async def callback_battle_back(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "battle_flee")
-async def callback_battle_flee(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.BATTLE_FLEE)
+async def callback_battle_flee(callback: CallbackQuery, player: Player) -> None:
     """Попытка сбежать."""
-    if not callback.from_user or not callback.message:
-        return
-
-    player = player_service.get_or_create(callback.from_user.id)
-
-    if not player.battle_state:
-        await callback.answer("❌ У вас нет активного боя!")
-        return
-
-    state = player.battle_state
-
-    # Нельзя сбежать от босса
-    if state.is_boss:
-        await callback.answer("❌ Вы не можете сбежать от босса!", show_alert=True)
-        return
-
-    # Попытка побега
-    if flee_battle(player):
-        player.battle_state = None
-        player_service.save_player(player)
-
-        await update_battle_message(
-            callback.message,
-            f"🏃 Вам удалось сбежать от {state.monster_name}!",
-            None
-        )
-        await callback.answer()
-    else:
-        # Неудачная попытка - монстр атакует
-        enemy_damage, is_dodge = monster_attack(player, state)
-        player.hp -= enemy_damage
-
-        log = "🏃 Попытка побега провалилась!\n"
-        if is_dodge:
-            log += f"💨 Но вы уклонились от атаки {state.monster_name}!"
-        else:
-            log += f"🗡️ {state.monster_name} атакует! {enemy_damage} урона."
-
-        state.turn += 1
-
-        # Проверяем, жив ли игрок
-        if player.hp <= 0:
-            await handle_defeat(callback, player, state, log)
-            return
-
-        player_service.save_player(player)
-
-        text = log + "\n\n" + format_battle_status(player, state)
-        has_potions = any(count > 0 for count in player.potions.values())
-
-        await update_battle_message(callback.message, text, get_battle_keyboard(player, has_potions))
-        await callback.answer()
+    await play_turn(callback, player, TurnAction.FLEE)
 
 
 async def handle_victory(callback: CallbackQuery, player, state, log: str) -> None:
@@ -491,8 +320,6 @@ async def handle_victory(callback: CallbackQuery, player, state, log: str) -> No
     # Проверка достижений
     msg, _ = check_and_award(player, msg)
 
-    player_service.save_player(player)
-
     await update_battle_message(callback.message, msg, None)
     await callback.answer("Победа!")
 
@@ -505,7 +332,6 @@ async def handle_defeat(callback: CallbackQuery, player, state, log: str) -> Non
 
     # Завершаем бой
     player.battle_state = None
-    player_service.save_player(player)
 
     msg = log + f"\n💀 Вы проиграли...\n"
     msg += f"💸 Потеряно золота: {gold_lost}\n"
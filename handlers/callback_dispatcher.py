@@ -0,0 +1,57 @@
+"""Диспетчер нажатий инлайн-кнопок по коду действия."""
+from typing import Any, Awaitable, Callable, Dict, Union
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import CallbackQuery
+from keyboards.callback_data import CallbackCode, unpack
+
+
+class CallbackDispatcher:
+    """Единая точка входа для всех callback-запросов.
+
+    Вместо цепочки фильтров ``F.data == ...`` по всем роутерам обработчик
+    выбирается одним поиском в словаре по коду из ``callback.data``.
+    Обработчик получает те же аргументы, что и обычный обработчик aiogram
+    (``player`` и другие данные middleware), а также ``payload`` — аргумент
+    кнопки. Нажатия с неизвестным кодом проходят дальше по роутерам.
+    """
+
+    def __init__(self, name: str = "callbacks"):
+        """Инициализировать диспетчер и его роутер."""
+        self._handlers: Dict[CallbackCode, CallableObject] = {}
+        self.router = Router(name=name)
+        self.router.callback_query.register(self._dispatch, self._resolve)
+
+    def register(self, code: CallbackCode) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        """Декоратор: назначить обработчик коду действия."""
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            if code in self._handlers:
+                raise ValueError(f"Код {code!r} уже назначен обработчику")
+            self._handlers[code] = CallableObject(callback=func)
+            return func
+        return decorator
+
+    def _resolve(self, callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        """Фильтр роутера: найти обработчик по коду кнопки."""
+        if not callback.data:
+            return False
+        parsed = unpack(callback.data)
+        if parsed is None:
+            return False
+        code, payload = parsed
+        handler = self._handlers.get(code)
+        if handler is None:
+            return False
+        return {'callback_handler': handler, 'payload': payload}
+
+    async def _dispatch(self, callback: CallbackQuery, callback_handler: CallableObject, **data: Any) -> Any:
+        """Вызвать найденный обработчик."""
+        return await callback_handler.call(callback, **data)
+
+    def codes(self) -> list[CallbackCode]:
+        """Коды, для которых назначены обработчики."""
+        return list(self._handlers)
+
+
+callbacks = CallbackDispatcher()
+router = callbacks.router
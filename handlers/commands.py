@@ -6,19 +6,16 @@ from keyboards import main_keyboard
 from game_logic import equip_item
 from game_logic.story import get_current_chapter
 from utils import format_top_players
+from models import Player
 
-router = Router()
+router = Router(name="commands")
 
 player_service = get_player_service()
 
 
 @router.message(Command("start"))
-async def cmd_start(message: types.Message) -> None:
+async def cmd_start(message: types.Message, player: Player) -> None:
     """Команда /start - начало игры."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
-
     # Получаем текущую главу сюжета
     current_chapter = get_current_chapter(player)
 
@@ -36,11 +33,10 @@ async def cmd_start(message: types.Message) -> None:
 
 
 @router.message(Command("equip"))
-async def cmd_equip(message: types.Message) -> None:
+async def cmd_equip(message: types.Message, player: Player) -> None:
     """Команда /equip - экипировать предмет."""
-    if not message.from_user or not message.text:
+    if not message.text:
         return
-    player = player_service.get_or_create(message.from_user.id)
 
     # Получаем название предмета из команды
     args = message.text.split(maxsplit=1)
@@ -50,21 +46,19 @@ async def cmd_equip(message: types.Message) -> None:
 
     item_name = args[1]
 
-    success, msg = equip_item(player, item_name)
-    if success:
-        player_service.save_player(player)
-
+    _, msg = equip_item(player, item_name)
     await message.answer(msg)
 
 
 @router.message(Command("top"))
 async def cmd_top(message: types.Message) -> None:
     """Команда /top - топ игроков."""
-    top_players = player_service.get_top_players(10)
+    top_players = await player_service.aget_top_players(10)
 
     if not top_players:
         await message.answer("📊 Пока нет игроков в рейтинге.")
         return
 
-    text = format_top_players(top_players)
+    rank = await player_service.aget_player_rank(message.from_user.id) if message.from_user else None
+    text = format_top_players(top_players, rank)
     await message.answer(text)
@@ -1,18 +1,14 @@
 """Обработчики профиля."""
-from aiogram import Router, F, types
-from services import get_player_service
+from aiogram import Router, types
 from utils import format_profile
+from models import Player
+from .text_commands import text_commands
 
-router = Router()
+router = Router(name="profile")
 
-player_service = get_player_service()
 
-
-@router.message(F.text == "👤 Профиль")
-async def show_profile(message: types.Message) -> None:
+@text_commands.register("👤 Профиль")
+async def show_profile(message: types.Message, player: Player) -> None:
     """Показать профиль игрока."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
     text = format_profile(player)
     await message.answer(text)
@@ -1,46 +1,33 @@
 """Обработчики квестов."""
-from aiogram import Router, F, types
-from services import get_player_service
+from aiogram import Router, types
 from keyboards import quest_keyboard, main_keyboard
 from game_logic import claim_daily_reward, format_quest_status
+from models import Player
+from .text_commands import text_commands
 
-router = Router()
+router = Router(name="quest")
 
-player_service = get_player_service()
 
-
-@router.message(F.text == "📜 Квесты")
-async def show_quests(message: types.Message) -> None:
+@text_commands.register("📜 Квесты")
+async def show_quests(message: types.Message, player: Player) -> None:
     """Показать квесты."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
     text = format_quest_status(player)
-    player_service.save_player(player)
     await message.answer(text, reply_markup=quest_keyboard)
 
 
-@router.message(F.text == "📦 Забрать награду")
-async def claim_quest_reward(message: types.Message) -> None:
+@text_commands.register("📦 Забрать награду")
+async def claim_quest_reward(message: types.Message, player: Player) -> None:
     """Получить награду за квест."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
     success, msg = claim_daily_reward(player)
     if success:
         # Опыт уже добавлен в claim_daily_reward
-        player_service.save_player(player)
         await message.answer(msg, reply_markup=main_keyboard)
     else:
         await message.answer(msg)
 
 
-@router.message(F.text == "🔄 Обновить")
-async def refresh_quests(message: types.Message) -> None:
+@text_commands.register("🔄 Обновить")
+async def refresh_quests(message: types.Message, player: Player) -> None:
     """Обновить информацию о квестах."""
-    if not message.from_user:
-        return
-    player = player_service.get_or_create(message.from_user.id)
     text = format_quest_status(player)
-    player_service.save_player(player)
     await message.answer(text, reply_markup=quest_keyboard)
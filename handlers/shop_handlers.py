@@ -1,26 +1,21 @@
 """Обработчики магазина."""
-from aiogram import Router, F, types
+from aiogram import Router, types
 from aiogram.types import CallbackQuery
-from services import get_player_service
 from keyboards.shop_keyboard import get_shop_main_keyboard, get_equipment_keyboard, get_spells_keyboard, get_potions_keyboard
 from keyboards import main_keyboard
 from game_logic import purchase_item
 from data import SHOP_ITEMS
-from models import ItemType
+from models import ItemType, Player
+from keyboards.callback_data import CallbackCode
+from .callback_dispatcher import callbacks
+from .text_commands import text_commands
 
-router = Router()
+router = Router(name="shop")
 
-player_service = get_player_service()
 
-
-@router.message(F.text == "🛒 Магазин")
-async def open_shop(message: types.Message) -> None:
+@text_commands.register("🛒 Магазин")
+async def open_shop(message: types.Message, player: Player) -> None:
     """Открыть магазин."""
-    if not message.from_user:
-        return
-
-    player = player_service.get_or_create(message.from_user.id)
-
     text = (
         "🏪 Добро пожаловать в магазин!\n\n"
         f"💰 Ваше золото: {player.gold}\n"
@@ -31,14 +26,12 @@ async def open_shop(message: types.Message) -> None:
     await message.answer(text, reply_markup=get_shop_main_keyboard())
 
 
-@router.callback_query(F.data == "shop_main")
-async def callback_shop_main(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.SHOP_MAIN)
+async def callback_shop_main(callback: CallbackQuery, player: Player) -> None:
     """Главное меню магазина."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     text = (
         "🏪 Добро пожаловать в магазин!\n\n"
         f"💰 Ваше золото: {player.gold}\n"
@@ -50,14 +43,12 @@ async def callback_shop_main(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "shop_equipment")
-async def callback_shop_equipment(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.SHOP_EQUIPMENT)
+async def callback_shop_equipment(callback: CallbackQuery, player: Player) -> None:
     """Показать оружие и броню."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     text = (
         "⚔️ ОРУЖИЕ И БРОНЯ\n\n"
         f"💰 Ваше золото: {player.gold}\n\n"
@@ -68,14 +59,12 @@ async def callback_shop_equipment(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "shop_spells")
-async def callback_shop_spells(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.SHOP_SPELLS)
+async def callback_shop_spells(callback: CallbackQuery, player: Player) -> None:
     """Показать заклинания."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     text = (
         "📚 ЗАКЛИНАНИЯ\n\n"
         f"💰 Ваше золото: {player.gold}\n"
@@ -89,14 +78,12 @@ async def callback_shop_spells(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "shop_potions")
-async def callback_shop_potions(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.SHOP_POTIONS)
+async def callback_shop_potions(callback: CallbackQuery, player: Player) -> None:
     """Показать зелья."""
-    if not callback.from_user or not callback.message:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
     text = (
         "🧪 ЗЕЛЬЯ\n\n"
         f"💰 Ваше золото: {player.gold}\n\n"
@@ -110,28 +97,22 @@ async def callback_shop_potions(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("buy_"))
-async def callback_buy_item(callback: CallbackQuery) -> None:
+@callbacks.register(CallbackCode.BUY_ITEM)
+async def callback_buy_item(callback: CallbackQuery, player: Player, payload: str) -> None:
     """Купить предмет."""
-    if not callback.from_user or not callback.message or not callback.data:
+    if not callback.message:
         return
 
-    player = player_service.get_or_create(callback.from_user.id)
-
-    # Получаем ключ предмета
-    item_key = callback.data.replace("buy_", "")
-    shop_item = SHOP_ITEMS.get(item_key)
+    shop_item = SHOP_ITEMS.get(payload)
 
     if not shop_item:
         await callback.answer("❌ Предмет не найден!")
         return
 
     # Покупаем
-    success, msg = purchase_item(player, item_key)
+    success, msg = purchase_item(player, payload)
 
     if success:
-        player_service.save_player(player)
-
         # Обновляем клавиатуру
         if shop_item.item.is_spell:
             keyboard = get_spells_keyboard(player)
@@ -146,7 +127,7 @@ async def callback_buy_item(callback: CallbackQuery) -> None:
     await callback.answer(msg, show_alert=True)
 
 
-@router.callback_query(F.data == "shop_close")
+@callbacks.register(CallbackCode.SHOP_CLOSE)
 async def callback_shop_close(callback: CallbackQuery) -> None:
     """Закрыть магазин."""
     if not callback.message:
@@ -157,7 +138,7 @@ async def callback_shop_close(callback: CallbackQuery) -> None:
 
 
 # Обработчик для старой кнопки "Назад"
-@router.message(F.text == "⬅️ Назад")
+@text_commands.register("⬅️ Назад")
 async def go_back(message: types.Message) -> None:
     """Вернуться в главное меню."""
     await message.answer("🧭 Куда дальше?", reply_markup=main_keyboard)
@@ -5,7 +5,7 @@
 """
 from aiogram import Router
 
-router = Router()
+router = Router(name="story")
 
 # Обработчики не требуются - сюжет полностью интегрирован
 # в существующий игровой процесс через:
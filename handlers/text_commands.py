@@ -0,0 +1,61 @@
+"""Диспетчер текстовых команд с кнопок главной клавиатуры."""
+from typing import Any, Awaitable, Callable, Dict, Union
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.types import Message
+
+
+class TextCommandDispatcher:
+    """Поиск обработчика по точному тексту кнопки.
+
+    Текст reply-кнопки приходит обычным сообщением. Вместо проверки
+    ``F.text == ...`` в каждом роутере обработчик находится одним поиском
+    в словаре. Сообщения с незарегистрированным текстом проходят дальше
+    по обычной цепочке роутеров. Для каждого текста считается число
+    срабатываний.
+    """
+
+    def __init__(self, name: str = "text_commands"):
+        """Инициализировать диспетчер и его роутер."""
+        self._handlers: Dict[str, CallableObject] = {}
+        self._names: Dict[str, str] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+        self.router = Router(name=name)
+        self.router.message.register(self._dispatch, self._resolve)
+
+    def register(self, *texts: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        """Декоратор: назначить обработчик одному или нескольким текстам кнопок."""
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            handler = CallableObject(callback=func)
+            for text in texts:
+                if text in self._handlers:
+                    raise ValueError(f"Текст {text!r} уже назначен обработчику")
+                self._handlers[text] = handler
+                self._names[text] = func.__name__
+                self.hits[text] = 0
+            return func
+        return decorator
+
+    def _resolve(self, message: Message) -> Union[bool, Dict[str, Any]]:
+        """Фильтр роутера: найти обработчик по тексту сообщения."""
+        handler = self._handlers.get(message.text) if message.text else None
+        if handler is None:
+            self.misses += 1
+            return False
+        self.hits[message.text] += 1
+        return {'text_handler': handler}
+
+    async def _dispatch(self, message: Message, text_handler: CallableObject, **data: Any) -> Any:
+        """Вызвать найденный обработчик."""
+        return await text_handler.call(message, **data)
+
+    def stats(self) -> list[tuple[str, str, int]]:
+        """Тексты, имена обработчиков и число срабатываний, частые первыми."""
+        rows = [(text, self._names[text], hits) for text, hits in self.hits.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+
+text_commands = TextCommandDispatcher()
+router = text_commands.router
@@ -1,5 +1,6 @@
 """Клавиатуры для боевой системы."""
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from .callback_data import CallbackCode, pack
 from models import Player
 from game_logic import get_spell_by_name
 
@@ -7,19 +8,19 @@ from game_logic import get_spell_by_name
 def get_battle_keyboard(player: Player, has_potions: bool = False) -> InlineKeyboardMarkup:
     """Кнопки действий в бою."""
     buttons = [
-        [InlineKeyboardButton(text="⚔️ Атака", callback_data="battle_attack")],
+        [InlineKeyboardButton(text="⚔️ Атака", callback_data=pack(CallbackCode.BATTLE_ATTACK))],
     ]
 
     # Показываем кнопку заклинаний только если они есть
     if player.spells:
-        buttons.append([InlineKeyboardButton(text="🔮 Заклинания", callback_data="battle_spells")])
+        buttons.append([InlineKeyboardButton(text="🔮 Заклинания", callback_data=pack(CallbackCode.BATTLE_SPELLS))])
 
     # Показываем кнопку зелий только если они есть
     if has_potions:
-        buttons.append([InlineKeyboardButton(text="🧪 Зелья", callback_data="battle_potions")])
+        buttons.append([InlineKeyboardButton(text="🧪 Зелья", callback_data=pack(CallbackCode.BATTLE_POTIONS))])
 
-    buttons.append([InlineKeyboardButton(text="🛡️ Защита", callback_data="battle_defend")])
-    buttons.append([InlineKeyboardButton(text="🏃 Бежать", callback_data="battle_flee")])
+    buttons.append([InlineKeyboardButton(text="🛡️ Защита", callback_data=pack(CallbackCode.BATTLE_DEFEND))])
+    buttons.append([InlineKeyboardButton(text="🏃 Бежать", callback_data=pack(CallbackCode.BATTLE_FLEE))])
 
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
@@ -48,10 +49,10 @@ def get_spells_battle_keyboard(player: Player) -> InlineKeyboardMarkup:
 
             buttons.append([InlineKeyboardButton(
                 text=button_text,
-                callback_data=f"cast_{spell.key}" if can_cast else "battle_spells"
+                callback_data=pack(CallbackCode.CAST_SPELL, spell.key) if can_cast else pack(CallbackCode.BATTLE_SPELLS)
             )])
 
-    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="battle_back")])
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.BATTLE_BACK))])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
@@ -64,7 +65,7 @@ def get_potions_battle_keyboard(player: Player) -> InlineKeyboardMarkup:
         count = player.potions["health_potion"]
         buttons.append([InlineKeyboardButton(
             text=f"❤️ Зелье здоровья (x{count})",
-            callback_data="use_health_potion"
+            callback_data=pack(CallbackCode.USE_POTION, "health_potion")
         )])
 
     # Зелье маны
@@ -72,7 +73,7 @@ def get_potions_battle_keyboard(player: Player) -> InlineKeyboardMarkup:
         count = player.potions["mana_potion"]
         buttons.append([InlineKeyboardButton(
             text=f"💙 Зелье маны (x{count})",
-            callback_data="use_mana_potion"
+            callback_data=pack(CallbackCode.USE_POTION, "mana_potion")
         )])
 
     # Зелье силы
@@ -80,8 +81,8 @@ def get_potions_battle_keyboard(player: Player) -> InlineKeyboardMarkup:
         count = player.potions["power_potion"]
         buttons.append([InlineKeyboardButton(
             text=f"💪 Зелье силы (x{count})",
-            callback_data="use_power_potion"
+            callback_data=pack(CallbackCode.USE_POTION, "power_potion")
         )])
 
-    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="battle_back")])
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.BATTLE_BACK))])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
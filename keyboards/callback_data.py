@@ -0,0 +1,92 @@
+"""Компактный протокол callback-данных инлайн-кнопок.
+
+Данные кнопки — короткий код действия и необязательный аргумент через
+двоеточие: ``"c:fireball"``, ``"a"``. Код определяет обработчик, поэтому
+обработчик находится одним поиском в словаре (см. ``CallbackDispatcher``).
+Кнопки в старом формате (``"cast_fireball"``, ``"battle_attack"``) из уже
+отправленных сообщений продолжают работать.
+"""
+from enum import Enum
+from typing import Optional
+
+SEPARATOR = ':'
+
+
+class CallbackCode(str, Enum):
+    """Код действия кнопки."""
+    BATTLE_ATTACK = "a"
+    BATTLE_DEFEND = "d"
+    BATTLE_SPELLS = "s"
+    CAST_SPELL = "c"
+    BATTLE_POTIONS = "p"
+    USE_POTION = "u"
+    BATTLE_BACK = "k"
+    BATTLE_FLEE = "f"
+    SHOP_MAIN = "sm"
+    SHOP_EQUIPMENT = "se"
+    SHOP_SPELLS = "ss"
+    SHOP_POTIONS = "sp"
+    SHOP_CLOSE = "sx"
+    BUY_ITEM = "b"
+    STORY_OVERVIEW = "so"
+    STORY_CURRENT = "sc"
+    STORY_CHAPTERS = "sl"
+    CHAPTER = "ch"
+    START_BOSS = "sb"
+
+
+_CODES = {code.value: code for code in CallbackCode}
+
+# Старый формат: полные строки без аргумента и префиксы с аргументом
+_LEGACY_EXACT = {
+    "battle_attack": CallbackCode.BATTLE_ATTACK,
+    "battle_defend": CallbackCode.BATTLE_DEFEND,
+    "battle_spells": CallbackCode.BATTLE_SPELLS,
+    "battle_potions": CallbackCode.BATTLE_POTIONS,
+    "battle_back": CallbackCode.BATTLE_BACK,
+    "battle_flee": CallbackCode.BATTLE_FLEE,
+    "shop_main": CallbackCode.SHOP_MAIN,
+    "shop_equipment": CallbackCode.SHOP_EQUIPMENT,
+    "shop_spells": CallbackCode.SHOP_SPELLS,
+    "shop_potions": CallbackCode.SHOP_POTIONS,
+    "shop_close": CallbackCode.SHOP_CLOSE,
+    "story_overview": CallbackCode.STORY_OVERVIEW,
+    "story_current": CallbackCode.STORY_CURRENT,
+    "story_chapters": CallbackCode.STORY_CHAPTERS,
+}
+_LEGACY_PREFIXES = {
+    "cast": CallbackCode.CAST_SPELL,
+    "use": CallbackCode.USE_POTION,
+    "buy": CallbackCode.BUY_ITEM,
+    "chapter": CallbackCode.CHAPTER,
+}
+
+
+def pack(code: CallbackCode, payload: Optional[object] = None) -> str:
+    """Собрать callback-данные кнопки."""
+    if payload is None:
+        return code.value
+    return f"{code.value}{SEPARATOR}{payload}"
+
+
+def unpack(data: str) -> Optional[tuple[CallbackCode, str]]:
+    """Разобрать callback-данные в код и аргумент.
+
+    Returns:
+        Пара (код, аргумент) или None, если данные не из этого протокола
+    """
+    head, _, payload = data.partition(SEPARATOR)
+    code = _CODES.get(head)
+    if code is not None:
+        return code, payload
+
+    code = _LEGACY_EXACT.get(data)
+    if code is not None:
+        return code, ""
+    if data.startswith("start_boss_"):
+        return CallbackCode.START_BOSS, data[len("start_boss_"):]
+    head, _, payload = data.partition('_')
+    code = _LEGACY_PREFIXES.get(head)
+    if code is not None:
+        return code, payload
+    return None
@@ -1,5 +1,6 @@
 """Клавиатура магазина."""
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from .callback_data import CallbackCode, pack
 from models import Player, ItemType
 from data import SHOP_ITEMS
 
@@ -7,10 +8,10 @@ from data import SHOP_ITEMS
 def get_shop_main_keyboard() -> InlineKeyboardMarkup:
     """Главное меню магазина."""
     keyboard = [
-        [InlineKeyboardButton(text="⚔️ Оружие и Броня", callback_data="shop_equipment")],
-        [InlineKeyboardButton(text="📚 Заклинания", callback_data="shop_spells")],
-        [InlineKeyboardButton(text="🧪 Зелья", callback_data="shop_potions")],
-        [InlineKeyboardButton(text="🔙 Закрыть", callback_data="shop_close")]
+        [InlineKeyboardButton(text="⚔️ Оружие и Броня", callback_data=pack(CallbackCode.SHOP_EQUIPMENT))],
+        [InlineKeyboardButton(text="📚 Заклинания", callback_data=pack(CallbackCode.SHOP_SPELLS))],
+        [InlineKeyboardButton(text="🧪 Зелья", callback_data=pack(CallbackCode.SHOP_POTIONS))],
+        [InlineKeyboardButton(text="🔙 Закрыть", callback_data=pack(CallbackCode.SHOP_CLOSE))]
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -29,10 +30,10 @@ def get_equipment_keyboard(player: Player) -> InlineKeyboardMarkup:
             button_text = f"{status} {item.name} - {item.cost}💰"
             keyboard.append([InlineKeyboardButton(
                 text=button_text,
-                callback_data=f"buy_{key}" if not owned else "shop_equipment"
+                callback_data=pack(CallbackCode.BUY_ITEM, key) if not owned else pack(CallbackCode.SHOP_EQUIPMENT)
             )])
 
-    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data="shop_main")])
+    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.SHOP_MAIN))])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -56,10 +57,10 @@ def get_spells_keyboard(player: Player) -> InlineKeyboardMarkup:
 
             button_text = f"{status} {item.name} - {item.cost}💰"
 
-            callback = f"buy_{key}" if (not learned and can_learn) else "shop_spells"
+            callback = pack(CallbackCode.BUY_ITEM, key) if (not learned and can_learn) else pack(CallbackCode.SHOP_SPELLS)
             keyboard.append([InlineKeyboardButton(text=button_text, callback_data=callback)])
 
-    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data="shop_main")])
+    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.SHOP_MAIN))])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -77,10 +78,10 @@ def get_potions_keyboard(player: Player) -> InlineKeyboardMarkup:
             button_text = f"{item.name} - {item.cost}💰{count_text}"
             keyboard.append([InlineKeyboardButton(
                 text=button_text,
-                callback_data=f"buy_{key}"
+                callback_data=pack(CallbackCode.BUY_ITEM, key)
             )])
 
-    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data="shop_main")])
+    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.SHOP_MAIN))])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -1,5 +1,6 @@
 """Клавиатуры для системы сюжета."""
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from .callback_data import CallbackCode, pack
 from models import Player
 from models.story import StoryProgress
 from data.story_chapters import get_all_chapters
@@ -8,9 +9,9 @@ from data.story_chapters import get_all_chapters
 def story_main_keyboard() -> InlineKeyboardMarkup:
     """Главная клавиатура сюжета."""
     keyboard = [
-        [InlineKeyboardButton(text="📖 Текущая глава", callback_data="story_current")],
-        [InlineKeyboardButton(text="📚 Все главы", callback_data="story_chapters")],
-        [InlineKeyboardButton(text="🔙 Назад", callback_data="story_overview")]
+        [InlineKeyboardButton(text="📖 Текущая глава", callback_data=pack(CallbackCode.STORY_CURRENT))],
+        [InlineKeyboardButton(text="📚 Все главы", callback_data=pack(CallbackCode.STORY_CHAPTERS))],
+        [InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.STORY_OVERVIEW))]
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -36,11 +37,11 @@ def get_chapters_keyboard(player: Player) -> InlineKeyboardMarkup:
             status = "🔒"
 
         button_text = f"{status} Глава {chapter.chapter_id}: {chapter.title[:20]}..."
-        callback_data = f"chapter_{chapter.chapter_id}"
+        callback_data = pack(CallbackCode.CHAPTER, chapter.chapter_id)
 
         keyboard.append([InlineKeyboardButton(text=button_text, callback_data=callback_data)])
 
-    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data="story_overview")])
+    keyboard.append([InlineKeyboardButton(text="🔙 Назад", callback_data=pack(CallbackCode.STORY_OVERVIEW))])
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -63,12 +64,12 @@ def get_chapter_detail_keyboard(chapter_id: int, player: Player) -> InlineKeyboa
                 keyboard.append([
                     InlineKeyboardButton(
                         text=f"⚔️ Сразиться с {chapter.boss_name}",
-                        callback_data=f"start_boss_{chapter_id}"
+                        callback_data=pack(CallbackCode.START_BOSS, chapter_id)
                     )
                 ])
 
-    keyboard.append([InlineKeyboardButton(text="🔙 К главам", callback_data="story_chapters")])
-    keyboard.append([InlineKeyboardButton(text="🏠 К обзору", callback_data="story_overview")])
+    keyboard.append([InlineKeyboardButton(text="🔙 К главам", callback_data=pack(CallbackCode.STORY_CHAPTERS))])
+    keyboard.append([InlineKeyboardButton(text="🏠 К обзору", callback_data=pack(CallbackCode.STORY_OVERVIEW))])
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -0,0 +1,16 @@
+"""Middleware бота."""
+from .flood_control import FloodControlMiddleware
+from .metrics import HandlerMetricsMiddleware
+from .player_session import PlayerSessionMiddleware
+from .update_logging import UpdateLoggingMiddleware
+from .update_scheduler import UpdateSchedulerMiddleware
+from .user_lock import UserLockMiddleware
+
+__all__ = [
+    'FloodControlMiddleware',
+    'HandlerMetricsMiddleware',
+    'PlayerSessionMiddleware',
+    'UpdateLoggingMiddleware',
+    'UpdateSchedulerMiddleware',
+    'UserLockMiddleware',
+]
@@ -0,0 +1,109 @@
+"""Middleware исходящих запросов: лимиты Telegram и склейка правок."""
+import asyncio
+from typing import Any, Dict, Hashable, Optional
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageCaption, EditMessageReplyMarkup, EditMessageText, Response, TelegramMethod
+from services import FloodControl
+
+# Правки, из которых имеет смысл отправлять только последнюю
+COALESCED_METHODS = (EditMessageText, EditMessageCaption, EditMessageReplyMarkup)
+
+
+class _PendingEdit:
+    """Правка сообщения, ожидающая своей очереди на отправку."""
+
+    __slots__ = ('method', 'future')
+
+    def __init__(self, method: TelegramMethod) -> None:
+        self.method = method
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class FloodControlMiddleware(BaseRequestMiddleware):
+    """Выдерживает лимиты отправки и склеивает устаревшие правки.
+
+    Каждый запрос, адресованный чату, резервирует токен в ``FloodControl``
+    и при необходимости ждёт. Если, пока правка сообщения ждёт отправки,
+    приходит новая правка того же сообщения тем же методом, старая
+    заменяется новой: Telegram получает только последнее состояние, а оба
+    вызова получают его результат. Ответ 429 выдерживается и запрос
+    повторяется до ``max_retries`` раз.
+    """
+
+    def __init__(self, flood_control: FloodControl, max_retries: int = 2):
+        """Инициализировать middleware."""
+        self.flood_control = flood_control
+        self.max_retries = max_retries
+        self._pending: Dict[Hashable, _PendingEdit] = {}
+
+    @staticmethod
+    def _edit_key(method: TelegramMethod) -> Optional[Hashable]:
+        """Ключ сообщения для склейки правок."""
+        if not isinstance(method, COALESCED_METHODS):
+            return None
+        return type(method), method.chat_id, method.message_id, method.inline_message_id
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Response[Any]:
+        """Отправить запрос с учётом лимитов."""
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None and getattr(method, 'inline_message_id', None) is None:
+            # getUpdates, answerCallbackQuery и т.п. не расходуют лимит сообщений
+            return await make_request(bot, method)
+
+        key = self._edit_key(method)
+        if key is None:
+            await self._wait(chat_id)
+            return await self._send(make_request, bot, method)
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.method = method
+            self.flood_control.coalesced += 1
+            return await asyncio.shield(pending.future)
+
+        pending = self._pending[key] = _PendingEdit(method)
+        try:
+            try:
+                await self._wait(chat_id)
+            finally:
+                del self._pending[key]
+            response = await self._send(make_request, bot, pending.method)
+        except BaseException as e:
+            # Склеенные правки ждут future: без результата они зависнут навсегда,
+            # в том числе когда этот вызов отменён (CancelledError — не Exception)
+            if not pending.future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    pending.future.cancel()
+                else:
+                    pending.future.set_exception(e)
+                    # Исключение уже получит этот вызов; ждущим правкам оно придёт из future
+                    pending.future.exception()
+            raise
+        pending.future.set_result(response)
+        return response
+
+    async def _wait(self, chat_id: Any) -> None:
+        """Дождаться своей очереди по лимитам."""
+        delay = self.flood_control.reserve(chat_id)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self, make_request: NextRequestMiddlewareType[Any], bot: Bot, method: TelegramMethod[Any]) -> Response[Any]:
+        """Выполнить запрос, выдерживая ответ 429."""
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.flood_control.retried += 1
+                await asyncio.sleep(e.retry_after)
@@ -0,0 +1,52 @@
+"""Middleware, собирающий метрики времени обработчиков."""
+import time
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from services.metrics import MetricsRegistry
+from .update_logging import handler_name, resolve_handler
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Гистограмма времени обработчиков и счётчик ошибок по роутеру и обработчику."""
+
+    def __init__(self, registry: MetricsRegistry):
+        """Инициализировать middleware и зарегистрировать метрики."""
+        self.latency = registry.histogram(
+            'handler_latency_seconds', "Время обработки события", ('router', 'handler'),
+        )
+        self.errors = registry.counter(
+            'handler_errors_total', "Исключения в обработчиках", ('router', 'handler'),
+        )
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Вызвать обработчик и учесть время обработки."""
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors.inc(1, *self._labels(data))
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - start, *self._labels(data))
+
+    @staticmethod
+    def _labels(data: Dict[str, Any]) -> tuple[str, str]:
+        """Метки ``router`` и ``handler`` события.
+
+        Почти все нажатия и тексты кнопок доходят до обработчиков через
+        общие роутеры ``callbacks`` и ``text_commands``, поэтому роутер
+        берётся по модулю найденного обработчика: ``handlers.shop_handlers``
+        → ``shop``, как в имени роутера этого модуля.
+        """
+        module = getattr(resolve_handler(data), '__module__', None)
+        if module:
+            router = module.rsplit('.', 1)[-1].removesuffix('_handlers')
+        else:
+            router = getattr(data.get('event_router'), 'name', None) or 'unknown'
+        return (router, handler_name(data))
@@ -0,0 +1,39 @@
+"""Middleware, загружающий игрока один раз на событие."""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+from services import PlayerService
+
+
+class PlayerSessionMiddleware(BaseMiddleware):
+    """Передаёт обработчику игрока и сохраняет его после обработки.
+
+    Игрок загружается один раз и попадает в обработчик аргументом
+    ``player``. После обработчика игрок сохраняется один раз и только при
+    наличии изменений — даже если обработчик завершился исключением, чтобы
+    уже отправленный игроку результат не потерялся.
+    """
+
+    def __init__(self, player_service: PlayerService):
+        """Инициализировать middleware с сервисом игроков."""
+        self.player_service = player_service
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Загрузить игрока, вызвать обработчик и сохранить изменения."""
+        user: Optional[User] = data.get('event_from_user')
+        if user is None:
+            return await handler(event, data)
+        player = await self.player_service.aget_or_create(user.id)
+        data['player'] = player
+        try:
+            return await handler(event, data)
+        finally:
+            # Один снимок и для проверки изменений, и для записи
+            state = player.to_dict()
+            if player.is_dirty(state):
+                await self.player_service.asave_player(player, state)
@@ -0,0 +1,59 @@
+"""Middleware, записывающий в журнал время обработки событий."""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_handler(data: Dict[str, Any]) -> Optional[Callable[..., Any]]:
+    """Функция обработчика события (с учётом поиска в словарях кнопок)."""
+    for key in ('callback_handler', 'text_handler', 'handler'):
+        handler = data.get(key)
+        if handler is not None:
+            return getattr(handler, 'callback', handler)
+    return None
+
+
+def handler_name(data: Dict[str, Any]) -> str:
+    """Имя обработчика события (с учётом поиска в словарях кнопок)."""
+    callback = resolve_handler(data)
+    if callback is None:
+        return 'unknown'
+    return getattr(callback, '__qualname__', repr(callback))
+
+
+class UpdateLoggingMiddleware(BaseMiddleware):
+    """Структурная запись об обработанном событии: игрок, обработчик, время.
+
+    Обычные события пишутся на уровне DEBUG, события дольше ``slow_ms`` —
+    на WARNING. Пока уровень записи выключен, middleware только засекает
+    время: поля записи не собираются.
+    """
+
+    def __init__(self, slow_ms: float = 1000.0):
+        """Инициализировать middleware с порогом медленной обработки."""
+        self.slow_ms = slow_ms
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Вызвать обработчик и записать время обработки."""
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            level = logging.WARNING if latency_ms >= self.slow_ms else logging.DEBUG
+            if logger.isEnabledFor(level):
+                user: Optional[User] = data.get('event_from_user')
+                logger.log(level, "Событие обработано за %.1f мс", latency_ms, extra={
+                    'user_id': user.id if user is not None else None,
+                    'handler': handler_name(data),
+                    'latency_ms': round(latency_ms, 2),
+                })
@@ -0,0 +1,37 @@
+"""Middleware, передающий обновления в планировщик по игрокам."""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import Chat, TelegramObject, Update, User
+from services import UpdateScheduler
+
+
+class UpdateSchedulerMiddleware(BaseMiddleware):
+    """Ставит обработку обновления в очередь его отправителя.
+
+    Регистрируется как outer-middleware на ``dp.update`` и возвращает
+    управление сразу после постановки в очередь, а сами фильтры и
+    обработчики выполняет воркер ``UpdateScheduler``. Обновления без
+    отправителя распределяются по чату, а без чата — по ``update_id``.
+    """
+
+    def __init__(self, scheduler: UpdateScheduler):
+        """Инициализировать middleware с планировщиком."""
+        self.scheduler = scheduler
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Поставить обработку обновления в очередь."""
+        user: Optional[User] = data.get('event_from_user')
+        chat: Optional[Chat] = data.get('event_chat')
+        if user is not None:
+            key = user.id
+        elif chat is not None:
+            key = chat.id
+        else:
+            key = event.update_id if isinstance(event, Update) else 0
+        await self.scheduler.submit(key, lambda: handler(event, data))
+        return None
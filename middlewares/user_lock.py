@@ -0,0 +1,30 @@
+"""Middleware, обрабатывающий события одного игрока по очереди."""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+from services import UserLockRegistry
+
+
+class UserLockMiddleware(BaseMiddleware):
+    """Держит блокировку игрока на время работы обработчика.
+
+    Два быстрых нажатия одной кнопки выполняются последовательно и видят
+    изменения друг друга, а события разных игроков не ждут друг друга.
+    """
+
+    def __init__(self, registry: UserLockRegistry):
+        """Инициализировать middleware с реестром блокировок."""
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Вызвать обработчик под блокировкой отправителя события."""
+        user: Optional[User] = data.get('event_from_user')
+        if user is None:
+            return await handler(event, data)
+        async with self.registry.hold(user.id):
+            return await handler(event, data)
@@ -14,6 +14,7 @@ class Monster:
     exp: int
     gold_range: Tuple[int, int]
     image_path: str = ""
+    is_elite: bool = False
 
     @classmethod
     def from_template(cls, template: 'MonsterTemplate') -> 'Monster':
@@ -42,6 +43,7 @@ class MonsterTemplate:
     gold_max: int
     min_level: int = 1
     max_level: int = 100  # Максимальный уровень для появления монстра
+    spawn_weight: float = 1.0  # Относительная частота появления в локации (0 — не появляется)
     image_path: str = ""
 
     def is_available_for_level(self, player_level: int) -> bool:
@@ -1,13 +1,14 @@
 """Модели данных игрока."""
 from dataclasses import dataclass, field, asdict
 from typing import Optional, Dict, List, TYPE_CHECKING
+from models.tracking import DirtyTrackingMixin
 
 if TYPE_CHECKING:
     from models.story import StoryProgress
 
 
 @dataclass
-class BattleState:
+class BattleState(DirtyTrackingMixin):
     """Состояние активного боя."""
     monster_key: str
     monster_name: str
@@ -46,7 +47,7 @@ class BattleState:
 
 
 @dataclass
-class Equipment:
+class Equipment(DirtyTrackingMixin):
     """Экипировка игрока."""
     weapon: Optional[str] = None
     armor: Optional[str] = None
@@ -65,7 +66,7 @@ class Equipment:
 
 
 @dataclass
-class DailyQuest:
+class DailyQuest(DirtyTrackingMixin):
     """Ежедневный квест."""
     date: Optional[str] = None  # YYYY-MM-DD
     kills: int = 0
@@ -88,7 +89,7 @@ class DailyQuest:
 
 
 @dataclass
-class Player:
+class Player(DirtyTrackingMixin):
     """Игрок."""
     user_id: int
     hp: int = 100
@@ -122,15 +123,15 @@ class Player:
             'exp': self.exp,
             'gold': self.gold,
             'power': self.power,
-            'inventory': self.inventory,
-            'spells': self.spells,
+            'inventory': list(self.inventory),
+            'spells': list(self.spells),
             'location': self.location,
             'equipment': self.equipment.to_dict(),
             'quests': {k: v.to_dict() for k, v in self.quests.items()},
-            'achievements': self.achievements,
+            'achievements': list(self.achievements),
             'total_kills': self.total_kills,
             'story_progress': self.story_progress.to_dict() if self.story_progress else None,
-            'potions': self.potions,
+            'potions': dict(self.potions),
             'battle_state': self.battle_state.to_dict() if self.battle_state else None
         }
 
@@ -155,7 +156,7 @@ class Player:
         battle_state_data = data.get('battle_state')
         battle_state = BattleState.from_dict(battle_state_data) if battle_state_data else None
 
-        return cls(
+        player = cls(
             user_id=data['user_id'],
             hp=data.get('hp', 100),
             max_hp=data.get('max_hp', 100),
@@ -176,3 +177,20 @@ class Player:
             potions=data.get('potions', {"health": 0, "mana": 0, "power": 0}),
             battle_state=battle_state
         )
+        # Только что загруженный игрок совпадает с сохранённым
+        player.mark_clean()
+        return player
+
+    def mark_clean(self, state: Optional[dict] = None) -> None:
+        """Запомнить состояние игрока и вложенных объектов как сохранённое."""
+        state = state if state is not None else self.to_dict()
+        super().mark_clean(state)
+
+        self.equipment.mark_clean(state['equipment'])
+        for key, quest in self.quests.items():
+            if isinstance(quest, DailyQuest) and key in state['quests']:
+                quest.mark_clean(state['quests'][key])
+        if self.story_progress is not None and state['story_progress'] is not None:
+            self.story_progress.mark_clean(state['story_progress'])
+        if self.battle_state is not None and state['battle_state'] is not None:
+            self.battle_state.mark_clean(state['battle_state'])
@@ -1,6 +1,7 @@
 """Модели данных сюжета."""
 from dataclasses import dataclass
 from typing import Optional
+from models.tracking import DirtyTrackingMixin
 
 
 @dataclass
@@ -22,7 +23,7 @@ class StoryChapter:
 
 
 @dataclass
-class StoryProgress:
+class StoryProgress(DirtyTrackingMixin):
     """Прогресс игрока по сюжету."""
     current_chapter: int = 1
     completed_chapters: list[int] = None
@@ -39,8 +40,8 @@ class StoryProgress:
         """Преобразовать в словарь."""
         return {
             'current_chapter': self.current_chapter,
-            'completed_chapters': self.completed_chapters,
-            'boss_defeated': self.boss_defeated
+            'completed_chapters': list(self.completed_chapters),
+            'boss_defeated': dict(self.boss_defeated)
         }
 
     @classmethod
@@ -0,0 +1,43 @@
+"""Отслеживание изменений моделей между сохранениями."""
+from typing import Optional
+
+
+class DirtyTrackingMixin:
+    """Отслеживание изменений относительно последнего сохранённого состояния.
+
+    Модель запоминает результат ``to_dict()`` на момент сохранения или загрузки
+    и сравнивает с ним текущее состояние. Так замечаются и присваивания полей,
+    и изменения вложенных списков и словарей на месте (``inventory.append``,
+    ``potions[key] -= 1``). Объект, который ещё ни разу не сохранялся,
+    считается изменённым целиком.
+    """
+
+    _saved_state: Optional[dict] = None
+
+    def mark_clean(self, state: Optional[dict] = None) -> None:
+        """Запомнить состояние как сохранённое.
+
+        Args:
+            state: Снимок ``to_dict()``, который был записан в хранилище.
+                Если не передан, берётся текущее состояние.
+        """
+        self._saved_state = state if state is not None else self.to_dict()
+
+    def dirty_fields(self, state: Optional[dict] = None) -> set[str]:
+        """Поля, изменившиеся после последнего сохранения.
+
+        Args:
+            state: Уже снятый снимок ``to_dict()``. Передайте его, если он
+                всё равно нужен для записи, чтобы не сериализовать модель дважды.
+        """
+        current = state if state is not None else self.to_dict()
+        saved = self._saved_state
+        if saved is None:
+            return set(current)
+        return {key for key, value in current.items() if key not in saved or saved[key] != value}
+
+    def is_dirty(self, state: Optional[dict] = None) -> bool:
+        """Есть ли несохранённые изменения (``state`` — как в ``dirty_fields``)."""
+        if self._saved_state is None:
+            return True
+        return (state if state is not None else self.to_dict()) != self._saved_state
@@ -1,9 +1,55 @@
 """Сервисы приложения."""
 from .data_repository import DataRepository
+from .journal_repository import JournalDataRepository
+from .binary_repository import BinaryDataRepository, migrate_json_to_binary
+from .indexed_repository import IndexedDataRepository, migrate_json_to_indexed
+from .sqlite_repository import SqliteDataRepository, migrate_json_to_sqlite
+from .repository_factory import create_repository
+from .leaderboard import LeaderboardIndex
+from .asset_compiler import AssetCompiler, get_asset_compiler
+from .media_cache import MediaCache, get_media_cache
+from .player_cache import PlayerCache
+from .user_locks import UserLockRegistry
+from .flood_control import FloodControl, TokenBucket, get_flood_control
+from .update_scheduler import UpdateScheduler, get_update_scheduler
+from .logging_setup import JsonFormatter, SamplingFilter, parse_logger_levels, setup_logging
 from .player_service import PlayerService, get_player_service
+from .sampling_profiler import ProfileReport, SamplingProfiler, get_profiler
+from .metrics import MetricsRegistry, get_metrics, instrument_services, start_metrics_server
 
 __all__ = [
     'DataRepository',
+    'JournalDataRepository',
+    'SqliteDataRepository',
+    'BinaryDataRepository',
+    'migrate_json_to_binary',
+    'IndexedDataRepository',
+    'migrate_json_to_indexed',
+    'migrate_json_to_sqlite',
+    'create_repository',
+    'LeaderboardIndex',
+    'AssetCompiler',
+    'get_asset_compiler',
+    'MediaCache',
+    'get_media_cache',
+    'PlayerCache',
+    'UserLockRegistry',
+    'FloodControl',
+    'TokenBucket',
+    'get_flood_control',
+    'UpdateScheduler',
+    'get_update_scheduler',
+    'JsonFormatter',
+    'SamplingFilter',
+    'parse_logger_levels',
+    'setup_logging',
     'PlayerService',
     'get_player_service',
+    'ProfileReport',
+    'SamplingProfiler',
+    'get_profiler',
+    'MetricsRegistry',
+    'get_metrics',
+    'instrument_services',
+    'start_metrics_server',
 ]
@@ -0,0 +1,198 @@
+"""Подготовка уменьшенных копий картинок для отправки в Telegram.
+
+Пример:
+    python -m services.asset_compiler
+"""
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow нужен только для сборки копий, не для их использования
+    Image = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'PNG': '.png'}
+MANIFEST_NAME = 'manifest.json'
+
+
+@dataclass
+class AssetReport:
+    """Результат сборки одной картинки."""
+    source: str
+    variant: str
+    original_bytes: int
+    optimized_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        """Сколько байт сэкономлено."""
+        return self.original_bytes - self.optimized_bytes
+
+
+class AssetCompiler:
+    """Сборщик и каталог оптимизированных копий картинок.
+
+    Копии лежат в ``cache_dir`` под именем из хэша содержимого исходника
+    и параметров сжатия, поэтому повторная сборка пропускает неизменённые
+    файлы, а изменённый файл получает новую копию. Манифест связывает
+    путь исходника с копией; ``resolve`` по нему подменяет путь, а если
+    копии нет или исходник изменился — возвращает исходный путь.
+    """
+
+    def __init__(
+        self,
+        source_dir: str = 'assets/images',
+        cache_dir: str = 'assets/cache',
+        max_size: int = 800,
+        image_format: str = 'JPEG',
+        quality: int = 85,
+    ):
+        """Инициализировать сборщик."""
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.image_format = image_format.upper()
+        self.quality = quality
+        self._manifest: Optional[dict[str, dict]] = None
+
+    @property
+    def manifest_file(self) -> str:
+        """Путь к манифесту копий."""
+        return os.path.join(self.cache_dir, MANIFEST_NAME)
+
+    def _load_manifest(self) -> dict[str, dict]:
+        """Манифест копий (читается при первом обращении)."""
+        if self._manifest is None:
+            self._manifest = {}
+            if os.path.exists(self.manifest_file):
+                try:
+                    with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        self._manifest = data
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning("Ошибка чтения манифеста картинок: %s", e)
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        """Атомарно записать манифест."""
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_file, self.manifest_file)
+
+    def resolve(self, path: str) -> str:
+        """Путь к оптимизированной копии картинки или исходный путь."""
+        entry = self._load_manifest().get(os.path.normpath(path))
+        if entry is None:
+            return path
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        # Исходник изменён после сборки — копия устарела
+        if (stat.st_mtime_ns, stat.st_size) != (entry['mtime_ns'], entry['size']):
+            return path
+        if not os.path.exists(entry['variant']):
+            return path
+        return entry['variant']
+
+    def _variant_path(self, digest: str) -> str:
+        """Имя копии: хэш исходника и параметры сжатия."""
+        extension = FORMAT_EXTENSIONS.get(self.image_format, '.' + self.image_format.lower())
+        return os.path.join(self.cache_dir, f"{digest[:16]}-{self.max_size}-q{self.quality}{extension}")
+
+    def _render(self, source: str, variant: str) -> None:
+        """Уменьшить и пересжать картинку."""
+        with Image.open(source) as image:
+            image.thumbnail((self.max_size, self.max_size), Image.LANCZOS)
+            if self.image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                # В JPEG нет прозрачности — кладём картинку на белый фон
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+                image = background
+            tmp_file = variant + '.tmp'
+            image.save(tmp_file, format=self.image_format, quality=self.quality, optimize=True)
+        os.replace(tmp_file, variant)
+
+    def compile(self) -> list[AssetReport]:
+        """Собрать копии всех картинок из ``source_dir``.
+
+        Raises:
+            RuntimeError: не установлен Pillow
+        """
+        if Image is None:
+            raise RuntimeError("Для сборки картинок нужен Pillow: pip install Pillow")
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        reports = []
+        for root, _, files in os.walk(self.source_dir):
+            for name in sorted(files):
+                if not name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                source = os.path.normpath(os.path.join(root, name))
+                stat = os.stat(source)
+                with open(source, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+
+                variant = self._variant_path(digest)
+                if not os.path.exists(variant):
+                    self._render(source, variant)
+                manifest[source] = {
+                    'variant': variant,
+                    'hash': digest,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                }
+                reports.append(AssetReport(source, variant, stat.st_size, os.path.getsize(variant)))
+
+        self._save_manifest()
+        return reports
+
+
+def format_report(reports: list[AssetReport]) -> str:
+    """Таблица сэкономленных байт по каждой картинке."""
+    lines = [f"{'картинка':<45} {'было, КБ':>9} {'стало, КБ':>10} {'экономия':>9}"]
+    for report in reports:
+        percent = report.saved_bytes / report.original_bytes * 100 if report.original_bytes else 0.0
+        lines.append(
+            f"{report.source:<45} {report.original_bytes / 1024:>9.1f} "
+            f"{report.optimized_bytes / 1024:>10.1f} {percent:>8.1f}%"
+        )
+    original = sum(r.original_bytes for r in reports)
+    optimized = sum(r.optimized_bytes for r in reports)
+    lines.append(
+        f"{'итого':<45} {original / 1024:>9.1f} {optimized / 1024:>10.1f} "
+        f"{(original - optimized) / 1024:>8.1f} КБ"
+    )
+    return "\n".join(lines)
+
+
+_asset_compiler: Optional[AssetCompiler] = None
+
+
+def get_asset_compiler() -> AssetCompiler:
+    """Получить глобальный экземпляр AssetCompiler с настройками из конфигурации."""
+    global _asset_compiler
+    if _asset_compiler is None:
+        _asset_compiler = AssetCompiler(
+            source_dir=config.ASSET_SOURCE_DIR,
+            cache_dir=config.ASSET_CACHE_DIR,
+            max_size=config.ASSET_MAX_SIZE,
+            image_format=config.ASSET_FORMAT,
+            quality=config.ASSET_QUALITY,
+        )
+    return _asset_compiler
+
+
+if __name__ == '__main__':
+    print(format_report(get_asset_compiler().compile()))
@@ -0,0 +1,464 @@
+"""Компактный бинарный формат записей игроков.
+
+Запись — это байт версии и поля ``Player.to_dict()`` в фиксированном
+порядке. Целые числа кодируются zigzag-varint, флаги боя упакованы в один
+байт, а известные названия предметов, заклинаний, достижений, локаций и
+монстров заменяются номерами из таблиц ниже.
+
+Таблицы только дополняются: номер, однажды попавший в файлы, нельзя
+переиспользовать или переставлять. Названия, которых нет в таблице,
+пишутся строкой прямо в запись, поэтому новый контент не ломает формат.
+"""
+from datetime import date
+from typing import Iterable, Iterator, Optional
+from models import Player
+
+FORMAT_VERSION = 1
+
+ITEM_NAMES: tuple[str, ...] = (
+    "Деревянная палка",
+    "Стальной меч",
+    "Кожаная броня",
+    "Стальной топор",
+    "Клинок охотника",
+    "Древний амулет",
+    "Королевский щит",
+    "Легендарный меч света",
+)
+
+SPELL_NAMES: tuple[str, ...] = (
+    "⚡ Огненный шар",
+    "✨ Исцеление",
+    "⚡ Молния",
+    "❄️ Ледяной взрыв",
+    "💚 Регенерация",
+)
+
+ACHIEVEMENT_KEYS: tuple[str, ...] = (
+    "first_blood",
+    "monster_hunter",
+    "rich",
+    "explorer",
+)
+
+LOCATION_KEYS: tuple[str, ...] = (
+    "village",
+    "forest",
+    "cave",
+    "mountain",
+)
+
+MONSTER_KEYS: tuple[str, ...] = (
+    "goblin",
+    "wolf",
+    "skeleton",
+    "orc",
+    "dragon",
+    "goblin_chief",
+    "skeleton_king",
+    "orc_warlord",
+    "ancient_dragon",
+)
+
+MONSTER_NAMES: tuple[str, ...] = (
+    "Гоблин",
+    "Волк",
+    "Скелет",
+    "Орк",
+    "Дракон",
+    "Вожак гоблинов",
+    "Король скелетов",
+    "Вождь орков",
+    "Древний дракон Тенебрис",
+)
+
+POTION_KEYS: tuple[str, ...] = (
+    "health",
+    "mana",
+    "power",
+    "health_potion",
+    "mana_potion",
+    "power_potion",
+)
+
+QUEST_KEYS: tuple[str, ...] = (
+    "daily",
+)
+
+_FLAG_BOSS = 1
+_FLAG_ELITE = 2
+_FLAG_DEFENDING = 4
+
+
+class _NameTable:
+    """Таблица названий в обе стороны."""
+
+    def __init__(self, names: tuple[str, ...]):
+        """Построить обратный индекс."""
+        self.names = names
+        self.ids = {name: index for index, name in enumerate(names)}
+
+
+_ITEMS = _NameTable(ITEM_NAMES)
+_SPELLS = _NameTable(SPELL_NAMES)
+_ACHIEVEMENTS = _NameTable(ACHIEVEMENT_KEYS)
+_LOCATIONS = _NameTable(LOCATION_KEYS)
+_MONSTER_KEYS = _NameTable(MONSTER_KEYS)
+_MONSTER_NAMES = _NameTable(MONSTER_NAMES)
+_POTIONS = _NameTable(POTION_KEYS)
+_QUESTS = _NameTable(QUEST_KEYS)
+
+
+# --- Запись ---
+
+def _write_uint(out: bytearray, value: int) -> None:
+    """Беззнаковый varint: по 7 бит на байт, старший бит — «дальше есть ещё»."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_int(out: bytearray, value: int) -> None:
+    """Знаковое число в zigzag-кодировке: 0, -1, 1, -2, ... → 0, 1, 2, 3, ..."""
+    _write_uint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    """Строка UTF-8 с длиной."""
+    raw = value.encode('utf-8')
+    _write_uint(out, len(raw))
+    out += raw
+
+
+def _write_name(out: bytearray, name: Optional[str], table: _NameTable) -> None:
+    """Название: 0 — None, нечётное — номер в таблице, чётное — строка.
+
+    Для строки в метке хранится длина в байтах, увеличенная на единицу.
+    """
+    if name is None:
+        out.append(0)
+        return
+    index = table.ids.get(name)
+    if index is not None:
+        _write_uint(out, index * 2 + 1)
+        return
+    raw = name.encode('utf-8')
+    _write_uint(out, (len(raw) + 1) * 2)
+    out += raw
+
+
+def _write_date(out: bytearray, value: Optional[str]) -> None:
+    """Дата YYYY-MM-DD: 0 — None, нечётное — порядковый номер дня, чётное — строка."""
+    if value is None:
+        out.append(0)
+        return
+    try:
+        ordinal = date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        ordinal = None
+    if ordinal is not None and date.fromordinal(ordinal).isoformat() == value:
+        _write_uint(out, ordinal * 2 + 1)
+        return
+    raw = str(value).encode('utf-8')
+    _write_uint(out, (len(raw) + 1) * 2)
+    out += raw
+
+
+def _write_names(out: bytearray, names: list, table: _NameTable) -> None:
+    """Список названий с количеством."""
+    _write_uint(out, len(names))
+    for name in names:
+        _write_name(out, name, table)
+
+
+def encode_record(data: dict) -> bytes:
+    """Закодировать данные игрока в формате ``Player.to_dict()``.
+
+    Отсутствующие поля заменяются значениями по умолчанию из ``Player.from_dict``,
+    поэтому старые неполные записи тоже кодируются.
+    """
+    out = bytearray((FORMAT_VERSION,))
+    _write_int(out, data['user_id'])
+    _write_int(out, data.get('hp', 100))
+    _write_int(out, data.get('max_hp', 100))
+    _write_int(out, data.get('mana', 50))
+    _write_int(out, data.get('max_mana', 50))
+    _write_int(out, data.get('level', 1))
+    _write_int(out, data.get('exp', 0))
+    _write_int(out, data.get('gold', 20))
+    _write_int(out, data.get('power', 10))
+    _write_names(out, data.get('inventory', ["Деревянная палка"]), _ITEMS)
+    _write_names(out, data.get('spells', []), _SPELLS)
+    _write_name(out, data.get('location', 'village'), _LOCATIONS)
+
+    equipment = data.get('equipment') or {}
+    _write_name(out, equipment.get('weapon'), _ITEMS)
+    _write_name(out, equipment.get('armor'), _ITEMS)
+
+    quests = data.get('quests', {})
+    _write_uint(out, len(quests))
+    for key, quest in quests.items():
+        _write_name(out, key, _QUESTS)
+        _write_date(out, quest.get('date'))
+        _write_int(out, quest.get('kills', 0))
+        _write_int(out, quest.get('target', 5))
+        out.append(1 if quest.get('reward_claimed', False) else 0)
+
+    _write_names(out, data.get('achievements', []), _ACHIEVEMENTS)
+    _write_int(out, data.get('total_kills', 0))
+
+    story = data.get('story_progress')
+    if story:
+        out.append(1)
+        _write_int(out, story.get('current_chapter', 1))
+        completed = story.get('completed_chapters', [])
+        _write_uint(out, len(completed))
+        for chapter_id in completed:
+            _write_int(out, chapter_id)
+        bosses = story.get('boss_defeated', {})
+        _write_uint(out, len(bosses))
+        for boss_name, defeated in bosses.items():
+            _write_name(out, boss_name, _MONSTER_NAMES)
+            out.append(1 if defeated else 0)
+    else:
+        out.append(0)
+
+    potions = data.get('potions', {"health": 0, "mana": 0, "power": 0})
+    _write_uint(out, len(potions))
+    for key, count in potions.items():
+        _write_name(out, key, _POTIONS)
+        _write_int(out, count)
+
+    battle = data.get('battle_state')
+    if battle:
+        out.append(1)
+        _write_name(out, battle['monster_key'], _MONSTER_KEYS)
+        _write_name(out, battle['monster_name'], _MONSTER_NAMES)
+        _write_int(out, battle['monster_hp'])
+        _write_int(out, battle['monster_max_hp'])
+        _write_int(out, battle['monster_power'])
+        _write_int(out, battle['monster_exp'])
+        _write_int(out, battle['monster_gold_min'])
+        _write_int(out, battle['monster_gold_max'])
+        flags = 0
+        if battle.get('is_boss', False):
+            flags |= _FLAG_BOSS
+        if battle.get('is_elite', False):
+            flags |= _FLAG_ELITE
+        if battle.get('defending', False):
+            flags |= _FLAG_DEFENDING
+        out.append(flags)
+        _write_int(out, battle.get('turn', 1))
+    else:
+        out.append(0)
+
+    return bytes(out)
+
+
+# --- Чтение ---
+
+class _Reader:
+    """Последовательное чтение полей записи."""
+
+    __slots__ = ('buf', 'pos')
+
+    def __init__(self, buf: bytes):
+        """Начать чтение с начала буфера."""
+        self.buf = buf
+        self.pos = 0
+
+    def byte(self) -> int:
+        """Один байт."""
+        value = self.buf[self.pos]
+        self.pos += 1
+        return value
+
+    def uint(self) -> int:
+        """Беззнаковый varint."""
+        buf = self.buf
+        pos = self.pos
+        value = buf[pos]
+        if value < 0x80:
+            # Большинство полей укладывается в один байт
+            self.pos = pos + 1
+            return value
+        result = 0
+        shift = 0
+        while True:
+            value = buf[pos]
+            pos += 1
+            result |= (value & 0x7F) << shift
+            if value < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def int(self) -> int:
+        """Знаковое zigzag-число."""
+        value = self.uint()
+        return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+    def raw_str(self, length: int) -> str:
+        """Строка UTF-8 заданной длины."""
+        end = self.pos + length
+        if end > len(self.buf):
+            raise ValueError("Запись обрезана")
+        value = self.buf[self.pos:end].decode('utf-8')
+        self.pos = end
+        return value
+
+    def name(self, table: _NameTable) -> Optional[str]:
+        """Название из таблицы или строкой."""
+        tag = self.uint()
+        if tag == 0:
+            return None
+        if tag & 1:
+            index = tag >> 1
+            if index >= len(table.names):
+                raise ValueError(f"Неизвестный номер названия: {index}")
+            return table.names[index]
+        return self.raw_str((tag >> 1) - 1)
+
+    def date(self) -> Optional[str]:
+        """Дата из порядкового номера дня или строкой."""
+        tag = self.uint()
+        if tag == 0:
+            return None
+        if tag & 1:
+            return date.fromordinal(tag >> 1).isoformat()
+        return self.raw_str((tag >> 1) - 1)
+
+    def names(self, table: _NameTable) -> list:
+        """Список названий."""
+        return [self.name(table) for _ in range(self.uint())]
+
+
+def decode_record(buf: bytes) -> dict:
+    """Раскодировать запись в словарь формата ``Player.to_dict()``.
+
+    Raises:
+        ValueError: неизвестная версия формата или повреждённая запись
+    """
+    reader = _Reader(buf)
+    try:
+        version = reader.byte()
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата: {version}")
+
+        data = {
+            'user_id': reader.int(),
+            'hp': reader.int(),
+            'max_hp': reader.int(),
+            'mana': reader.int(),
+            'max_mana': reader.int(),
+            'level': reader.int(),
+            'exp': reader.int(),
+            'gold': reader.int(),
+            'power': reader.int(),
+            'inventory': reader.names(_ITEMS),
+            'spells': reader.names(_SPELLS),
+            'location': reader.name(_LOCATIONS),
+            'equipment': {
+                'weapon': reader.name(_ITEMS),
+                'armor': reader.name(_ITEMS),
+            },
+        }
+
+        quests = {}
+        for _ in range(reader.uint()):
+            key = reader.name(_QUESTS)
+            quests[key] = {
+                'date': reader.date(),
+                'kills': reader.int(),
+                'target': reader.int(),
+                'reward_claimed': bool(reader.byte()),
+            }
+        data['quests'] = quests
+
+        data['achievements'] = reader.names(_ACHIEVEMENTS)
+        data['total_kills'] = reader.int()
+
+        story = None
+        if reader.byte():
+            current_chapter = reader.int()
+            completed = [reader.int() for _ in range(reader.uint())]
+            bosses = {}
+            for _ in range(reader.uint()):
+                boss_name = reader.name(_MONSTER_NAMES)
+                bosses[boss_name] = bool(reader.byte())
+            story = {
+                'current_chapter': current_chapter,
+                'completed_chapters': completed,
+                'boss_defeated': bosses,
+            }
+        data['story_progress'] = story
+
+        potions = {}
+        for _ in range(reader.uint()):
+            key = reader.name(_POTIONS)
+            potions[key] = reader.int()
+        data['potions'] = potions
+
+        battle = None
+        if reader.byte():
+            battle = {
+                'monster_key': reader.name(_MONSTER_KEYS),
+                'monster_name': reader.name(_MONSTER_NAMES),
+                'monster_hp': reader.int(),
+                'monster_max_hp': reader.int(),
+                'monster_power': reader.int(),
+                'monster_exp': reader.int(),
+                'monster_gold_min': reader.int(),
+                'monster_gold_max': reader.int(),
+            }
+            flags = reader.byte()
+            battle['is_boss'] = bool(flags & _FLAG_BOSS)
+            battle['is_elite'] = bool(flags & _FLAG_ELITE)
+            battle['defending'] = bool(flags & _FLAG_DEFENDING)
+            battle['turn'] = reader.int()
+        data['battle_state'] = battle
+    except IndexError:
+        raise ValueError("Запись обрезана") from None
+
+    if reader.pos != len(buf):
+        raise ValueError("Лишние байты в конце записи")
+    return data
+
+
+def encode_player(player: Player) -> bytes:
+    """Закодировать игрока."""
+    return encode_record(player.to_dict())
+
+
+def decode_player(buf: bytes) -> Player:
+    """Раскодировать игрока."""
+    return Player.from_dict(decode_record(buf))
+
+
+# --- Кадрирование записей в файле ---
+
+def frame_records(records: Iterable[bytes]) -> bytes:
+    """Склеить записи, предварив каждую её длиной (varint)."""
+    out = bytearray()
+    for record in records:
+        _write_uint(out, len(record))
+        out += record
+    return bytes(out)
+
+
+def iter_records(buf: bytes, pos: int = 0) -> Iterator[bytes]:
+    """Записи из буфера ``frame_records``, начиная с позиции ``pos``.
+
+    Raises:
+        ValueError: Последняя запись обрезана.
+    """
+    reader = _Reader(buf)
+    reader.pos = pos
+    while reader.pos < len(buf):
+        length = reader.uint()
+        end = reader.pos + length
+        if end > len(buf):
+            raise ValueError("Запись обрезана")
+        yield buf[reader.pos:end]
+        reader.pos = end
@@ -0,0 +1,144 @@
+"""Репозиторий, хранящий игроков в компактном бинарном формате."""
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional
+from models import Player
+from .binary_codec import decode_record, encode_record, frame_records, iter_records
+from .data_repository import DataRepository
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b'RPGB'
+
+
+class BinaryDataRepository(DataRepository):
+    """Репозиторий с бинарным файлом вместо JSON.
+
+    Файл начинается с сигнатуры ``RPGB``, дальше идут записи игроков
+    из ``binary_codec``, каждая с префиксом длины. Закодированные записи
+    держатся в памяти, поэтому при сохранении заново кодируются только
+    изменившиеся игроки. Файл заменяется атомарно через временный.
+    """
+
+    backend = 'binary'
+
+    def __init__(self, data_file: str = 'players_rpg.bin'):
+        """Инициализировать репозиторий."""
+        super().__init__(data_file)
+        self._encoded: Dict[str, bytes] = {}
+
+    def load_all(self) -> Dict[str, dict]:
+        """Загрузить и раскодировать всех игроков."""
+        if self._cache is not None:
+            return self._cache
+
+        data: Dict[str, dict] = {}
+        encoded: Dict[str, bytes] = {}
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file, 'rb') as f:
+                    buf = f.read()
+                if buf[:len(FILE_MAGIC)] != FILE_MAGIC:
+                    raise ValueError("неверная сигнатура файла")
+                for record in iter_records(buf, len(FILE_MAGIC)):
+                    player_data = decode_record(record)
+                    key = str(player_data['user_id'])
+                    data[key] = player_data
+                    encoded[key] = record
+        except (ValueError, IndexError) as e:
+            logger.warning("Ошибка чтения бинарного файла %s: %s", self.data_file, e)
+        except Exception as e:
+            logger.exception("Неизвестная ошибка при загрузке: %s", e)
+
+        self._cache = data
+        self._encoded = encoded
+        return data
+
+    def save_all(self, data: Dict[str, dict]) -> bool:
+        """Закодировать всех игроков и записать файл."""
+        try:
+            encoded = {key: encode_record(value) for key, value in data.items()}
+        except Exception as e:
+            logger.exception("Ошибка при сохранении: %s", e)
+            return False
+        if not self._write_file(encoded):
+            return False
+        self._cache = data
+        self._encoded = encoded
+        return True
+
+    def save_player(self, player: Player, changed_fields: Optional[set[str]] = None,
+                    record: Optional[dict] = None) -> bool:
+        """Сохранить игрока (снимок ``record``, если он уже снят), перекодировав только его запись."""
+        if record is None:
+            return self.save_players([player])
+        return self.save_records({str(player.user_id): record})
+
+    def save_players(self, players: Iterable[Player]) -> bool:
+        """Сохранить нескольких игроков одной записью файла."""
+        return self.save_records({str(player.user_id): player.to_dict() for player in players})
+
+    def save_records(self, records: Dict[str, dict]) -> bool:
+        """Сохранить готовые снимки игроков одной записью файла."""
+        data = self.load_all()
+        encoded = dict(self._encoded)
+        for key, record in records.items():
+            encoded[key] = encode_record(record)
+        if not self._write_file(encoded):
+            return False
+        data.update(records)
+        self._encoded = encoded
+        return True
+
+    def delete_player(self, user_id: int) -> bool:
+        """Удалить данные игрока."""
+        data = self.load_all()
+        key = str(user_id)
+        if key not in data:
+            return False
+        encoded = dict(self._encoded)
+        encoded.pop(key, None)
+        if not self._write_file(encoded):
+            return False
+        del data[key]
+        self._encoded = encoded
+        return True
+
+    def clear_cache(self) -> None:
+        """Очистить кэш."""
+        super().clear_cache()
+        self._encoded = {}
+
+    def _write_file(self, encoded: Dict[str, bytes]) -> bool:
+        """Записать файл из готовых записей через временный файл."""
+        out = FILE_MAGIC + frame_records(encoded.values())
+
+        tmp_file = self.data_file + '.tmp'
+        try:
+            started = time.perf_counter()
+            with open(tmp_file, 'wb') as f:
+                f.write(out)
+            os.replace(tmp_file, self.data_file)
+            self._report_write('save_all', started, len(out))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка при сохранении: %s", e)
+            return False
+
+
+def migrate_json_to_binary(json_file: str, binary_file: str) -> int:
+    """Перенести игроков из JSON-файла в бинарный. Возвращает число игроков."""
+    data = DataRepository(data_file=json_file).load_all()
+    if not BinaryDataRepository(data_file=binary_file).save_all(data):
+        raise RuntimeError(f"Не удалось записать данные в {binary_file}")
+    return len(data)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Использование: python -m services.binary_repository players_rpg.json players_rpg.bin")
+        sys.exit(1)
+    count = migrate_json_to_binary(sys.argv[1], sys.argv[2])
+    print(f"✅ Перенесено игроков: {count}")
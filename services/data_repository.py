@@ -1,12 +1,25 @@
 """Репозиторий для работы с данными игроков."""
+import heapq
 import json
+import logging
 import os
-from typing import Dict, Optional
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
 from models import Player
 
+logger = logging.getLogger(__name__)
+
 
 class DataRepository:
-    """Репозиторий для загрузки и сохранения данных игроков."""
+    """Репозиторий для загрузки и сохранения данных игроков.
+
+    ``write_hook(operation, seconds, size)`` вызывается после каждой записи
+    на диск: ``save_all`` — файл перезаписан целиком, ``append`` —
+    дописаны изменения. ``size`` — записано байт.
+    """
+
+    backend = 'json'
+    write_hook: Optional[Callable[[str, float, int], None]] = None
 
     def __init__(self, data_file: str = 'players_rpg.json'):
         """Инициализировать репозиторий."""
@@ -23,26 +36,29 @@ class DataRepository:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     if not isinstance(data, dict):
-                        print(f"⚠️ Неверная структура данных в {self.data_file}, создаем новую базу")
+                        logger.warning("Неверная структура данных в %s, создаем новую базу", self.data_file)
                         return {}
                     self._cache = data
                     return data
         except json.JSONDecodeError as e:
-            print(f"⚠️ Ошибка чтения JSON: {e}")
+            logger.warning("Ошибка чтения JSON: %s", e)
         except Exception as e:
-            print(f"⚠️ Неизвестная ошибка при загрузке: {e}")
+            logger.exception("Неизвестная ошибка при загрузке: %s", e)
         self._cache = {}
         return {}
 
     def save_all(self, data: Dict[str, dict]) -> bool:
         """Сохранить все данные в файл."""
         try:
+            started = time.perf_counter()
             with open(self.data_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=4)
+                size = f.tell()
+            self._report_write('save_all', started, size)
             self._cache = data
             return True
         except Exception as e:
-            print(f"⚠️ Ошибка при сохранении: {e}")
+            logger.exception("Ошибка при сохранении: %s", e)
             return False
 
     def get_player_data(self, user_id: int) -> Optional[dict]:
@@ -50,10 +66,26 @@ class DataRepository:
         data = self.load_all()
         return data.get(str(user_id))
 
-    def save_player(self, player: Player) -> bool:
-        """Сохранить данные игрока."""
+    def save_player(self, player: Player, changed_fields: Optional[set[str]] = None,
+                    record: Optional[dict] = None) -> bool:
+        """Сохранить данные игрока.
+
+        ``changed_fields`` — поля, изменившиеся после прошлого сохранения.
+        Файл перезаписывается целиком, поэтому здесь подсказка не используется.
+        ``record`` — уже снятый снимок ``player.to_dict()``: пишется именно он.
+        """
+        data = self.load_all()
+        data[str(player.user_id)] = record if record is not None else player.to_dict()
+        return self.save_all(data)
+
+    def save_players(self, players: Iterable[Player]) -> bool:
+        """Сохранить нескольких игроков одной записью."""
+        return self.save_records({str(player.user_id): player.to_dict() for player in players})
+
+    def save_records(self, records: Dict[str, dict]) -> bool:
+        """Сохранить готовые снимки ``to_dict()`` игроков одной записью."""
         data = self.load_all()
-        data[str(player.user_id)] = player.to_dict()
+        data.update(records)
         return self.save_all(data)
 
     def delete_player(self, user_id: int) -> bool:
@@ -68,6 +100,29 @@ class DataRepository:
         """Получить всех игроков."""
         return self.load_all()
 
+    def get_top_player_data(self, limit: int = 10) -> list[tuple[str, dict]]:
+        """Получить данные топ игроков по уровню и золоту."""
+        return heapq.nlargest(
+            limit,
+            self.load_all().items(),
+            key=lambda item: (item[1].get('level', 1), item[1].get('gold', 20))
+        )
+
+    def get_leaderboard_records(self) -> Iterator[tuple[int, int, int]]:
+        """Записи ``(user_id, level, gold)`` всех игроков для индекса рейтинга."""
+        return (
+            (int(uid), data.get('level', 1), data.get('gold', 20))
+            for uid, data in self.load_all().items()
+        )
+
     def clear_cache(self) -> None:
         """Очистить кэш."""
         self._cache = None
+
+    def _report_write(self, operation: str, started: float, size: int) -> None:
+        """Передать время и объём записи в ``write_hook``, если он задан."""
+        if self.write_hook is not None:
+            self.write_hook(operation, time.perf_counter() - started, size)
+
+    def close(self) -> None:
+        """Освободить ресурсы хранилища."""
@@ -0,0 +1,130 @@
+"""Ограничение частоты исходящих сообщений под лимиты Telegram."""
+import time
+from typing import Dict, Optional, Union
+import config
+
+ChatId = Union[int, str]
+
+
+class TokenBucket:
+    """Корзина токенов с резервированием.
+
+    ``reserve`` сразу списывает токен и возвращает, сколько секунд нужно
+    подождать до его появления. Токены могут уйти в минус — тогда каждая
+    следующая отправка встаёт в очередь за предыдущими, и порядок
+    отправок сохраняется без отдельной очереди.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """Инициализировать корзину.
+
+        Args:
+            rate: Токенов в секунду
+            capacity: Ёмкость (сколько отправок можно сделать залпом)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Начислить токены за прошедшее время."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Списать токен; вернуть задержку в секундах до отправки."""
+        self._refill(time.monotonic())
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    def is_idle(self) -> bool:
+        """Корзина полная — её можно удалить без потери ограничения."""
+        self._refill(time.monotonic())
+        return self._tokens >= self.capacity
+
+
+class FloodControl:
+    """Глобальная корзина и корзины по чатам.
+
+    Глобальная корзина держит общий лимит бота (около 30 сообщений в
+    секунду), корзины групповых чатов — лимит на чат (около сообщения в
+    секунду). Личные чаты ограничены только глобальной корзиной.
+    """
+
+    # Сколько корзин чатов держать, прежде чем выбросить полные
+    PRUNE_THRESHOLD = 1000
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        global_burst: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+    ):
+        """Инициализировать ограничитель."""
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        self.sent = 0
+        self.throttled = 0
+        self.throttled_time = 0.0
+        self.coalesced = 0
+        self.retried = 0
+
+    @staticmethod
+    def is_group(chat_id: ChatId) -> bool:
+        """Групповой чат или канал (отрицательный id или @username)."""
+        if isinstance(chat_id, str):
+            return not chat_id.isdigit()
+        return chat_id < 0
+
+    def _chat_bucket(self, chat_id: ChatId) -> TokenBucket:
+        """Корзина чата; создаётся при первой отправке."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.PRUNE_THRESHOLD:
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_idle()}
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def reserve(self, chat_id: Optional[ChatId]) -> float:
+        """Зарезервировать отправку в чат; вернуть задержку в секундах."""
+        delay = self.global_bucket.reserve()
+        if chat_id is not None and self.is_group(chat_id):
+            delay = max(delay, self._chat_bucket(chat_id).reserve())
+        self.sent += 1
+        if delay > 0:
+            self.throttled += 1
+            self.throttled_time += delay
+        return delay
+
+    def stats(self) -> dict:
+        """Статистика ограничения отправок."""
+        return {
+            'sent': self.sent,
+            'throttled': self.throttled,
+            'throttled_ms': self.throttled_time * 1000,
+            'coalesced': self.coalesced,
+            'retried': self.retried,
+            'chat_buckets': len(self._chats),
+        }
+
+
+_flood_control: Optional[FloodControl] = None
+
+
+def get_flood_control() -> FloodControl:
+    """Получить глобальный экземпляр FloodControl с настройками из конфигурации."""
+    global _flood_control
+    if _flood_control is None:
+        _flood_control = FloodControl(
+            global_rate=config.FLOOD_GLOBAL_RATE,
+            global_burst=config.FLOOD_GLOBAL_RATE,
+            chat_rate=config.FLOOD_CHAT_RATE,
+            chat_burst=config.FLOOD_CHAT_BURST,
+        )
+    return _flood_control
@@ -0,0 +1,404 @@
+"""Индексированное хранилище: игроки читаются из файла по одному."""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+from models import Player
+from .data_repository import DataRepository
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'RPGI'
+INDEX_VERSION = 1
+
+# Заголовок индекса: сигнатура, версия, проиндексированный размер файла данных,
+# его inode, число игроков и суммарная длина их актуальных строк
+INDEX_HEADER = struct.Struct('<4sBQQQQ')
+# Запись индекса: user_id, смещение строки, её длина, уровень и золото
+INDEX_ENTRY = struct.Struct('<qQIqq')
+
+# Смещение строки, её длина, уровень и золото для рейтинга
+IndexEntry = tuple[int, int, int, int]
+
+
+def _encode_line(record: dict) -> bytes:
+    """Одна строка файла данных."""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class IndexedDataRepository(DataRepository):
+    """Репозиторий с файлом JSON-строк и индексом смещений.
+
+    Файл данных ``data_file`` только дописывается: каждое сохранение добавляет
+    строку с игроком, удаление — строку ``{"user_id": ..., "deleted": true}``.
+
+    Индекс ``<data_file>.idx`` — отсортированный по user_id массив записей
+    фиксированной длины. Он отображается в память и читается бинарным поиском,
+    поэтому при старте не разбирается ни файл данных, ни индекс целиком:
+    первый игрок после перезапуска стоит одного поиска и одной строки JSON.
+    Изменения после сохранения индекса держатся в памяти поверх него,
+    а строки, дописанные после сохранения, досканируются при открытии.
+    Индекс сохраняется заново каждые ``index_every_bytes`` дописанных байт,
+    поэтому после аварийного завершения досканировать нужно немного.
+    Когда устаревших строк становится больше живых, файл переписывается.
+    """
+
+    backend = 'indexed'
+
+    def __init__(
+        self,
+        data_file: str = 'players_rpg.jsonl',
+        compact_min_bytes: int = 1024 * 1024,
+        index_every_bytes: int = 4 * 1024 * 1024,
+    ):
+        """Инициализировать репозиторий."""
+        super().__init__(data_file)
+        self.index_file = data_file + '.idx'
+        self.compact_min_bytes = compact_min_bytes
+        self.index_every_bytes = index_every_bytes
+        self._opened = False
+        self._base: Optional[mmap.mmap] = None
+        self._base_count = 0
+        self._overlay: Dict[int, Optional[IndexEntry]] = {}
+        self._count = 0
+        self._size = 0
+        self._indexed_size = 0  # размер файла данных, покрытый сохранённым индексом
+        self._live_bytes = 0
+        self._reader: Optional[BinaryIO] = None
+        self._lock = threading.RLock()
+
+    @property
+    def stale_bytes(self) -> int:
+        """Объём устаревших строк, которые уберёт компакция."""
+        return self._size - self._live_bytes
+
+    def load_all(self) -> Dict[str, dict]:
+        """Прочитать всех игроков (для миграций и отчётов, не для старта)."""
+        with self._lock:
+            return {str(user_id): self._read(entry) for user_id, entry in self._entries()}
+
+    def save_all(self, data: Dict[str, dict]) -> bool:
+        """Переписать файл данными и построить индекс заново."""
+        with self._lock:
+            entries: Dict[int, IndexEntry] = {}
+            tmp_file = self.data_file + '.tmp'
+            try:
+                started = time.perf_counter()
+                offset = 0
+                with open(tmp_file, 'wb') as f:
+                    for uid, record in data.items():
+                        if 'user_id' not in record:
+                            record = {'user_id': int(uid), **record}
+                        line = _encode_line(record)
+                        f.write(line)
+                        entries[int(uid)] = (
+                            offset, len(line), record.get('level', 1), record.get('gold', 20)
+                        )
+                        offset += len(line)
+                self._close_files()
+                os.replace(tmp_file, self.data_file)
+                self._report_write('save_all', started, offset)
+            except Exception as e:
+                logger.exception("Ошибка при сохранении: %s", e)
+                return False
+
+            self._opened = True
+            self._overlay = entries
+            self._base_count = 0
+            self._count = len(entries)
+            self._size = offset
+            self._live_bytes = offset
+            self._save_index()
+            return True
+
+    def get_player_data(self, user_id: int) -> Optional[dict]:
+        """Прочитать одного игрока по смещению из индекса."""
+        with self._lock:
+            entry = self._lookup(int(user_id))
+            if entry is None:
+                return None
+            return self._read(entry)
+
+    def save_player(self, player: Player, changed_fields: Optional[set[str]] = None,
+                    record: Optional[dict] = None) -> bool:
+        """Дописать строку игрока (снимок ``record``, если он уже снят) в файл."""
+        if record is None:
+            return self.save_players([player])
+        return self._append([record])
+
+    def save_players(self, players: Iterable[Player]) -> bool:
+        """Дописать строки нескольких игроков одной записью."""
+        return self._append([player.to_dict() for player in players])
+
+    def save_records(self, records: Dict[str, dict]) -> bool:
+        """Дописать готовые снимки игроков одной записью."""
+        return self._append(list(records.values()))
+
+    def delete_player(self, user_id: int) -> bool:
+        """Дописать отметку об удалении игрока."""
+        with self._lock:
+            if self._lookup(int(user_id)) is None:
+                return False
+            return self._append([{'user_id': int(user_id), 'deleted': True}])
+
+    def get_all_players(self) -> Dict[str, dict]:
+        """Получить всех игроков."""
+        return self.load_all()
+
+    def get_leaderboard_records(self) -> Iterator[tuple[int, int, int]]:
+        """Уровень и золото всех игроков прямо из индекса, без чтения файла."""
+        with self._lock:
+            entries = list(self._entries())
+        return ((user_id, level, gold) for user_id, (_, _, level, gold) in entries)
+
+    def count_players(self) -> int:
+        """Количество игроков."""
+        with self._lock:
+            self._open()
+            return self._count
+
+    def clear_cache(self) -> None:
+        """Забыть индекс; он будет открыт заново при следующем обращении."""
+        with self._lock:
+            self._close_files()
+            self._overlay = {}
+            self._opened = False
+
+    def compact(self) -> bool:
+        """Переписать файл без устаревших строк."""
+        with self._lock:
+            return self.save_all(self.load_all())
+
+    def close(self) -> None:
+        """Сохранить индекс и закрыть файлы."""
+        with self._lock:
+            if self._opened and self._overlay:
+                self._save_index()
+            self._close_files()
+
+    # --- Индекс ---
+
+    def _open(self) -> None:
+        """Открыть сохранённый индекс и досканировать хвост файла данных."""
+        if self._opened:
+            return
+        self._opened = True
+        self._overlay = {}
+        self._base_count = self._count = self._size = self._live_bytes = self._indexed_size = 0
+
+        if not os.path.exists(self.data_file):
+            return
+        data_stat = os.stat(self.data_file)
+        try:
+            self._open_base(data_stat)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Индекс %s повреждён, строим заново: %s", self.index_file, e)
+            self._close_files()
+            self._base_count = self._count = self._size = self._live_bytes = 0
+
+        if self._size < data_stat.st_size:
+            self._scan_tail()
+
+    def _open_base(self, data_stat: os.stat_result) -> None:
+        """Отобразить сохранённый индекс в память, если он соответствует файлу данных."""
+        if not os.path.exists(self.index_file):
+            return
+        with open(self.index_file, 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            magic, version, size, inode, count, live_bytes = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError("неизвестный формат")
+            if inode != data_stat.st_ino or size > data_stat.st_size:
+                # Файл данных переписан в обход индекса
+                return
+            if count:
+                self._base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if len(self._base) != INDEX_HEADER.size + count * INDEX_ENTRY.size:
+                    raise ValueError("неверная длина")
+        self._base_count = self._count = count
+        self._size = self._indexed_size = size
+        self._live_bytes = live_bytes
+
+    def _base_entry(self, position: int) -> tuple:
+        """Запись сохранённого индекса по номеру."""
+        return INDEX_ENTRY.unpack_from(self._base, INDEX_HEADER.size + position * INDEX_ENTRY.size)
+
+    def _base_lookup(self, user_id: int) -> Optional[IndexEntry]:
+        """Бинарный поиск игрока в сохранённом индексе."""
+        low, high = 0, self._base_count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._base_entry(middle)
+            if entry[0] < user_id:
+                low = middle + 1
+            elif entry[0] > user_id:
+                high = middle
+            else:
+                return entry[1:]
+        return None
+
+    def _lookup(self, user_id: int) -> Optional[IndexEntry]:
+        """Найти строку игрока: сначала среди свежих изменений, потом в индексе."""
+        self._open()
+        if user_id in self._overlay:
+            return self._overlay[user_id]
+        return self._base_lookup(user_id)
+
+    def _entries(self) -> Iterator[tuple[int, IndexEntry]]:
+        """Все актуальные записи индекса."""
+        self._open()
+        for position in range(self._base_count):
+            user_id, *entry = self._base_entry(position)
+            if user_id not in self._overlay:
+                yield user_id, tuple(entry)
+        for user_id, entry in self._overlay.items():
+            if entry is not None:
+                yield user_id, entry
+
+    def _save_index(self) -> None:
+        """Атомарно записать индекс на диск и отобразить его заново."""
+        if not os.path.exists(self.data_file):
+            return
+        entries = sorted(self._entries())
+        tmp_file = self.index_file + '.tmp'
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(INDEX_HEADER.pack(
+                    INDEX_MAGIC, INDEX_VERSION, self._size,
+                    os.stat(self.data_file).st_ino, len(entries), self._live_bytes,
+                ))
+                for user_id, entry in entries:
+                    f.write(INDEX_ENTRY.pack(user_id, *entry))
+            self._close_base()
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.exception("Ошибка при сохранении индекса: %s", e)
+            return
+
+        # Сохранённый индекс становится базой, свежих изменений больше нет
+        self._overlay = {}
+        self._indexed_size = self._size
+        self._base_count = len(entries)
+        if entries:
+            with open(self.index_file, 'rb') as f:
+                self._base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # --- Файл данных ---
+
+    def _scan_tail(self) -> None:
+        """Проиндексировать строки, дописанные после сохранения индекса."""
+        with open(self.data_file, 'rb') as f:
+            f.seek(self._size)
+            offset = self._size
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Недописанная строка после аварийного завершения
+                    logger.warning("Обрезанная запись в %s на смещении %d, отбрасываем", self.data_file, offset)
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Повреждённая запись в %s на смещении %d, пропускаем", self.data_file, offset)
+                else:
+                    self._apply(record, offset, len(line))
+                offset += len(line)
+
+        if offset < os.path.getsize(self.data_file):
+            os.truncate(self.data_file, offset)
+        self._size = offset
+
+    def _apply(self, record: dict, offset: int, length: int) -> None:
+        """Учесть строку файла в индексе."""
+        user_id = int(record['user_id'])
+        old = self._lookup(user_id)
+        if old is not None:
+            self._live_bytes -= old[1]
+            self._count -= 1
+        if record.get('deleted'):
+            self._overlay[user_id] = None
+        else:
+            self._overlay[user_id] = (offset, length, record.get('level', 1), record.get('gold', 20))
+            self._live_bytes += length
+            self._count += 1
+
+    def _append(self, records: list[dict]) -> bool:
+        """Дописать строки в конец файла и обновить индекс."""
+        if not records:
+            return True
+        with self._lock:
+            self._open()
+            lines = [_encode_line(record) for record in records]
+            try:
+                started = time.perf_counter()
+                payload = b''.join(lines)
+                with open(self.data_file, 'ab') as f:
+                    f.write(payload)
+                self._report_write('append', started, len(payload))
+            except Exception as e:
+                logger.exception("Ошибка при сохранении: %s", e)
+                return False
+
+            offset = self._size
+            for record, line in zip(records, lines):
+                self._apply(record, offset, len(line))
+                offset += len(line)
+            self._size = offset
+            self._maybe_compact()
+            self._maybe_save_index()
+            return True
+
+    def _read(self, entry: IndexEntry) -> dict:
+        """Прочитать и декодировать строку игрока."""
+        if self._reader is None:
+            self._reader = open(self.data_file, 'rb')
+        self._reader.seek(entry[0])
+        return json.loads(self._reader.read(entry[1]))
+
+    def _close_base(self) -> None:
+        """Закрыть отображение индекса."""
+        if self._base is not None:
+            self._base.close()
+            self._base = None
+
+    def _close_files(self) -> None:
+        """Закрыть открытые файлы."""
+        self._close_base()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _maybe_save_index(self) -> None:
+        """Сохранить индекс, если с прошлого сохранения дописано много строк."""
+        if self.index_every_bytes and self._size - self._indexed_size >= self.index_every_bytes:
+            self._save_index()
+
+    def _maybe_compact(self) -> None:
+        """Переписать файл, если устаревших строк больше, чем живых."""
+        stale = self.stale_bytes
+        if stale >= self.compact_min_bytes and stale > self._live_bytes:
+            self.compact()
+
+
+def migrate_json_to_indexed(json_file: str, indexed_file: str) -> int:
+    """Перенести игроков из JSON-файла в индексированный. Возвращает число игроков."""
+    data = DataRepository(data_file=json_file).load_all()
+    target = IndexedDataRepository(data_file=indexed_file)
+    try:
+        if not target.save_all(data):
+            raise RuntimeError(f"Не удалось записать данные в {indexed_file}")
+    finally:
+        target.close()
+    return len(data)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Использование: python -m services.indexed_repository players_rpg.json players_rpg.jsonl")
+        sys.exit(1)
+    count = migrate_json_to_indexed(sys.argv[1], sys.argv[2])
+    print(f"✅ Перенесено игроков: {count}")
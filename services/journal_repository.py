@@ -0,0 +1,278 @@
+"""Журнальный репозиторий: дозапись изменений вместо перезаписи всего файла."""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, TextIO
+from models import Player
+from .data_repository import DataRepository
+
+logger = logging.getLogger(__name__)
+
+
+class JournalDataRepository(DataRepository):
+    """Репозиторий со снимком и журналом изменений.
+
+    Каждое сохранение дописывает одну компактную запись об игроке в журнал
+    ``<data_file>.journal``, поэтому стоимость сохранения не зависит от числа
+    игроков. Когда журнал разрастается, компакция сворачивает его в снимок —
+    обычный JSON-файл ``data_file``, совместимый с ``DataRepository``.
+    При старте загружается снимок и проигрывается хвост журнала.
+    """
+
+    backend = 'journal'
+
+    def __init__(
+        self,
+        data_file: str = 'players_rpg.json',
+        compact_threshold: int = 1000,
+        background_compaction: bool = True,
+    ):
+        """Инициализировать репозиторий."""
+        super().__init__(data_file)
+        self.journal_file = data_file + '.journal'
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+        self._journal: Optional[TextIO] = None
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    @property
+    def rotated_journal_file(self) -> str:
+        """Журнал, который сейчас сворачивается в снимок."""
+        return self.journal_file + '.old'
+
+    @property
+    def journal_records(self) -> int:
+        """Количество записей в журнале после последней компакции."""
+        return self._journal_records
+
+    def load_all(self) -> Dict[str, dict]:
+        """Загрузить снимок и проиграть журнал."""
+        if self._cache is not None:
+            return self._cache
+
+        with self._lock:
+            if self._cache is not None:
+                return self._cache
+            data = super().load_all()
+            self._journal_records = 0
+            for path in (self.rotated_journal_file, self.journal_file):
+                self._journal_records += self._replay(path, data)
+            self._cache = data
+            return data
+
+    def save_all(self, data: Dict[str, dict]) -> bool:
+        """Записать полный снимок и очистить журнал."""
+        with self._compaction_lock, self._lock:
+            self._close_journal()
+            if not self._write_snapshot(data):
+                return False
+            for path in (self.journal_file, self.rotated_journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._journal_records = 0
+            self._cache = data
+            return True
+
+    def save_player(self, player: Player, changed_fields: Optional[set[str]] = None,
+                    record: Optional[dict] = None) -> bool:
+        """Дописать запись игрока в журнал.
+
+        Если известны изменившиеся поля, а игрок уже есть в хранилище,
+        в журнал пишутся только они. ``record`` — снимок, по которому
+        найдены ``changed_fields``: значения полей берутся из него же.
+        """
+        data = self.load_all()
+        uid = str(player.user_id)
+        if record is None:
+            record = player.to_dict()
+
+        with self._lock:
+            if changed_fields is not None and uid in data:
+                entry = {'op': 'patch', 'id': uid, 'data': {key: record[key] for key in changed_fields}}
+            else:
+                entry = {'op': 'put', 'id': uid, 'data': record}
+            if not self._append(entry):
+                return False
+            data[uid] = record
+
+        self._maybe_compact()
+        return True
+
+    def save_players(self, players: Iterable[Player]) -> bool:
+        """Дописать записи нескольких игроков одной операцией записи."""
+        return self.save_records({str(player.user_id): player.to_dict() for player in players})
+
+    def save_records(self, records: Dict[str, dict]) -> bool:
+        """Дописать готовые снимки игроков одной операцией записи."""
+        data = self.load_all()
+        if not records:
+            return True
+
+        with self._lock:
+            if not self._append_many([{'op': 'put', 'id': uid, 'data': record}
+                                      for uid, record in records.items()]):
+                return False
+            data.update(records)
+
+        self._maybe_compact()
+        return True
+
+    def delete_player(self, user_id: int) -> bool:
+        """Дописать в журнал удаление игрока."""
+        data = self.load_all()
+        uid = str(user_id)
+
+        with self._lock:
+            if uid not in data:
+                return False
+            if not self._append({'op': 'del', 'id': uid}):
+                return False
+            del data[uid]
+
+        self._maybe_compact()
+        return True
+
+    def compact(self) -> bool:
+        """Свернуть журнал в снимок.
+
+        Журнал переименовывается, после чего новые записи идут в свежий журнал,
+        а снимок пишется во временный файл и атомарно подменяет старый.
+        Если процесс упадёт посередине, старый снимок и оба журнала
+        остаются на диске и проигрываются при следующем старте.
+        """
+        with self._compaction_lock:
+            with self._lock:
+                data = self.load_all()
+                snapshot = dict(data)
+                self._rotate_journal()
+                self._journal_records = 0
+
+            if not self._write_snapshot(snapshot):
+                return False
+
+            with self._lock:
+                if os.path.exists(self.rotated_journal_file):
+                    os.remove(self.rotated_journal_file)
+            return True
+
+    def close(self) -> None:
+        """Дождаться компакции и закрыть журнал."""
+        thread = self._compaction_thread
+        if thread is not None and thread.is_alive():
+            thread.join()
+        with self._lock:
+            self._close_journal()
+
+    def clear_cache(self) -> None:
+        """Очистить кэш (при следующем обращении журнал будет проигран заново)."""
+        with self._lock:
+            self._close_journal()
+            self._cache = None
+
+    def _append(self, record: dict) -> bool:
+        """Дописать одну запись в журнал."""
+        return self._append_many([record])
+
+    def _append_many(self, records: list[dict]) -> bool:
+        """Дописать записи в журнал одной операцией записи."""
+        try:
+            started = time.perf_counter()
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            payload = ''.join(
+                json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+                for record in records
+            )
+            self._journal.write(payload)
+            self._journal.flush()
+            self._journal_records += len(records)
+            if self.write_hook is not None:
+                self._report_write('append', started, len(payload.encode('utf-8')))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка записи в журнал: %s", e)
+            return False
+
+    def _replay(self, path: str, data: Dict[str, dict]) -> int:
+        """Применить записи журнала к данным. Возвращает число записей."""
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Недописанная строка после аварийного завершения
+                    logger.warning("Повреждённая запись в %s:%d, пропускаем", path, line_no)
+                    continue
+
+                if record.get('op') == 'put':
+                    data[record['id']] = record['data']
+                elif record.get('op') == 'patch':
+                    if record['id'] in data:
+                        data[record['id']].update(record['data'])
+                elif record.get('op') == 'del':
+                    data.pop(record['id'], None)
+                applied += 1
+        return applied
+
+    def _rotate_journal(self) -> None:
+        """Отложить текущий журнал для компакции."""
+        self._close_journal()
+        if not os.path.exists(self.journal_file):
+            return
+
+        if os.path.exists(self.rotated_journal_file):
+            # Предыдущая компакция не завершилась — дописываем, а не затираем
+            with open(self.journal_file, 'r', encoding='utf-8') as src, \
+                    open(self.rotated_journal_file, 'a', encoding='utf-8') as dst:
+                dst.write(src.read())
+            os.remove(self.journal_file)
+        else:
+            os.replace(self.journal_file, self.rotated_journal_file)
+
+    def _write_snapshot(self, data: Dict[str, dict]) -> bool:
+        """Атомарно записать снимок."""
+        tmp_file = self.data_file + '.tmp'
+        try:
+            started = time.perf_counter()
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                size = f.tell()
+            os.replace(tmp_file, self.data_file)
+            self._report_write('save_all', started, size)
+            return True
+        except Exception as e:
+            logger.exception("Ошибка при сохранении снимка: %s", e)
+            return False
+
+    def _close_journal(self) -> None:
+        """Закрыть открытый файл журнала."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _maybe_compact(self) -> None:
+        """Запустить компакцию, если журнал разросся."""
+        if self._journal_records < self.compact_threshold:
+            return
+
+        if not self.background_compaction:
+            self.compact()
+            return
+
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(
+            target=self.compact, name='journal-compaction', daemon=True
+        )
+        self._compaction_thread.start()
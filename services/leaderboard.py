@@ -0,0 +1,68 @@
+"""Индекс рейтинга игроков."""
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable, Optional
+
+
+class LeaderboardIndex:
+    """Отсортированный индекс игроков по уровню и золоту.
+
+    Ключи хранятся в виде ``(-level, -gold, user_id)``, поэтому список
+    упорядочен от лучшего игрока к худшему: топ-N — это срез первых
+    N элементов, а место игрока находится бинарным поиском.
+    """
+
+    def __init__(self) -> None:
+        """Создать пустой индекс."""
+        self._keys: list[tuple[int, int, int]] = []
+        self._by_user: dict[int, tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Количество игроков в индексе."""
+        return len(self._keys)
+
+    @staticmethod
+    def _make_key(user_id: int, level: int, gold: int) -> tuple[int, int, int]:
+        """Ключ сортировки игрока."""
+        return (-level, -gold, user_id)
+
+    def rebuild(self, records: Iterable[tuple[int, int, int]]) -> None:
+        """Перестроить индекс из записей ``(user_id, level, gold)``."""
+        by_user = {uid: self._make_key(uid, level, gold) for uid, level, gold in records}
+        keys = sorted(by_user.values())
+        with self._lock:
+            self._by_user = by_user
+            self._keys = keys
+
+    def update(self, user_id: int, level: int, gold: int) -> None:
+        """Обновить позицию игрока после изменения уровня или золота."""
+        key = self._make_key(user_id, level, gold)
+        with self._lock:
+            old_key = self._by_user.get(user_id)
+            if old_key == key:
+                return
+            if old_key is not None:
+                del self._keys[bisect_left(self._keys, old_key)]
+            insort(self._keys, key)
+            self._by_user[user_id] = key
+
+    def remove(self, user_id: int) -> None:
+        """Убрать игрока из рейтинга."""
+        with self._lock:
+            old_key = self._by_user.pop(user_id, None)
+            if old_key is not None:
+                del self._keys[bisect_left(self._keys, old_key)]
+
+    def top(self, limit: int = 10) -> list[int]:
+        """ID лучших игроков, от первого места."""
+        with self._lock:
+            return [user_id for _, _, user_id in self._keys[:limit]]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Место игрока в рейтинге (с единицы) или None, если его нет."""
+        with self._lock:
+            key = self._by_user.get(user_id)
+            if key is None:
+                return None
+            return bisect_left(self._keys, key) + 1
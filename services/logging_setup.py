@@ -0,0 +1,173 @@
+"""Журналирование: очередь, JSON-записи и прореживание повторов.
+
+Обработчики событий только кладут запись в очередь (``QueueHandler``),
+а форматирование и запись в поток выполняет отдельный поток
+``QueueListener``. Одинаковые записи сверх лимита отбрасываются ещё до
+очереди, а их число приписывается к первой записи того же вида в
+следующем окне.
+"""
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Атрибуты, которые есть у любой LogRecord; остальное — поля из extra
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись журнала одной JSON-строкой.
+
+    Кроме времени, уровня, имени логгера и сообщения в строку попадают
+    поля, переданные через ``extra`` (``user_id``, ``handler``,
+    ``latency_ms`` и т. п.).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Собрать JSON-строку."""
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Не больше ``burst`` одинаковых записей за ``interval`` секунд.
+
+    Одинаковыми считаются записи одного логгера и уровня с одним шаблоном
+    сообщения (до подстановки аргументов). Первая запись нового окна
+    получает поле ``suppressed`` — сколько записей было отброшено в
+    предыдущем.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 60.0, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """Инициализировать фильтр."""
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Ключ записи -> [начало окна, пропущено в окне, отброшено в окне]
+        self._windows: Dict[tuple, list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Пропустить запись или отбросить повтор."""
+        key = (record.name, record.levelno, record.msg)
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is not None and window[2]:
+                    record.suppressed = window[2]
+                elif window is None and len(self._windows) >= self.max_keys:
+                    self._expire(now)
+                self._windows[key] = [now, 1, 0]
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            self.suppressed += 1
+            return False
+
+    def _expire(self, now: float) -> None:
+        """Забыть окна, которые уже закончились."""
+        self._windows = {
+            key: window for key, window in self._windows.items()
+            if now - window[0] < self.interval
+        }
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler, сохраняющий поля из ``extra`` для JSON-форматтера.
+
+    Стандартный ``prepare`` форматирует запись целиком ещё в потоке
+    обработчика. Здесь подставляются только аргументы сообщения (они
+    могут измениться после вызова логгера) и текст исключения, а JSON
+    собирает поток ``QueueListener``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подготовить запись к передаче в другой поток."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_logger_levels(spec: str) -> Dict[str, str]:
+    """Разобрать уровни логгеров вида ``"aiogram=WARNING,services=DEBUG"``."""
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(
+    level: str = 'INFO',
+    logger_levels: Optional[Dict[str, str]] = None,
+    fmt: str = 'json',
+    sample_burst: int = 10,
+    sample_interval: float = 60.0,
+    stream: Optional[TextIO] = None,
+) -> QueueListener:
+    """Направить журнал корневого логгера через очередь.
+
+    Args:
+        level: Уровень корневого логгера
+        logger_levels: Уровни отдельных логгеров
+        fmt: ``json`` или ``text``
+        sample_burst: Сколько одинаковых записей пропускать за окно (0 — все)
+        sample_interval: Длина окна прореживания, с
+        stream: Куда писать (по умолчанию stderr)
+
+    Returns:
+        Запущенный ``QueueListener``; при завершении его нужно остановить,
+        чтобы дописать очередь
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    if sample_burst > 0:
+        queue_handler.addFilter(SamplingFilter(burst=sample_burst, interval=sample_interval))
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    for name, logger_level in (logger_levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,216 @@
+"""Кэш file_id картинок, уже загруженных в Telegram."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, Message
+import config
+from .asset_compiler import get_asset_compiler
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCache:
+    """Соответствие «файл картинки → file_id в Telegram».
+
+    Первая отправка картинки загружает файл, а возвращённый Telegram
+    ``file_id`` запоминается вместе с хэшем содержимого файла. Следующие
+    отправки передают только ``file_id``. Если файл на диске изменился,
+    хэш не совпадёт, и картинка загрузится заново. Соответствие хранится
+    в JSON-файле и переживает перезапуск бота.
+
+    ``resolve`` подменяет путь картинки перед отправкой — через него
+    отправляются уменьшенные копии из ``AssetCompiler``.
+    ``send_hook(source, seconds)`` получает время каждой удачной отправки:
+    ``file_id`` или ``upload``.
+
+    ``answer_photo`` не трогает диск в event loop: хэш изменившейся
+    картинки считается в пуле потоков, а JSON-файл переписывается фоновой
+    задачей, которая объединяет подряд идущие изменения.
+    """
+
+    def __init__(self, cache_file: str = 'media_cache.json', resolve: Optional[Callable[[str], str]] = None):
+        """Инициализировать кэш и загрузить сохранённые file_id."""
+        self.cache_file = cache_file
+        self.resolve = resolve
+        self.send_hook: Optional[Callable[[str, float], None]] = None
+        self._entries: Dict[str, Dict[str, str]] = self._load()
+        # Хэши файлов по (mtime, размер), чтобы не читать картинку при каждой отправке
+        self._hashes: Dict[str, tuple[int, int, str]] = {}
+        self._save_pending = False
+        self._save_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.uploads = 0
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """Прочитать сохранённые file_id."""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+            logger.warning("Неверная структура %s, кэш картинок сброшен", self.cache_file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ошибка чтения кэша картинок: %s", e)
+        return {}
+
+    def _save(self, entries: Optional[Dict[str, Dict[str, str]]] = None) -> None:
+        """Атомарно записать file_id (или их снимок ``entries``) на диск."""
+        tmp_file = self.cache_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries if entries is None else entries, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.error("Ошибка при сохранении кэша картинок: %s", e)
+
+    def _known_hash(self, path: str) -> Optional[str]:
+        """Посчитанный ранее хэш, если у файла те же mtime и размер."""
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        return None
+
+    def file_hash(self, path: str) -> str:
+        """SHA-256 содержимого файла (пересчитывается, только если файл изменился)."""
+        digest = self._known_hash(path)
+        if digest is not None:
+            return digest
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    async def _afile_hash(self, path: str) -> str:
+        """``file_hash``, читающий и хэширующий изменившийся файл в пуле потоков."""
+        digest = self._known_hash(path)
+        if digest is not None:
+            return digest
+        return await asyncio.get_running_loop().run_in_executor(None, self.file_hash, path)
+
+    def get_file_id(self, path: str) -> Optional[str]:
+        """Сохранённый file_id, если файл не менялся с момента загрузки."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            if entry.get('hash') != self.file_hash(path):
+                return None
+        except OSError:
+            return None
+        return entry.get('file_id')
+
+    async def _aget_file_id(self, path: str) -> Optional[str]:
+        """``get_file_id`` без чтения картинки в event loop."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            if entry.get('hash') != await self._afile_hash(path):
+                return None
+        except OSError:
+            return None
+        return entry.get('file_id')
+
+    @staticmethod
+    def _sent_file_id(sent: Optional[Message]) -> Optional[str]:
+        """file_id самой крупной копии из ответа Telegram."""
+        photos = getattr(sent, 'photo', None)
+        if not photos:
+            return None
+        file_id = photos[-1].file_id
+        return file_id if isinstance(file_id, str) else None
+
+    def remember(self, path: str, sent: Optional[Message]) -> None:
+        """Запомнить file_id из ответа Telegram на загрузку файла."""
+        file_id = self._sent_file_id(sent)
+        if file_id is None:
+            return
+        self._entries[path] = {'hash': self.file_hash(path), 'file_id': file_id}
+        self._save()
+
+    def forget(self, path: str) -> None:
+        """Удалить file_id, который Telegram больше не принимает."""
+        if self._entries.pop(path, None) is not None:
+            self._save()
+
+    def _schedule_save(self) -> None:
+        """Записать file_id на диск в фоне; изменения до начала записи объединяются."""
+        self._save_pending = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_in_background())
+
+    async def _save_in_background(self) -> None:
+        """Переписывать файл в пуле потоков, пока есть несохранённые изменения."""
+        loop = asyncio.get_running_loop()
+        while self._save_pending:
+            self._save_pending = False
+            # Снимок берётся в event loop: записи меняют _entries только здесь
+            await loop.run_in_executor(None, self._save, dict(self._entries))
+
+    async def aflush(self) -> None:
+        """Дождаться фоновой записи file_id на диск."""
+        if self._save_task is not None:
+            await self._save_task
+
+    async def answer_photo(self, message: Message, path: str, **kwargs: Any) -> Message:
+        """Ответить картинкой, загружая файл только при первой отправке."""
+        if self.resolve is not None:
+            path = self.resolve(path)
+        file_id = await self._aget_file_id(path)
+        if file_id is not None:
+            started = time.perf_counter()
+            try:
+                sent = await message.answer_photo(file_id, **kwargs)
+                self.hits += 1
+                self._report_send('file_id', started)
+                return sent
+            except TelegramBadRequest:
+                # file_id устарел (например, сменился токен бота) — загружаем заново
+                if self._entries.pop(path, None) is not None:
+                    self._schedule_save()
+
+        started = time.perf_counter()
+        sent = await message.answer_photo(FSInputFile(path), **kwargs)
+        self.uploads += 1
+        self._report_send('upload', started)
+        file_id = self._sent_file_id(sent)
+        if file_id is not None:
+            self._entries[path] = {'hash': await self._afile_hash(path), 'file_id': file_id}
+            self._schedule_save()
+        return sent
+
+    def _report_send(self, source: str, started: float) -> None:
+        """Передать время отправки в ``send_hook``, если он задан."""
+        if self.send_hook is not None:
+            self.send_hook(source, time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        """Статистика отправок картинок."""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'uploads': self.uploads,
+        }
+
+
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    """Получить глобальный экземпляр MediaCache."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache(
+            cache_file=config.MEDIA_CACHE_FILE,
+            resolve=get_asset_compiler().resolve,
+        )
+    return _media_cache
@@ -0,0 +1,279 @@
+"""Метрики в текстовом формате Prometheus без сторонних библиотек.
+
+Счётчики, гистограммы и вычисляемые при опросе значения собираются в
+``MetricsRegistry`` и отдаются по HTTP на ``/metrics``. Время обработчиков
+пишет ``HandlerMetricsMiddleware``, время и объём записи хранилища —
+хук репозитория, время отправки картинок — хук ``MediaCache``.
+"""
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from aiohttp import web
+
+import config
+from .flood_control import get_flood_control
+from .media_cache import get_media_cache
+from .player_service import PlayerService, get_player_service
+from .update_scheduler import get_update_scheduler
+
+# Границы корзин по умолчанию, секунды
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LabelValues = Tuple[str, ...]
+Sample = Union[float, Dict[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    """Экранировать значение метки."""
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Метки в виде ``{name="value",...}``."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """Число в формате Prometheus."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    """Общая часть метрик с метками."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        """Инициализировать метрику."""
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, values: LabelValues) -> LabelValues:
+        """Проверить число значений меток."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ожидались метки {self.labelnames}, получено {values}")
+        return tuple(str(value) for value in values)
+
+    def header(self) -> list[str]:
+        """Строки HELP и TYPE."""
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        """Строки метрики для /metrics."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        """Инициализировать счётчик."""
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        """Увеличить счётчик для набора меток."""
+        key = self._check(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Текущее значение."""
+        return self._values.get(self._check(labels), 0.0)
+
+    def render(self) -> list[str]:
+        """Строки счётчика."""
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Инициализировать гистограмму."""
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Метки -> [счётчики корзин (последняя — +Inf), сумма, количество]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Учесть значение для набора меток."""
+        key = self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        """Сколько значений учтено."""
+        series = self._series.get(self._check(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        """Строки гистограммы: накопительные корзины, сумма и количество."""
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = self.header()
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Значение, вычисляемое в момент опроса."""
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], Sample],
+                 labelnames: Sequence[str] = (), kind: str = 'gauge'):
+        """Инициализировать метрику с функцией-источником."""
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self._func = func
+
+    def render(self) -> list[str]:
+        """Строки метрики по текущему значению функции."""
+        sample = self._func()
+        values = sample if isinstance(sample, dict) else {(): sample}
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class MetricsRegistry:
+    """Набор метрик, отдаваемых на ``/metrics``."""
+
+    def __init__(self, prefix: str = 'rpg_'):
+        """Инициализировать пустой набор."""
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        """Зарегистрировать метрику; повторная регистрация возвращает уже существующую."""
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Счётчик ``<prefix><name>``."""
+        return self._add(Counter(self.prefix + name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Гистограмма ``<prefix><name>``."""
+        return self._add(Histogram(self.prefix + name, help_text, labelnames, buckets))
+
+    def gauge_func(self, name: str, help_text: str, func: Callable[[], Sample],
+                   labelnames: Sequence[str] = ()) -> CallbackMetric:
+        """Показатель, вычисляемый при опросе."""
+        return self._add(CallbackMetric(self.prefix + name, help_text, func, labelnames))
+
+    def register_stats(self, name: str, help_text: str, stats: Callable[[], dict]) -> None:
+        """Показатели из словаря ``stats()`` сервиса: ``<prefix><name>_<ключ>``."""
+        keys = [key for key, value in stats().items() if isinstance(value, (int, float))]
+        for key in keys:
+            self.gauge_func(f"{name}_{key}", f"{help_text}: {key}", lambda key=key: float(stats()[key]))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def names(self) -> Iterable[str]:
+        """Имена зарегистрированных метрик."""
+        return self._metrics.keys()
+
+
+def instrument_services(registry: MetricsRegistry, player_service: Optional[PlayerService] = None) -> None:
+    """Подключить метрики к хранилищу, кэшам и фоновым сервисам."""
+    player_service = player_service or get_player_service()
+
+    repository = player_service.repository
+    write_seconds = registry.histogram(
+        'storage_write_seconds', "Время записи хранилища", ('backend', 'operation'),
+    )
+    written_bytes = registry.counter(
+        'storage_written_bytes_total', "Записано байт в хранилище", ('backend', 'operation'),
+    )
+
+    def on_write(operation: str, seconds: float, size: int) -> None:
+        write_seconds.observe(seconds, repository.backend, operation)
+        written_bytes.inc(size, repository.backend, operation)
+
+    repository.write_hook = on_write
+
+    image_seconds = registry.histogram('image_send_seconds', "Время отправки картинки", ('source',))
+    get_media_cache().send_hook = lambda source, seconds: image_seconds.observe(seconds, source)
+
+    registry.gauge_func('active_battles', "Игроки в бою (среди загруженных в память)", player_service.active_battles)
+    registry.register_stats('player_cache', "Кэш игроков", player_service.cache_stats)
+    registry.register_stats('user_locks', "Блокировки игроков", player_service.lock_stats)
+    registry.register_stats('media_cache', "Кэш картинок", get_media_cache().stats)
+    if config.UPDATE_SCHEDULER_ENABLED:
+        registry.register_stats('update_scheduler', "Планировщик обновлений", get_update_scheduler().stats)
+    if config.FLOOD_CONTROL_ENABLED:
+        registry.register_stats('flood_control', "Лимиты исходящих сообщений", get_flood_control().stats)
+
+
+def create_metrics_app(registry: MetricsRegistry) -> web.Application:
+    """aiohttp-приложение с ``/metrics``."""
+    async def metrics(request: web.Request) -> web.Response:
+        """Текущие значения метрик."""
+        return web.Response(body=registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics)
+    return app
+
+
+async def start_metrics_server(registry: MetricsRegistry, host: str, port: int) -> web.AppRunner:
+    """Поднять HTTP-сервер метрик. Остановка — ``await runner.cleanup()``."""
+    runner = web.AppRunner(create_metrics_app(registry))
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    return runner
+
+
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Получить глобальный набор метрик."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
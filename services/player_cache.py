@@ -0,0 +1,134 @@
+"""Ограниченный LRU-кэш игроков."""
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+from models import Player
+
+
+def estimate_player_size(player: Player, state: Optional[dict] = None) -> int:
+    """Оценить объём игрока в памяти по размеру его сериализованных данных.
+
+    ``state`` — уже снятый снимок ``player.to_dict()``.
+    """
+    if state is None:
+        state = player.to_dict()
+    return len(json.dumps(state, ensure_ascii=False).encode('utf-8'))
+
+
+class PlayerCache:
+    """LRU-кэш игроков с лимитом по количеству записей и по объёму.
+
+    Когда лимит превышен, вытесняются давно не использовавшиеся игроки.
+    Перед вытеснением вызывается ``on_evict`` — через него владелец кэша
+    успевает записать несохранённые изменения.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 0,
+        on_evict: Optional[Callable[[Player], None]] = None,
+    ):
+        """Инициализировать кэш. Нулевой лимит означает отсутствие ограничения."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries: OrderedDict[int, Player] = OrderedDict()
+        self._sizes: dict[int, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Количество игроков в кэше."""
+        return len(self._entries)
+
+    def __contains__(self, user_id: int) -> bool:
+        """Есть ли игрок в кэше (без учёта в статистике)."""
+        return user_id in self._entries
+
+    @property
+    def size_bytes(self) -> int:
+        """Оценка занятого объёма (считается только при заданном max_bytes)."""
+        return self._bytes
+
+    def get(self, user_id: int) -> Optional[Player]:
+        """Получить игрока и отметить его как недавно использованного."""
+        with self._lock:
+            player = self._entries.get(user_id)
+            if player is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return player
+
+    def peek(self, user_id: int) -> Optional[Player]:
+        """Получить игрока, не меняя порядок вытеснения и статистику."""
+        return self._entries.get(user_id)
+
+    def put(self, player: Player, state: Optional[dict] = None) -> None:
+        """Положить игрока в кэш и вытеснить лишних (``state`` — снимок для оценки объёма)."""
+        user_id = player.user_id
+        size = estimate_player_size(player, state) if self.max_bytes else 0
+
+        with self._lock:
+            self._entries[user_id] = player
+            self._entries.move_to_end(user_id)
+            self._bytes += size - self._sizes.get(user_id, 0)
+            self._sizes[user_id] = size
+            evicted = self._collect_evicted()
+
+        for victim in evicted:
+            if self.on_evict is not None:
+                self.on_evict(victim)
+
+    def pop(self, user_id: int) -> Optional[Player]:
+        """Удалить игрока из кэша."""
+        with self._lock:
+            self._bytes -= self._sizes.pop(user_id, 0)
+            return self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def players(self) -> list[Player]:
+        """Снимок загруженных игроков."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def stats(self) -> dict:
+        """Статистика кэша для подбора лимитов."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _over_budget(self) -> bool:
+        """Превышен ли какой-либо из лимитов."""
+        if self.max_entries and len(self._entries) > self.max_entries:
+            return True
+        return bool(self.max_bytes) and self._bytes > self.max_bytes
+
+    def _collect_evicted(self) -> list[Player]:
+        """Убрать самых давних игроков, пока кэш не уложится в лимиты."""
+        evicted = []
+        # Последнего добавленного не вытесняем, даже если он один превышает лимит
+        while len(self._entries) > 1 and self._over_budget():
+            user_id, player = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(user_id, 0)
+            self.evictions += 1
+            evicted.append(player)
+        return evicted
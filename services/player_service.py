@@ -1,7 +1,22 @@
 """Сервис управления игроками."""
-from typing import Optional
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+import config
 from models import Player
 from .data_repository import DataRepository
+from .leaderboard import LeaderboardIndex
+from .player_cache import PlayerCache
+from .repository_factory import create_repository
+from .user_locks import UserLockRegistry
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
 
 
 class PlayerService:
@@ -9,14 +24,37 @@ class PlayerService:
 
     _instance: Optional['PlayerService'] = None
     _repository: DataRepository
-    _cache: dict[int, Player]
+    _cache: PlayerCache
+    _dirty: dict[int, Player]
+    _writing: dict[int, Player]
+    _flush_task: Optional[asyncio.Task]
+    _state_lock: threading.RLock
+    _write_lock: threading.Lock
+    _executor: Optional[ThreadPoolExecutor]
+    _leaderboard: Optional[LeaderboardIndex]
+    _locks: UserLockRegistry
 
     def __new__(cls, repository: Optional[DataRepository] = None):
         """Создать или получить экземпляр синглтона."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._repository = repository or DataRepository()
-            cls._instance._cache = {}
+            cls._instance._repository = repository or create_repository()
+            cls._instance._cache = PlayerCache(
+                max_entries=config.PLAYER_CACHE_MAX_ENTRIES,
+                max_bytes=config.PLAYER_CACHE_MAX_BYTES,
+                on_evict=cls._instance._write_back,
+            )
+            cls._instance._dirty = {}
+            cls._instance._writing = {}
+            cls._instance._flush_task = None
+            # Короткая блокировка очереди и рейтинга: под ней нет ввода-вывода,
+            # поэтому event loop может брать её, не дожидаясь диска
+            cls._instance._state_lock = threading.RLock()
+            # Записи в хранилище идут по одной и только в потоках хранилища
+            cls._instance._write_lock = threading.Lock()
+            cls._instance._executor = None
+            cls._instance._leaderboard = None
+            cls._instance._locks = UserLockRegistry()
         return cls._instance
 
     @property
@@ -27,30 +65,279 @@ class PlayerService:
     def get_or_create(self, user_id: int) -> Player:
         """Получить или создать игрока."""
         # Проверяем кэш
-        if user_id in self._cache:
-            return self._cache[user_id]
+        player = self._cache.get(user_id)
+        if player is not None:
+            return player
+        return self._load_or_create(user_id)
 
-        # Проверяем репозиторий
+    def _load_or_create(self, user_id: int) -> Player:
+        """Загрузить игрока из хранилища или создать нового."""
+        # Вытесненный, но ещё не записанный игрок в хранилище устарел
+        with self._state_lock:
+            player = self._pending_player(user_id)
+        if player is not None:
+            self._cache.put(player)
+            return player
+
+        # Проверяем репозиторий (без блокировок: чтения идут параллельно)
         player_data = self._repository.get_player_data(user_id)
 
-        if player_data is None:
-            # Создаем нового игрока
-            player = Player(user_id=user_id)
-            self._repository.save_player(player)
-        else:
-            # Загружаем из данных
-            player = Player.from_dict(player_data)
+        with self._state_lock:
+            # Пока читали, игрока мог загрузить или вытеснить другой поток
+            player = self._cache.peek(user_id) or self._pending_player(user_id)
+            if player is not None:
+                self._cache.put(player)
+                return player
+
+            if player_data is None:
+                # Создаем нового игрока. Он ещё не сохранён (is_dirty), поэтому
+                # попадёт в хранилище при первом же save_player
+                player = Player(user_id=user_id)
+            else:
+                # Загружаем из данных
+                player = Player.from_dict(player_data)
 
         # Кэшируем
-        self._cache[user_id] = player
+        self._cache.put(player)
         return player
 
-    def save_player(self, player: Player) -> bool:
-        """Сохранить игрока."""
-        # Обновляем кэш
-        self._cache[player.user_id] = player
-        # Сохраняем в репозиторий
-        return self._repository.save_player(player)
+    async def aget_or_create(self, user_id: int) -> Player:
+        """Получить или создать игрока, не блокируя event loop."""
+        player = self._cache.get(user_id)
+        if player is not None:
+            return player
+        return await self._run_io(self._load_or_create, user_id)
+
+    def _pending_player(self, user_id: int) -> Optional[Player]:
+        """Игрок из очереди записи или из записи, которая ещё идёт."""
+        return self._dirty.get(user_id) or self._writing.get(user_id)
+
+    @property
+    def write_behind(self) -> bool:
+        """Включена ли отложенная запись."""
+        return self._flush_task is not None
+
+    @property
+    def dirty_count(self) -> int:
+        """Количество игроков, ожидающих записи."""
+        return len(self._dirty)
+
+    def save_player(self, player: Player, state: Optional[dict] = None) -> bool:
+        """Сохранить игрока.
+
+        Если игрок не менялся с последнего сохранения, запись пропускается.
+        В режиме отложенной записи игрок только помечается изменённым,
+        а в хранилище попадает при следующем сбросе. ``state`` — уже снятый
+        снимок ``player.to_dict()``, чтобы не сериализовать игрока повторно.
+        """
+        state, changed = self._prepare_save(player, state)
+        if not changed or self._flush_task is not None:
+            return True
+        return self._write_player(player, state, changed)
+
+    async def asave_player(self, player: Player, state: Optional[dict] = None) -> bool:
+        """Сохранить игрока: снимок берётся на месте, запись идёт в пуле потоков."""
+        state, changed = self._prepare_save(player, state)
+        if not changed or self._flush_task is not None:
+            # Отложенная запись только помечает игрока — ввода-вывода нет
+            return True
+        saved = await self._run_io(self._write_player, player, state, changed)
+        if self._dirty:
+            # Вытесненные из кэша несохранённые игроки
+            await self.aflush()
+        return saved
+
+    def _prepare_save(self, player: Player, state: Optional[dict]) -> tuple[dict, set[str]]:
+        """Обновить кэш и рейтинг и найти изменённые поля по одному снимку игрока.
+
+        В режиме отложенной записи изменённый игрок сразу ставится в очередь.
+        """
+        if state is None:
+            state = player.to_dict()
+        changed = player.dirty_fields(state)
+
+        # Обновляем кэш и рейтинг
+        self._cache.put(player, state)
+        with self._state_lock:
+            if self._leaderboard is not None:
+                self._leaderboard.update(player.user_id, player.level, player.gold)
+
+            if self._flush_task is not None and changed:
+                self._dirty[player.user_id] = player
+                if len(self._dirty) >= self._flush_max_dirty:
+                    # Сохранение может прийти из пула потоков — будим задачу потокобезопасно
+                    self._flush_loop_ref.call_soon_threadsafe(self._flush_wakeup.set)
+        return state, changed
+
+    def _write_player(self, player: Player, state: dict, changed: set[str]) -> bool:
+        """Записать игрока и запомнить снимок ``state`` как сохранённый.
+
+        В хранилище уходит тот же снимок, который потом помечается
+        сохранённым: изменения, сделанные во время записи, останутся видны
+        как несохранённые.
+        """
+        with self._write_lock:
+            if not self._repository.save_player(player, changed_fields=changed, record=state):
+                return False
+        player.mark_clean(state)
+        return True
+
+    def cache_stats(self) -> dict:
+        """Статистика кэша игроков: попадания, промахи, вытеснения."""
+        return self._cache.stats()
+
+    def active_battles(self) -> int:
+        """Количество загруженных в память игроков, которые сейчас в бою."""
+        return sum(1 for player in self._cache.players() if player.battle_state is not None)
+
+    @property
+    def locks(self) -> UserLockRegistry:
+        """Реестр блокировок игроков."""
+        return self._locks
+
+    def lock_stats(self) -> dict:
+        """Статистика ожидания блокировок игроков."""
+        return self._locks.stats()
+
+    def _write_back(self, player: Player) -> None:
+        """Поставить вытесняемого из кэша игрока в очередь записи, если он не сохранён.
+
+        Вытеснение случается внутри ``save_player``, в том числе на event loop,
+        поэтому здесь нет ввода-вывода: игрока запишет ближайший сброс.
+        """
+        with self._state_lock:
+            if player.user_id in self._dirty:
+                return
+        if not player.is_dirty():
+            return
+        with self._state_lock:
+            self._dirty.setdefault(player.user_id, player)
+            wakeup = self._flush_task is not None and len(self._dirty) >= self._flush_max_dirty
+        if wakeup:
+            self._flush_loop_ref.call_soon_threadsafe(self._flush_wakeup.set)
+
+    def _take_dirty(self) -> tuple[dict[int, Player], dict[str, dict]]:
+        """Забрать очередь изменённых игроков вместе со снимками их состояния.
+
+        Снимки берутся в потоке вызывающего (для event loop — там же, где
+        обработчики меняют игроков), а в пул потоков уходят только словари.
+        """
+        with self._state_lock:
+            pending = self._dirty
+            self._dirty = {}
+            # До конца записи игроков находит _load_or_create
+            self._writing.update(pending)
+        return pending, {str(user_id): player.to_dict() for user_id, player in pending.items()}
+
+    def _write_records(self, records: dict[str, dict]) -> bool:
+        """Записать снимки игроков в хранилище."""
+        with self._write_lock:
+            return self._repository.save_records(records)
+
+    def _finish_flush(self, pending: dict[int, Player], records: dict[str, dict], saved: bool) -> bool:
+        """Отметить записанных игроков сохранёнными или вернуть их в очередь."""
+        with self._state_lock:
+            for user_id, player in pending.items():
+                if self._writing.get(user_id) is player:
+                    del self._writing[user_id]
+                if not saved:
+                    # Не удалось записать — вернём в очередь, не затирая более свежие изменения
+                    self._dirty.setdefault(user_id, player)
+        if saved:
+            for user_id, player in pending.items():
+                player.mark_clean(records[str(user_id)])
+        return saved
+
+    def flush(self) -> bool:
+        """Записать всех изменённых игроков одной операцией."""
+        pending, records = self._take_dirty()
+        if not pending:
+            return True
+        saved = False
+        try:
+            saved = self._write_records(records)
+        finally:
+            # При исключении игроки возвращаются в очередь, а не остаются в _writing
+            self._finish_flush(pending, records, saved)
+        return saved
+
+    async def aflush(self) -> bool:
+        """Записать всех изменённых игроков, выполнив запись в пуле потоков."""
+        pending, records = self._take_dirty()
+        if not pending:
+            return True
+        saved = False
+        try:
+            saved = await self._run_io(self._write_records, records)
+        finally:
+            # При исключении игроки возвращаются в очередь, а не остаются в _writing
+            self._finish_flush(pending, records, saved)
+        return saved
+
+    def start_write_behind(self, interval_ms: int = 500, max_dirty: int = 100) -> None:
+        """Включить отложенную запись.
+
+        Фоновая задача сбрасывает изменённых игроков каждые ``interval_ms``
+        миллисекунд или сразу, как только их накопилось ``max_dirty``.
+        Должен вызываться внутри работающего event loop.
+        """
+        if self._flush_task is not None:
+            return
+        self._flush_interval = interval_ms / 1000
+        self._flush_max_dirty = max_dirty
+        self._flush_wakeup = asyncio.Event()
+        self._flush_loop_ref = asyncio.get_running_loop()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop_write_behind(self) -> None:
+        """Остановить фоновую задачу и сбросить оставшиеся изменения."""
+        task = self._flush_task
+        if task is None:
+            await self.aflush()
+            return
+        self._flush_task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self.aflush()
+
+    async def aclose(self) -> None:
+        """Сбросить изменения, остановить пул ввода-вывода и закрыть хранилище."""
+        await self.stop_write_behind()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._repository.close()
+
+    async def _flush_loop(self) -> None:
+        """Периодически сбрасывать изменённых игроков."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            try:
+                await self.aflush()
+            except Exception as e:
+                # Одна неудачная запись не должна останавливать отложенную запись
+                logger.exception("Ошибка при сбросе игроков: %s", e)
+
+    async def _run_io(self, func: Callable[..., T], *args) -> T:
+        """Выполнить блокирующую операцию хранилища в выделенном пуле потоков.
+
+        Размер пула ограничивает число одновременных операций ввода-вывода,
+        а event loop тем временем продолжает обрабатывать других игроков.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.STORAGE_IO_WORKERS,
+                thread_name_prefix='storage-io',
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
 
     def update_player(self, user_id: int, **kwargs) -> Player:
         """Обновить поля игрока и сохранить."""
@@ -63,23 +350,60 @@ class PlayerService:
 
     def invalidate_cache(self, user_id: Optional[int] = None) -> None:
         """Очистить кэш для игрока или всех игроков."""
+        # Несохранённые изменения не должны потеряться вместе с кэшем
+        self.flush()
         if user_id is not None:
-            self._cache.pop(user_id, None)
+            self._cache.pop(user_id)
         else:
             self._cache.clear()
 
+    def rebuild_leaderboard(self) -> None:
+        """Построить индекс рейтинга по данным хранилища."""
+        index = LeaderboardIndex()
+        index.rebuild(self._repository.get_leaderboard_records())
+        with self._state_lock:
+            # Игроки, ещё не записанные в хранилище, уже есть в кэше
+            for player in self._dirty.values():
+                index.update(player.user_id, player.level, player.gold)
+            self._leaderboard = index
+
+    async def arebuild_leaderboard(self) -> None:
+        """Построить индекс рейтинга, не блокируя event loop."""
+        await self._run_io(self.rebuild_leaderboard)
+
+    def _get_leaderboard(self) -> LeaderboardIndex:
+        """Индекс рейтинга (строится при первом обращении)."""
+        if self._leaderboard is None:
+            self.rebuild_leaderboard()
+        return self._leaderboard
+
     def get_top_players(self, limit: int = 10) -> list[tuple[str, Player]]:
         """Получить топ игроков по уровню и золоту."""
-        all_data = self._repository.get_all_players()
-        players = []
+        top = []
+        for user_id in self._get_leaderboard().top(limit):
+            # Сначала смотрим в памяти: там могут быть ещё не записанные изменения
+            player = self._pending_player(user_id) or self._cache.peek(user_id)
+            if player is None:
+                data = self._repository.get_player_data(user_id)
+                if data is None:
+                    continue
+                player = Player.from_dict(data)
+            top.append((str(user_id), player))
+        return top
+
+    def get_player_rank(self, user_id: int) -> Optional[int]:
+        """Место игрока в рейтинге."""
+        return self._get_leaderboard().rank(user_id)
 
-        for uid, data in all_data.items():
-            player = Player.from_dict(data)
-            players.append((uid, player))
+    async def aget_top_players(self, limit: int = 10) -> list[tuple[str, Player]]:
+        """Получить топ игроков, не блокируя event loop."""
+        return await self._run_io(self.get_top_players, limit)
 
-        # Сортировка по уровню и золоту
-        players.sort(key=lambda x: (x[1].level, x[1].gold), reverse=True)
-        return players[:limit]
+    async def aget_player_rank(self, user_id: int) -> Optional[int]:
+        """Место игрока в рейтинге, не блокируя event loop."""
+        if self._leaderboard is not None:
+            return self._leaderboard.rank(user_id)
+        return await self._run_io(self.get_player_rank, user_id)
 
 
 def get_player_service() -> PlayerService:
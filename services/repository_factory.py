@@ -0,0 +1,39 @@
+"""Выбор хранилища данных игроков по конфигурации."""
+from typing import Optional
+import config
+from .binary_repository import BinaryDataRepository
+from .data_repository import DataRepository
+from .indexed_repository import IndexedDataRepository
+from .journal_repository import JournalDataRepository
+from .sqlite_repository import SqliteDataRepository
+
+
+def create_repository(backend: Optional[str] = None, data_file: Optional[str] = None) -> DataRepository:
+    """Создать репозиторий для указанного бэкенда.
+
+    Поддерживаемые бэкенды:
+        json    - один JSON-файл, перезаписывается целиком (по умолчанию)
+        journal - снимок + журнал изменений с фоновой компакцией
+        sqlite  - SQLite в режиме WAL, одна строка на игрока
+        binary  - компактный бинарный файл (см. binary_codec)
+        indexed - JSON-строки с индексом смещений, игроки читаются по одному
+    """
+    backend = (backend or config.STORAGE_BACKEND).lower()
+
+    if backend == 'json':
+        return DataRepository(data_file=data_file or config.DATA_FILE)
+    if backend == 'journal':
+        return JournalDataRepository(
+            data_file=data_file or config.DATA_FILE,
+            compact_threshold=config.JOURNAL_COMPACT_THRESHOLD,
+        )
+    if backend == 'sqlite':
+        return SqliteDataRepository(data_file=data_file or config.SQLITE_FILE)
+    if backend == 'binary':
+        return BinaryDataRepository(data_file=data_file or config.BINARY_FILE)
+    if backend == 'indexed':
+        return IndexedDataRepository(
+            data_file=data_file or config.INDEXED_FILE,
+            index_every_bytes=config.INDEXED_INDEX_EVERY_BYTES,
+        )
+    raise ValueError(f"Неизвестный бэкенд хранилища: {backend}")
@@ -0,0 +1,164 @@
+"""Сэмплирующий профилировщик потока цикла событий.
+
+Отдельный поток через равные промежутки снимает стек целевого потока
+(``sys._current_frames``) и считает одинаковые стеки. Код бота при этом
+не трассируется, поэтому профилировщик можно включать под реальной
+нагрузкой. Результат — файл «свёрнутых» стеков для flamegraph.pl /
+speedscope и сводка самых горячих функций.
+
+Стек снимается, когда поток профилировщика получает GIL, поэтому
+функции, отпускающие GIL (системные вызовы, ввод-вывод), в профиле
+немного завышены. Код в пуле потоков (запись хранилища) в профиль
+цикла событий не попадает.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Optional
+import config
+
+# Стек, на вершине которого ожидание в selectors, — цикл событий простаивает
+IDLE_MODULES = frozenset({'selectors'})
+
+
+def frame_label(frame: FrameType) -> str:
+    """Подпись кадра: ``модуль:Класс.функция``."""
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> tuple[str, ...]:
+    """Стек от корня к текущему кадру."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+@dataclass
+class HotFunction:
+    """Функция из сводки профиля."""
+    name: str
+    self_samples: int
+    total_samples: int
+
+
+@dataclass
+class ProfileReport:
+    """Результат профилирования."""
+    seconds: float
+    samples: int
+    idle_samples: int
+    stacks: Counter = field(default_factory=Counter)
+
+    @property
+    def busy_samples(self) -> int:
+        """Сэмплы, когда цикл событий выполнял код."""
+        return self.samples - self.idle_samples
+
+    def folded(self) -> str:
+        """Свёрнутые стеки: ``корень;...;лист количество`` на строку."""
+        return ''.join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.stacks.most_common()
+        )
+
+    def write_folded(self, path: str) -> str:
+        """Записать свёрнутые стеки в файл. Возвращает путь."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+        return path
+
+    def top(self, limit: int = 10) -> list[HotFunction]:
+        """Самые горячие функции без учёта простоя.
+
+        ``self_samples`` — функция была на вершине стека,
+        ``total_samples`` — была где-либо в стеке (с вызванными из неё).
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if _is_idle(stack):
+                continue
+            own[stack[-1]] += count
+            for name in set(stack):
+                total[name] += count
+        hot = sorted(total, key=lambda name: (own[name], total[name]), reverse=True)
+        return [HotFunction(name, own[name], total[name]) for name in hot[:limit]]
+
+
+def _is_idle(stack: tuple[str, ...]) -> bool:
+    """Стек простаивающего цикла событий."""
+    return bool(stack) and stack[-1].partition(':')[0] in IDLE_MODULES
+
+
+class SamplingProfiler:
+    """Профилировщик одного потока; одновременно идёт только один замер."""
+
+    def __init__(self, interval: float = 0.005):
+        """Инициализировать профилировщик с периодом сэмплирования в секундах."""
+        self.interval = interval
+        self._running = False
+        # Свой поток, чтобы долгий замер не занимал общий пул цикла событий
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sampling-profiler')
+
+    @property
+    def running(self) -> bool:
+        """Идёт ли замер."""
+        return self._running
+
+    def sample(self, thread_id: int, seconds: float) -> ProfileReport:
+        """Снимать стеки потока ``thread_id`` в течение ``seconds`` (блокирующе)."""
+        stacks: Counter = Counter()
+        idle = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            stack = collapse_stack(frame)
+            del frame
+            stacks[stack] += 1
+            if _is_idle(stack):
+                idle += 1
+            time.sleep(self.interval)
+        return ProfileReport(
+            seconds=time.perf_counter() - started,
+            samples=sum(stacks.values()),
+            idle_samples=idle,
+            stacks=stacks,
+        )
+
+    async def profile_loop(self, seconds: float) -> ProfileReport:
+        """Профилировать поток текущего цикла событий, не блокируя его."""
+        if self._running:
+            raise RuntimeError("Профилирование уже идёт")
+        self._running = True
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.sample, threading.get_ident(), seconds,
+            )
+        finally:
+            self._running = False
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """Получить глобальный профилировщик."""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(interval=config.PROFILE_INTERVAL_MS / 1000)
+    return _profiler
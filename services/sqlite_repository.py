@@ -0,0 +1,217 @@
+"""SQLite-хранилище данных игроков."""
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+from models import Player
+from .data_repository import DataRepository
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS players (
+        user_id INTEGER PRIMARY KEY,
+        level INTEGER NOT NULL,
+        gold INTEGER NOT NULL,
+        total_kills INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_players_level_gold ON players (level DESC, gold DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_players_gold ON players (gold DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_players_total_kills ON players (total_kills DESC)",
+)
+
+# Запросы — константы, чтобы sqlite3 переиспользовал скомпилированные выражения
+SQL_SELECT_PLAYER = "SELECT data FROM players WHERE user_id = ?"
+SQL_SELECT_ALL = "SELECT user_id, data FROM players"
+SQL_UPSERT_PLAYER = (
+    "INSERT OR REPLACE INTO players (user_id, level, gold, total_kills, data) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SQL_DELETE_PLAYER = "DELETE FROM players WHERE user_id = ?"
+SQL_DELETE_ALL = "DELETE FROM players"
+SQL_COUNT = "SELECT COUNT(*) FROM players"
+SQL_SELECT_LEADERBOARD = "SELECT user_id, level, gold FROM players"
+
+# Колонки, по которым разрешена сортировка рейтингов
+TOP_ORDERS = {
+    'level': "level DESC, gold DESC",
+    'gold': "gold DESC",
+    'total_kills': "total_kills DESC",
+}
+
+
+def _row_values(user_id: int, record: dict) -> tuple:
+    """Подготовить значения строки таблицы из словаря игрока."""
+    return (
+        int(user_id),
+        record.get('level', 1),
+        record.get('gold', 20),
+        record.get('total_kills', 0),
+        json.dumps(record, ensure_ascii=False, separators=(',', ':')),
+    )
+
+
+def _rows_size(rows: list[tuple]) -> int:
+    """Объём JSON-данных строк (без колонок рейтинга и служебных данных SQLite)."""
+    return sum(len(row[-1]) for row in rows)
+
+
+class SqliteDataRepository(DataRepository):
+    """Репозиторий игроков в SQLite: одна строка на игрока.
+
+    Уровень, золото и количество убийств вынесены в индексированные колонки,
+    поэтому рейтинги строятся запросом без разбора всех записей.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, data_file: str = 'players_rpg.db'):
+        """Открыть базу и создать схему при необходимости."""
+        super().__init__(data_file)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            data_file,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=64,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+    def load_all(self) -> Dict[str, dict]:
+        """Загрузить всех игроков."""
+        with self._lock:
+            rows = self._conn.execute(SQL_SELECT_ALL).fetchall()
+        return {str(user_id): json.loads(data) for user_id, data in rows}
+
+    def save_all(self, data: Dict[str, dict]) -> bool:
+        """Заменить всех игроков одной транзакцией."""
+        try:
+            started = time.perf_counter()
+            rows = [_row_values(uid, record) for uid, record in data.items()]
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute(SQL_DELETE_ALL)
+                    self._conn.executemany(SQL_UPSERT_PLAYER, rows)
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            self._report_write('save_all', started, _rows_size(rows))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка при сохранении: %s", e)
+            return False
+
+    def get_player_data(self, user_id: int) -> Optional[dict]:
+        """Получить данные игрока по ID."""
+        with self._lock:
+            row = self._conn.execute(SQL_SELECT_PLAYER, (int(user_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_player(self, player: Player, changed_fields: Optional[set[str]] = None,
+                    record: Optional[dict] = None) -> bool:
+        """Сохранить данные игрока (строка заменяется целиком) из снимка ``record``."""
+        try:
+            started = time.perf_counter()
+            values = _row_values(player.user_id, record if record is not None else player.to_dict())
+            with self._lock:
+                self._conn.execute(SQL_UPSERT_PLAYER, values)
+            self._report_write('append', started, _rows_size([values]))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка при сохранении: %s", e)
+            return False
+
+    def save_players(self, players: Iterable[Player]) -> bool:
+        """Сохранить нескольких игроков одной транзакцией."""
+        return self.save_records({str(player.user_id): player.to_dict() for player in players})
+
+    def save_records(self, records: Dict[str, dict]) -> bool:
+        """Сохранить готовые снимки игроков одной транзакцией."""
+        try:
+            started = time.perf_counter()
+            rows = [_row_values(user_id, record) for user_id, record in records.items()]
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(SQL_UPSERT_PLAYER, rows)
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            self._report_write('append', started, _rows_size(rows))
+            return True
+        except Exception as e:
+            logger.exception("Ошибка при сохранении: %s", e)
+            return False
+
+    def delete_player(self, user_id: int) -> bool:
+        """Удалить данные игрока."""
+        with self._lock:
+            cursor = self._conn.execute(SQL_DELETE_PLAYER, (int(user_id),))
+        return cursor.rowcount > 0
+
+    def get_all_players(self) -> Dict[str, dict]:
+        """Получить всех игроков."""
+        return self.load_all()
+
+    def get_top_player_data(self, limit: int = 10, order_by: str = 'level') -> list[tuple[str, dict]]:
+        """Получить топ игроков запросом по индексу."""
+        order = TOP_ORDERS.get(order_by)
+        if order is None:
+            raise ValueError(f"Нельзя сортировать по {order_by}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT user_id, data FROM players ORDER BY {order} LIMIT ?", (limit,)
+            ).fetchall()
+        return [(str(user_id), json.loads(data)) for user_id, data in rows]
+
+    def get_leaderboard_records(self) -> Iterator[tuple[int, int, int]]:
+        """Уровень и золото всех игроков из колонок, без разбора JSON."""
+        with self._lock:
+            rows = self._conn.execute(SQL_SELECT_LEADERBOARD).fetchall()
+        return iter(rows)
+
+    def count_players(self) -> int:
+        """Количество игроков в базе."""
+        with self._lock:
+            return self._conn.execute(SQL_COUNT).fetchone()[0]
+
+    def clear_cache(self) -> None:
+        """Кэша нет — данные всегда читаются из базы."""
+
+    def close(self) -> None:
+        """Закрыть соединение с базой."""
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_file: str, db_file: str) -> int:
+    """Перенести игроков из JSON-файла в SQLite. Возвращает число игроков."""
+    data = DataRepository(data_file=json_file).load_all()
+    target = SqliteDataRepository(data_file=db_file)
+    try:
+        if not target.save_all(data):
+            raise RuntimeError(f"Не удалось записать данные в {db_file}")
+    finally:
+        target.close()
+    return len(data)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Использование: python -m services.sqlite_repository players_rpg.json players_rpg.db")
+        sys.exit(1)
+    count = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"✅ Перенесено игроков: {count}")
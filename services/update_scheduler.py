@@ -0,0 +1,152 @@
+"""Планировщик обновлений: по порядку для игрока, параллельно для разных игроков."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class UpdateScheduler:
+    """Фиксированный пул очередей с воркерами.
+
+    Обновление попадает в очередь ``key % workers``, где ключ — id
+    отправителя. Каждую очередь разбирает один воркер строго по порядку,
+    поэтому обновления одного игрока никогда не выполняются одновременно
+    и не обгоняют друг друга, а обновления игроков из разных очередей идут
+    параллельно — не больше ``workers`` одновременно. Очереди ограничены
+    ``queue_size``: когда очередь заполнена, ``submit`` ждёт, и источник
+    обновлений (polling или вебхук) притормаживает вместо того, чтобы
+    копить задачи в памяти.
+    """
+
+    def __init__(self, workers: int = 16, queue_size: int = 100):
+        """Инициализировать планировщик.
+
+        Args:
+            workers: Число очередей и воркеров (предел параллельности)
+            queue_size: Ёмкость каждой очереди; 0 — без ограничения
+        """
+        if workers < 1:
+            raise ValueError("workers должно быть не меньше 1")
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queues: list[asyncio.Queue[tuple[float, Job]]] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(workers)
+        ]
+        self._tasks: list[asyncio.Task] = []
+        self.submitted = 0
+        self.started = 0
+        self.processed = 0
+        self.failed = 0
+        self.blocked = 0
+        self.peak_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_blocked = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Запущены ли воркеры."""
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Запустить воркеры (нужен работающий event loop)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(queue), name=f"update-worker-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+
+    def queue_index(self, key: int) -> int:
+        """Номер очереди для ключа."""
+        return key % self.workers
+
+    async def submit(self, key: int, job: Job) -> None:
+        """Поставить задачу в очередь ключа; ждёт, если очередь заполнена."""
+        if not self._tasks:
+            self.start()
+        queue = self._queues[self.queue_index(key)]
+        item = (time.perf_counter(), job)
+        if queue.full():
+            self.blocked += 1
+            start = time.perf_counter()
+            await queue.put(item)
+            self.total_blocked += time.perf_counter() - start
+        else:
+            queue.put_nowait(item)
+        self.submitted += 1
+        self.peak_depth = max(self.peak_depth, queue.qsize())
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """Выполнять задачи одной очереди по порядку."""
+        while True:
+            enqueued_at, job = await queue.get()
+            wait = time.perf_counter() - enqueued_at
+            self.started += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            try:
+                await job()
+            except Exception:
+                self.failed += 1
+                logger.exception("Ошибка обработки обновления")
+            finally:
+                self.processed += 1
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Дождаться выполнения всех поставленных задач."""
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Доработать очереди и остановить воркеры.
+
+        Args:
+            timeout: Сколько секунд ждать очереди; None — без ограничения
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Не дождались %d обновлений при остановке", self.depth())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def depth(self) -> int:
+        """Сколько задач ждёт во всех очередях."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def stats(self) -> dict:
+        """Глубина очередей и время ожидания."""
+        return {
+            'workers': self.workers,
+            'queued': self.depth(),
+            'max_queue_depth': max(queue.qsize() for queue in self._queues),
+            'peak_queue_depth': self.peak_depth,
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'failed': self.failed,
+            'blocked': self.blocked,
+            'blocked_ms': self.total_blocked * 1000,
+            'avg_wait_ms': self.total_wait * 1000 / self.started if self.started else 0.0,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+_update_scheduler: Optional[UpdateScheduler] = None
+
+
+def get_update_scheduler() -> UpdateScheduler:
+    """Получить глобальный экземпляр UpdateScheduler с настройками из конфигурации."""
+    global _update_scheduler
+    if _update_scheduler is None:
+        _update_scheduler = UpdateScheduler(workers=config.UPDATE_WORKERS, queue_size=config.UPDATE_QUEUE_SIZE)
+    return _update_scheduler
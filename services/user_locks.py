@@ -0,0 +1,66 @@
+"""Блокировки игроков: обновления одного игрока идут по очереди."""
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class UserLockRegistry:
+    """Реестр asyncio-блокировок по user_id.
+
+    Блокировки хранятся в ``WeakValueDictionary``: пока обработчик держит
+    ссылку на блокировку, она живёт в реестре, а как только последний
+    ожидающий её отпустил — удаляется сборщиком. Поэтому реестр не растёт
+    вместе с числом игроков, которые когда-либо писали боту.
+    """
+
+    def __init__(self) -> None:
+        """Создать пустой реестр."""
+        self._locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __len__(self) -> int:
+        """Количество живых блокировок."""
+        return len(self._locks)
+
+    def get(self, user_id: int) -> asyncio.Lock:
+        """Блокировка игрока; создаётся при первом обращении."""
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[user_id] = lock
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, user_id: int) -> AsyncIterator[None]:
+        """Захватить блокировку игрока на время блока ``async with``."""
+        lock = self.get(user_id)
+        if lock.locked():
+            self.contended += 1
+            start = time.perf_counter()
+            await lock.acquire()
+            wait = time.perf_counter() - start
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        else:
+            await lock.acquire()
+        self.acquisitions += 1
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self) -> dict:
+        """Статистика ожидания блокировок."""
+        return {
+            'locks': len(self._locks),
+            'acquisitions': self.acquisitions,
+            'contended': self.contended,
+            'total_wait_ms': self.total_wait * 1000,
+            'max_wait_ms': self.max_wait * 1000,
+            'avg_wait_ms': self.total_wait * 1000 / self.contended if self.contended else 0.0,
+        }
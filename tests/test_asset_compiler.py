@@ -0,0 +1,95 @@
+"""Тесты сборки уменьшенных картинок."""
+import json
+import os
+import pytest
+from services import AssetCompiler
+from services.asset_compiler import AssetReport, format_report
+
+
+@pytest.fixture
+def compiler(tmp_path):
+    """Сборщик с исходниками и кэшем во временной директории."""
+    os.makedirs(tmp_path / "images" / "monsters")
+    return AssetCompiler(
+        source_dir=str(tmp_path / "images"),
+        cache_dir=str(tmp_path / "cache"),
+        max_size=64,
+    )
+
+
+def make_image(path, size=(256, 128), mode='RGB'):
+    """Нарисовать тестовую картинку."""
+    Image = pytest.importorskip("PIL.Image")
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(path)
+
+
+class TestAssetCompiler:
+    """Тесты AssetCompiler."""
+
+    def test_compile_downscales(self, compiler):
+        """Копия уменьшена и записана под хэшем содержимого."""
+        source = os.path.join(compiler.source_dir, "monsters", "goblin.png")
+        make_image(source)
+
+        reports = compiler.compile()
+
+        assert len(reports) == 1
+        from PIL import Image
+        with Image.open(reports[0].variant) as variant:
+            assert max(variant.size) == 64
+            assert variant.format == 'JPEG'
+        assert compiler.resolve(source) == reports[0].variant
+
+    def test_transparent_png(self, compiler):
+        """Прозрачная картинка сохраняется в JPEG."""
+        source = os.path.join(compiler.source_dir, "monsters", "ghost.png")
+        make_image(source, mode='RGBA')
+
+        assert os.path.exists(compiler.compile()[0].variant)
+
+    def test_recompile_skips_unchanged(self, compiler):
+        """Неизменённые картинки повторно не пересжимаются."""
+        source = os.path.join(compiler.source_dir, "monsters", "goblin.png")
+        make_image(source)
+        variant = compiler.compile()[0].variant
+        mtime = os.stat(variant).st_mtime_ns
+
+        assert compiler.compile()[0].variant == variant
+        assert os.stat(variant).st_mtime_ns == mtime
+
+    def test_changed_source_not_resolved(self, compiler):
+        """Изменённый исходник отправляется как есть до пересборки."""
+        source = os.path.join(compiler.source_dir, "monsters", "goblin.png")
+        make_image(source)
+        compiler.compile()
+        make_image(source, size=(300, 300))
+
+        assert compiler.resolve(source) == source
+
+    def test_resolve_without_manifest(self, compiler):
+        """Без сборки возвращается исходный путь."""
+        assert compiler.resolve("assets/images/monsters/goblin.png") == "assets/images/monsters/goblin.png"
+
+    def test_resolve_from_manifest(self, compiler, tmp_path):
+        """Манифест подменяет путь (Pillow для этого не нужен)."""
+        source = tmp_path / "images" / "monsters" / "wolf.png"
+        source.write_bytes(b"png")
+        variant = tmp_path / "cache" / "abc-64-q85.jpg"
+        os.makedirs(variant.parent)
+        variant.write_bytes(b"jpg")
+        stat = os.stat(source)
+        with open(compiler.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump({os.path.normpath(str(source)): {
+                'variant': str(variant), 'hash': 'abc',
+                'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+            }}, f)
+
+        assert compiler.resolve(str(source)) == str(variant)
+
+    def test_format_report(self):
+        """Отчёт показывает экономию по картинкам и итог."""
+        text = format_report([AssetReport("a.png", "a.jpg", 2048, 512)])
+
+        assert "a.png" in text
+        assert "75.0%" in text
+        assert "итого" in text
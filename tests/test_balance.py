@@ -0,0 +1,121 @@
+"""Тесты симуляции баланса боёв."""
+import random
+import pytest
+from data import MONSTER_TEMPLATES, SHOP_ITEMS
+from game_logic.balance import (
+    MAX_TURNS, equipment_combinations, make_build, simulate_balance, simulate_fights,
+)
+from game_logic.battle import TurnAction, TurnStatus, create_battle_state, resolve_turn
+from models import Monster, Player
+
+np = pytest.importorskip("numpy")
+
+
+def best_spell(player: Player, build, effect: str):
+    """Самое сильное заклинание с эффектом ``effect``, на которое хватает маны."""
+    spells = [SHOP_ITEMS[key].item for key in build.spells]
+    spells = [spell for spell in spells if getattr(spell, effect) > 0 and spell.mana_cost <= player.mana]
+    return max(spells, key=lambda spell: getattr(spell, effect), default=None)
+
+
+def scalar_fight(template, build, rng: random.Random, heal_below: float = 0.35,
+                 defend_below: float = 0.0) -> tuple[bool, int]:
+    """Один бой движком resolve_turn с той же тактикой: (победа, ходов)."""
+    player = Player(
+        user_id=1, hp=build.max_hp, max_hp=build.max_hp, power=build.power,
+        mana=build.max_mana, max_mana=build.max_mana,
+        spells=[SHOP_ITEMS[key].item.name for key in build.spells],
+    )
+    state = player.battle_state = create_battle_state(Monster.from_template(template))
+    for turn in range(1, MAX_TURNS + 1):
+        heal = best_spell(player, build, 'spell_heal')
+        damage = best_spell(player, build, 'spell_damage')
+        if heal and player.hp <= heal_below * player.max_hp:
+            outcome = resolve_turn(player, state, TurnAction.SPELL, rng, key=heal.key)
+        elif player.hp <= defend_below * player.max_hp:
+            outcome = resolve_turn(player, state, TurnAction.DEFEND, rng)
+        elif damage:
+            outcome = resolve_turn(player, state, TurnAction.SPELL, rng, key=damage.key)
+        else:
+            outcome = resolve_turn(player, state, TurnAction.ATTACK, rng)
+        if outcome.status is not TurnStatus.ONGOING:
+            return outcome.status is TurnStatus.VICTORY, turn
+    return False, MAX_TURNS
+
+
+def turn_cdf(turns: "np.ndarray") -> "np.ndarray":
+    """Эмпирическая функция распределения числа ходов на 1..MAX_TURNS."""
+    counts = np.bincount(turns, minlength=MAX_TURNS + 1)[1:MAX_TURNS + 1]
+    return np.cumsum(counts) / len(turns)
+
+
+def test_make_build_stats():
+    """Рост за уровни и бонусы купленной экипировки складываются."""
+    build = make_build(3, ("steel_sword", "leather_armor"))
+
+    assert build.max_hp == 100 + 2 * 25 + 30
+    assert build.power == 10 + 2 * 5 + 15
+    assert build.max_mana == 50 + 2 * 10
+    assert set(build.spells) == {"fireball", "heal"}
+
+
+def test_equipment_combinations():
+    """Все подмножества оружия и брони, включая пустое."""
+    combos = equipment_combinations(["a", "b", "c"])
+
+    assert len(combos) == 8
+    assert combos[0] == ()
+
+
+@pytest.mark.parametrize('monster, level, learn_spells, defend_below', [
+    ("wolf", 1, True, 0.0),
+    ("ancient_dragon", 6, True, 0.0),
+    ("skeleton_king", 2, False, 0.0),
+    ("orc_warlord", 4, False, 0.3),
+])
+def test_matches_turn_engine(monster, level, learn_spells, defend_below):
+    """Векторная симуляция сходится с боями на resolve_turn: доля побед и распределение ходов."""
+    template = MONSTER_TEMPLATES[monster]
+    build = make_build(level, learn_spells=learn_spells)
+    fights = 4000
+
+    rng = random.Random(7)
+    scalar = [scalar_fight(template, build, rng, defend_below=defend_below) for _ in range(fights)]
+    # По бою на клетку: avg_turns клетки — число ходов этого боя
+    vector = simulate_fights(
+        [template] * fights, [build] * fights, 1, np.random.default_rng(7), defend_below=defend_below,
+    )
+    scalar_turns = np.array([turns for _, turns in scalar])
+    vector_turns = np.array([result.avg_turns for result in vector], dtype=np.int64)
+
+    assert np.mean([r.win_rate for r in vector]) == pytest.approx(np.mean([won for won, _ in scalar]), abs=0.04)
+    assert vector_turns.mean() == pytest.approx(scalar_turns.mean(), rel=0.05)
+    # Статистика Колмогорова — Смирнова для двух выборок по 4000 боёв
+    assert np.abs(turn_cdf(vector_turns) - turn_cdf(scalar_turns)).max() < 0.06
+
+
+def test_defend_halves_damage():
+    """Защита вдвое снижает потерю HP, но монстр не умирает."""
+    template = MONSTER_TEMPLATES["orc"]
+    build = make_build(1, learn_spells=False)
+    rng = np.random.default_rng(1)
+
+    [normal] = simulate_fights([template], [build], 2000, rng)
+    [defending] = simulate_fights([template], [build], 2000, rng, defend_below=1.0)
+
+    assert defending.win_rate == 0.0
+    assert defending.avg_turns > normal.avg_turns
+
+
+def test_simulate_balance_table():
+    """Таблица содержит каждую пару монстр × уровень × экипировка."""
+    results = simulate_balance(
+        monster_keys=["goblin", "dragon"], levels=[1, 10], equipment=[(), ("steel_axe",)], fights=200, seed=1,
+    )
+
+    assert len(results) == 2 * 2 * 2
+    goblin_strong = next(r for r in results if r.monster == "goblin" and r.level == 10 and r.equipment)
+    dragon_weak = next(r for r in results if r.monster == "dragon" and r.level == 1 and not r.equipment)
+    assert goblin_strong.win_rate == 1.0
+    assert dragon_weak.win_rate < 0.2
+    assert 0 <= dragon_weak.avg_hp_loss <= make_build(1).max_hp
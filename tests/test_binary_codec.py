@@ -0,0 +1,178 @@
+"""Тесты бинарного формата игроков."""
+import json
+import pytest
+from models import Player, BattleState, Equipment, DailyQuest, ItemType
+from models.story import StoryProgress
+from services import BinaryDataRepository, create_repository, migrate_json_to_binary
+from services import binary_codec
+from services.binary_codec import (
+    decode_player, decode_record, encode_player, encode_record, frame_records, iter_records,
+)
+from data.items import SHOP_ITEMS
+from data.locations import LOCATIONS
+from data.monsters import MONSTER_TEMPLATES
+from data.story_chapters import STORY_CHAPTERS
+from game_logic.achievements import Achievement
+
+
+@pytest.fixture
+def full_player():
+    """Игрок, у которого заполнены все вложенные объекты."""
+    return Player(
+        user_id=987654321,
+        hp=-5,
+        level=12,
+        exp=1500,
+        gold=123456,
+        inventory=["Деревянная палка", "Стальной меч", "Самодельный лук"],
+        spells=["⚡ Огненный шар", "💚 Регенерация"],
+        location="cave",
+        equipment=Equipment(weapon="Стальной меч", armor="Кожаная броня"),
+        quests={"daily": DailyQuest(date="2026-10-18", kills=3, target=5, reward_claimed=True)},
+        achievements=["first_blood", "rich"],
+        total_kills=42,
+        story_progress=StoryProgress(
+            current_chapter=3,
+            completed_chapters=[1, 2],
+            boss_defeated={"Вожак гоблинов": True, "Король скелетов": False},
+        ),
+        potions={"health": 2, "mana": 0, "power": 1, "health_potion": 4},
+        battle_state=BattleState(
+            monster_key="skeleton_king",
+            monster_name="Король скелетов",
+            monster_hp=70,
+            monster_max_hp=120,
+            monster_power=22,
+            monster_exp=100,
+            monster_gold_min=40,
+            monster_gold_max=80,
+            is_boss=True,
+            defending=True,
+            turn=4,
+        ),
+    )
+
+
+class TestBinaryCodec:
+    """Тесты кодека."""
+
+    def test_round_trip_full_player(self, full_player):
+        """Запись раскодируется в тот же словарь."""
+        assert decode_record(encode_player(full_player)) == full_player.to_dict()
+
+    def test_round_trip_default_player(self):
+        """Игрок по умолчанию."""
+        player = Player(user_id=1)
+        restored = decode_player(encode_player(player))
+        assert restored.to_dict() == player.to_dict()
+        assert not restored.is_dirty()
+
+    def test_smaller_than_json(self, full_player):
+        """Бинарная запись заметно меньше JSON."""
+        binary = encode_player(full_player)
+        compact_json = json.dumps(full_player.to_dict(), ensure_ascii=False).encode('utf-8')
+        assert len(binary) * 4 < len(compact_json)
+
+    def test_unknown_names_inline(self):
+        """Названия не из таблиц сохраняются строкой."""
+        data = Player(
+            user_id=1,
+            location="swamp",
+            inventory=["Неизвестный артефакт"],
+            quests={"weekly": DailyQuest(date="когда-нибудь")},
+        ).to_dict()
+        assert decode_record(encode_record(data)) == data
+
+    def test_legacy_record_defaults(self):
+        """Неполная старая запись кодируется со значениями по умолчанию."""
+        legacy = {"user_id": 5, "level": 3}
+        restored = Player.from_dict(decode_record(encode_record(legacy)))
+        assert restored.to_dict() == Player.from_dict(legacy).to_dict()
+
+    def test_large_and_negative_ints(self):
+        """Varint выдерживает большие и отрицательные числа."""
+        player = Player(user_id=-10 ** 12, gold=2 ** 40, hp=-300)
+        assert decode_player(encode_player(player)).to_dict() == player.to_dict()
+
+    def test_unknown_version(self, full_player):
+        """Запись неизвестной версии не читается."""
+        record = bytearray(encode_player(full_player))
+        record[0] = 99
+        with pytest.raises(ValueError):
+            decode_record(bytes(record))
+
+    def test_truncated_record(self, full_player):
+        """Обрезанная запись — ValueError, а не IndexError."""
+        record = encode_player(full_player)
+        with pytest.raises(ValueError):
+            decode_record(record[:len(record) // 2])
+
+    def test_frame_records(self):
+        """Записи с префиксом длины читаются обратно, обрезанный хвост — ValueError."""
+        records = [b"", b"a", b"x" * 300]
+        framed = b"HEAD" + frame_records(records)
+
+        assert list(iter_records(framed, 4)) == records
+        with pytest.raises(ValueError):
+            list(iter_records(framed[:-1], 4))
+
+    def test_tables_cover_game_data(self):
+        """Весь контент игры есть в таблицах (новые названия дописываются в конец)."""
+        for key, shop_item in SHOP_ITEMS.items():
+            item = shop_item.item
+            if item.is_spell:
+                assert item.name in binary_codec.SPELL_NAMES
+            elif item.item_type == ItemType.CONSUMABLE:
+                assert key in binary_codec.POTION_KEYS
+            else:
+                assert item.name in binary_codec.ITEM_NAMES
+        for chapter in STORY_CHAPTERS.values():
+            if chapter.reward_item:
+                assert chapter.reward_item in binary_codec.ITEM_NAMES
+        for achievement in Achievement:
+            assert achievement.value in binary_codec.ACHIEVEMENT_KEYS
+        for key in LOCATIONS:
+            assert key in binary_codec.LOCATION_KEYS
+        for key, template in MONSTER_TEMPLATES.items():
+            assert key in binary_codec.MONSTER_KEYS
+            assert template.name in binary_codec.MONSTER_NAMES
+
+
+class TestBinaryDataRepository:
+    """Тесты бинарного репозитория."""
+
+    def test_save_and_reload(self, tmp_path, full_player):
+        """Игрок переживает перезапуск."""
+        path = str(tmp_path / "players.bin")
+        repo = BinaryDataRepository(data_file=path)
+        assert repo.save_player(full_player) is True
+        assert repo.save_player(Player(user_id=2, gold=7)) is True
+
+        reloaded = BinaryDataRepository(data_file=path)
+        assert reloaded.get_player_data(987654321) == full_player.to_dict()
+        assert reloaded.get_player_data(2)["gold"] == 7
+
+    def test_delete_player(self, tmp_path):
+        """Удаление игрока."""
+        path = str(tmp_path / "players.bin")
+        repo = BinaryDataRepository(data_file=path)
+        repo.save_players([Player(user_id=1), Player(user_id=2)])
+
+        assert repo.delete_player(1) is True
+        assert repo.delete_player(1) is False
+        assert set(BinaryDataRepository(data_file=path).get_all_players()) == {"2"}
+
+    def test_corrupt_file(self, tmp_path):
+        """Файл с чужой сигнатурой не роняет загрузку."""
+        path = tmp_path / "players.bin"
+        path.write_bytes(b"{}")
+        assert BinaryDataRepository(data_file=str(path)).get_all_players() == {}
+
+    def test_factory_and_migration(self, tmp_path, test_repository_with_data):
+        """Фабрика создаёт бинарный бэкенд, миграция переносит игроков."""
+        path = str(tmp_path / "players.bin")
+        assert migrate_json_to_binary(test_repository_with_data.data_file, path) == 2
+
+        repo = create_repository('binary', data_file=path)
+        assert isinstance(repo, BinaryDataRepository)
+        assert repo.get_player_data(456)["level"] == 10
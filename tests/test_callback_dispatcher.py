@@ -0,0 +1,114 @@
+"""Тесты протокола callback-данных и диспетчера кнопок."""
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, Update, User
+from handlers.callback_dispatcher import CallbackDispatcher, callbacks
+from keyboards.callback_data import CallbackCode, pack, unpack
+
+
+def make_update(data: str) -> Update:
+    """Обновление с нажатием кнопки."""
+    return Update(
+        update_id=1,
+        callback_query=CallbackQuery(
+            id="1",
+            from_user=User(id=42, is_bot=False, first_name="Игрок"),
+            chat_instance="chat",
+            data=data,
+        ),
+    )
+
+
+class TestCallbackData:
+    """Тесты pack/unpack."""
+
+    def test_roundtrip(self):
+        """Код и аргумент переживают упаковку."""
+        assert unpack(pack(CallbackCode.CAST_SPELL, "fireball")) == (CallbackCode.CAST_SPELL, "fireball")
+        assert unpack(pack(CallbackCode.BATTLE_ATTACK)) == (CallbackCode.BATTLE_ATTACK, "")
+
+    def test_payload_with_separator(self):
+        """Аргумент может содержать разделитель."""
+        assert unpack(pack(CallbackCode.BUY_ITEM, "a:b")) == (CallbackCode.BUY_ITEM, "a:b")
+
+    @pytest.mark.parametrize("data,expected", [
+        ("battle_attack", (CallbackCode.BATTLE_ATTACK, "")),
+        ("cast_fireball", (CallbackCode.CAST_SPELL, "fireball")),
+        ("use_health_potion", (CallbackCode.USE_POTION, "health_potion")),
+        ("buy_iron_sword", (CallbackCode.BUY_ITEM, "iron_sword")),
+        ("start_boss_2", (CallbackCode.START_BOSS, "2")),
+    ])
+    def test_legacy_format(self, data, expected):
+        """Кнопки из старых сообщений понимаются."""
+        assert unpack(data) == expected
+
+    def test_unknown(self):
+        """Чужие данные не разбираются."""
+        assert unpack("something_else") is None
+
+    def test_codes_unique_and_short(self):
+        """Коды не повторяются и короче старых строк."""
+        values = [code.value for code in CallbackCode]
+        assert len(values) == len(set(values))
+        assert all(len(value) <= 2 and ':' not in value for value in values)
+
+
+class TestCallbackDispatcher:
+    """Тесты CallbackDispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_by_code(self):
+        """Обработчик получает аргумент кнопки и данные middleware."""
+        dispatcher = CallbackDispatcher()
+        calls = []
+
+        @dispatcher.register(CallbackCode.CAST_SPELL)
+        async def cast(callback: CallbackQuery, payload: str, player: str) -> None:
+            calls.append((payload, player))
+
+        dp = Dispatcher()
+
+        async def inject_player(handler, event, data):
+            data['player'] = "игрок"
+            return await handler(event, data)
+
+        dp.callback_query.middleware(inject_player)
+        dp.include_router(dispatcher.router)
+        bot = Bot(token="42:TEST")
+
+        await dp.feed_update(bot, make_update(pack(CallbackCode.CAST_SPELL, "fireball")))
+        await dp.feed_update(bot, make_update("cast_heal"))
+
+        assert calls == [("fireball", "игрок"), ("heal", "игрок")]
+        await bot.session.close()
+
+    @pytest.mark.asyncio
+    async def test_unknown_code_falls_through(self):
+        """Нажатия без обработчика не перехватываются."""
+        dispatcher = CallbackDispatcher()
+        dp = Dispatcher()
+        dp.include_router(dispatcher.router)
+        bot = Bot(token="42:TEST")
+
+        result = await dp.feed_update(bot, make_update(pack(CallbackCode.SHOP_CLOSE)))
+
+        assert result is UNHANDLED
+        await bot.session.close()
+
+    def test_duplicate_code(self):
+        """Один код нельзя назначить двум обработчикам."""
+        dispatcher = CallbackDispatcher()
+        dispatcher.register(CallbackCode.BATTLE_FLEE)(lambda callback: None)
+
+        with pytest.raises(ValueError):
+            dispatcher.register(CallbackCode.BATTLE_FLEE)(lambda callback: None)
+
+    def test_game_handlers_registered(self):
+        """Все кнопки боя и магазина ведут к обработчикам."""
+        import handlers  # noqa: F401 - регистрирует обработчики
+
+        registered = set(callbacks.codes())
+        assert CallbackCode.BATTLE_ATTACK in registered
+        assert CallbackCode.BUY_ITEM in registered
+        assert CallbackCode.SHOP_CLOSE in registered
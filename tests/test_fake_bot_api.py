@@ -0,0 +1,121 @@
+"""Тесты заглушки Bot API и виртуальных игроков нагрузочного теста."""
+import random
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramNotFound
+from aiogram.methods import GetChatMember
+from aiogram.types import BufferedInputFile
+from benchmarks.fake_bot_api import FakeBotAPI
+from benchmarks.load_players import Traffic, VirtualPlayer, inline_buttons, reply_buttons
+from keyboards import main_keyboard
+from keyboards.battle_keyboard import get_battle_keyboard
+from keyboards.callback_data import CallbackCode
+
+CHAT_ID = 1001
+
+
+@pytest_asyncio.fixture
+async def api_and_bot():
+    """Заглушка на тестовом сервере и бот, подключённый к ней."""
+    api = FakeBotAPI()
+    server = TestServer(api.make_app())
+    await server.start_server()
+    session = AiohttpSession(api=TelegramAPIServer.from_base(str(server.make_url('')).rstrip('/')))
+    bot = Bot(token="42:TEST", session=session)
+    yield api, bot
+    await bot.session.close()
+    await server.close()
+
+
+class TestFakeBotAPI:
+    """Тесты FakeBotAPI."""
+
+    @pytest.mark.asyncio
+    async def test_send_and_edit(self, api_and_bot, test_player):
+        """Правка без клавиатуры убирает инлайн-кнопки, как в Telegram."""
+        api, bot = api_and_bot
+        sent = await bot.send_message(CHAT_ID, "Бой!", reply_markup=get_battle_keyboard(test_player))
+        assert CallbackCode.BATTLE_ATTACK in inline_buttons(api.get_message(CHAT_ID, sent.message_id))
+
+        edited = await bot.edit_message_text("Победа", chat_id=CHAT_ID, message_id=sent.message_id)
+
+        assert edited.text == "Победа"
+        assert edited.reply_markup is None
+        assert inline_buttons(api.last_message(CHAT_ID)) == {}
+
+    @pytest.mark.asyncio
+    async def test_reply_keyboard_kept_for_player(self, api_and_bot):
+        """Обычная клавиатура не возвращается боту, но видна игроку."""
+        api, bot = api_and_bot
+        sent = await bot.send_message(CHAT_ID, "Привет", reply_markup=main_keyboard)
+
+        assert sent.reply_markup is None
+        assert "⚔️ В бой!" in reply_buttons(api.last_message(CHAT_ID))
+
+    @pytest.mark.asyncio
+    async def test_photo_upload_and_file_id(self, api_and_bot):
+        """Загруженный файл получает file_id, который потом принимается."""
+        api, bot = api_and_bot
+        uploaded = await bot.send_photo(CHAT_ID, BufferedInputFile(b"png", "goblin.png"), caption="Гоблин")
+        file_id = uploaded.photo[-1].file_id
+
+        resent = await bot.send_photo(CHAT_ID, file_id)
+
+        assert uploaded.caption == "Гоблин"
+        assert resent.photo[-1].file_id == file_id
+        assert api.calls['sendPhoto'] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_updates_offset(self, api_and_bot):
+        """offset подтверждает полученные обновления."""
+        api, bot = api_and_bot
+        first = api.push_update({'message': {'message_id': 1, 'date': 0, 'chat': {'id': CHAT_ID, 'type': 'private'}}})
+        api.push_update({'message': {'message_id': 2, 'date': 0, 'chat': {'id': CHAT_ID, 'type': 'private'}}})
+
+        updates = await bot.get_updates()
+        assert [update.update_id for update in updates] == [first, first + 1]
+
+        updates = await bot.get_updates(offset=first + 1)
+        assert [update.update_id for update in updates] == [first + 1]
+
+    @pytest.mark.asyncio
+    async def test_unknown_method(self, api_and_bot):
+        """Неподдержанный метод отвечает 404 и попадает в статистику."""
+        api, bot = api_and_bot
+        with pytest.raises(TelegramNotFound):
+            await bot(GetChatMember(chat_id=CHAT_ID, user_id=1))
+
+        assert api.stats()['unknown'] == {'getChatMember': 1}
+
+
+class TestVirtualPlayer:
+    """Тесты выбора действий виртуального игрока."""
+
+    def make_player(self) -> VirtualPlayer:
+        """Игрок с фиксированным генератором."""
+        return VirtualPlayer(1, Traffic(FakeBotAPI()), random.Random(1))
+
+    def test_battle_over_without_buttons(self):
+        """Без кнопок атаки бой считается законченным."""
+        assert self.make_player()._battle_action({}) is None
+
+    def test_spell_menu_cast(self):
+        """В меню заклинаний выбирается заклинание, а без него — возврат."""
+        player = self.make_player()
+
+        assert player._battle_action({CallbackCode.CAST_SPELL: ["c:fireball"], CallbackCode.BATTLE_BACK: ["k"]}) == "c:fireball"
+        assert player._battle_action({CallbackCode.BATTLE_SPELLS: ["s"], CallbackCode.BATTLE_BACK: ["k"]}) == "k"
+
+    def test_attack_mostly(self, test_player):
+        """Из главного меню боя чаще всего — атака."""
+        player = self.make_player()
+        buttons = inline_buttons({'reply_markup': get_battle_keyboard(test_player, has_potions=True).model_dump()})
+
+        choices = [player._battle_action(buttons) for _ in range(200)]
+
+        assert choices.count("a") > 100
+        assert set(choices) <= {"a", "s", "p"}
@@ -0,0 +1,165 @@
+"""Тесты ограничения исходящих сообщений."""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, EditMessageText, SendMessage
+from handlers.admin_handlers import format_flood_stats
+from middlewares import FloodControlMiddleware
+from services import FloodControl, TokenBucket
+
+
+class TestTokenBucket:
+    """Тесты TokenBucket."""
+
+    def test_burst_then_delay(self):
+        """Залп в пределах ёмкости без задержки, дальше — по темпу."""
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+class TestFloodControl:
+    """Тесты FloodControl."""
+
+    def test_group_chat_limited(self):
+        """Групповой чат ограничен своей корзиной, личный — только общей."""
+        flood = FloodControl(global_rate=1000, global_burst=1000, chat_rate=1, chat_burst=1)
+
+        assert flood.reserve(-100) == 0.0
+        assert flood.reserve(-100) > 0.5
+        assert flood.reserve(42) == 0.0
+        assert flood.reserve(42) == 0.0
+        assert flood.stats()['throttled'] == 1
+
+    def test_is_group(self):
+        """Группы — отрицательные id и @username."""
+        assert FloodControl.is_group(-1001)
+        assert FloodControl.is_group("@channel")
+        assert not FloodControl.is_group(42)
+        assert not FloodControl.is_group("42")
+
+
+def edit(text: str) -> EditMessageText:
+    """Правка одного и того же сообщения."""
+    return EditMessageText(chat_id=42, message_id=7, text=text)
+
+
+class TestFloodControlMiddleware:
+    """Тесты FloodControlMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_superseded_edits_coalesced(self):
+        """Из ожидающих правок одного сообщения отправляется последняя."""
+        flood = FloodControl(global_rate=20, global_burst=1)
+        middleware = FloodControlMiddleware(flood)
+        sent = []
+
+        async def make_request(bot, method):
+            sent.append(method)
+            return f"ok:{getattr(method, 'text', '')}"
+
+        await middleware(make_request, Mock(), SendMessage(chat_id=42, text="старт"))
+        results = await asyncio.gather(*(middleware(make_request, Mock(), edit(f"ход {turn}")) for turn in range(1, 4)))
+
+        assert [method.text for method in sent] == ["старт", "ход 3"]
+        assert results == ["ok:ход 3"] * 3
+        assert flood.stats()['coalesced'] == 2
+
+    @pytest.mark.asyncio
+    async def test_sends_paced(self):
+        """Отправки сверх залпа растягиваются по темпу корзины."""
+        flood = FloodControl(global_rate=50, global_burst=1)
+        middleware = FloodControlMiddleware(flood)
+
+        async def make_request(bot, method):
+            return True
+
+        start = time.monotonic()
+        for index in range(4):
+            await middleware(make_request, Mock(), SendMessage(chat_id=42, text=str(index)))
+
+        assert time.monotonic() - start >= 0.05
+        assert flood.stats()['throttled'] == 3
+
+    @pytest.mark.asyncio
+    async def test_requests_without_chat_not_limited(self):
+        """Служебные запросы не расходуют лимит."""
+        flood = FloodControl(global_rate=1, global_burst=1)
+        middleware = FloodControlMiddleware(flood)
+
+        async def make_request(bot, method):
+            return True
+
+        for _ in range(3):
+            await middleware(make_request, Mock(), AnswerCallbackQuery(callback_query_id="1"))
+
+        assert flood.stats()['sent'] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after(self):
+        """Ответ 429 выдерживается и запрос повторяется."""
+        flood = FloodControl()
+        middleware = FloodControlMiddleware(flood, max_retries=1)
+        method = SendMessage(chat_id=42, text="привет")
+        calls = []
+
+        async def make_request(bot, method):
+            calls.append(method)
+            if len(calls) == 1:
+                raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+            return True
+
+        assert await middleware(make_request, Mock(), method) is True
+        assert len(calls) == 2
+        assert flood.stats()['retried'] == 1
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_coalesced_callers(self):
+        """Ошибка отправки получают все склеенные вызовы."""
+        flood = FloodControl(global_rate=20, global_burst=1)
+        middleware = FloodControlMiddleware(flood)
+
+        async def make_request(bot, method):
+            if isinstance(method, EditMessageText):
+                raise RuntimeError("message to edit not found")
+            return True
+
+        await middleware(make_request, Mock(), SendMessage(chat_id=42, text="старт"))
+        results = await asyncio.gather(
+            middleware(make_request, Mock(), edit("1")),
+            middleware(make_request, Mock(), edit("2")),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancel_reaches_coalesced_callers(self):
+        """Отмена первой правки не оставляет склеенные вызовы ждать вечно."""
+        flood = FloodControl(global_rate=20, global_burst=1)
+        middleware = FloodControlMiddleware(flood)
+
+        async def make_request(bot, method):
+            return True
+
+        await middleware(make_request, Mock(), SendMessage(chat_id=42, text="старт"))
+        first = asyncio.create_task(middleware(make_request, Mock(), edit("1")))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(middleware(make_request, Mock(), edit("2")))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), timeout=1)
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+    def test_format_stats(self):
+        """Сводка для администратора."""
+        text = format_flood_stats(FloodControl().stats())
+
+        assert "Склеено правок: 0" in text
@@ -22,14 +22,10 @@ async def test_start_battle_success(mock_message, test_player, test_monster):
     test_player.location = "forest"
     test_player.hp = 100
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.select_monster_for_location', return_value=test_monster), \
+    with patch('handlers.battle_handlers.select_monster_for_location', return_value=test_monster), \
          patch('handlers.battle_handlers.get_story_progress'), \
          patch('handlers.battle_handlers.get_current_chapter', return_value=None):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await start_battle(mock_message)
+        await start_battle(mock_message, test_player)
 
         # Проверяем, что бой создан
         assert test_player.battle_state is not None
@@ -37,7 +33,6 @@ async def test_start_battle_success(mock_message, test_player, test_monster):
 
         # Проверяем, что вызван answer_photo или answer
         assert mock_message.answer_photo.called or mock_message.answer.called
-        mock_service.save_player.assert_called_once_with(test_player)
 
 
 @pytest.mark.asyncio
@@ -45,32 +40,26 @@ async def test_start_battle_low_hp(mock_message, test_player):
     """Тест начала боя с низким HP."""
     test_player.hp = 10  # Меньше 15
 
-    with patch('handlers.battle_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = test_player
-
-        await start_battle(mock_message)
+    await start_battle(mock_message, test_player)
 
-        # Проверяем, что бой не начался
-        assert test_player.battle_state is None
+    # Проверяем, что бой не начался
+    assert test_player.battle_state is None
 
-        # Проверяем сообщение об ошибке
-        mock_message.answer.assert_called_once()
-        call_args = mock_message.answer.call_args[0][0]
-        assert "слишком слабы" in call_args
+    # Проверяем сообщение об ошибке
+    mock_message.answer.assert_called_once()
+    call_args = mock_message.answer.call_args[0][0]
+    assert "слишком слабы" in call_args
 
 
 @pytest.mark.asyncio
 async def test_start_battle_already_active(mock_message, player_in_battle):
     """Тест начала боя при уже активном бое."""
-    with patch('handlers.battle_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await start_battle(mock_message)
+    await start_battle(mock_message, player_in_battle)
 
-        # Проверяем сообщение об ошибке
-        mock_message.answer.assert_called_once()
-        call_args = mock_message.answer.call_args[0][0]
-        assert "активный бой" in call_args
+    # Проверяем сообщение об ошибке
+    mock_message.answer.assert_called_once()
+    call_args = mock_message.answer.call_args[0][0]
+    assert "активный бой" in call_args
 
 
 @pytest.mark.asyncio
@@ -79,15 +68,11 @@ async def test_start_battle_peaceful_location(mock_message, test_player):
     test_player.location = "village"
     test_player.hp = 100
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.select_monster_for_location', return_value=None), \
+    with patch('handlers.battle_handlers.select_monster_for_location', return_value=None), \
          patch('handlers.battle_handlers.get_story_progress'), \
          patch('handlers.battle_handlers.get_current_chapter', return_value=None), \
          patch('handlers.battle_handlers.LOCATIONS', {"village": Mock(name="Деревня", is_peaceful=True)}):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await start_battle(mock_message)
+        await start_battle(mock_message, test_player)
 
         # Проверяем, что бой не начался
         assert test_player.battle_state is None
@@ -100,13 +85,9 @@ async def test_callback_battle_attack_victory(mock_callback, player_in_battle):
     # Устанавливаем HP монстра на минимум
     player_in_battle.battle_state.monster_hp = 1
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.player_attack', return_value=(10, False)), \
+    with patch('game_logic.battle.player_attack', return_value=(10, False)), \
          patch('handlers.battle_handlers.handle_victory') as mock_victory:
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_attack(mock_callback)
+        await callback_battle_attack(mock_callback, player_in_battle)
 
         # Проверяем, что вызвана обработка победы
         mock_victory.assert_called_once()
@@ -117,13 +98,9 @@ async def test_callback_battle_attack_continue(mock_callback, player_in_battle):
     """Тест атаки с продолжением боя."""
     player_in_battle.battle_state.monster_hp = 50
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.player_attack', return_value=(10, False)), \
-         patch('handlers.battle_handlers.monster_attack', return_value=(5, False)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_attack(mock_callback)
+    with patch('game_logic.battle.player_attack', return_value=(10, False)), \
+         patch('game_logic.battle.monster_attack', return_value=(5, False)):
+        await callback_battle_attack(mock_callback, player_in_battle)
 
         # Проверяем, что бой продолжается
         assert player_in_battle.battle_state is not None
@@ -137,14 +114,10 @@ async def test_callback_battle_attack_defeat(mock_callback, player_in_battle):
     player_in_battle.hp = 5
     player_in_battle.battle_state.monster_hp = 50
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.player_attack', return_value=(10, False)), \
-         patch('handlers.battle_handlers.monster_attack', return_value=(10, False)), \
+    with patch('game_logic.battle.player_attack', return_value=(10, False)), \
+         patch('game_logic.battle.monster_attack', return_value=(10, False)), \
          patch('handlers.battle_handlers.handle_defeat') as mock_defeat:
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_attack(mock_callback)
+        await callback_battle_attack(mock_callback, player_in_battle)
 
         # Проверяем, что вызвана обработка поражения
         mock_defeat.assert_called_once()
@@ -153,15 +126,12 @@ async def test_callback_battle_attack_defeat(mock_callback, player_in_battle):
 @pytest.mark.asyncio
 async def test_callback_battle_attack_no_battle(mock_callback, test_player):
     """Тест атаки без активного боя."""
-    with patch('handlers.battle_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = test_player
+    await callback_battle_attack(mock_callback, test_player)
 
-        await callback_battle_attack(mock_callback)
-
-        # Проверяем сообщение об ошибке
-        mock_callback.answer.assert_called_once()
-        call_args = mock_callback.answer.call_args[0][0]
-        assert "нет активного боя" in call_args
+    # Проверяем сообщение об ошибке
+    mock_callback.answer.assert_called_once()
+    call_args = mock_callback.answer.call_args[0][0]
+    assert "нет активного боя" in call_args
 
 
 @pytest.mark.asyncio
@@ -169,27 +139,18 @@ async def test_callback_battle_defend(mock_callback, player_in_battle):
     """Тест защиты игрока."""
     player_in_battle.battle_state.monster_hp = 50
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.monster_attack', return_value=(3, False)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_defend(mock_callback)
+    with patch('game_logic.battle.monster_attack', return_value=(3, False)):
+        await callback_battle_defend(mock_callback, player_in_battle)
 
         # Проверяем, что бой продолжается
         mock_callback.message.edit_caption.assert_called_once()
-        mock_service.save_player.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_callback_battle_spells(mock_callback, player_in_battle):
     """Тест показа меню заклинаний."""
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.get_spells_battle_keyboard'):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_spells(mock_callback)
+    with patch('handlers.battle_handlers.get_spells_battle_keyboard'):
+        await callback_battle_spells(mock_callback, player_in_battle)
 
         # Проверяем, что клавиатура обновлена
         mock_callback.message.edit_reply_markup.assert_called_once()
@@ -199,17 +160,12 @@ async def test_callback_battle_spells(mock_callback, player_in_battle):
 @pytest.mark.asyncio
 async def test_callback_cast_spell_success(mock_callback, player_in_battle):
     """Тест успешного применения заклинания."""
-    mock_callback.data = "cast_fireball"
     player_in_battle.battle_state.monster_hp = 50
     player_in_battle.mana = 50
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.cast_spell', return_value=(True, "⚡ Огненный шар!", 20)), \
-         patch('handlers.battle_handlers.monster_attack', return_value=(5, False)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_cast_spell(mock_callback)
+    with patch('game_logic.battle.cast_spell', return_value=(True, "⚡ Огненный шар!", 20)), \
+         patch('game_logic.battle.monster_attack', return_value=(5, False)):
+        await callback_cast_spell(mock_callback, player_in_battle, "fireball")
 
         # Проверяем, что бой продолжается
         mock_callback.message.edit_caption.assert_called_once()
@@ -218,15 +174,10 @@ async def test_callback_cast_spell_success(mock_callback, player_in_battle):
 @pytest.mark.asyncio
 async def test_callback_cast_spell_insufficient_mana(mock_callback, player_in_battle):
     """Тест применения заклинания без маны."""
-    mock_callback.data = "cast_fireball"
     player_in_battle.mana = 0
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.cast_spell', return_value=(False, "Недостаточно маны", 0)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_cast_spell(mock_callback)
+    with patch('game_logic.battle.cast_spell', return_value=(False, "Недостаточно маны", 0)):
+        await callback_cast_spell(mock_callback, player_in_battle, "fireball")
 
         # Проверяем, что показано предупреждение
         mock_callback.answer.assert_called_once()
@@ -237,12 +188,8 @@ async def test_callback_cast_spell_insufficient_mana(mock_callback, player_in_ba
 @pytest.mark.asyncio
 async def test_callback_battle_potions(mock_callback, player_in_battle):
     """Тест показа меню зелий."""
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.get_potions_battle_keyboard'):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_potions(mock_callback)
+    with patch('handlers.battle_handlers.get_potions_battle_keyboard'):
+        await callback_battle_potions(mock_callback, player_in_battle)
 
         # Проверяем, что клавиатура обновлена
         mock_callback.message.edit_reply_markup.assert_called_once()
@@ -252,17 +199,12 @@ async def test_callback_battle_potions(mock_callback, player_in_battle):
 @pytest.mark.asyncio
 async def test_callback_use_potion_success(mock_callback, player_in_battle):
     """Тест успешного использования зелья."""
-    mock_callback.data = "use_health"
     player_in_battle.hp = 50
     player_in_battle.potions = {"health": 1}
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.use_potion', return_value=(True, "💚 Восстановлено 50 HP!")), \
-         patch('handlers.battle_handlers.monster_attack', return_value=(5, False)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_use_potion(mock_callback)
+    with patch('game_logic.battle.use_potion', return_value=(True, "💚 Восстановлено 50 HP!")), \
+         patch('game_logic.battle.monster_attack', return_value=(5, False)):
+        await callback_use_potion(mock_callback, player_in_battle, "health")
 
         # Проверяем, что бой продолжается
         mock_callback.message.edit_caption.assert_called_once()
@@ -271,12 +213,8 @@ async def test_callback_use_potion_success(mock_callback, player_in_battle):
 @pytest.mark.asyncio
 async def test_callback_battle_flee_success(mock_callback, player_in_battle):
     """Тест успешного побега."""
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.flee_battle', return_value=True):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_flee(mock_callback)
+    with patch('game_logic.battle.flee_battle', return_value=True):
+        await callback_battle_flee(mock_callback, player_in_battle)
 
         # Проверяем, что бой завершён
         assert player_in_battle.battle_state is None
@@ -288,13 +226,9 @@ async def test_callback_battle_flee_fail(mock_callback, player_in_battle):
     """Тест неудачного побега."""
     player_in_battle.battle_state.monster_hp = 50
 
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.flee_battle', return_value=False), \
-         patch('handlers.battle_handlers.monster_attack', return_value=(5, False)):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_flee(mock_callback)
+    with patch('game_logic.battle.flee_battle', return_value=False), \
+         patch('game_logic.battle.monster_attack', return_value=(5, False)):
+        await callback_battle_flee(mock_callback, player_in_battle)
 
         # Проверяем, что бой продолжается
         assert player_in_battle.battle_state is not None
@@ -306,26 +240,19 @@ async def test_callback_battle_flee_from_boss(mock_callback, player_in_battle):
     """Тест попытки побега от босса."""
     player_in_battle.battle_state.is_boss = True
 
-    with patch('handlers.battle_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = player_in_battle
+    await callback_battle_flee(mock_callback, player_in_battle)
 
-        await callback_battle_flee(mock_callback)
-
-        # Проверяем, что побег невозможен
-        mock_callback.answer.assert_called_once()
-        call_args = mock_callback.answer.call_args[0][0]
-        assert "босса" in call_args
+    # Проверяем, что побег невозможен
+    mock_callback.answer.assert_called_once()
+    call_args = mock_callback.answer.call_args[0][0]
+    assert "босса" in call_args
 
 
 @pytest.mark.asyncio
 async def test_callback_battle_back(mock_callback, player_in_battle):
     """Тест возврата к действиям боя."""
-    with patch('handlers.battle_handlers.player_service') as mock_service, \
-         patch('handlers.battle_handlers.get_battle_keyboard'):
-
-        mock_service.get_or_create.return_value = player_in_battle
-
-        await callback_battle_back(mock_callback)
+    with patch('handlers.battle_handlers.get_battle_keyboard'):
+        await callback_battle_back(mock_callback, player_in_battle)
 
         # Проверяем, что клавиатура обновлена
         mock_callback.message.edit_reply_markup.assert_called_once()
@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, Mock
 from handlers.commands import cmd_start, cmd_equip, cmd_top
 from models import StoryProgress
+from services import PlayerService
 
 
 @pytest.mark.asyncio
@@ -13,13 +14,9 @@ async def test_cmd_start_new_player(mock_message, test_player):
     mock_chapter.title = "Глава 1: Начало приключения"
     mock_chapter.boss_name = "Лесной тролль"
 
-    with patch('handlers.commands.player_service') as mock_service, \
-         patch('handlers.commands.get_current_chapter', return_value=mock_chapter), \
+    with patch('handlers.commands.get_current_chapter', return_value=mock_chapter), \
          patch('handlers.commands.main_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await cmd_start(mock_message)
+        await cmd_start(mock_message, test_player)
 
         # Проверяем, что отправлено приветственное сообщение
         mock_message.answer.assert_called_once()
@@ -37,13 +34,9 @@ async def test_cmd_start_with_chapter(mock_message, player_with_story):
     mock_chapter.title = "Глава 2: Темный лес"
     mock_chapter.boss_name = "Темный маг"
 
-    with patch('handlers.commands.player_service') as mock_service, \
-         patch('handlers.commands.get_current_chapter', return_value=mock_chapter), \
+    with patch('handlers.commands.get_current_chapter', return_value=mock_chapter), \
          patch('handlers.commands.main_keyboard'):
-
-        mock_service.get_or_create.return_value = player_with_story
-
-        await cmd_start(mock_message)
+        await cmd_start(mock_message, player_with_story)
 
         # Проверяем наличие информации о главе
         mock_message.answer.assert_called_once()
@@ -54,13 +47,9 @@ async def test_cmd_start_with_chapter(mock_message, player_with_story):
 @pytest.mark.asyncio
 async def test_cmd_start_completed_story(mock_message, test_player):
     """Тест команды /start для игрока, завершившего сюжет."""
-    with patch('handlers.commands.player_service') as mock_service, \
-         patch('handlers.commands.get_current_chapter', return_value=None), \
+    with patch('handlers.commands.get_current_chapter', return_value=None), \
          patch('handlers.commands.main_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await cmd_start(mock_message)
+        await cmd_start(mock_message, test_player)
 
         # Проверяем сообщение о завершении сюжета
         mock_message.answer.assert_called_once()
@@ -74,15 +63,10 @@ async def test_cmd_equip_success(mock_message, test_player):
     mock_message.text = "/equip Железный меч"
     test_player.inventory = ["Железный меч"]
 
-    with patch('handlers.commands.player_service') as mock_service, \
-         patch('handlers.commands.equip_item', return_value=(True, "✅ Экипировано: Железный меч")):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await cmd_equip(mock_message)
+    with patch('handlers.commands.equip_item', return_value=(True, "✅ Экипировано: Железный меч")):
+        await cmd_equip(mock_message, test_player)
 
         # Проверяем, что предмет экипирован
-        mock_service.save_player.assert_called_once()
         mock_message.answer.assert_called_once()
         call_args = mock_message.answer.call_args[0][0]
         assert "Экипировано" in call_args or "✅" in call_args
@@ -93,15 +77,12 @@ async def test_cmd_equip_missing_args(mock_message, test_player):
     """Тест команды /equip без аргументов."""
     mock_message.text = "/equip"
 
-    with patch('handlers.commands.player_service') as mock_service:
-        mock_service.get_or_create.return_value = test_player
+    await cmd_equip(mock_message, test_player)
 
-        await cmd_equip(mock_message)
-
-        # Проверяем сообщение об ошибке
-        mock_message.answer.assert_called_once()
-        call_args = mock_message.answer.call_args[0][0]
-        assert "Укажите предмет" in call_args
+    # Проверяем сообщение об ошибке
+    mock_message.answer.assert_called_once()
+    call_args = mock_message.answer.call_args[0][0]
+    assert "Укажите предмет" in call_args
 
 
 @pytest.mark.asyncio
@@ -110,12 +91,8 @@ async def test_cmd_equip_item_not_found(mock_message, test_player):
     mock_message.text = "/equip Мифический меч"
     test_player.inventory = ["Деревянная палка"]
 
-    with patch('handlers.commands.player_service') as mock_service, \
-         patch('handlers.commands.equip_item', return_value=(False, "❌ Предмет не найден в инвентаре")):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await cmd_equip(mock_message)
+    with patch('handlers.commands.equip_item', return_value=(False, "❌ Предмет не найден в инвентаре")):
+        await cmd_equip(mock_message, test_player)
 
         # Проверяем сообщение об ошибке
         mock_message.answer.assert_called_once()
@@ -133,10 +110,10 @@ async def test_cmd_top_with_players(mock_message):
         Mock(user_id=3, level=5, gold=200, total_kills=15)
     ]
 
-    with patch('handlers.commands.player_service') as mock_service, \
+    with patch('handlers.commands.player_service', spec=PlayerService) as mock_service, \
          patch('handlers.commands.format_top_players', return_value="🏆 ТОП-10 ИГРОКОВ\n\n1. Игрок 1"):
 
-        mock_service.get_top_players.return_value = top_players
+        mock_service.aget_top_players.return_value = top_players
 
         await cmd_top(mock_message)
 
@@ -149,8 +126,8 @@ async def test_cmd_top_with_players(mock_message):
 @pytest.mark.asyncio
 async def test_cmd_top_empty(mock_message):
     """Тест команды /top без игроков."""
-    with patch('handlers.commands.player_service') as mock_service:
-        mock_service.get_top_players.return_value = []
+    with patch('handlers.commands.player_service', spec=PlayerService) as mock_service:
+        mock_service.aget_top_players.return_value = []
 
         await cmd_top(mock_message)
 
@@ -2,6 +2,7 @@
 import pytest
 from unittest.mock import patch, Mock
 from handlers.map_handlers import show_map, travel_to_location
+from services import MediaCache
 
 
 @pytest.mark.asyncio
@@ -14,14 +15,10 @@ async def test_show_map(mock_message, test_player):
     mock_location.description = "Мирное место"
     mock_location.image_path = None
 
-    with patch('handlers.map_handlers.player_service') as mock_service, \
-         patch('handlers.map_handlers.format_location_info', return_value="📍 Деревня"), \
+    with patch('handlers.map_handlers.format_location_info', return_value="📍 Деревня"), \
          patch('handlers.map_handlers.LOCATIONS', {"village": mock_location}), \
          patch('handlers.map_handlers.map_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await show_map(mock_message)
+        await show_map(mock_message, test_player)
 
         # Проверяем, что информация отправлена
         mock_message.answer.assert_called_once()
@@ -37,18 +34,15 @@ async def test_show_map_with_image(mock_message, test_player):
     mock_location.description = "Опасное место"
     mock_location.image_path = "assets/locations/forest.jpg"
 
-    with patch('handlers.map_handlers.player_service') as mock_service, \
-         patch('handlers.map_handlers.format_location_info', return_value="📍 Тёмный лес"), \
+    with patch('handlers.map_handlers.format_location_info', return_value="📍 Тёмный лес"), \
          patch('handlers.map_handlers.LOCATIONS', {"forest": mock_location}), \
          patch('handlers.map_handlers.map_keyboard'), \
-         patch('handlers.map_handlers.FSInputFile'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await show_map(mock_message)
+         patch('handlers.map_handlers.media_cache', spec=MediaCache) as mock_media:
+        await show_map(mock_message, test_player)
 
-        # Проверяем, что фото отправлено
-        mock_message.answer_photo.assert_called_once()
+        # Проверяем, что фото отправлено через кэш картинок
+        mock_media.answer_photo.assert_awaited_once()
+        assert mock_media.answer_photo.call_args[0][1] == "assets/locations/forest.jpg"
 
 
 @pytest.mark.asyncio
@@ -62,16 +56,11 @@ async def test_travel_to_location(mock_message, test_player):
     mock_location.description = "Опасное место, полное монстров"
     mock_location.image_path = None
 
-    with patch('handlers.map_handlers.player_service') as mock_service, \
-         patch('handlers.map_handlers.LOCATIONS', {"forest": mock_location}):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await travel_to_location(mock_message)
+    with patch('handlers.map_handlers.LOCATIONS', {"forest": mock_location}):
+        await travel_to_location(mock_message, test_player)
 
         # Проверяем, что локация изменена
         assert test_player.location == "forest"
-        mock_service.save_player.assert_called_once()
         mock_message.answer.assert_called_once()
 
 
@@ -94,12 +83,8 @@ async def test_travel_all_locations(mock_message, test_player):
         mock_message.text = location_text
         test_player.location = "village"
 
-        with patch('handlers.map_handlers.player_service') as mock_service, \
-             patch('handlers.map_handlers.LOCATIONS', {location_key: mock_location}):
-
-            mock_service.get_or_create.return_value = test_player
-
-            await travel_to_location(mock_message)
+        with patch('handlers.map_handlers.LOCATIONS', {location_key: mock_location}):
+            await travel_to_location(mock_message, test_player)
 
             # Проверяем, что локация изменена
             assert test_player.location == location_key
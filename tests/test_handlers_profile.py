@@ -11,12 +11,8 @@ async def test_show_profile(mock_message, test_player):
     test_player.gold = 100
     test_player.exp = 250
 
-    with patch('handlers.profile.player_service') as mock_service, \
-         patch('handlers.profile.format_profile', return_value="👤 ПРОФИЛЬ\n\nУровень: 5"):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await show_profile(mock_message)
+    with patch('handlers.profile.format_profile', return_value="👤 ПРОФИЛЬ\n\nУровень: 5"):
+        await show_profile(mock_message, test_player)
 
         # Проверяем, что профиль отправлен
         mock_message.answer.assert_called_once()
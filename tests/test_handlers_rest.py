@@ -2,6 +2,7 @@
 import pytest
 from unittest.mock import patch, Mock
 from handlers.rest_handlers import rest_and_heal, show_rating_inline
+from services import PlayerService
 
 
 @pytest.mark.asyncio
@@ -13,17 +14,13 @@ async def test_rest_and_heal_success(mock_message, test_player):
     test_player.mana = 20
     test_player.max_mana = 50
 
-    with patch('handlers.rest_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = test_player
+    await rest_and_heal(mock_message, test_player)
 
-        await rest_and_heal(mock_message)
-
-        # Проверяем, что здоровье и мана восстановлены
-        assert test_player.hp == test_player.max_hp
-        assert test_player.mana == test_player.max_mana
-        assert test_player.gold == 35  # 50 - 15
-        mock_service.save_player.assert_called_once()
-        mock_message.answer.assert_called_once()
+    # Проверяем, что здоровье и мана восстановлены
+    assert test_player.hp == test_player.max_hp
+    assert test_player.mana == test_player.max_mana
+    assert test_player.gold == 35  # 50 - 15
+    mock_message.answer.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -33,17 +30,14 @@ async def test_rest_and_heal_insufficient_gold(mock_message, test_player):
     test_player.hp = 50
     test_player.max_hp = 100
 
-    with patch('handlers.rest_handlers.player_service') as mock_service:
-        mock_service.get_or_create.return_value = test_player
-
-        await rest_and_heal(mock_message)
+    await rest_and_heal(mock_message, test_player)
 
-        # Проверяем, что здоровье не изменилось
-        assert test_player.hp == 50
-        assert test_player.gold == 10
-        mock_message.answer.assert_called_once()
-        call_args = mock_message.answer.call_args[0][0]
-        assert "Не хватает золота" in call_args
+    # Проверяем, что здоровье не изменилось
+    assert test_player.hp == 50
+    assert test_player.gold == 10
+    mock_message.answer.assert_called_once()
+    call_args = mock_message.answer.call_args[0][0]
+    assert "Не хватает золота" in call_args
 
 
 @pytest.mark.asyncio
@@ -54,10 +48,10 @@ async def test_show_rating_inline_with_players(mock_message):
         Mock(user_id=2, level=8, gold=500)
     ]
 
-    with patch('handlers.rest_handlers.player_service') as mock_service, \
+    with patch('handlers.rest_handlers.player_service', spec=PlayerService) as mock_service, \
          patch('handlers.rest_handlers.format_top_players', return_value="🏆 ТОП ИГРОКОВ"):
 
-        mock_service.get_top_players.return_value = top_players
+        mock_service.aget_top_players.return_value = top_players
 
         await show_rating_inline(mock_message)
 
@@ -70,8 +64,8 @@ async def test_show_rating_inline_with_players(mock_message):
 @pytest.mark.asyncio
 async def test_show_rating_inline_empty(mock_message):
     """Тест показа пустого рейтинга."""
-    with patch('handlers.rest_handlers.player_service') as mock_service:
-        mock_service.get_top_players.return_value = []
+    with patch('handlers.rest_handlers.player_service', spec=PlayerService) as mock_service:
+        mock_service.aget_top_players.return_value = []
 
         await show_rating_inline(mock_message)
 
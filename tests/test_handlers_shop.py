@@ -19,12 +19,8 @@ async def test_open_shop(mock_message, test_player):
     """Тест открытия магазина."""
     test_player.gold = 100
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.get_shop_main_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await open_shop(mock_message)
+    with patch('handlers.shop_handlers.get_shop_main_keyboard'):
+        await open_shop(mock_message, test_player)
 
         # Проверяем, что ответ отправлен
         mock_message.answer.assert_called_once()
@@ -38,12 +34,8 @@ async def test_callback_shop_main(mock_callback, test_player):
     """Тест главного меню магазина."""
     test_player.gold = 100
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.get_shop_main_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_shop_main(mock_callback)
+    with patch('handlers.shop_handlers.get_shop_main_keyboard'):
+        await callback_shop_main(mock_callback, test_player)
 
         # Проверяем, что текст обновлён
         mock_callback.message.edit_text.assert_called_once()
@@ -55,12 +47,8 @@ async def test_callback_shop_equipment(mock_callback, test_player):
     """Тест показа категории оружия."""
     test_player.gold = 100
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.get_equipment_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_shop_equipment(mock_callback)
+    with patch('handlers.shop_handlers.get_equipment_keyboard'):
+        await callback_shop_equipment(mock_callback, test_player)
 
         # Проверяем, что текст обновлён
         mock_callback.message.edit_text.assert_called_once()
@@ -74,12 +62,8 @@ async def test_callback_shop_spells(mock_callback, test_player):
     test_player.gold = 100
     test_player.level = 5
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.get_spells_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_shop_spells(mock_callback)
+    with patch('handlers.shop_handlers.get_spells_keyboard'):
+        await callback_shop_spells(mock_callback, test_player)
 
         # Проверяем, что текст обновлён
         mock_callback.message.edit_text.assert_called_once()
@@ -92,12 +76,8 @@ async def test_callback_shop_potions(mock_callback, test_player):
     """Тест показа категории зелий."""
     test_player.gold = 100
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.get_potions_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_shop_potions(mock_callback)
+    with patch('handlers.shop_handlers.get_potions_keyboard'):
+        await callback_shop_potions(mock_callback, test_player)
 
         # Проверяем, что текст обновлён
         mock_callback.message.edit_text.assert_called_once()
@@ -108,7 +88,6 @@ async def test_callback_shop_potions(mock_callback, test_player):
 @pytest.mark.asyncio
 async def test_callback_buy_item_success(mock_callback, test_player):
     """Тест успешной покупки предмета."""
-    mock_callback.data = "buy_wooden_sword"
     test_player.gold = 100
 
     # Создаём мок предмета
@@ -121,17 +100,12 @@ async def test_callback_buy_item_success(mock_callback, test_player):
     )
     mock_shop_item = ShopItem(item=mock_item, unique=True)
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.SHOP_ITEMS', {"wooden_sword": mock_shop_item}), \
+    with patch('handlers.shop_handlers.SHOP_ITEMS', {"wooden_sword": mock_shop_item}), \
          patch('handlers.shop_handlers.purchase_item', return_value=(True, "✅ Куплено!")), \
          patch('handlers.shop_handlers.get_equipment_keyboard'):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_buy_item(mock_callback)
+        await callback_buy_item(mock_callback, test_player, "wooden_sword")
 
         # Проверяем, что покупка прошла
-        mock_service.save_player.assert_called_once()
         mock_callback.answer.assert_called_once()
         call_args = mock_callback.answer.call_args[0][0]
         assert "Куплено" in call_args or "✅" in call_args
@@ -140,7 +114,6 @@ async def test_callback_buy_item_success(mock_callback, test_player):
 @pytest.mark.asyncio
 async def test_callback_buy_item_insufficient_gold(mock_callback, test_player):
     """Тест покупки без достаточного золота."""
-    mock_callback.data = "buy_iron_sword"
     test_player.gold = 10
 
     # Создаём мок предмета
@@ -153,13 +126,9 @@ async def test_callback_buy_item_insufficient_gold(mock_callback, test_player):
     )
     mock_shop_item = ShopItem(item=mock_item, unique=True)
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.SHOP_ITEMS', {"iron_sword": mock_shop_item}), \
+    with patch('handlers.shop_handlers.SHOP_ITEMS', {"iron_sword": mock_shop_item}), \
          patch('handlers.shop_handlers.purchase_item', return_value=(False, "❌ Недостаточно золота!")):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_buy_item(mock_callback)
+        await callback_buy_item(mock_callback, test_player, "iron_sword")
 
         # Проверяем, что показано сообщение об ошибке
         mock_callback.answer.assert_called_once()
@@ -170,7 +139,6 @@ async def test_callback_buy_item_insufficient_gold(mock_callback, test_player):
 @pytest.mark.asyncio
 async def test_callback_buy_item_level_requirement(mock_callback, test_player):
     """Тест покупки предмета с требованием уровня."""
-    mock_callback.data = "buy_fireball_spell"
     test_player.gold = 500
     test_player.level = 1
 
@@ -186,13 +154,9 @@ async def test_callback_buy_item_level_requirement(mock_callback, test_player):
     )
     mock_shop_item = ShopItem(item=mock_item, unique=True)
 
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.SHOP_ITEMS', {"fireball_spell": mock_shop_item}), \
+    with patch('handlers.shop_handlers.SHOP_ITEMS', {"fireball_spell": mock_shop_item}), \
          patch('handlers.shop_handlers.purchase_item', return_value=(False, "❌ Требуется 5 уровень! У вас 1.")):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_buy_item(mock_callback)
+        await callback_buy_item(mock_callback, test_player, "fireball_spell")
 
         # Проверяем, что показано сообщение об уровне
         mock_callback.answer.assert_called_once()
@@ -203,14 +167,8 @@ async def test_callback_buy_item_level_requirement(mock_callback, test_player):
 @pytest.mark.asyncio
 async def test_callback_buy_item_not_found(mock_callback, test_player):
     """Тест покупки несуществующего предмета."""
-    mock_callback.data = "buy_unknown_item"
-
-    with patch('handlers.shop_handlers.player_service') as mock_service, \
-         patch('handlers.shop_handlers.SHOP_ITEMS', {}):
-
-        mock_service.get_or_create.return_value = test_player
-
-        await callback_buy_item(mock_callback)
+    with patch('handlers.shop_handlers.SHOP_ITEMS', {}):
+        await callback_buy_item(mock_callback, test_player, "unknown_item")
 
         # Проверяем, что показано сообщение об ошибке
         mock_callback.answer.assert_called_once()
@@ -0,0 +1,142 @@
+"""Тесты индексированного хранилища."""
+import pytest
+from models import Player
+from services import (
+    IndexedDataRepository,
+    PlayerService,
+    create_repository,
+    migrate_json_to_indexed,
+)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """Путь к файлу данных во временной директории."""
+    return str(tmp_path / "players.jsonl")
+
+
+@pytest.fixture
+def indexed_repository(data_file):
+    """Индексированный репозиторий."""
+    repo = IndexedDataRepository(data_file=data_file)
+    yield repo
+    repo.close()
+
+
+class TestIndexedDataRepository:
+    """Тесты IndexedDataRepository."""
+
+    def test_save_and_get_player(self, indexed_repository):
+        """Сохранение и чтение игрока."""
+        player = Player(user_id=1, level=5, inventory=["Стальной меч"])
+        assert indexed_repository.save_player(player) is True
+
+        assert indexed_repository.get_player_data(1) == player.to_dict()
+        assert indexed_repository.get_player_data(2) is None
+
+    def test_save_appends(self, indexed_repository, data_file):
+        """Повторное сохранение дописывает строку, читается последняя."""
+        player = Player(user_id=1, gold=10)
+        indexed_repository.save_player(player)
+        player.gold = 99
+        indexed_repository.save_player(player)
+
+        with open(data_file, encoding='utf-8') as f:
+            assert len(f.readlines()) == 2
+        assert indexed_repository.get_player_data(1)["gold"] == 99
+        assert indexed_repository.stale_bytes > 0
+
+    def test_restart_uses_saved_index(self, data_file):
+        """После перезапуска индекс берётся из файла, а хвост досканируется."""
+        repo = IndexedDataRepository(data_file=data_file)
+        repo.save_players([Player(user_id=1, level=3), Player(user_id=2, level=7)])
+        repo.close()
+
+        # Запись, сделанная после сохранения индекса
+        other = IndexedDataRepository(data_file=data_file)
+        other.save_player(Player(user_id=3, gold=500))
+
+        reloaded = IndexedDataRepository(data_file=data_file)
+        assert reloaded.count_players() == 3
+        assert reloaded.get_player_data(2)["level"] == 7
+        assert reloaded.get_player_data(3)["gold"] == 500
+
+    def test_index_saved_periodically(self, data_file):
+        """Индекс сохраняется по ходу записи, а не только при закрытии."""
+        repo = IndexedDataRepository(data_file=data_file, index_every_bytes=1)
+        repo.save_players([Player(user_id=1), Player(user_id=2)])
+        repo.save_player(Player(user_id=3, gold=500))
+
+        # Без close(), как после аварийного завершения: хвост сканировать не нужно
+        reloaded = IndexedDataRepository(data_file=data_file)
+        reloaded._open()
+        assert reloaded._size == reloaded._indexed_size
+        assert reloaded.count_players() == 3
+        assert reloaded.get_player_data(3)["gold"] == 500
+        repo.close()
+        reloaded.close()
+
+    def test_index_rebuilt_without_sidecar(self, indexed_repository, data_file):
+        """Без файла индекса он строится сканированием."""
+        indexed_repository.save_players([Player(user_id=1), Player(user_id=2, gold=5)])
+
+        reloaded = IndexedDataRepository(data_file=data_file)
+        assert reloaded.get_player_data(2)["gold"] == 5
+
+    def test_truncated_tail_dropped(self, indexed_repository, data_file):
+        """Недописанная строка отбрасывается, следующие записи не портятся."""
+        indexed_repository.save_player(Player(user_id=1))
+        with open(data_file, 'ab') as f:
+            f.write(b'{"user_id": 2, "gol')
+
+        reloaded = IndexedDataRepository(data_file=data_file)
+        assert reloaded.count_players() == 1
+        reloaded.save_player(Player(user_id=3))
+        assert IndexedDataRepository(data_file=data_file).get_player_data(3)["user_id"] == 3
+
+    def test_delete_player(self, indexed_repository, data_file):
+        """Удаление переживает перезапуск."""
+        indexed_repository.save_players([Player(user_id=1), Player(user_id=2)])
+
+        assert indexed_repository.delete_player(1) is True
+        assert indexed_repository.delete_player(1) is False
+        assert IndexedDataRepository(data_file=data_file).get_player_data(1) is None
+
+    def test_compaction(self, data_file):
+        """Когда устаревших строк больше живых, файл переписывается."""
+        repo = IndexedDataRepository(data_file=data_file, compact_min_bytes=1)
+        player = Player(user_id=1)
+        for gold in range(5):
+            player.gold = gold
+            repo.save_player(player)
+
+        with open(data_file, encoding='utf-8') as f:
+            assert len(f.readlines()) == 1
+        assert repo.get_player_data(1)["gold"] == 4
+
+    def test_leaderboard_records_from_index(self, indexed_repository):
+        """Рейтинг строится по индексу."""
+        indexed_repository.save_players([Player(user_id=1, level=2, gold=3)])
+        assert list(indexed_repository.get_leaderboard_records()) == [(1, 2, 3)]
+
+    def test_factory_and_migration(self, tmp_path, test_repository_with_data):
+        """Фабрика создаёт бэкенд, миграция переносит игроков."""
+        path = str(tmp_path / "players.jsonl")
+        assert migrate_json_to_indexed(test_repository_with_data.data_file, path) == 2
+
+        repo = create_repository('indexed', data_file=path)
+        assert isinstance(repo, IndexedDataRepository)
+        assert repo.get_player_data(123)["gold"] == 100
+        assert sorted(uid for uid, _, _ in repo.get_leaderboard_records()) == [123, 456]
+
+    def test_player_service(self, indexed_repository):
+        """PlayerService работает поверх индексированного хранилища."""
+        PlayerService._instance = None
+        service = PlayerService(repository=indexed_repository)
+        player = service.get_or_create(10)
+        player.level = 9
+        service.save_player(player)
+        service.rebuild_leaderboard()
+
+        assert service.get_player_rank(10) == 1
+        PlayerService._instance = None
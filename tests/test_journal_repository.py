@@ -0,0 +1,212 @@
+"""Тесты журнального репозитория."""
+import json
+import os
+import pytest
+from models import Player
+from services import JournalDataRepository, DataRepository, create_repository
+
+
+@pytest.fixture
+def journal_repository(temp_data_file):
+    """Журнальный репозиторий с синхронной компакцией."""
+    repo = JournalDataRepository(
+        data_file=temp_data_file,
+        compact_threshold=1000,
+        background_compaction=False
+    )
+    yield repo
+    repo.close()
+
+
+def reopen(repo: JournalDataRepository) -> JournalDataRepository:
+    """Закрыть репозиторий и открыть его заново, как после рестарта."""
+    repo.close()
+    return JournalDataRepository(data_file=repo.data_file, background_compaction=False)
+
+
+class TestJournalDataRepository:
+    """Тесты хранения снимка и журнала."""
+
+    def test_save_player_appends_one_record(self, journal_repository):
+        """Сохранение дописывает одну компактную строку в журнал."""
+        journal_repository.save_player(Player(user_id=1, level=3))
+        journal_repository.save_player(Player(user_id=2, level=4))
+
+        with open(journal_repository.journal_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        assert len(lines) == 2
+        record = json.loads(lines[0])
+        assert record['op'] == 'put'
+        assert record['id'] == '1'
+        assert record['data']['level'] == 3
+        assert not os.path.exists(journal_repository.data_file)
+
+    def test_save_cost_independent_of_player_count(self, journal_repository):
+        """Размер записи не зависит от количества игроков."""
+        for uid in range(50):
+            journal_repository.save_player(Player(user_id=uid))
+
+        size_before = os.path.getsize(journal_repository.journal_file)
+        journal_repository.save_player(Player(user_id=10))
+        size_after = os.path.getsize(journal_repository.journal_file)
+
+        single_record = len(json.dumps(
+            {'op': 'put', 'id': '10', 'data': Player(user_id=10).to_dict()},
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')) + 1
+        assert size_after - size_before == single_record
+
+    def test_replay_after_restart(self, journal_repository):
+        """Данные восстанавливаются из журнала после рестарта."""
+        journal_repository.save_player(Player(user_id=1, gold=100))
+        journal_repository.save_player(Player(user_id=1, gold=150))
+        journal_repository.save_player(Player(user_id=2))
+        journal_repository.delete_player(2)
+
+        repo = reopen(journal_repository)
+        data = repo.get_all_players()
+        assert data['1']['gold'] == 150
+        assert '2' not in data
+        assert repo.journal_records == 4
+
+    def test_save_players_single_write(self, journal_repository):
+        """Пачка игроков дописывается в журнал разом."""
+        journal_repository.save_players([Player(user_id=1), Player(user_id=2)])
+
+        repo = reopen(journal_repository)
+        assert set(repo.get_all_players()) == {'1', '2'}
+        assert repo.journal_records == 2
+
+    def test_patch_record_for_changed_fields(self, journal_repository):
+        """Для существующего игрока пишутся только изменившиеся поля."""
+        player = Player(user_id=1, gold=10)
+        journal_repository.save_player(player)
+        player.gold = 99
+        journal_repository.save_player(player, changed_fields={'gold'})
+
+        with open(journal_repository.journal_file, encoding='utf-8') as f:
+            last = json.loads(f.read().splitlines()[-1])
+        assert last == {'op': 'patch', 'id': '1', 'data': {'gold': 99}}
+
+        repo = reopen(journal_repository)
+        assert repo.get_player_data(1)['gold'] == 99
+        assert repo.get_player_data(1)['inventory'] == player.inventory
+
+    def test_patch_values_from_record(self, journal_repository):
+        """Значения патча берутся из переданного снимка, а не из игрока."""
+        player = Player(user_id=1, gold=10)
+        journal_repository.save_player(player)
+        player.gold = 20
+        record = player.to_dict()
+        player.gold = 30
+        journal_repository.save_player(player, changed_fields={'gold'}, record=record)
+
+        assert reopen(journal_repository).get_player_data(1)['gold'] == 20
+
+    def test_delete_player_not_exists(self, journal_repository):
+        """Удаление несуществующего игрока ничего не пишет."""
+        assert journal_repository.delete_player(999) is False
+        assert not os.path.exists(journal_repository.journal_file)
+
+    def test_compact_folds_journal_into_snapshot(self, journal_repository):
+        """Компакция переносит журнал в снимок и очищает журнал."""
+        journal_repository.save_player(Player(user_id=1, level=7))
+        journal_repository.save_player(Player(user_id=2, level=8))
+
+        assert journal_repository.compact() is True
+        assert not os.path.exists(journal_repository.journal_file)
+        assert not os.path.exists(journal_repository.rotated_journal_file)
+        assert journal_repository.journal_records == 0
+
+        # Снимок читается обычным DataRepository
+        plain = DataRepository(data_file=journal_repository.data_file)
+        assert plain.get_player_data(1)['level'] == 7
+        assert plain.get_player_data(2)['level'] == 8
+
+    def test_snapshot_plus_tail(self, journal_repository):
+        """Старт проигрывает хвост журнала поверх снимка."""
+        journal_repository.save_player(Player(user_id=1, level=2))
+        journal_repository.compact()
+        journal_repository.save_player(Player(user_id=1, level=3))
+
+        repo = reopen(journal_repository)
+        assert repo.get_player_data(1)['level'] == 3
+        assert repo.journal_records == 1
+
+    def test_auto_compaction_by_threshold(self, temp_data_file):
+        """Компакция запускается при достижении порога."""
+        repo = JournalDataRepository(
+            data_file=temp_data_file,
+            compact_threshold=3,
+            background_compaction=False
+        )
+        for uid in range(3):
+            repo.save_player(Player(user_id=uid))
+
+        assert os.path.exists(repo.data_file)
+        assert repo.journal_records == 0
+        repo.close()
+
+    def test_background_compaction(self, temp_data_file):
+        """Фоновая компакция не теряет записи."""
+        repo = JournalDataRepository(data_file=temp_data_file, compact_threshold=5)
+        for uid in range(23):
+            repo.save_player(Player(user_id=uid))
+        repo.close()
+
+        restored = JournalDataRepository(data_file=temp_data_file)
+        assert len(restored.get_all_players()) == 23
+        restored.close()
+
+    def test_interrupted_compaction_replays_rotated_journal(self, journal_repository):
+        """Отложенный журнал незавершённой компакции проигрывается при старте."""
+        journal_repository.save_player(Player(user_id=1, gold=10))
+        journal_repository.close()
+        os.replace(journal_repository.journal_file, journal_repository.rotated_journal_file)
+
+        repo = JournalDataRepository(data_file=journal_repository.data_file)
+        repo.save_player(Player(user_id=2, gold=20))
+        repo = reopen(repo)
+
+        data = repo.get_all_players()
+        assert data['1']['gold'] == 10
+        assert data['2']['gold'] == 20
+
+    def test_truncated_record_is_skipped(self, journal_repository):
+        """Недописанная последняя строка журнала пропускается."""
+        journal_repository.save_player(Player(user_id=1))
+        journal_repository.close()
+        with open(journal_repository.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op":"put","id":"2","da')
+
+        repo = reopen(journal_repository)
+        assert list(repo.get_all_players()) == ['1']
+
+    def test_save_all_writes_snapshot(self, journal_repository):
+        """save_all пишет полный снимок и сбрасывает журнал."""
+        journal_repository.save_player(Player(user_id=1))
+        assert journal_repository.save_all({"5": {"user_id": 5}}) is True
+        assert not os.path.exists(journal_repository.journal_file)
+
+        repo = reopen(journal_repository)
+        assert list(repo.get_all_players()) == ['5']
+
+
+class TestCreateRepository:
+    """Тесты выбора хранилища."""
+
+    def test_json_backend(self, temp_data_file):
+        """Бэкенд json — обычный DataRepository."""
+        repo = create_repository('json', temp_data_file)
+        assert type(repo) is DataRepository
+
+    def test_journal_backend(self, temp_data_file):
+        """Бэкенд journal — JournalDataRepository."""
+        repo = create_repository('journal', temp_data_file)
+        assert isinstance(repo, JournalDataRepository)
+
+    def test_unknown_backend(self, temp_data_file):
+        """Неизвестный бэкенд — ошибка."""
+        with pytest.raises(ValueError):
+            create_repository('redis', temp_data_file)
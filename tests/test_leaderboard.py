@@ -0,0 +1,90 @@
+"""Тесты индекса рейтинга."""
+import pytest
+from models import Player
+from services import LeaderboardIndex
+
+
+class TestLeaderboardIndex:
+    """Тесты LeaderboardIndex."""
+
+    def test_top_sorted_by_level_then_gold(self):
+        """Топ упорядочен по уровню, затем по золоту."""
+        index = LeaderboardIndex()
+        index.update(1, level=5, gold=100)
+        index.update(2, level=10, gold=200)
+        index.update(3, level=10, gold=300)
+
+        assert index.top(3) == [3, 2, 1]
+        assert index.top(2) == [3, 2]
+
+    def test_update_moves_player(self):
+        """Обновление меняет позицию игрока."""
+        index = LeaderboardIndex()
+        index.update(1, level=1, gold=0)
+        index.update(2, level=2, gold=0)
+        index.update(1, level=3, gold=0)
+
+        assert index.top(10) == [1, 2]
+        assert len(index) == 2
+
+    def test_rank(self):
+        """Место игрока в рейтинге."""
+        index = LeaderboardIndex()
+        index.rebuild([(1, 5, 100), (2, 10, 200), (3, 7, 50)])
+
+        assert index.rank(2) == 1
+        assert index.rank(3) == 2
+        assert index.rank(1) == 3
+        assert index.rank(999) is None
+
+    def test_remove(self):
+        """Удаление игрока из рейтинга."""
+        index = LeaderboardIndex()
+        index.rebuild([(1, 5, 100), (2, 10, 200)])
+        index.remove(2)
+        index.remove(2)
+
+        assert index.top(10) == [1]
+        assert index.rank(1) == 1
+
+
+class TestPlayerServiceLeaderboard:
+    """Тесты рейтинга в PlayerService."""
+
+    def test_rebuild_from_storage(self, fresh_player_service):
+        """Индекс строится по данным хранилища."""
+        fresh_player_service.repository.save_all({
+            "1": {"user_id": 1, "level": 3, "gold": 10},
+            "2": {"user_id": 2, "level": 8, "gold": 10},
+        })
+        fresh_player_service.rebuild_leaderboard()
+
+        top = fresh_player_service.get_top_players(2)
+        assert [uid for uid, _ in top] == ["2", "1"]
+        assert top[0][1].level == 8
+
+    def test_save_updates_index_without_full_scan(self, fresh_player_service):
+        """После построения индекса топ не перебирает всех игроков."""
+        fresh_player_service.rebuild_leaderboard()
+        player = fresh_player_service.get_or_create(5)
+        player.level = 20
+        fresh_player_service.save_player(player)
+
+        fresh_player_service.repository.get_all_players = None  # полный перебор запрещён
+        top = fresh_player_service.get_top_players(1)
+        assert top[0][1] is player
+        assert fresh_player_service.get_player_rank(5) == 1
+
+    @pytest.mark.asyncio
+    async def test_rank_in_write_behind(self, fresh_player_service):
+        """Несохранённые изменения сразу видны в рейтинге."""
+        fresh_player_service.rebuild_leaderboard()
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+        try:
+            fresh_player_service.save_player(Player(user_id=1, level=2))
+            fresh_player_service.save_player(Player(user_id=2, level=9))
+
+            assert await fresh_player_service.aget_player_rank(2) == 1
+            assert await fresh_player_service.aget_player_rank(1) == 2
+        finally:
+            await fresh_player_service.stop_write_behind()
@@ -0,0 +1,148 @@
+"""Тесты журналирования: JSON-записи, прореживание, очередь."""
+import io
+import json
+import logging
+import sys
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aiogram.dispatcher.event.handler import CallableObject
+from middlewares import UpdateLoggingMiddleware
+from services import JsonFormatter, SamplingFilter, parse_logger_levels, setup_logging
+
+
+def make_record(msg="Ошибка при сохранении: %s", args=("disk full",), level=logging.WARNING, **extra):
+    """Запись журнала с дополнительными полями."""
+    record = logging.LogRecord("services.data_repository", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Вернуть корневой логгер в исходное состояние после теста."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestJsonFormatter:
+    """Тесты JsonFormatter."""
+
+    def test_fields_and_extra(self):
+        """В строку попадают сообщение и поля из extra."""
+        line = JsonFormatter().format(make_record(user_id=42, latency_ms=12.5))
+        payload = json.loads(line)
+
+        assert payload['message'] == "Ошибка при сохранении: disk full"
+        assert payload['level'] == "WARNING"
+        assert payload['logger'] == "services.data_repository"
+        assert payload['user_id'] == 42
+        assert payload['latency_ms'] == 12.5
+
+    def test_exception(self):
+        """Исключение записывается отдельным полем."""
+        try:
+            raise OSError("disk full")
+        except OSError:
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "boom", None, sys.exc_info())
+
+        assert "OSError: disk full" in json.loads(JsonFormatter().format(record))['exc']
+
+
+class TestSamplingFilter:
+    """Тесты SamplingFilter."""
+
+    def test_burst_then_suppressed(self):
+        """Сверх лимита одинаковые записи отбрасываются, а их число сообщается позже."""
+        now = [0.0]
+        sampling = SamplingFilter(burst=2, interval=10.0, clock=lambda: now[0])
+
+        passed = [sampling.filter(make_record(args=(i,))) for i in range(5)]
+        now[0] = 10.0
+        record = make_record()
+
+        assert passed == [True, True, False, False, False]
+        assert sampling.filter(record)
+        assert record.suppressed == 3
+
+    def test_different_templates_independent(self):
+        """Разные шаблоны сообщений прореживаются отдельно."""
+        sampling = SamplingFilter(burst=1, interval=10.0, clock=lambda: 0.0)
+
+        assert sampling.filter(make_record("a %s"))
+        assert sampling.filter(make_record("b %s"))
+        assert not sampling.filter(make_record("a %s"))
+
+    def test_max_keys(self):
+        """Закончившиеся окна забываются, когда ключей слишком много."""
+        now = [0.0]
+        sampling = SamplingFilter(burst=1, interval=1.0, max_keys=2, clock=lambda: now[0])
+        sampling.filter(make_record("a"))
+        sampling.filter(make_record("b"))
+        now[0] = 5.0
+
+        sampling.filter(make_record("c"))
+
+        assert len(sampling._windows) == 1
+
+
+def test_parse_logger_levels():
+    """Уровни логгеров разбираются из строки конфигурации."""
+    assert parse_logger_levels("aiogram=warning, services=DEBUG,,bad") == {
+        'aiogram': 'WARNING',
+        'services': 'DEBUG',
+    }
+
+
+def test_setup_logging_queue(restore_root_logger):
+    """Записи проходят через очередь и выводятся JSON-строками."""
+    stream = io.StringIO()
+    listener = setup_logging(level='INFO', logger_levels={'noisy': 'ERROR'}, stream=stream)
+    logging.getLogger("services.test").info("Игрок %d сохранён", 7, extra={'user_id': 7})
+    logging.getLogger("noisy").warning("не попадёт")
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['message'] == "Игрок 7 сохранён"
+    assert json.loads(lines[0])['user_id'] == 7
+
+
+class TestUpdateLoggingMiddleware:
+    """Тесты UpdateLoggingMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_record_fields(self, caplog):
+        """Запись содержит игрока, обработчик из словаря кнопок и время."""
+        async def show_profile():
+            pass
+
+        data = {'event_from_user': Mock(id=42), 'text_handler': CallableObject(show_profile)}
+        with caplog.at_level(logging.DEBUG, logger="middlewares.update_logging"):
+            await UpdateLoggingMiddleware()(AsyncMock(return_value="ok"), Mock(), data)
+
+        record = caplog.records[-1]
+        assert record.levelno == logging.DEBUG
+        assert record.user_id == 42
+        assert record.handler.endswith("show_profile")
+        assert record.latency_ms >= 0
+
+    @pytest.mark.asyncio
+    async def test_slow_is_warning(self, caplog):
+        """Медленная обработка пишется предупреждением даже без DEBUG."""
+        with caplog.at_level(logging.WARNING, logger="middlewares.update_logging"):
+            await UpdateLoggingMiddleware(slow_ms=0)(AsyncMock(), Mock(), {})
+
+        assert caplog.records[-1].levelno == logging.WARNING
+
+    @pytest.mark.asyncio
+    async def test_disabled_level_skipped(self, caplog):
+        """Без DEBUG быстрые события в журнал не попадают."""
+        with caplog.at_level(logging.INFO, logger="middlewares.update_logging"):
+            result = await UpdateLoggingMiddleware()(AsyncMock(return_value="ok"), Mock(), {})
+
+        assert result == "ok"
+        assert caplog.records == []
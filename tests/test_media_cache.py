@@ -0,0 +1,126 @@
+"""Тесты кэша file_id картинок."""
+import threading
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile
+from services import MediaCache
+
+
+@pytest.fixture
+def image(tmp_path):
+    """Картинка во временной директории."""
+    path = tmp_path / "goblin.png"
+    path.write_bytes(b"\x89PNG fake image")
+    return str(path)
+
+
+@pytest.fixture
+def media_cache(tmp_path):
+    """Кэш с файлом во временной директории."""
+    return MediaCache(cache_file=str(tmp_path / "media_cache.json"))
+
+
+def sent_photo(file_id):
+    """Ответ Telegram на отправку фото."""
+    return Mock(photo=[Mock(file_id="small"), Mock(file_id=file_id)])
+
+
+class TestMediaCache:
+    """Тесты MediaCache."""
+
+    @pytest.mark.asyncio
+    async def test_upload_then_file_id(self, media_cache, image):
+        """Файл загружается один раз, дальше отправляется file_id."""
+        message = Mock(answer_photo=AsyncMock(return_value=sent_photo("AgAD123")))
+
+        await media_cache.answer_photo(message, image, caption="Гоблин")
+        await media_cache.answer_photo(message, image, caption="Гоблин")
+        await media_cache.aflush()
+
+        first, second = message.answer_photo.call_args_list
+        assert isinstance(first[0][0], FSInputFile)
+        assert second[0][0] == "AgAD123"
+        assert second[1] == {"caption": "Гоблин"}
+        assert media_cache.stats() == {'entries': 1, 'hits': 1, 'uploads': 1}
+
+    @pytest.mark.asyncio
+    async def test_disk_io_off_event_loop(self, media_cache, image):
+        """Хэш картинки и запись JSON выполняются вне потока event loop."""
+        message = Mock(answer_photo=AsyncMock(return_value=sent_photo("AgAD123")))
+        threads = []
+        file_hash, save = media_cache.file_hash, media_cache._save
+
+        def tracking(func):
+            def wrapper(*args):
+                threads.append(threading.current_thread())
+                return func(*args)
+            return wrapper
+
+        media_cache.file_hash = tracking(file_hash)
+        media_cache._save = tracking(save)
+        await media_cache.answer_photo(message, image)
+        await media_cache.aflush()
+
+        assert len(threads) == 2
+        assert threading.current_thread() not in threads
+        assert MediaCache(cache_file=media_cache.cache_file).get_file_id(image) == "AgAD123"
+
+    def test_persisted(self, media_cache, image):
+        """file_id переживает перезапуск."""
+        media_cache.remember(image, sent_photo("AgAD123"))
+
+        reloaded = MediaCache(cache_file=media_cache.cache_file)
+        assert reloaded.get_file_id(image) == "AgAD123"
+
+    def test_changed_file_reuploaded(self, media_cache, image):
+        """Изменённый файл не отправляется старым file_id."""
+        media_cache.remember(image, sent_photo("AgAD123"))
+        with open(image, 'ab') as f:
+            f.write(b"new pixels")
+
+        assert media_cache.get_file_id(image) is None
+
+    def test_non_string_file_id_ignored(self, media_cache, image):
+        """Ответ без настоящего file_id не запоминается."""
+        media_cache.remember(image, Mock(photo=[Mock()]))
+        media_cache.remember(image, Mock(photo=None))
+
+        assert media_cache.get_file_id(image) is None
+
+    @pytest.mark.asyncio
+    async def test_stale_file_id_reuploaded(self, media_cache, image):
+        """Если Telegram не принял file_id, файл загружается заново."""
+        media_cache.remember(image, sent_photo("expired"))
+        message = Mock(answer_photo=AsyncMock(side_effect=[
+            TelegramBadRequest(method=Mock(), message="wrong file identifier"),
+            sent_photo("AgAD456"),
+        ]))
+
+        await media_cache.answer_photo(message, image)
+        await media_cache.aflush()
+
+        assert isinstance(message.answer_photo.call_args[0][0], FSInputFile)
+        assert media_cache.get_file_id(image) == "AgAD456"
+
+    @pytest.mark.asyncio
+    async def test_resolve_applied(self, tmp_path, image):
+        """Перед отправкой путь подменяется на оптимизированную копию."""
+        variant = str(tmp_path / "goblin.jpg")
+        with open(variant, 'wb') as f:
+            f.write(b"jpeg")
+        cache = MediaCache(cache_file=str(tmp_path / "media.json"), resolve=lambda path: variant)
+        message = Mock(answer_photo=AsyncMock(return_value=sent_photo("AgAD789")))
+
+        await cache.answer_photo(message, image)
+        await cache.aflush()
+
+        assert message.answer_photo.call_args[0][0].path == variant
+        assert cache.get_file_id(variant) == "AgAD789"
+
+    def test_corrupt_cache_file(self, tmp_path):
+        """Повреждённый файл кэша не мешает запуску."""
+        path = tmp_path / "media_cache.json"
+        path.write_text("{oops", encoding='utf-8')
+
+        assert MediaCache(cache_file=str(path)).stats()['entries'] == 0
@@ -0,0 +1,189 @@
+"""Тесты метрик Prometheus и хуков, которые их собирают."""
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallableObject
+from middlewares import HandlerMetricsMiddleware
+from services import (
+    JournalDataRepository,
+    MediaCache,
+    MetricsRegistry,
+    SqliteDataRepository,
+    get_media_cache,
+    instrument_services,
+)
+from services.metrics import create_metrics_app
+
+
+class TestMetricsRegistry:
+    """Тесты MetricsRegistry и текстового формата."""
+
+    def test_histogram_cumulative_buckets(self):
+        """Корзины гистограммы накопительные, есть сумма и количество."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', "Время", ('handler',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, 'profile')
+
+        text = registry.render()
+
+        assert '# TYPE rpg_latency_seconds histogram' in text
+        assert 'rpg_latency_seconds_bucket{handler="profile",le="0.1"} 1' in text
+        assert 'rpg_latency_seconds_bucket{handler="profile",le="1.0"} 2' in text
+        assert 'rpg_latency_seconds_bucket{handler="profile",le="+Inf"} 3' in text
+        assert 'rpg_latency_seconds_sum{handler="profile"} 5.55' in text
+        assert 'rpg_latency_seconds_count{handler="profile"} 3' in text
+
+    def test_label_escaping(self):
+        """Кавычки и переводы строк в значениях меток экранируются."""
+        registry = MetricsRegistry()
+        registry.counter('errors_total', "Ошибки", ('handler',)).inc(2, 'say "hi"\n')
+
+        assert 'rpg_errors_total{handler="say \\"hi\\"\\n"} 2.0' in registry.render()
+
+    def test_wrong_labels(self):
+        """Неверное число меток — ошибка, а не молча потерянная метрика."""
+        counter = MetricsRegistry().counter('errors_total', "Ошибки", ('handler',))
+
+        with pytest.raises(ValueError):
+            counter.inc(1)
+
+    def test_same_name_returns_existing(self):
+        """Повторная регистрация возвращает уже созданную метрику."""
+        registry = MetricsRegistry()
+
+        assert registry.counter('x_total', "X") is registry.counter('x_total', "X")
+
+    def test_register_stats(self):
+        """Числовые поля stats() становятся показателями, вычисляемыми при опросе."""
+        stats = {'hits': 1, 'hit_ratio': 0.5, 'name': 'cache'}
+        registry = MetricsRegistry()
+        registry.register_stats('player_cache', "Кэш", lambda: stats)
+        stats['hits'] = 7
+
+        text = registry.render()
+
+        assert 'rpg_player_cache_hits 7.0' in text
+        assert 'rpg_player_cache_hit_ratio 0.5' in text
+        assert 'rpg_player_cache_name' not in text
+
+
+@pytest.mark.parametrize('make_repository, full_operation', [
+    (lambda tmp_path: SqliteDataRepository(data_file=str(tmp_path / "players.db")), 'save_all'),
+    (lambda tmp_path: JournalDataRepository(data_file=str(tmp_path / "players.json"),
+                                            background_compaction=False), 'save_all'),
+])
+def test_repository_write_hook(tmp_path, test_player, make_repository, full_operation):
+    """Хранилище сообщает время и объём каждой записи."""
+    repository = make_repository(tmp_path)
+    writes = []
+    repository.write_hook = lambda operation, seconds, size: writes.append((operation, seconds, size))
+
+    repository.save_all({'1': {'user_id': 1, 'level': 2}})
+    repository.save_player(test_player)
+    repository.close()
+
+    assert [operation for operation, _, _ in writes] == [full_operation, 'append']
+    assert all(seconds >= 0 and size > 0 for _, seconds, size in writes)
+
+
+def test_json_repository_write_hook(test_repository, test_player):
+    """Файл JSON переписывается целиком — размер равен размеру файла."""
+    writes = []
+    test_repository.write_hook = lambda operation, seconds, size: writes.append((operation, size))
+
+    test_repository.save_player(test_player)
+
+    with open(test_repository.data_file, 'rb') as f:
+        assert writes == [('save_all', len(f.read()))]
+
+
+@pytest.mark.asyncio
+async def test_media_send_hook(tmp_path):
+    """Время отправки картинки передаётся с источником: загрузка или file_id."""
+    image = tmp_path / "goblin.png"
+    image.write_bytes(b"\x89PNG fake image")
+    media_cache = MediaCache(cache_file=str(tmp_path / "media_cache.json"))
+    sends = []
+    media_cache.send_hook = lambda source, seconds: sends.append(source)
+    message = Mock(answer_photo=AsyncMock(return_value=Mock(photo=[Mock(file_id="AgAD")])))
+
+    await media_cache.answer_photo(message, str(image))
+    await media_cache.answer_photo(message, str(image))
+
+    assert sends == ['upload', 'file_id']
+
+
+def test_active_battles(fresh_player_service, test_battle_state):
+    """В бою считаются только загруженные игроки с battle_state."""
+    fresh_player_service.get_or_create(1).battle_state = test_battle_state
+    fresh_player_service.get_or_create(2)
+
+    assert fresh_player_service.active_battles() == 1
+
+
+def test_instrument_services(fresh_player_service, test_player):
+    """Запись хранилища попадает в метрики с именем бэкенда."""
+    registry = MetricsRegistry()
+    instrument_services(registry, fresh_player_service)
+    try:
+        fresh_player_service.repository.save_player(test_player)
+        text = registry.render()
+    finally:
+        get_media_cache().send_hook = None
+
+    assert 'rpg_storage_write_seconds_count{backend="json",operation="save_all"} 1' in text
+    assert 'rpg_storage_written_bytes_total{backend="json",operation="save_all"}' in text
+    assert 'rpg_active_battles 0.0' in text
+    assert 'rpg_player_cache_hit_ratio' in text
+
+
+class TestHandlerMetricsMiddleware:
+    """Тесты HandlerMetricsMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_labels_router_and_handler(self):
+        """Время пишется с роутером модуля обработчика, а не общего роутера кнопок."""
+        from handlers.profile import show_profile
+        from handlers.shop_handlers import callback_shop_main
+
+        registry = MetricsRegistry()
+        middleware = HandlerMetricsMiddleware(registry)
+        await middleware(AsyncMock(), Mock(), {
+            'event_router': Router(name="text_commands"), 'text_handler': CallableObject(show_profile),
+        })
+        await middleware(AsyncMock(), Mock(), {
+            'event_router': Router(name="callbacks"), 'callback_handler': CallableObject(callback_shop_main),
+        })
+
+        text = registry.render()
+        assert 'rpg_handler_latency_seconds_count{router="profile",handler="show_profile"} 1' in text
+        assert 'rpg_handler_latency_seconds_count{router="shop",handler="callback_shop_main"} 1' in text
+
+    @pytest.mark.asyncio
+    async def test_error_counted(self):
+        """Исключение обработчика учитывается и пробрасывается дальше."""
+        registry = MetricsRegistry()
+        middleware = HandlerMetricsMiddleware(registry)
+
+        with pytest.raises(RuntimeError):
+            await middleware(AsyncMock(side_effect=RuntimeError), Mock(), {})
+
+        assert middleware.errors.value('unknown', 'unknown') == 1
+        assert middleware.latency.count('unknown', 'unknown') == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """GET /metrics отдаёт текстовый формат Prometheus."""
+    registry = MetricsRegistry()
+    registry.gauge_func('active_battles', "Бои", lambda: 3)
+
+    async with TestClient(TestServer(create_metrics_app(registry))) as client:
+        response = await client.get('/metrics')
+        body = await response.text()
+
+    assert response.status == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'rpg_active_battles 3.0' in body
@@ -345,3 +345,65 @@ class TestStoryChapter:
         )
         assert chapter.is_unlocked(1) is False
         assert chapter.is_unlocked(4) is False
+
+
+class TestDirtyTracking:
+    """Тесты отслеживания изменений моделей."""
+
+    def test_new_player_is_dirty(self):
+        """Новый игрок ещё не сохранён."""
+        player = Player(user_id=1)
+        assert player.is_dirty() is True
+        assert "gold" in player.dirty_fields()
+
+    def test_loaded_player_is_clean(self, test_player):
+        """Загруженный игрок совпадает с сохранённым."""
+        player = Player.from_dict(test_player.to_dict())
+        assert player.is_dirty() is False
+        assert player.dirty_fields() == set()
+
+    def test_field_assignment(self, test_player):
+        """Присваивание поля отмечается."""
+        test_player.mark_clean()
+        test_player.gold += 5
+        assert test_player.dirty_fields() == {"gold"}
+
+    def test_in_place_list_mutation(self, test_player):
+        """Изменение списка на месте отмечается."""
+        test_player.mark_clean()
+        test_player.inventory.append("Стальной меч")
+        test_player.potions["health_potion"] = 1
+        assert test_player.dirty_fields() == {"inventory", "potions"}
+
+    def test_nested_objects(self, player_in_battle):
+        """Изменения вложенных объектов видны и на игроке, и на самом объекте."""
+        from models import StoryProgress
+        player_in_battle.story_progress = StoryProgress()
+        player_in_battle.mark_clean()
+        assert player_in_battle.battle_state.is_dirty() is False
+
+        player_in_battle.battle_state.monster_hp -= 3
+        player_in_battle.equipment.weapon = "Стальной меч"
+        player_in_battle.quests["daily"].kills += 1
+        player_in_battle.story_progress.defeat_boss("Вожак гоблинов")
+
+        assert player_in_battle.dirty_fields() == {"battle_state", "equipment", "quests", "story_progress"}
+        assert player_in_battle.battle_state.dirty_fields() == {"monster_hp"}
+        assert player_in_battle.equipment.dirty_fields() == {"weapon"}
+        assert player_in_battle.quests["daily"].dirty_fields() == {"kills"}
+        assert player_in_battle.story_progress.dirty_fields() == {"boss_defeated"}
+
+    def test_mark_clean_with_saved_state(self, test_player):
+        """Изменения после снятия снимка остаются несохранёнными."""
+        state = test_player.to_dict()
+        test_player.gold += 1
+        test_player.mark_clean(state)
+        assert test_player.dirty_fields() == {"gold"}
+
+    def test_to_dict_does_not_alias_lists(self, test_player):
+        """to_dict возвращает копии списков и словарей."""
+        data = test_player.to_dict()
+        data["inventory"].append("X")
+        data["potions"]["health"] = 99
+        assert "X" not in test_player.inventory
+        assert test_player.potions["health"] == 0
@@ -0,0 +1,144 @@
+"""Тесты LRU-кэша игроков."""
+import pytest
+from unittest.mock import patch
+from models import Player
+from services import PlayerCache, PlayerService
+from services.player_cache import estimate_player_size
+
+
+class TestPlayerCache:
+    """Тесты PlayerCache."""
+
+    def test_get_miss_and_hit(self):
+        """Промахи и попадания считаются."""
+        cache = PlayerCache(max_entries=10)
+        assert cache.get(1) is None
+
+        player = Player(user_id=1)
+        cache.put(player)
+        assert cache.get(1) is player
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        """Вытесняется давно не использовавшийся игрок."""
+        cache = PlayerCache(max_entries=2)
+        cache.put(Player(user_id=1))
+        cache.put(Player(user_id=2))
+        cache.get(1)
+        cache.put(Player(user_id=3))
+
+        assert 1 in cache
+        assert 2 not in cache
+        assert 3 in cache
+        assert cache.stats()['evictions'] == 1
+
+    def test_on_evict_called(self):
+        """Перед вытеснением вызывается обработчик."""
+        evicted = []
+        cache = PlayerCache(max_entries=1, on_evict=evicted.append)
+        first = Player(user_id=1)
+        cache.put(first)
+        cache.put(Player(user_id=2))
+
+        assert evicted == [first]
+
+    def test_byte_budget(self):
+        """Лимит по объёму вытесняет игроков."""
+        size = estimate_player_size(Player(user_id=1))
+        cache = PlayerCache(max_entries=0, max_bytes=size * 2 + size // 2)
+        for uid in range(1, 5):
+            cache.put(Player(user_id=uid))
+
+        assert len(cache) == 2
+        assert cache.size_bytes <= cache.max_bytes
+
+    def test_peek_does_not_touch_stats(self):
+        """peek не влияет на статистику и порядок."""
+        cache = PlayerCache(max_entries=2)
+        cache.put(Player(user_id=1))
+        cache.put(Player(user_id=2))
+        cache.peek(1)
+        cache.put(Player(user_id=3))
+
+        assert 1 not in cache
+        assert cache.stats()['hits'] == 0
+
+    def test_pop_and_clear(self):
+        """Удаление и очистка."""
+        cache = PlayerCache(max_entries=10, max_bytes=10 ** 6)
+        cache.put(Player(user_id=1))
+        cache.put(Player(user_id=2))
+
+        assert cache.pop(1).user_id == 1
+        assert cache.pop(1) is None
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+
+class TestPlayerServiceEviction:
+    """Тесты вытеснения в PlayerService."""
+
+    @pytest.mark.asyncio
+    async def test_dirty_player_queued_on_eviction(self, fresh_player_service):
+        """Несохранённый вытесняемый игрок уходит в очередь записи, без записи на месте."""
+        fresh_player_service._cache.max_entries = 1
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+        try:
+            player = Player(user_id=1, gold=555)
+            fresh_player_service.save_player(player)
+            fresh_player_service.save_player(Player(user_id=2))
+
+            assert 1 not in fresh_player_service._cache
+            assert fresh_player_service.repository.get_player_data(1) is None
+            assert fresh_player_service.dirty_count == 2
+            # Пока игрок не записан, загрузка возвращает его же, а не данные хранилища
+            assert fresh_player_service.get_or_create(1) is player
+
+            await fresh_player_service.aflush()
+            assert fresh_player_service.repository.get_player_data(1)["gold"] == 555
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    @pytest.mark.asyncio
+    async def test_evicted_dirty_player_flushed_after_save(self, fresh_player_service):
+        """Без отложенной записи вытесненного игрока записывает следующее сохранение."""
+        fresh_player_service._cache.max_entries = 1
+        player = await fresh_player_service.aget_or_create(1)
+        player.gold = 777
+        with patch.object(fresh_player_service.repository, 'save_records',
+                          wraps=fresh_player_service.repository.save_records) as save_records:
+            await fresh_player_service.aget_or_create(2)
+            save_records.assert_not_called()
+
+            await fresh_player_service.asave_player(await fresh_player_service.aget_or_create(2))
+
+        assert fresh_player_service.dirty_count == 0
+        assert fresh_player_service.repository.get_player_data(1)["gold"] == 777
+        assert not player.is_dirty()
+
+    def test_evicted_player_reloaded(self, fresh_player_service):
+        """Вытесненный игрок загружается из хранилища заново."""
+        fresh_player_service._cache.max_entries = 1
+        player = fresh_player_service.get_or_create(1)
+        player.level = 4
+        fresh_player_service.save_player(player)
+        fresh_player_service.get_or_create(2)
+
+        reloaded = fresh_player_service.get_or_create(1)
+        assert reloaded is not player
+        assert reloaded.level == 4
+
+    def test_cache_stats(self, fresh_player_service):
+        """Сервис отдаёт статистику кэша."""
+        fresh_player_service.get_or_create(1)
+        fresh_player_service.get_or_create(1)
+
+        stats = fresh_player_service.cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
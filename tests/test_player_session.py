@@ -0,0 +1,83 @@
+"""Тесты загрузки и сохранения игрока на время события."""
+import pytest
+from unittest.mock import Mock, patch
+from middlewares import PlayerSessionMiddleware
+
+
+@pytest.fixture
+def middleware(fresh_player_service):
+    """Middleware поверх сервиса с временным хранилищем."""
+    return PlayerSessionMiddleware(fresh_player_service)
+
+
+class TestPlayerSessionMiddleware:
+    """Тесты PlayerSessionMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_player_passed_and_saved_once(self, middleware, fresh_player_service):
+        """Обработчик получает игрока, изменения сохраняются один раз."""
+        async def handler(event, data):
+            data['player'].gold = 70
+            data['player'].hp = 40
+            return "ok"
+
+        with patch.object(fresh_player_service, 'asave_player', wraps=fresh_player_service.asave_player) as save:
+            result = await middleware(handler, Mock(), {'event_from_user': Mock(id=42)})
+
+        assert result == "ok"
+        save.assert_awaited_once()
+        stored = fresh_player_service.repository.get_player_data(42)
+        assert (stored['gold'], stored['hp']) == (70, 40)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_player_not_saved(self, middleware, fresh_player_service):
+        """Без изменений игрок не записывается."""
+        player = await fresh_player_service.aget_or_create(42)
+        await fresh_player_service.asave_player(player)
+
+        async def handler(event, data):
+            return data['player'].gold
+
+        with patch.object(fresh_player_service, 'asave_player') as save:
+            await middleware(handler, Mock(), {'event_from_user': Mock(id=42)})
+
+        save.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_saved_when_handler_fails(self, middleware, fresh_player_service):
+        """Изменения сохраняются, даже если обработчик упал после них."""
+        async def handler(event, data):
+            data['player'].gold = 999
+            raise RuntimeError("telegram недоступен")
+
+        with pytest.raises(RuntimeError):
+            await middleware(handler, Mock(), {'event_from_user': Mock(id=42)})
+
+        assert fresh_player_service.repository.get_player_data(42)['gold'] == 999
+
+    @pytest.mark.asyncio
+    async def test_single_snapshot_per_update(self, middleware, fresh_player_service):
+        """На событие с изменениями игрок сериализуется один раз."""
+        player = await fresh_player_service.aget_or_create(42)
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+
+        async def handler(event, data):
+            data['player'].gold = 5
+
+        try:
+            with patch.object(player, 'to_dict', wraps=player.to_dict) as to_dict:
+                await middleware(handler, Mock(), {'event_from_user': Mock(id=42)})
+            assert to_dict.call_count == 1
+            assert fresh_player_service.dirty_count == 1
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    @pytest.mark.asyncio
+    async def test_event_without_user(self, middleware):
+        """События без отправителя проходят без игрока."""
+        data = {}
+
+        async def handler(event, data):
+            return 'player' in data
+
+        assert await middleware(handler, Mock(), data) is False
@@ -0,0 +1,103 @@
+"""Тесты сэмплирующего профилировщика и команды /profile."""
+import asyncio
+import sys
+from collections import Counter
+import pytest
+import config
+from handlers.admin_handlers import format_profile_report, parse_profile_seconds
+from services import ProfileReport, SamplingProfiler
+from services.sampling_profiler import collapse_stack
+
+IDLE = ('asyncio.base_events:BaseEventLoop.run_forever', 'selectors:EpollSelector.select')
+HOT = ('asyncio.base_events:BaseEventLoop.run_forever', 'services.player_service:PlayerService.get_top_players',
+       'models.player:Player.from_dict')
+SAVE = ('asyncio.base_events:BaseEventLoop.run_forever', 'services.data_repository:DataRepository.save_all')
+
+
+def make_report() -> ProfileReport:
+    """Профиль с простоем и двумя горячими стеками."""
+    return ProfileReport(seconds=1.0, samples=10, idle_samples=4, stacks=Counter({IDLE: 4, HOT: 5, SAVE: 1}))
+
+
+def test_collapse_stack_labels():
+    """Стек идёт от корня к текущей функции, подписи — модуль и qualname."""
+    stack = collapse_stack(sys._getframe())
+
+    assert stack[-1] == f"{__name__}:test_collapse_stack_labels"
+    assert len(stack) > 1
+
+
+class TestProfileReport:
+    """Тесты ProfileReport."""
+
+    def test_folded(self, tmp_path):
+        """Свёрнутые стеки записываются строками «стек количество»."""
+        path = make_report().write_folded(str(tmp_path / "out" / "profile.folded"))
+
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert lines[0] == ';'.join(HOT) + " 5"
+        assert len(lines) == 3
+
+    def test_top_skips_idle(self):
+        """В сводке нет простоя, вызывающие функции учитываются в «всего»."""
+        top = {hot.name: hot for hot in make_report().top()}
+
+        assert 'selectors:EpollSelector.select' not in top
+        assert top['models.player:Player.from_dict'].self_samples == 5
+        assert top['services.player_service:PlayerService.get_top_players'].self_samples == 0
+        assert top['services.player_service:PlayerService.get_top_players'].total_samples == 5
+        assert top['asyncio.base_events:BaseEventLoop.run_forever'].total_samples == 6
+
+    def test_format(self):
+        """Сводка для администратора начинается с самой горячей функции."""
+        text = format_profile_report(make_report())
+
+        assert "занят в 6 (60%)" in text
+        assert text.splitlines()[3].endswith("models.player:Player.from_dict")
+
+
+class TestSamplingProfiler:
+    """Тесты SamplingProfiler."""
+
+    @pytest.mark.asyncio
+    async def test_profile_loop_sees_busy_code(self):
+        """Замер видит код, который блокирует цикл событий."""
+        def busy_wait(seconds: float) -> None:
+            deadline = asyncio.get_running_loop().time() + seconds
+            while asyncio.get_running_loop().time() < deadline:
+                pass
+
+        async def busy():
+            await asyncio.sleep(0.02)
+            busy_wait(0.15)
+
+        profiler = SamplingProfiler(interval=0.002)
+        report, _ = await asyncio.gather(profiler.profile_loop(0.3), busy())
+
+        assert report.samples > 0
+        assert any(hot.name.endswith("busy_wait") for hot in report.top())
+        assert not profiler.running
+
+    @pytest.mark.asyncio
+    async def test_single_run(self):
+        """Второй замер во время первого не запускается."""
+        profiler = SamplingProfiler(interval=0.01)
+        first = asyncio.create_task(profiler.profile_loop(0.1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(RuntimeError):
+            await profiler.profile_loop(0.1)
+        await first
+
+
+@pytest.mark.parametrize('args, expected', [
+    (None, 30),
+    ("5", 5),
+    ("0", None),
+    ("abc", None),
+    (str(config.PROFILE_MAX_SECONDS + 1), None),
+])
+def test_parse_profile_seconds(args, expected):
+    """Длительность по умолчанию 30 с, вне пределов — ошибка."""
+    assert parse_profile_seconds(args) == expected
@@ -1,6 +1,8 @@
 """Тесты для сервисов (DataRepository, PlayerService)."""
+import asyncio
 import os
 import pytest
+from unittest.mock import patch
 from models import Player
 from services import DataRepository, PlayerService, get_player_service
 
@@ -170,6 +172,53 @@ class TestPlayerService:
         data = fresh_player_service.repository.get_player_data(666)
         assert data["level"] == 10
 
+    def test_get_or_create_new_player_not_written(self, fresh_player_service):
+        """Новый игрок не пишется в хранилище до первого сохранения."""
+        player = fresh_player_service.get_or_create(998)
+        assert fresh_player_service.repository.get_player_data(998) is None
+
+        fresh_player_service.save_player(player)
+        assert fresh_player_service.repository.get_player_data(998) is not None
+
+    def test_save_unchanged_player_is_noop(self, fresh_player_service):
+        """Сохранение неизменённого игрока не обращается к хранилищу."""
+        player = fresh_player_service.get_or_create(997)
+        fresh_player_service.save_player(player)
+
+        with patch.object(fresh_player_service.repository, 'save_player') as save:
+            assert fresh_player_service.save_player(player) is True
+            save.assert_not_called()
+
+            player.gold += 1
+            fresh_player_service.save_player(player)
+            save.assert_called_once_with(player, changed_fields={"gold"}, record=player.to_dict())
+
+    def test_failed_save_keeps_player_dirty(self, fresh_player_service):
+        """Неудачная запись не сбрасывает признак изменений."""
+        player = fresh_player_service.get_or_create(996)
+        with patch.object(fresh_player_service.repository, 'save_player', return_value=False):
+            assert fresh_player_service.save_player(player) is False
+        assert player.is_dirty() is True
+
+    def test_save_writes_the_snapshot_marked_clean(self, fresh_player_service):
+        """В хранилище уходит тот же снимок, что помечается сохранённым."""
+        player = fresh_player_service.get_or_create(995)
+        fresh_player_service.save_player(player)
+        repository = fresh_player_service.repository
+        save = repository.save_player
+
+        def change_during_write(*args, **kwargs):
+            # Обработчик меняет игрока, пока идёт запись
+            player.gold += 100
+            return save(*args, **kwargs)
+
+        player.gold = 10
+        with patch.object(repository, 'save_player', side_effect=change_during_write):
+            assert fresh_player_service.save_player(player) is True
+
+        assert repository.get_player_data(995)['gold'] == 10
+        assert player.dirty_fields() == {"gold"}
+
     def test_update_player_single_field(self, fresh_player_service):
         """Обновление одного поля."""
         player = fresh_player_service.update_player(555, level=7)
@@ -263,3 +312,219 @@ class TestPlayerService:
         PlayerService._instance = None
         service = get_player_service()
         assert isinstance(service, PlayerService)
+
+
+class TestWriteBehind:
+    """Тесты отложенной пакетной записи."""
+
+    @pytest.mark.asyncio
+    async def test_save_marks_dirty_without_writing(self, fresh_player_service):
+        """В режиме write-behind сохранение не пишет в хранилище сразу."""
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+        try:
+            player = fresh_player_service.get_or_create(1)
+            player.gold = 999
+            assert fresh_player_service.save_player(player) is True
+
+            assert fresh_player_service.dirty_count == 1
+            assert fresh_player_service.repository.get_player_data(1) is None
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_dirty_players(self, fresh_player_service):
+        """Остановка сбрасывает все изменения."""
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+        for uid in range(3):
+            player = fresh_player_service.get_or_create(uid)
+            player.level = uid + 5
+            fresh_player_service.save_player(player)
+
+        await fresh_player_service.stop_write_behind()
+
+        assert fresh_player_service.write_behind is False
+        assert fresh_player_service.dirty_count == 0
+        assert fresh_player_service.repository.get_player_data(2)["level"] == 7
+
+    @pytest.mark.asyncio
+    async def test_flush_by_interval(self, fresh_player_service):
+        """Фоновая задача сбрасывает изменения по таймеру."""
+        fresh_player_service.start_write_behind(interval_ms=10, max_dirty=100)
+        try:
+            player = fresh_player_service.get_or_create(1)
+            player.gold = 321
+            fresh_player_service.save_player(player)
+            await asyncio.sleep(0.05)
+
+            assert fresh_player_service.dirty_count == 0
+            assert fresh_player_service.repository.get_player_data(1)["gold"] == 321
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    @pytest.mark.asyncio
+    async def test_flush_by_dirty_count(self, fresh_player_service):
+        """Достижение лимита изменённых игроков запускает сброс."""
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=2)
+        try:
+            with patch.object(
+                fresh_player_service.repository, 'save_records',
+                wraps=fresh_player_service.repository.save_records
+            ) as save_records:
+                fresh_player_service.save_player(Player(user_id=1))
+                fresh_player_service.save_player(Player(user_id=2))
+                await asyncio.sleep(0.01)
+
+                save_records.assert_called_once()
+                assert fresh_player_service.dirty_count == 0
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    @pytest.mark.asyncio
+    async def test_flush_snapshots_on_loop_thread(self, fresh_player_service):
+        """Снимки игроков берутся в потоке event loop, в пул уходят словари."""
+        import threading
+        player = Player(user_id=1, gold=42)
+        fresh_player_service._dirty[1] = player
+        snapshot_threads = []
+        original = player.to_dict
+
+        def tracking_to_dict():
+            snapshot_threads.append(threading.current_thread())
+            return original()
+
+        with patch.object(player, 'to_dict', side_effect=tracking_to_dict), \
+             patch.object(fresh_player_service.repository, 'save_records',
+                          wraps=fresh_player_service.repository.save_records) as save_records:
+            assert await fresh_player_service.aflush() is True
+
+        assert snapshot_threads == [threading.current_thread()]
+        assert save_records.call_args[0][0] == {"1": original()}
+        assert not player.is_dirty()
+
+    def test_flush_failure_keeps_players_dirty(self, fresh_player_service):
+        """При ошибке записи игроки остаются в очереди."""
+        fresh_player_service._dirty[1] = Player(user_id=1)
+        with patch.object(fresh_player_service.repository, 'save_records', return_value=False):
+            assert fresh_player_service.flush() is False
+        assert fresh_player_service.dirty_count == 1
+        fresh_player_service._dirty.clear()
+
+    @pytest.mark.asyncio
+    async def test_flush_loop_survives_write_error(self, fresh_player_service):
+        """Исключение при записи не останавливает фоновую задачу и не теряет игроков."""
+        original = fresh_player_service.repository.save_records
+        calls = []
+
+        def failing_once(records):
+            calls.append(records)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            return original(records)
+
+        fresh_player_service.start_write_behind(interval_ms=10, max_dirty=100)
+        try:
+            with patch.object(fresh_player_service.repository, 'save_records', side_effect=failing_once):
+                fresh_player_service.save_player(Player(user_id=1, gold=7))
+                await asyncio.sleep(0.1)
+
+            assert len(calls) >= 2
+            assert not fresh_player_service._flush_task.done()
+            assert not fresh_player_service._writing
+            assert fresh_player_service.dirty_count == 0
+            assert fresh_player_service.repository.get_player_data(1)["gold"] == 7
+        finally:
+            await fresh_player_service.stop_write_behind()
+
+    def test_save_players_batch(self, test_repository):
+        """Репозиторий сохраняет пачку игроков одной записью."""
+        with patch.object(test_repository, 'save_all', wraps=test_repository.save_all) as save_all:
+            assert test_repository.save_players([Player(user_id=1), Player(user_id=2)]) is True
+            save_all.assert_called_once()
+        assert set(test_repository.get_all_players()) == {"1", "2"}
+
+    @pytest.mark.asyncio
+    async def test_save_does_not_wait_for_running_flush(self, fresh_player_service):
+        """Пока сброс пишет на диск, сохранение в event loop не ждёт его."""
+        import threading
+        import time
+        started, release = threading.Event(), threading.Event()
+        original = fresh_player_service.repository.save_records
+
+        def slow_save_records(records):
+            started.set()
+            release.wait(5)
+            return original(records)
+
+        fresh_player_service.start_write_behind(interval_ms=60_000, max_dirty=100)
+        try:
+            with patch.object(fresh_player_service.repository, 'save_records', side_effect=slow_save_records):
+                fresh_player_service.save_player(Player(user_id=1))
+                flush = asyncio.create_task(fresh_player_service.aflush())
+                await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+                begin = time.perf_counter()
+                assert await fresh_player_service.asave_player(Player(user_id=2)) is True
+                assert time.perf_counter() - begin < 0.1
+
+                release.set()
+                assert await flush is True
+        finally:
+            release.set()
+            await fresh_player_service.stop_write_behind()
+        assert fresh_player_service.repository.get_player_data(2) is not None
+
+
+class TestAsyncFacade:
+    """Тесты асинхронного фасада PlayerService."""
+
+    @pytest.mark.asyncio
+    async def test_aget_or_create_runs_in_executor(self, fresh_player_service):
+        """Загрузка из хранилища выполняется в пуле потоков."""
+        import threading
+        threads = []
+        original = fresh_player_service.repository.get_player_data
+
+        def tracking_get(user_id):
+            threads.append(threading.current_thread().name)
+            return original(user_id)
+
+        with patch.object(fresh_player_service.repository, 'get_player_data', side_effect=tracking_get):
+            player = await fresh_player_service.aget_or_create(10)
+
+        assert player.user_id == 10
+        assert threads and threads[0].startswith('storage-io')
+
+    @pytest.mark.asyncio
+    async def test_aget_or_create_cache_hit(self, fresh_player_service):
+        """Игрок из кэша возвращается без обращения к пулу потоков."""
+        player = fresh_player_service.get_or_create(11)
+        with patch.object(fresh_player_service, '_run_io') as run_io:
+            assert await fresh_player_service.aget_or_create(11) is player
+            run_io.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_asave_player(self, fresh_player_service):
+        """Асинхронное сохранение пишет игрока в хранилище."""
+        player = await fresh_player_service.aget_or_create(12)
+        player.gold = 77
+        assert await fresh_player_service.asave_player(player) is True
+        assert fresh_player_service.repository.get_player_data(12)["gold"] == 77
+
+    @pytest.mark.asyncio
+    async def test_aget_top_players(self, fresh_player_service):
+        """Асинхронный топ игроков."""
+        player = await fresh_player_service.aget_or_create(13)
+        player.level = 9
+        await fresh_player_service.asave_player(player)
+
+        top = await fresh_player_service.aget_top_players(1)
+        assert top[0][1].user_id == 13
+
+    @pytest.mark.asyncio
+    async def test_aclose_shuts_down_executor(self, fresh_player_service):
+        """aclose останавливает пул и закрывает хранилище."""
+        await fresh_player_service.aget_or_create(14)
+        with patch.object(fresh_player_service.repository, 'close') as close:
+            await fresh_player_service.aclose()
+            close.assert_called_once()
+        assert fresh_player_service._executor is None
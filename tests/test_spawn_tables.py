@@ -0,0 +1,94 @@
+"""Тесты таблиц появления монстров."""
+import random
+from collections import Counter
+import pytest
+from data import LOCATIONS, MONSTER_TEMPLATES
+from game_logic.battle import create_battle_state
+from game_logic.spawn_tables import AliasTable, SpawnTables
+from models import Location, MonsterTemplate
+
+
+def template(key: str, min_level: int = 1, max_level: int = 100, spawn_weight: float = 1.0) -> MonsterTemplate:
+    """Шаблон монстра для тестов."""
+    return MonsterTemplate(
+        key=key, name=key, hp=20, power=8, exp=10, gold_min=1, gold_max=2,
+        min_level=min_level, max_level=max_level, spawn_weight=spawn_weight,
+    )
+
+
+def location(*enemies: str) -> Location:
+    """Локация с заданными врагами."""
+    return Location(key="test", name="Тест", emoji="", enemies=list(enemies), description="")
+
+
+class TestAliasTable:
+    """Тесты AliasTable."""
+
+    def test_distribution_follows_weights(self):
+        """Частоты выбора пропорциональны весам."""
+        weights = [1, 2, 7]
+        table = AliasTable(weights)
+        rng = random.Random(42)
+
+        counts = Counter(table.sample(rng) for _ in range(50000))
+
+        for index, weight in enumerate(weights):
+            assert counts[index] / 50000 == pytest.approx(weight / sum(weights), abs=0.01)
+
+    def test_single(self):
+        """Единственный вариант выбирается всегда."""
+        assert {AliasTable([3.0]).sample() for _ in range(100)} == {0}
+
+    def test_no_positive_weights(self):
+        """Без положительных весов таблицу построить нельзя."""
+        with pytest.raises(ValueError):
+            AliasTable([0, 0])
+
+
+class TestSpawnTables:
+    """Тесты SpawnTables."""
+
+    def test_matches_level_filter(self):
+        """Для каждого уровня в таблице ровно доступные по уровню монстры."""
+        tables = SpawnTables(LOCATIONS, MONSTER_TEMPLATES)
+
+        for key, loc in LOCATIONS.items():
+            for level in range(1, 130):
+                expected = {enemy for enemy in loc.enemies if MONSTER_TEMPLATES[enemy].is_available_for_level(level)}
+                table = tables.table(key, level)
+                actual = {t.key for t in table.templates} if table else set()
+                assert actual == expected, (key, level)
+
+    def test_any_level_fallback(self):
+        """Если по уровню никого нет, с allow_any_level берётся любой монстр локации."""
+        tables = SpawnTables({"test": location("rat")}, {"rat": template("rat", max_level=5)})
+
+        assert tables.spawn("test", 10) is None
+        assert tables.spawn("test", 10, allow_any_level=True).key == "rat"
+
+    def test_zero_weight_never_spawns(self):
+        """Монстр с нулевым весом не появляется."""
+        templates = {"rat": template("rat"), "ghost": template("ghost", spawn_weight=0)}
+        tables = SpawnTables({"test": location("rat", "ghost")}, templates)
+
+        assert {tables.spawn("test", 1).key for _ in range(200)} == {"rat"}
+
+    def test_elite(self):
+        """Элитный монстр сильнее, а флаг попадает в состояние боя."""
+        tables = SpawnTables(
+            {"test": location("rat")}, {"rat": template("rat")},
+            elite_chance=1.0, elite_hp_multiplier=1.5, elite_power_multiplier=1.25,
+        )
+
+        monster = tables.spawn("test", 1)
+
+        assert monster.is_elite
+        assert (monster.hp, monster.max_hp, monster.power) == (30, 30, 10)
+        assert create_battle_state(monster, is_elite=monster.is_elite).is_elite
+
+    def test_unknown_location(self):
+        """Неизвестная локация и мирная деревня — без монстров."""
+        tables = SpawnTables(LOCATIONS, MONSTER_TEMPLATES)
+
+        assert tables.spawn("nowhere", 1, allow_any_level=True) is None
+        assert tables.spawn("village", 1, allow_any_level=True) is None
@@ -0,0 +1,142 @@
+"""Тесты SQLite-хранилища."""
+import pytest
+from models import Player
+from services import (
+    DataRepository,
+    PlayerService,
+    SqliteDataRepository,
+    create_repository,
+    migrate_json_to_sqlite,
+)
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path):
+    """SQLite-репозиторий во временной директории."""
+    repo = SqliteDataRepository(data_file=str(tmp_path / "players.db"))
+    yield repo
+    repo.close()
+
+
+class TestSqliteDataRepository:
+    """Тесты SQLite-репозитория."""
+
+    def test_wal_mode(self, sqlite_repository):
+        """База открыта в режиме WAL."""
+        mode = sqlite_repository._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_save_and_get_player(self, sqlite_repository):
+        """Сохранение и загрузка игрока."""
+        player = Player(user_id=123, level=5, gold=100, inventory=["Стальной меч"])
+        assert sqlite_repository.save_player(player) is True
+
+        data = sqlite_repository.get_player_data(123)
+        assert data["level"] == 5
+        assert Player.from_dict(data).inventory == ["Стальной меч"]
+
+    def test_get_player_not_exists(self, sqlite_repository):
+        """Несуществующий игрок."""
+        assert sqlite_repository.get_player_data(999) is None
+
+    def test_save_player_overwrites_row(self, sqlite_repository):
+        """Повторное сохранение обновляет строку, а не добавляет новую."""
+        sqlite_repository.save_player(Player(user_id=1, gold=10))
+        sqlite_repository.save_player(Player(user_id=1, gold=20))
+
+        assert sqlite_repository.count_players() == 1
+        assert sqlite_repository.get_player_data(1)["gold"] == 20
+
+    def test_indexed_columns_updated(self, sqlite_repository):
+        """Индексируемые колонки совпадают с данными игрока."""
+        sqlite_repository.save_player(Player(user_id=1, level=4, gold=77, total_kills=9))
+        row = sqlite_repository._conn.execute(
+            "SELECT level, gold, total_kills FROM players WHERE user_id = 1"
+        ).fetchone()
+        assert row == (4, 77, 9)
+
+    def test_save_players_batch(self, sqlite_repository):
+        """Пачка игроков сохраняется одной транзакцией."""
+        assert sqlite_repository.save_players([Player(user_id=uid) for uid in range(5)]) is True
+        assert sqlite_repository.count_players() == 5
+
+    def test_delete_player(self, sqlite_repository):
+        """Удаление игрока."""
+        sqlite_repository.save_player(Player(user_id=1))
+        assert sqlite_repository.delete_player(1) is True
+        assert sqlite_repository.delete_player(1) is False
+        assert sqlite_repository.get_player_data(1) is None
+
+    def test_save_all_replaces_players(self, sqlite_repository):
+        """save_all заменяет всех игроков."""
+        sqlite_repository.save_player(Player(user_id=1))
+        sqlite_repository.save_all({"2": {"user_id": 2, "level": 3}})
+
+        assert list(sqlite_repository.get_all_players()) == ["2"]
+
+    def test_top_player_data(self, sqlite_repository):
+        """Рейтинг по уровню и золоту строится запросом."""
+        sqlite_repository.save_player(Player(user_id=1, level=5, gold=100))
+        sqlite_repository.save_player(Player(user_id=2, level=10, gold=200))
+        sqlite_repository.save_player(Player(user_id=3, level=10, gold=300, total_kills=1))
+        sqlite_repository.save_player(Player(user_id=4, level=1, gold=0, total_kills=50))
+
+        top = sqlite_repository.get_top_player_data(limit=3)
+        assert [uid for uid, _ in top] == ["3", "2", "1"]
+
+        top_kills = sqlite_repository.get_top_player_data(limit=1, order_by='total_kills')
+        assert top_kills[0][0] == "4"
+
+    def test_top_player_data_invalid_order(self, sqlite_repository):
+        """Сортировка только по разрешённым колонкам."""
+        with pytest.raises(ValueError):
+            sqlite_repository.get_top_player_data(order_by="data; DROP TABLE players")
+
+    def test_persistence_after_reopen(self, tmp_path):
+        """Данные сохраняются после переоткрытия базы."""
+        db_file = str(tmp_path / "players.db")
+        repo = SqliteDataRepository(data_file=db_file)
+        repo.save_player(Player(user_id=42, level=8))
+        repo.close()
+
+        reopened = SqliteDataRepository(data_file=db_file)
+        assert reopened.get_player_data(42)["level"] == 8
+        reopened.close()
+
+    def test_player_service_with_sqlite(self, sqlite_repository):
+        """PlayerService работает поверх SQLite."""
+        PlayerService._instance = None
+        service = PlayerService(repository=sqlite_repository)
+        player = service.get_or_create(7)
+        player.level = 3
+        service.save_player(player)
+
+        top = service.get_top_players()
+        assert top[0][1].user_id == 7
+        PlayerService._instance = None
+
+
+class TestMigration:
+    """Тесты переноса данных из JSON."""
+
+    def test_migrate_json_to_sqlite(self, tmp_path):
+        """Все игроки переносятся из JSON-файла."""
+        json_file = str(tmp_path / "players.json")
+        db_file = str(tmp_path / "players.db")
+        DataRepository(data_file=json_file).save_all({
+            "1": Player(user_id=1, level=2).to_dict(),
+            "2": Player(user_id=2, level=3).to_dict(),
+        })
+
+        assert migrate_json_to_sqlite(json_file, db_file) == 2
+
+        repo = SqliteDataRepository(data_file=db_file)
+        assert repo.get_player_data(2)["level"] == 3
+        assert repo.count_players() == 2
+        repo.close()
+
+    def test_sqlite_backend_from_factory(self, tmp_path):
+        """Фабрика создаёт SQLite-репозиторий."""
+        repo = create_repository('sqlite', str(tmp_path / "players.db"))
+        assert isinstance(repo, SqliteDataRepository)
+        repo.close()
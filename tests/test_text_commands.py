@@ -0,0 +1,95 @@
+"""Тесты диспетчера текстовых команд."""
+import datetime
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import Chat, Message, Update, User
+from handlers.text_commands import TextCommandDispatcher, text_commands
+from handlers.admin_handlers import format_text_command_stats
+from keyboards import main_keyboard, map_keyboard, quest_keyboard
+
+
+def make_update(text: str) -> Update:
+    """Обновление с текстовым сообщением."""
+    return Update(
+        update_id=1,
+        message=Message(
+            message_id=1,
+            date=datetime.datetime.now(),
+            chat=Chat(id=42, type="private"),
+            from_user=User(id=42, is_bot=False, first_name="Игрок"),
+            text=text,
+        ),
+    )
+
+
+class TestTextCommandDispatcher:
+    """Тесты TextCommandDispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_and_fallback(self):
+        """Известный текст идёт в обработчик, остальное — дальше по роутерам."""
+        dispatcher = TextCommandDispatcher()
+        calls = []
+
+        @dispatcher.register("🗺️ Карта", "🌲 Тёмный лес")
+        async def show(message: Message, player: str) -> None:
+            calls.append((message.text, player))
+
+        dp = Dispatcher()
+
+        async def inject_player(handler, event, data):
+            data['player'] = "игрок"
+            return await handler(event, data)
+
+        dp.message.middleware(inject_player)
+        dp.include_router(dispatcher.router)
+        bot = Bot(token="42:TEST")
+
+        await dp.feed_update(bot, make_update("🌲 Тёмный лес"))
+        result = await dp.feed_update(bot, make_update("привет"))
+
+        assert calls == [("🌲 Тёмный лес", "игрок")]
+        assert result is UNHANDLED
+        assert dispatcher.hits == {"🗺️ Карта": 0, "🌲 Тёмный лес": 1}
+        assert dispatcher.misses == 1
+        await bot.session.close()
+
+    def test_duplicate_text(self):
+        """Один текст нельзя назначить двум обработчикам."""
+        dispatcher = TextCommandDispatcher()
+        dispatcher.register("🛒 Магазин")(lambda message: None)
+
+        with pytest.raises(ValueError):
+            dispatcher.register("🛒 Магазин")(lambda message: None)
+
+    def test_stats_sorted_by_hits(self):
+        """Частые команды в начале списка."""
+        dispatcher = TextCommandDispatcher()
+
+        @dispatcher.register("a", "b")
+        async def handler(message: Message) -> None:
+            pass
+
+        dispatcher.hits["b"] = 5
+
+        assert dispatcher.stats() == [("b", "handler", 5), ("a", "handler", 0)]
+
+    def test_keyboard_buttons_registered(self):
+        """Каждая кнопка клавиатур ведёт к обработчику."""
+        import handlers  # noqa: F401 - регистрирует обработчики
+
+        registered = {text for text, _, _ in text_commands.stats()}
+        for keyboard in (main_keyboard, map_keyboard, quest_keyboard):
+            for row in keyboard.keyboard:
+                for button in row:
+                    assert button.text in registered, button.text
+
+    def test_format_stats(self):
+        """Админская сводка перечисляет команды и обработчики."""
+        import handlers  # noqa: F401 - регистрирует обработчики
+
+        text = format_text_command_stats()
+
+        assert "⚔️ В бой! → start_battle" in text
+        assert "Передано роутерам" in text
@@ -0,0 +1,167 @@
+"""Тесты движка хода resolve_turn."""
+import random
+import pytest
+from data import MONSTER_TEMPLATES
+from game_logic.battle import (
+    TurnAction, TurnEventType, TurnStatus, create_battle_state, resolve_turn,
+)
+from handlers.battle_handlers import format_turn_log
+from models import Monster, Player
+
+
+class FixedRandom(random.Random):
+    """Генератор с заданной последовательностью random(); randint — максимум."""
+
+    def __init__(self, *values: float):
+        super().__init__(0)
+        self.values = list(values)
+
+    def random(self) -> float:
+        return self.values.pop(0)
+
+    def randint(self, a: int, b: int) -> int:
+        return b
+
+
+HIT = 0.5  # не крит, не уворот, побег удался
+MISS = 0.0  # крит / уворот
+
+
+def test_attack_then_monster_hits(test_player, test_battle_state):
+    """Атака, ответный удар, ход засчитан."""
+    test_battle_state.monster_hp = 100
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.ATTACK, FixedRandom(HIT, HIT))
+
+    assert outcome.status is TurnStatus.ONGOING
+    assert [e.type for e in outcome.events] == [TurnEventType.PLAYER_ATTACK, TurnEventType.MONSTER_ATTACK]
+    assert test_battle_state.monster_hp == 100 - test_player.power
+    assert test_player.hp == 100 - test_battle_state.monster_power
+    assert test_battle_state.turn == 2
+
+
+def test_crit_victory_skips_monster(test_player, test_battle_state):
+    """Крит добивает монстра, монстр уже не бьёт."""
+    test_battle_state.monster_hp = 15
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.ATTACK, FixedRandom(MISS))
+
+    assert outcome.status is TurnStatus.VICTORY
+    assert outcome.events[0].crit and outcome.events[0].amount == 15
+    assert test_player.hp == 100
+    assert test_battle_state.turn == 1
+
+
+def test_defend_halves_and_resets(test_player, test_battle_state):
+    """Защита вдвое снижает урон и действует один ход."""
+    test_battle_state.monster_power = 9
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.DEFEND, FixedRandom(HIT))
+
+    assert outcome.events[-1].defended and outcome.events[-1].amount == 4
+    assert test_player.hp == 96
+    assert not test_battle_state.defending
+
+
+def test_defeat(test_player, test_battle_state):
+    """HP игрока кончилось — поражение."""
+    test_player.hp = 1
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.DEFEND, FixedRandom(HIT))
+
+    assert outcome.status is TurnStatus.DEFEAT
+
+
+def test_rejected_spell_consumes_nothing(test_player, test_battle_state):
+    """Неизученное заклинание: отказ, ход и мана не тратятся."""
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.SPELL, FixedRandom(), key="fireball")
+
+    assert outcome.status is TurnStatus.REJECTED
+    assert "не изучали" in outcome.message
+    assert (test_player.mana, test_battle_state.turn) == (50, 1)
+
+
+def test_flee(test_player, test_battle_state):
+    """Побег завершает бой, от босса сбежать нельзя."""
+    test_player.battle_state = test_battle_state
+    outcome = resolve_turn(test_player, test_battle_state, TurnAction.FLEE, FixedRandom(MISS))
+
+    assert outcome.status is TurnStatus.FLED
+    assert test_player.battle_state is None
+
+    test_battle_state.is_boss = True
+    assert resolve_turn(test_player, test_battle_state, TurnAction.FLEE).status is TurnStatus.REJECTED
+
+
+@pytest.mark.parametrize('action, values, expected', [
+    (TurnAction.ATTACK, (MISS, MISS), "⚔️ Вы атакуете! 💥 КРИТИЧЕСКИЙ УДАР! 15 урона!\n💨 Вы уклонились от атаки Гоблин!"),
+    (TurnAction.DEFEND, (HIT,), "🛡️ Вы приняли защитную стойку!\n🗡️ Гоблин атакует! Урон снижен до 4."),
+    (TurnAction.FLEE, (0.9, MISS), "🏃 Попытка побега провалилась!\n💨 Но вы уклонились от атаки Гоблин!"),
+    (TurnAction.FLEE, (0.9, HIT), "🏃 Попытка побега провалилась!\n🗡️ Гоблин атакует! 9 урона."),
+])
+def test_format_turn_log(test_player, test_battle_state, action, values, expected):
+    """Текст хода прежний: обработчики только рисуют события."""
+    test_battle_state.monster_hp = 100
+    test_battle_state.monster_power = 9
+    outcome = resolve_turn(test_player, test_battle_state, action, FixedRandom(*values))
+
+    assert format_turn_log(outcome, "Гоблин") == expected
+
+
+def test_fuzz_invariants():
+    """Случайные действия не нарушают инвариантов боя."""
+    rng = random.Random(2024)
+    actions = list(TurnAction)
+    for _ in range(300):
+        template = rng.choice(list(MONSTER_TEMPLATES.values()))
+        player = Player(
+            user_id=1, hp=200, max_hp=200, power=rng.randint(5, 60), mana=rng.randint(0, 60), max_mana=60,
+            spells=["⚡ Огненный шар", "✨ Исцеление"], potions={"health_potion": 2, "mana_potion": 1},
+        )
+        state = player.battle_state = create_battle_state(
+            Monster.from_template(template), is_boss=rng.random() < 0.2,
+        )
+        status = TurnStatus.ONGOING
+        while status is TurnStatus.ONGOING:
+            before = (player.hp, player.mana, state.monster_hp, state.turn)
+            action = rng.choice(actions)
+            key = rng.choice(["fireball", "heal", "health_potion", "mana_potion", "unknown"])
+            status = resolve_turn(player, state, action, rng, key=key).status
+
+            assert 0 <= player.mana <= player.max_mana
+            assert player.hp <= player.max_hp
+            assert state.monster_hp <= before[2]
+            assert not state.defending
+            if status is TurnStatus.REJECTED:
+                assert (player.hp, player.mana, state.monster_hp, state.turn) == before
+                status = TurnStatus.ONGOING
+            elif status is TurnStatus.ONGOING:
+                assert state.turn == before[3] + 1 and player.hp > 0 and state.monster_hp > 0
+            elif status is TurnStatus.VICTORY:
+                assert state.monster_hp <= 0
+            elif status is TurnStatus.DEFEAT:
+                assert player.hp <= 0
+            elif status is TurnStatus.FLED:
+                assert not state.is_boss and player.battle_state is None
+
+
+def test_replay_with_spells_and_potions():
+    """С тем же зерном бой с заклинаниями и зельями повторяется, глобальный random не трогается."""
+    def play(seed: int) -> list:
+        rng = random.Random(seed)
+        player = Player(
+            user_id=1, hp=120, max_hp=200, power=25, mana=60, max_mana=60,
+            spells=["⚡ Огненный шар", "✨ Исцеление"], potions={"health_potion": 3, "mana_potion": 3},
+        )
+        state = player.battle_state = create_battle_state(Monster.from_template(MONSTER_TEMPLATES["orc"]))
+        plan = [
+            (TurnAction.SPELL, "fireball"), (TurnAction.POTION, "mana_potion"), (TurnAction.ATTACK, None),
+            (TurnAction.SPELL, "heal"), (TurnAction.POTION, "health_potion"), (TurnAction.DEFEND, None),
+        ]
+        log = []
+        for action, key in plan * 5:
+            outcome = resolve_turn(player, state, action, rng, key=key)
+            log.append((outcome.status, outcome.events, player.hp, player.mana, state.monster_hp))
+            if outcome.status not in (TurnStatus.ONGOING, TurnStatus.REJECTED):
+                break
+        return log
+
+    global_state = random.getstate()
+    assert play(11) == play(11)
+    assert random.getstate() == global_state
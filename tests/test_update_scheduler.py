@@ -0,0 +1,156 @@
+"""Тесты планировщика обновлений."""
+import asyncio
+import datetime
+import pytest
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Chat, Message, Update, User
+from handlers.admin_handlers import format_scheduler_stats
+from middlewares import UpdateSchedulerMiddleware
+from services import UpdateScheduler
+
+
+def make_update(update_id: int, user_id: int, text: str) -> Update:
+    """Обновление с текстовым сообщением."""
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=User(id=user_id, is_bot=False, first_name="Игрок"),
+            text=text,
+        ),
+    )
+
+
+class TestUpdateScheduler:
+    """Тесты UpdateScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_same_key_in_order(self):
+        """Задачи одного ключа выполняются по порядку и не пересекаются."""
+        scheduler = UpdateScheduler(workers=4)
+        events = []
+
+        def job(tag, delay):
+            async def run():
+                events.append(f"{tag}-start")
+                await asyncio.sleep(delay)
+                events.append(f"{tag}-end")
+            return run
+
+        await scheduler.submit(7, job("a", 0.02))
+        await scheduler.submit(7, job("b", 0))
+        await scheduler.stop()
+
+        assert events == ["a-start", "a-end", "b-start", "b-end"]
+
+    @pytest.mark.asyncio
+    async def test_different_keys_parallel(self):
+        """Задачи разных очередей идут одновременно."""
+        scheduler = UpdateScheduler(workers=4)
+        both_started = asyncio.Event()
+        started = set()
+
+        def job(key):
+            async def run():
+                started.add(key)
+                if len(started) == 2:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), 1)
+            return run
+
+        await scheduler.submit(1, job(1))
+        await scheduler.submit(2, job(2))
+        await scheduler.stop()
+
+        assert scheduler.stats()['failed'] == 0
+
+    @pytest.mark.asyncio
+    async def test_backpressure(self):
+        """При заполненной очереди submit ждёт, пока воркер её разберёт."""
+        scheduler = UpdateScheduler(workers=1, queue_size=1)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        async def fast():
+            pass
+
+        await scheduler.submit(1, slow)
+        await asyncio.sleep(0)  # воркер забрал первую задачу
+        await scheduler.submit(1, fast)
+        third = asyncio.create_task(scheduler.submit(1, fast))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        release.set()
+        await third
+        await scheduler.stop()
+
+        stats = scheduler.stats()
+        assert stats['blocked'] == 1
+        assert stats['processed'] == 3
+        assert stats['queued'] == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_stop_worker(self):
+        """Ошибка задачи не останавливает очередь."""
+        scheduler = UpdateScheduler(workers=1)
+        done = []
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def ok():
+            done.append(True)
+
+        await scheduler.submit(1, broken)
+        await scheduler.submit(1, ok)
+        await scheduler.stop()
+
+        assert done == [True]
+        assert scheduler.stats()['failed'] == 1
+
+    def test_invalid_workers(self):
+        """Нужен хотя бы один воркер."""
+        with pytest.raises(ValueError):
+            UpdateScheduler(workers=0)
+
+    def test_format_stats(self):
+        """Сводка для администратора содержит глубину и ожидание."""
+        text = format_scheduler_stats(UpdateScheduler(workers=2).stats())
+
+        assert "Воркеров: 2" in text
+        assert "Ожидание в очереди" in text
+
+
+class TestUpdateSchedulerMiddleware:
+    """Тесты UpdateSchedulerMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_updates_of_player_in_order(self):
+        """Обработчики одного игрока идут по порядку, игроки — параллельно."""
+        scheduler = UpdateScheduler(workers=4)
+        dp = Dispatcher()
+        dp.update.outer_middleware(UpdateSchedulerMiddleware(scheduler))
+        log = []
+
+        @dp.message(F.text)
+        async def handler(message: Message) -> None:
+            log.append((message.from_user.id, message.text, "start"))
+            await asyncio.sleep(0.01 if message.text == "1" else 0)
+            log.append((message.from_user.id, message.text, "end"))
+
+        bot = Bot(token="42:TEST")
+        await dp.feed_update(bot, make_update(1, 10, "1"))
+        await dp.feed_update(bot, make_update(2, 10, "2"))
+        await dp.feed_update(bot, make_update(3, 11, "3"))
+        await scheduler.stop()
+
+        player_10 = [entry for entry in log if entry[0] == 10]
+        assert player_10 == [(10, "1", "start"), (10, "1", "end"), (10, "2", "start"), (10, "2", "end")]
+        # Игрок 11 не ждал медленного обработчика игрока 10
+        assert log.index((11, "3", "end")) < log.index((10, "1", "end"))
+        await bot.session.close()
@@ -0,0 +1,102 @@
+"""Тесты блокировок игроков."""
+import asyncio
+import gc
+import pytest
+from unittest.mock import Mock
+from middlewares import UserLockMiddleware
+from services import UserLockRegistry
+
+
+class TestUserLockRegistry:
+    """Тесты UserLockRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_same_user_serialized(self):
+        """Обновления одного игрока не пересекаются."""
+        registry = UserLockRegistry()
+        events = []
+
+        async def update(tag):
+            async with registry.hold(1):
+                events.append(f"{tag}-start")
+                await asyncio.sleep(0.01)
+                events.append(f"{tag}-end")
+
+        await asyncio.gather(update("a"), update("b"))
+
+        assert events == ["a-start", "a-end", "b-start", "b-end"]
+        stats = registry.stats()
+        assert stats['acquisitions'] == 2
+        assert stats['contended'] == 1
+        assert stats['max_wait_ms'] > 0
+
+    @pytest.mark.asyncio
+    async def test_different_users_parallel(self):
+        """Разные игроки не ждут друг друга."""
+        registry = UserLockRegistry()
+        inside = set()
+        overlap = []
+
+        async def update(user_id):
+            async with registry.hold(user_id):
+                inside.add(user_id)
+                await asyncio.sleep(0.01)
+                overlap.append(len(inside))
+                inside.discard(user_id)
+
+        await asyncio.gather(update(1), update(2))
+
+        assert max(overlap) == 2
+        assert registry.stats()['contended'] == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_locks_reclaimed(self):
+        """Неиспользуемые блокировки удаляются из реестра."""
+        registry = UserLockRegistry()
+        for user_id in range(100):
+            async with registry.hold(user_id):
+                pass
+        gc.collect()
+
+        assert len(registry) == 0
+
+    @pytest.mark.asyncio
+    async def test_released_on_error(self):
+        """Исключение в обработчике отпускает блокировку."""
+        registry = UserLockRegistry()
+        with pytest.raises(RuntimeError):
+            async with registry.hold(1):
+                raise RuntimeError("boom")
+
+        assert not registry.get(1).locked()
+
+
+class TestUserLockMiddleware:
+    """Тесты UserLockMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_handler_runs_under_lock(self):
+        """Обработчик выполняется под блокировкой отправителя."""
+        registry = UserLockRegistry()
+        middleware = UserLockMiddleware(registry)
+
+        async def handler(event, data):
+            assert registry.get(42).locked()
+            return "ok"
+
+        result = await middleware(handler, Mock(), {'event_from_user': Mock(id=42)})
+
+        assert result == "ok"
+        assert registry.stats()['acquisitions'] == 1
+
+    @pytest.mark.asyncio
+    async def test_event_without_user(self):
+        """События без отправителя проходят без блокировки."""
+        registry = UserLockRegistry()
+        middleware = UserLockMiddleware(registry)
+
+        async def handler(event, data):
+            return "ok"
+
+        assert await middleware(handler, Mock(), {}) == "ok"
+        assert registry.stats()['acquisitions'] == 0
@@ -87,6 +87,14 @@ class TestFormatters:
         assert "Уровень 10" in top_text
         assert "500" in top_text
 
+    def test_format_top_players_with_rank(self):
+        """Тест топа с местом игрока."""
+        players = [("1", Player(user_id=1, level=10, gold=500))]
+
+        top_text = format_top_players(players, player_rank=42)
+
+        assert "Ваше место: #42" in top_text
+
     def test_format_top_players_empty(self):
         """Тест форматирования пустого топа."""
         top_text = format_top_players([])
@@ -0,0 +1,148 @@
+"""Тесты сервера вебхука."""
+import asyncio
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Message
+from webhook import WEBHOOK_HANDLER, create_app
+
+SECRET = "s3cret"
+
+
+def update_payload(update_id: int, text: str) -> dict:
+    """Тело запроса Telegram с текстовым сообщением."""
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': 42, 'type': 'private'},
+            'from': {'id': 42, 'is_bot': False, 'first_name': 'Игрок'},
+            'text': text,
+        },
+    }
+
+
+@pytest.fixture
+def received():
+    """Тексты сообщений, дошедших до обработчика."""
+    return []
+
+
+@pytest.fixture
+def dispatcher(received):
+    """Диспетчер с обработчиком, запоминающим сообщения."""
+    dp = Dispatcher()
+
+    @dp.message(F.text)
+    async def handler(message: Message) -> None:
+        await asyncio.sleep(0.01)
+        received.append(message.text)
+
+    return dp
+
+
+async def make_client(dispatcher, **kwargs) -> TestClient:
+    """Запустить приложение вебхука на тестовом сервере."""
+    bot = Bot(token="42:TEST")
+    app = create_app(dispatcher, bot, secret_token=SECRET, **kwargs)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+class TestWebhook:
+    """Тесты create_app."""
+
+    @pytest.mark.asyncio
+    async def test_update_handled(self, dispatcher, received):
+        """Обновление с верным секретом обрабатывается."""
+        client = await make_client(dispatcher)
+        try:
+            response = await client.post(
+                '/webhook', json=update_payload(1, "привет"),
+                headers={'X-Telegram-Bot-Api-Secret-Token': SECRET},
+            )
+            assert response.status == 200
+            await asyncio.sleep(0.05)
+        finally:
+            await client.close()
+
+        assert received == ["привет"]
+
+    @pytest.mark.asyncio
+    async def test_wrong_secret_rejected(self, dispatcher, received):
+        """Запрос без секрета получает 401 и не обрабатывается."""
+        client = await make_client(dispatcher)
+        try:
+            response = await client.post('/webhook', json=update_payload(1, "привет"))
+            assert response.status == 401
+            response = await client.post(
+                '/webhook', json=update_payload(2, "привет"),
+                headers={'X-Telegram-Bot-Api-Secret-Token': 'wrong'},
+            )
+            assert response.status == 401
+        finally:
+            await client.close()
+
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_health_and_ready(self, dispatcher):
+        """Проверки живости и готовности."""
+        client = await make_client(dispatcher)
+        try:
+            assert (await client.get('/healthz')).status == 200
+            response = await client.get('/readyz')
+            assert response.status == 200
+            assert (await response.json())['ready'] is True
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limited(self, dispatcher, received):
+        """Одновременно обрабатывается не больше max_concurrency обновлений."""
+        client = await make_client(dispatcher, max_concurrency=2)
+        handler = client.server.app[WEBHOOK_HANDLER]
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, handler.in_flight)
+                await asyncio.sleep(0.001)
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await asyncio.gather(*(
+                client.post(
+                    '/webhook', json=update_payload(i, str(i)),
+                    headers={'X-Telegram-Bot-Api-Secret-Token': SECRET},
+                )
+                for i in range(6)
+            ))
+        finally:
+            await client.close()
+            watcher.cancel()
+
+        assert sorted(received) == [str(i) for i in range(6)]
+        assert peak <= 2
+        assert handler.stats()['received'] == 6
+
+    @pytest.mark.asyncio
+    async def test_shutdown_waits_for_in_flight(self, dispatcher, received):
+        """Остановка дожидается начатых обработок, счётчик возвращается к нулю."""
+        client = await make_client(dispatcher)
+        handler = client.server.app[WEBHOOK_HANDLER]
+        try:
+            response = await client.post(
+                '/webhook', json=update_payload(1, "привет"),
+                headers={'X-Telegram-Bot-Api-Secret-Token': SECRET},
+            )
+            assert response.status == 200
+            assert handler.in_flight == 1
+        finally:
+            await client.close()
+
+        assert received == ["привет"]
+        assert handler.in_flight == 0
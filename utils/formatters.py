@@ -60,8 +60,8 @@ def format_battle_result(result, player: Player) -> str:
     return msg
 
 
-def format_top_players(players: list[tuple[str, Player]]) -> str:
-    """Отформатировать топ игроков."""
+def format_top_players(players: list[tuple[str, Player]], player_rank: int | None = None) -> str:
+    """Отформатировать топ игроков (и место запросившего игрока, если известно)."""
     text = "🏆 ТОП-10 ИГРОКОВ 🏆\n\n"
 
     for i, (uid, p) in enumerate(players, 1):
@@ -75,6 +75,9 @@ def format_top_players(players: list[tuple[str, Player]]) -> str:
 
         text += f"{medal} #{i}. Уровень {p.level} | 💰 {p.gold}\n"
 
+    if player_rank is not None:
+        text += f"\n📍 Ваше место: #{player_rank}"
+
     return text
 
 
@@ -0,0 +1,177 @@
+"""Режим вебхука: aiohttp-сервер для обновлений от Telegram.
+
+Запускается из ``bot.py`` при ``BOT_MODE=webhook``.
+"""
+import asyncio
+import logging
+from typing import Any, Optional
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обработчик вебхука с ограничением одновременно обрабатываемых обновлений.
+
+    Telegram получает ответ сразу, а обновление обрабатывается в фоне.
+    Фоновых обработок не больше ``max_concurrency``: следующий запрос
+    ждёт свободного места и не отвечает Telegram, пока его не дождётся,
+    поэтому при перегрузке Telegram сам придерживает отправку.
+
+    Приём запроса переопределён целиком через публичный ``handle``, а
+    фоновые задачи и их число обработчик ведёт сам — закрытые части
+    aiogram и ``asyncio.Semaphore`` не используются.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrency: int = 64, **kwargs: Any):
+        """Инициализировать обработчик."""
+        super().__init__(dispatcher=dispatcher, bot=bot, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self.in_flight = 0
+        self.received = 0
+        self.failed = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Проверить секрет, дождаться свободного места и запустить обработку в фоне."""
+        bot = await self.resolve_bot(request)
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), bot):
+            return web.Response(body="Unauthorized", status=401)
+        update = await request.json(loads=bot.session.json_loads)
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        self.received += 1
+        task = asyncio.create_task(self._feed_update(bot, update))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    __call__ = handle
+
+    async def _feed_update(self, bot: Bot, update: dict) -> None:
+        """Передать обновление диспетчеру и выполнить метод, который вернул обработчик."""
+        result = await self.dispatcher.feed_raw_update(bot=bot, update=update, **self.data)
+        if isinstance(result, TelegramMethod):
+            await self.dispatcher.silent_call_request(bot=bot, result=result)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Освободить место после обработки обновления."""
+        self._tasks.discard(task)
+        self.in_flight -= 1
+        self._semaphore.release()
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+            logger.error("Ошибка обработки обновления из вебхука", exc_info=task.exception())
+
+    async def drain(self, timeout: float) -> None:
+        """Дождаться начатых обработок, но не дольше ``timeout`` секунд."""
+        pending = list(self._tasks)
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+
+    def stats(self) -> dict:
+        """Статистика вебхука."""
+        return {
+            'received': self.received,
+            'failed': self.failed,
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+        }
+
+
+WEBHOOK_HANDLER = web.AppKey("webhook_handler", BoundedRequestHandler)
+
+
+def create_app(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    path: str = '/webhook',
+    secret_token: Optional[str] = None,
+    max_concurrency: int = 64,
+    webhook_url: Optional[str] = None,
+    **data: Any,
+) -> web.Application:
+    """Собрать aiohttp-приложение вебхука.
+
+    Args:
+        dispatcher: Диспетчер бота
+        bot: Бот
+        path: Путь, на который Telegram присылает обновления
+        secret_token: Секрет из заголовка X-Telegram-Bot-Api-Secret-Token;
+            запросы без него получают 401
+        max_concurrency: Предел одновременно обрабатываемых обновлений
+        webhook_url: Публичный адрес вебхука; если задан, регистрируется
+            в Telegram при запуске
+        data: Дополнительные данные для обработчиков
+    """
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        max_concurrency=max_concurrency,
+        secret_token=secret_token,
+        **data,
+    )
+    handler.register(app, path=path)
+    app[WEBHOOK_HANDLER] = handler
+    state = {'ready': False}
+
+    async def health(request: web.Request) -> web.Response:
+        """Процесс жив и отвечает."""
+        return web.json_response({'status': 'ok'})
+
+    async def ready(request: web.Request) -> web.Response:
+        """Бот запущен и принимает обновления."""
+        payload = {'ready': state['ready'], **handler.stats()}
+        return web.json_response(payload, status=200 if state['ready'] else 503)
+
+    app.router.add_get('/healthz', health)
+    app.router.add_get('/readyz', ready)
+
+    async def on_startup(app: web.Application) -> None:
+        """Зарегистрировать вебхук и открыть приём обновлений."""
+        if webhook_url:
+            await bot.set_webhook(
+                url=webhook_url.rstrip('/') + path,
+                secret_token=secret_token,
+                allowed_updates=dispatcher.resolve_used_update_types(),
+                max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+            )
+        state['ready'] = True
+
+    async def on_shutdown(app: web.Application) -> None:
+        """Закрыть приём обновлений и дождаться начатых обработок."""
+        state['ready'] = False
+        await handler.drain(timeout=10)
+
+    # Диспетчер запускается первым (startup бота), затем регистрируется вебхук
+    setup_application(app, dispatcher, bot=bot, **data)
+    app.on_startup.append(on_startup)
+    app.on_shutdown.insert(0, on_shutdown)
+    return app
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot) -> None:
+    """Запустить сервер вебхука с настройками из конфигурации и ждать остановки."""
+    app = create_app(
+        dispatcher,
+        bot,
+        path=config.WEBHOOK_PATH,
+        secret_token=config.WEBHOOK_SECRET or None,
+        max_concurrency=config.WEBHOOK_MAX_CONCURRENCY,
+        webhook_url=config.WEBHOOK_URL or None,
+    )
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=config.WEBHOOK_HOST, port=config.WEBHOOK_PORT)
+    await site.start()
+    logger.info("Вебхук слушает %s:%d%s", config.WEBHOOK_HOST, config.WEBHOOK_PORT, config.WEBHOOK_PATH)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()